@@ -8,6 +8,8 @@ import time
 import datetime
 import pandas as pd
 import os
+# Grabador de Ticks (segmentos binarios)
+from Grabador_Ticks import GrabadorTicks, LectorTicks, TIPO_MIDPOINT
 
 # Clase que procesa solicitudes de datos tick-by-tick
 class IB_TickByTickData(EWrapper, EClient):
@@ -16,14 +18,14 @@ class IB_TickByTickData(EWrapper, EClient):
     Clase que se conecta a IB y obtiene datos Tick-by-Tick en tiempo real
     """
     
-    def __init__(self):
+    def __init__(self, grabador):
         
         """
         Constructor
         """
         
         EClient.__init__(self, self)
-        self.tick_data = []
+        self.grabador = grabador
         self.req_id = 0
         
         
@@ -33,8 +35,25 @@ class IB_TickByTickData(EWrapper, EClient):
         Método que recibe el precio medio de los datos en tiempo real
         """
         
-        self.tick_data.append((reqId, time, midPoint))
-        print(f"ID Solicitud: {reqId}, Tiempo: {time}, Precio Medio: {midPoint}")
+        self.grabador.midpoint(reqId, time, midPoint)
+        
+        
+    def tickByTickBidAsk(self, reqId, time, bidPrice, askPrice, bidSize, askSize, tickAttribBidAsk):
+        
+        """
+        Método que recibe los precios Bid y Ask en Tick-by-Tick
+        """
+        
+        self.grabador.bid_ask(reqId, time, bidPrice, askPrice, bidSize, askSize)
+        
+        
+    def tickByTickAllLast(self, reqId, tickType, time, price, size, tickAttribLast, exchange, specialConditions):
+        
+        """
+        Método que recibe los precios de las operaciones ejecutadas en Tick-by-Tick
+        """
+        
+        self.grabador.last(reqId, tickType, time, price, size)
         
         
 # Función para crear un contrato
@@ -53,25 +72,33 @@ def crear_contrato(symbol, secType="CASH", exchange="IDEALPRO", currency="USD",
     
     return contrato
 
-# Función para guardar datos en un archivo
-def guardar_datos(df, filename):
+# Función para migrar los archivos CSV anteriores al grabador
+def migrar_csv(grabador, filename, req_id):
     
     """
-    Función para guardar datos en un archivo csv
+    Función que agrega al grabador los ticks de un archivo csv generado por versiones anteriores de este script
     """
     
-    # Revisar si hay un archivo existente
-    if os.path.exists(filename):
-        existing_df = pd.read_csv(filename)
-        df = pd.concat([existing_df, df]).drop_duplicates().reset_index(drop=True)
-    # Guardar
-    df.to_csv(filename, index=False)
+    df = pd.read_csv(filename)
+    for tiempo, precio in zip(df["Time"], df["MidPoint"]):
+        grabador.midpoint(req_id, int(datetime.datetime.fromisoformat(tiempo).timestamp()), precio)
     
 # Lista de activos para solicitar datos
 assets = ["EUR", "GBP", "AUD"]
 
+# Iniciar Grabador (los ticks se escriben en segundo plano en la carpeta "ticks")
+carpeta_ticks = "ticks"
+migrar = len(LectorTicks(carpeta_ticks).segmentos()) == 0
+grabador = GrabadorTicks(carpeta=carpeta_ticks)
+grabador.iniciar()
+for indice, activo in enumerate(assets):
+    grabador.registrar_activo(reqId=indice, nombre=activo + "_USD")
+    # Migrar los datos guardados en csv (sólo la primera vez)
+    if migrar and os.path.exists(activo + "_USD-tickbytick.csv"):
+        migrar_csv(grabador=grabador, filename=activo + "_USD-tickbytick.csv", req_id=indice)
+
 # Conectar a la API
-IB_streaming = IB_TickByTickData()
+IB_streaming = IB_TickByTickData(grabador=grabador)
 IB_streaming.connect(host="127.0.0.1", port=7497, clientId=1)
 streaming_thread = threading.Thread(target=IB_streaming.run, daemon=True)
 streaming_thread.start()
@@ -90,28 +117,18 @@ time.sleep(15)
 for i in range(IB_streaming.req_id):
     IB_streaming.cancelTickByTickData(reqId=i)
     
-# Esperar a que se procesen los últimos datos
+# Esperar a que se procesen los últimos datos y escribir los pendientes
 time.sleep(0.5)
-    
-# Mostrar datos
-print(IB_streaming.tick_data)  
+grabador.detener()
 
-# Guardar los datos en un archivo
-datos_df = pd.DataFrame(IB_streaming.tick_data, columns=["Request ID", "Time", "MidPoint"])    
-print(datos_df)    
-for indice, activo in enumerate(assets):
-    # Extraer datos para cada activo
-    sub_datos = datos_df[datos_df["Request ID"] == indice].copy()
-    # Convertir Fecha
-    sub_datos["Time"] = sub_datos["Time"].apply(lambda x: datetime.datetime.fromtimestamp(x))
-    # Guardar
-    guardar_datos(df=sub_datos, filename=assets[indice] + "_USD-tickbytick.csv")
+# Exportar los datos de cada activo a un archivo csv (el historial completo permanece en los segmentos; el csv se genera bajo demanda)
+lector = LectorTicks(carpeta_ticks)
+for activo in assets:
+    lector.exportar_csv(ruta=activo + "_USD-tickbytick.csv", activo=activo + "_USD", tipo=TIPO_MIDPOINT)
     
 # Leer Datos y Mostrarlos
-for indice in range(len(assets)):
-    # Obtener Nombre
-    filename = assets[indice] +  "_USD-tickbytick.csv"
-    df = pd.read_csv(filename)
+for activo in assets:
+    df = lector.a_dataframe(activo=activo + "_USD", tipo=TIPO_MIDPOINT)
     print("Datos:")
     print(df)
     print("\n" + "-" * 20 + "\n")
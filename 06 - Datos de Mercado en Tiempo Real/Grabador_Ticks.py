@@ -0,0 +1,583 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import threading
+import queue
+import datetime
+import glob
+import json
+import os
+from time import time_ns
+
+# Tipos de Tick
+TIPO_MIDPOINT = 0
+TIPO_BIDASK = 1
+TIPO_LAST = 2
+TIPO_ALLLAST = 3
+
+# Estructura de cada registro (56 bytes, ancho fijo)
+REGISTRO = np.dtype([
+    ("tiempo", "<i8"),       # Segundos desde 1970 (tiempo del tick enviado por IB)
+    ("recepcion", "<i8"),    # Nanosegundos desde 1970 (momento en que se recibió el tick)
+    ("req_id", "<i4"),
+    ("tipo", "u1"),
+    ("relleno", "u1", (3,)),
+    ("precio", "<f8"),       # MidPoint, Bid o Price
+    ("precio2", "<f8"),      # Ask
+    ("tamano", "<f8"),       # Bid Size o Size
+    ("tamano2", "<f8"),      # Ask Size
+    ])
+
+# Estructura del índice de cada segmento (una entrada por bloque escrito)
+INDICE = np.dtype([("tiempo_min", "<i8"), ("tiempo_max", "<i8"), ("posicion", "<i8"), ("cantidad", "<i8")])
+
+# Clase que graba ticks en segmentos binarios
+class GrabadorTicks:
+
+    """
+    Clase que graba ticks (tick-by-tick) en archivos binarios de solo escritura al final (append-only).
+
+    Los callbacks de IB escriben cada tick directamente en un bloque preasignado de registros de ancho fijo (sin crear
+    objetos por tick). Cuando el bloque se llena (o cada `intervalo_vaciado` segundos), se entrega a un hilo escritor,
+    que lo añade al segmento actual y registra en el índice del segmento su rango de tiempo. Los bloques se reutilizan.
+
+    Archivos generados en `carpeta`:
+
+        - ticks-000001.bin  : Registros (se pueden leer con `np.memmap(..., dtype=REGISTRO)`).
+        - ticks-000001.idx  : Índice de tiempo del segmento.
+        - ticks-000001.json : Nombres de los activos de cada reqId.
+
+    Al alcanzar `registros_por_segmento`, se abre un nuevo segmento.
+    """
+
+    def __init__(self, carpeta: str, registros_por_bloque: int = 4096, registros_por_segmento: int = 2_000_000,
+                 intervalo_vaciado: float = 1.0, bloques: int = 16) -> None:
+
+        """
+        Constructor de la clase.
+
+        Parámetros:
+        -----------
+        carpeta : str
+            Carpeta donde se guardan los segmentos. Si no existe, se creará automáticamente.
+
+        registros_por_bloque : int, opcional
+            Número de ticks por bloque en memoria. Por defecto, es 4096.
+
+        registros_por_segmento : int, opcional
+            Número máximo de ticks por segmento. Por defecto, es 2,000,000 (aprox. 112 MB).
+
+        intervalo_vaciado : float, opcional
+            Segundos máximos que un tick puede permanecer en memoria antes de escribirse. Por defecto, es 1.0.
+
+        bloques : int, opcional
+            Número de bloques preasignados. Por defecto, es 16.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        # Atributos
+        self.carpeta = carpeta
+        self.registros_por_bloque = registros_por_bloque
+        self.registros_por_segmento = registros_por_segmento
+        self.intervalo_vaciado = intervalo_vaciado
+        os.makedirs(self.carpeta, exist_ok=True)
+        # Bloques libres y cola del hilo escritor
+        self.libres = queue.SimpleQueue()
+        for _ in range(bloques):
+            self.libres.put(np.zeros(registros_por_bloque, dtype=REGISTRO))
+        self.cola = queue.SimpleQueue()
+        self.candado = threading.Lock()
+        self.tomar_bloque()
+        # Segmento Actual (se continúa la numeración existente)
+        existentes = sorted(glob.glob(os.path.join(self.carpeta, "ticks-*.bin")))
+        self.numero_segmento = int(os.path.basename(existentes[-1])[6:12]) if existentes else 0
+        self.archivo = None
+        self.archivo_indice = None
+        self.registros_segmento = 0
+        self.activos = {}
+        self.activos_segmento = None
+        # Hilo Escritor
+        self.activo = False
+        self.hilo = None
+
+
+    def tomar_bloque(self) -> None:
+
+        """
+        Método que toma un bloque libre (o crea uno nuevo si el escritor va retrasado) y prepara sus columnas.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        try:
+            self.bloque = self.libres.get_nowait()
+        except queue.Empty:
+            self.bloque = np.zeros(self.registros_por_bloque, dtype=REGISTRO)
+        # Vistas por columna (se crean una vez por bloque, no por tick)
+        self.c_tiempo = self.bloque["tiempo"]
+        self.c_recepcion = self.bloque["recepcion"]
+        self.c_req_id = self.bloque["req_id"]
+        self.c_tipo = self.bloque["tipo"]
+        self.c_precio = self.bloque["precio"]
+        self.c_precio2 = self.bloque["precio2"]
+        self.c_tamano = self.bloque["tamano"]
+        self.c_tamano2 = self.bloque["tamano2"]
+        self.n = 0
+
+
+    def iniciar(self) -> None:
+
+        """
+        Método que inicia el hilo escritor.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        self.activo = True
+        self.hilo = threading.Thread(target=self.escritor, daemon=True)
+        self.hilo.start()
+
+
+    def detener(self) -> None:
+
+        """
+        Método que escribe los ticks pendientes, detiene el hilo escritor y cierra el segmento actual.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        self.vaciar()
+        self.activo = False
+        self.cola.put(None)
+        if self.hilo is not None:
+            self.hilo.join()
+        self.cerrar_segmento()
+
+
+    def registrar_activo(self, reqId: int, nombre: str) -> None:
+
+        """
+        Método que asocia un nombre de activo a un reqId (se guarda junto a cada segmento para poder exportar por nombre).
+
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción tick-by-tick.
+
+        nombre : str
+            Nombre del activo (por ejemplo, "EUR_USD").
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        with self.candado:
+            self.activos[reqId] = nombre
+
+
+    def agregar(self, reqId: int, tipo: int, tiempo: int, precio: float, precio2: float = 0.0, tamano: float = 0.0,
+                tamano2: float = 0.0) -> None:
+
+        """
+        Método que escribe un tick en el bloque actual.
+
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+
+        tipo : int
+            Tipo de tick (TIPO_MIDPOINT, TIPO_BIDASK, TIPO_LAST o TIPO_ALLLAST).
+
+        tiempo : int
+            Tiempo del tick (segundos desde 1970).
+
+        precio, precio2, tamano, tamano2 : float
+            Valores del tick (ver la estructura `REGISTRO`).
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        with self.candado:
+            i = self.n
+            self.c_tiempo[i] = tiempo
+            self.c_recepcion[i] = time_ns()
+            self.c_req_id[i] = reqId
+            self.c_tipo[i] = tipo
+            self.c_precio[i] = precio
+            self.c_precio2[i] = precio2
+            self.c_tamano[i] = tamano
+            self.c_tamano2[i] = tamano2
+            self.n = i + 1
+            # Entregar bloque lleno al escritor
+            if self.n == self.registros_por_bloque:
+                self.cola.put((self.bloque, self.n, dict(self.activos)))
+                self.tomar_bloque()
+
+
+    def midpoint(self, reqId: int, tiempo: int, midPoint: float) -> None:
+
+        """
+        Método para llamar desde `tickByTickMidPoint`.
+        """
+
+        self.agregar(reqId, TIPO_MIDPOINT, tiempo, midPoint)
+
+
+    def bid_ask(self, reqId: int, tiempo: int, bidPrice: float, askPrice: float, bidSize: float, askSize: float) -> None:
+
+        """
+        Método para llamar desde `tickByTickBidAsk`.
+        """
+
+        self.agregar(reqId, TIPO_BIDASK, tiempo, bidPrice, askPrice, float(bidSize), float(askSize))
+
+
+    def last(self, reqId: int, tickType: int, tiempo: int, price: float, size: float) -> None:
+
+        """
+        Método para llamar desde `tickByTickAllLast` (tickType 1 = "Last", 2 = "AllLast").
+        """
+
+        self.agregar(reqId, TIPO_LAST if tickType == 1 else TIPO_ALLLAST, tiempo, price, 0.0, float(size))
+
+
+    def vaciar(self) -> None:
+
+        """
+        Método que entrega al escritor el bloque actual aunque no esté lleno.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        with self.candado:
+            if self.n > 0:
+                self.cola.put((self.bloque, self.n, dict(self.activos)))
+                self.tomar_bloque()
+
+
+    def escritor(self) -> None:
+
+        """
+        Método que ejecuta el hilo escritor: recibe bloques y los añade al segmento actual.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        while True:
+            try:
+                elemento = self.cola.get(timeout=self.intervalo_vaciado)
+            except queue.Empty:
+                # Vaciar periódicamente los ticks acumulados
+                self.vaciar()
+                continue
+            if elemento is None:
+                if not self.activo:
+                    break
+                continue
+            bloque, n, activos = elemento
+            self.escribir_bloque(bloque[:n], activos)
+            self.libres.put(bloque)
+
+
+    def escribir_bloque(self, registros: np.ndarray, activos: dict) -> None:
+
+        """
+        Método que añade registros al segmento actual (rotando de segmento cuando se llena) y actualiza el índice.
+
+        Parámetros:
+        -----------
+        registros : np.ndarray
+            Registros con la estructura `REGISTRO`.
+
+        activos : dict
+            Nombres de los activos por reqId.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        while len(registros) > 0:
+            if self.archivo is None or self.registros_segmento >= self.registros_por_segmento:
+                self.abrir_segmento()
+            if activos != self.activos_segmento:
+                self.guardar_activos(activos)
+            # Parte que cabe en el segmento
+            parte = registros[:self.registros_por_segmento - self.registros_segmento]
+            tiempos = parte["tiempo"]
+            entrada = np.array([(tiempos.min(), tiempos.max(), self.registros_segmento, len(parte))], dtype=INDICE)
+            self.archivo.write(memoryview(parte).cast("B"))
+            self.archivo.flush()
+            self.archivo_indice.write(entrada.tobytes())
+            self.archivo_indice.flush()
+            self.registros_segmento += len(parte)
+            registros = registros[len(parte):]
+
+
+    def abrir_segmento(self) -> None:
+
+        """
+        Método que cierra el segmento actual (si existe) y abre uno nuevo.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        self.cerrar_segmento()
+        self.numero_segmento += 1
+        base = os.path.join(self.carpeta, f"ticks-{self.numero_segmento:06d}")
+        self.archivo = open(base + ".bin", "ab")
+        self.archivo_indice = open(base + ".idx", "ab")
+        self.registros_segmento = 0
+        self.activos_segmento = None
+
+
+    def guardar_activos(self, activos: dict) -> None:
+
+        """
+        Método que guarda los nombres de los activos del segmento actual.
+
+        Parámetros:
+        -----------
+        activos : dict
+            Nombres de los activos por reqId.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        with open(os.path.join(self.carpeta, f"ticks-{self.numero_segmento:06d}.json"), "w") as archivo:
+            json.dump({str(reqId): nombre for reqId, nombre in activos.items()}, archivo)
+        self.activos_segmento = dict(activos)
+
+
+    def cerrar_segmento(self) -> None:
+
+        """
+        Método que cierra los archivos del segmento actual.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        if self.archivo is not None:
+            self.archivo.close()
+            self.archivo_indice.close()
+            self.archivo = None
+            self.archivo_indice = None
+
+
+# Clase que lee los segmentos generados por GrabadorTicks
+class LectorTicks:
+
+    """
+    Clase que lee (con memory-map) los segmentos de ticks y los exporta a CSV o Parquet.
+    """
+
+    # Columnas por tipo de tick
+    COLUMNAS = {
+        TIPO_MIDPOINT: {"precio": "MidPoint"},
+        TIPO_BIDASK: {"precio": "Bid", "precio2": "Ask", "tamano": "Bid Size", "tamano2": "Ask Size"},
+        TIPO_LAST: {"precio": "Price", "tamano": "Size"},
+        TIPO_ALLLAST: {"precio": "Price", "tamano": "Size"},
+        }
+
+    def __init__(self, carpeta: str) -> None:
+
+        """
+        Constructor de la clase.
+
+        Parámetros:
+        -----------
+        carpeta : str
+            Carpeta donde se encuentran los segmentos.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        self.carpeta = carpeta
+
+
+    def segmentos(self) -> list:
+
+        """
+        Método que devuelve las rutas base (sin extensión) de los segmentos existentes, en orden.
+
+        Salida:
+        -------
+        return: list : Lista de rutas.
+        """
+
+        return [ruta[:-4] for ruta in sorted(glob.glob(os.path.join(self.carpeta, "ticks-*.bin")))]
+
+
+    def leer(self, activo: str = None, tipo: int = None, inicio: datetime.datetime = None,
+             fin: datetime.datetime = None) -> np.ndarray:
+
+        """
+        Método que lee los ticks de los segmentos. Sólo se leen los bloques cuyo rango de tiempo (según el índice) se
+        cruza con el intervalo solicitado.
+
+        Parámetros:
+        -----------
+        activo : str, opcional
+            Nombre del activo (registrado con `registrar_activo`). Si es None, se incluyen todos.
+
+        tipo : int, opcional
+            Tipo de tick. Si es None, se incluyen todos.
+
+        inicio : datetime, opcional
+            Fecha mínima de los ticks. Si es None, no se aplica límite.
+
+        fin : datetime, opcional
+            Fecha máxima de los ticks. Si es None, no se aplica límite.
+
+        Salida:
+        -------
+        return: np.ndarray : Registros con la estructura `REGISTRO`.
+        """
+
+        t_inicio = -2**62 if inicio is None else int(inicio.timestamp())
+        t_fin = 2**62 if fin is None else int(fin.timestamp())
+        partes = []
+        for base in self.segmentos():
+            # Segmento (se ignora un registro incompleto al final)
+            n = os.path.getsize(base + ".bin") // REGISTRO.itemsize
+            if n == 0:
+                continue
+            datos = np.memmap(base + ".bin", dtype=REGISTRO, mode="r", shape=(n,))
+            indice = np.fromfile(base + ".idx", dtype=INDICE) if os.path.exists(base + ".idx") else np.zeros(0, INDICE)
+            # Bloques que se cruzan con el intervalo
+            indice = indice[(indice["tiempo_max"] >= t_inicio) & (indice["tiempo_min"] <= t_fin) & (indice["posicion"] < n)]
+            for posicion, cantidad in zip(indice["posicion"], indice["cantidad"]):
+                bloque = datos[posicion:min(posicion + cantidad, n)]
+                filtro = (bloque["tiempo"] >= t_inicio) & (bloque["tiempo"] <= t_fin)
+                if tipo is not None:
+                    filtro &= bloque["tipo"] == tipo
+                if activo is not None:
+                    filtro &= np.isin(bloque["req_id"], self.req_ids(base, activo))
+                partes.append(bloque[filtro])
+
+        return np.concatenate(partes) if partes else np.zeros(0, dtype=REGISTRO)
+
+
+    @staticmethod
+    def req_ids(base: str, activo: str) -> list:
+
+        """
+        Método que devuelve los reqId asociados a un activo dentro de un segmento.
+
+        Parámetros:
+        -----------
+        base : str
+            Ruta base del segmento.
+
+        activo : str
+            Nombre del activo.
+
+        Salida:
+        -------
+        return: list : Lista de reqId.
+        """
+
+        if not os.path.exists(base + ".json"):
+            return []
+        with open(base + ".json") as archivo:
+            activos = json.load(archivo)
+
+        return [int(reqId) for reqId, nombre in activos.items() if nombre == activo]
+
+
+    def a_dataframe(self, activo: str = None, tipo: int = TIPO_MIDPOINT, inicio: datetime.datetime = None,
+                    fin: datetime.datetime = None) -> pd.DataFrame:
+
+        """
+        Método que lee los ticks de un tipo y los convierte en DataFrame (con la hora local, como los archivos CSV de
+        `04 - Almacenamiento de Datos.py`).
+
+        Parámetros:
+        -----------
+        Los mismos que `leer`.
+
+        Salida:
+        -------
+        return: pd.DataFrame : Ticks con las columnas "Request ID", "Time" y las propias del tipo de tick.
+        """
+
+        registros = self.leer(activo=activo, tipo=tipo, inicio=inicio, fin=fin)
+        zona_local = datetime.datetime.now().astimezone().tzinfo
+        datos = pd.DataFrame({
+            "Request ID": registros["req_id"],
+            "Time": pd.to_datetime(registros["tiempo"], unit="s", utc=True).tz_convert(zona_local).tz_localize(None),
+            })
+        for campo, columna in self.COLUMNAS[tipo].items():
+            datos[columna] = registros[campo]
+
+        return datos
+
+
+    def exportar_csv(self, ruta: str, activo: str = None, tipo: int = TIPO_MIDPOINT, inicio: datetime.datetime = None,
+                     fin: datetime.datetime = None) -> None:
+
+        """
+        Método que exporta ticks a un archivo CSV.
+
+        Parámetros:
+        -----------
+        ruta : str
+            Ruta del archivo CSV.
+
+        activo, tipo, inicio, fin :
+            Los mismos que `a_dataframe`.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        self.a_dataframe(activo=activo, tipo=tipo, inicio=inicio, fin=fin).to_csv(ruta, index=False)
+
+
+    def exportar_parquet(self, ruta: str, activo: str = None, tipo: int = TIPO_MIDPOINT, inicio: datetime.datetime = None,
+                         fin: datetime.datetime = None) -> None:
+
+        """
+        Método que exporta ticks a un archivo Parquet (requiere `pyarrow`).
+
+        Parámetros:
+        -----------
+        ruta : str
+            Ruta del archivo Parquet.
+
+        activo, tipo, inicio, fin :
+            Los mismos que `a_dataframe`.
+
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+
+        self.a_dataframe(activo=activo, tipo=tipo, inicio=inicio, fin=fin).to_parquet(ruta, index=False)
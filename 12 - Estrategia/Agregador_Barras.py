@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Segundos por unidad de tiempo (formato de IB)
+SEGUNDOS_UNIDAD = {"sec": 1, "secs": 1, "min": 60, "mins": 60, "hour": 3600, "hours": 3600, "day": 86400, "days": 86400}
+# Unidades de las barras por actividad
+UNIDADES_ACTIVIDAD = {"tick": "ticks", "ticks": "ticks", "volume": "volumen", "dollar": "dolares", "dollars": "dolares"}
+
+# Función que interpreta una resolución de barras
+def interpretar_resolucion(resolucion: str) -> tuple:
+    
+    """
+    Función que interpreta una resolución de barras.
+    
+    Parámetros:
+    -----------
+    resolucion : str
+        Resolución en el formato de IB para barras de tiempo ("5 secs", "1 min", "30 mins", "1 hour") o por actividad:
+        "500 ticks", "10000 volume" o "1000000 dollars".
+        
+    Salida:
+    -------
+    return: tuple : (tipo, umbral), donde tipo es 'tiempo' (umbral en nanosegundos), 'ticks', 'volumen' o 'dolares'.
+    """
+    
+    cantidad, unidad = resolucion.split()
+    if unidad in SEGUNDOS_UNIDAD:
+        return "tiempo", int(float(cantidad) * SEGUNDOS_UNIDAD[unidad] * 1_000_000_000)
+    if unidad in UNIDADES_ACTIVIDAD:
+        return UNIDADES_ACTIVIDAD[unidad], float(cantidad)
+        
+    raise ValueError(f"Resolución no válida: '{resolucion}'")
+
+
+# Clase que almacena las últimas barras de una resolución en un buffer circular
+class AnilloBarras:
+    
+    """
+    Clase que almacena las últimas `capacidad` barras cerradas en arreglos de NumPy circulares (la barra más antigua se
+    sobrescribe). Las fechas se guardan en nanosegundos desde 1970 (UTC) y corresponden al inicio de cada barra.
+    """
+    
+    def __init__(self, capacidad: int = 1000) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        capacidad : int, opcional
+            Número máximo de barras almacenadas. Por defecto, es 1000.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Arreglos circulares
+        self.capacidad = capacidad
+        self.fechas = np.zeros(capacidad, dtype="int64")
+        self.precios = np.zeros((capacidad, 4), dtype="float64")
+        self.volumen = np.zeros(capacidad, dtype="float64")
+        self.ticks = np.zeros(capacidad, dtype="int64")
+        self.total = 0
+        
+        
+    def __len__(self) -> int:
+        
+        """
+        Método que devuelve el número de barras almacenadas.
+        """
+        
+        return min(self.total, self.capacidad)
+        
+        
+    def agregar(self, fecha: int, apertura: float, maximo: float, minimo: float, cierre: float, volumen: float,
+                ticks: int) -> None:
+                
+        """
+        Método que agrega una barra cerrada (sobrescribe la más antigua si el anillo está lleno).
+        
+        Parámetros:
+        -----------
+        fecha : int
+            Inicio de la barra en nanosegundos desde 1970 (UTC).
+            
+        apertura, maximo, minimo, cierre : float
+            Precios de la barra.
+            
+        volumen : float
+            Volumen de la barra.
+            
+        ticks : int
+            Número de ticks (o barras de 5 segundos) que formaron la barra.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        i = self.total % self.capacidad
+        self.fechas[i] = fecha
+        self.precios[i] = (apertura, maximo, minimo, cierre)
+        self.volumen[i] = volumen
+        self.ticks[i] = ticks
+        self.total += 1
+        
+        
+    def orden(self) -> np.ndarray:
+        
+        """
+        Método que devuelve las posiciones de las barras almacenadas, de la más antigua a la más reciente.
+        """
+        
+        if self.total <= self.capacidad:
+            return np.arange(self.total)
+            
+        return (np.arange(self.capacidad) + self.total) % self.capacidad
+        
+        
+    def cierres(self) -> np.ndarray:
+        
+        """
+        Método que devuelve los precios de cierre almacenados (de la barra más antigua a la más reciente).
+        """
+        
+        return self.precios[self.orden(), 3]
+        
+        
+    def a_dataframe(self) -> pd.DataFrame:
+        
+        """
+        Método que devuelve las barras almacenadas con el formato de `reqHistoricalData` (fechas en hora local).
+        
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con índice de fechas y columnas Open, High, Low, Close, Volume y Ticks.
+        """
+        
+        orden = self.orden()
+        zona_local = datetime.now().astimezone().tzinfo
+        indice = pd.to_datetime(self.fechas[orden], unit="ns", utc=True).tz_convert(zona_local).tz_localize(None)
+        datos = pd.DataFrame(self.precios[orden], index=pd.DatetimeIndex(indice, name="Date"),
+                             columns=["Open", "High", "Low", "Close"])
+        datos["Volume"] = self.volumen[orden]
+        datos["Ticks"] = self.ticks[orden]
+        
+        return datos
+
+
+# Clase que construye barras OHLCV a partir de ticks en tiempo real
+class AgregadorBarras:
+    
+    """
+    Clase que construye barras OHLCV en tiempo real a partir de ticks (`tickByTickAllLast`, `tickByTickMidPoint`,
+    `tickByTickBidAsk`) o de las barras de 5 segundos de `reqRealTimeBars`, en varias resoluciones a la vez:
+        
+        - Barras de tiempo ("1 min", "30 mins", "1 hour", ...): se alinean al inicio del periodo (como IB).
+        - Barras de ticks ("500 ticks"), de volumen ("10000 volume") y de dólares negociados ("1000000 dollars").
+        
+    Cada resolución guarda sus barras cerradas en un `AnilloBarras`. Al cerrar una barra se llama a cada función
+    registrada con `al_cerrar(agregador, resolucion, barra)`. Las barras de tiempo se cierran con el primer tick del
+    periodo siguiente o, si no hay actividad, con `cerrar_vencidas` (IB_Trading la invoca periódicamente). No se generan
+    barras para periodos sin ticks; los ticks tardíos (de un periodo ya cerrado) se suman a la barra abierta.
+    """
+    
+    def __init__(self, resoluciones: list, capacidad: int = 1000, nombre: str = "") -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        resoluciones : list
+            Lista de resoluciones (ver `interpretar_resolucion`).
+            
+        capacidad : int, opcional
+            Número de barras cerradas que se conservan por resolución. Por defecto, es 1000.
+            
+        nombre : str, opcional
+            Nombre del agregador (por ejemplo, el símbolo del contrato). Por defecto, es "".
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.nombre = nombre
+        self.reqId = None
+        self.fuente = None
+        self.resoluciones = list(resoluciones)
+        self.tipos = {resolucion: interpretar_resolucion(resolucion) for resolucion in self.resoluciones}
+        self.anillos = {resolucion: AnilloBarras(capacidad) for resolucion in self.resoluciones}
+        # Barra abierta de cada resolución: [inicio, open, high, low, close, volumen, ticks, acumulado]
+        self.abiertas = {resolucion: None for resolucion in self.resoluciones}
+        self.funciones = []
+        self.candado = threading.Lock()
+        
+        
+    def al_cerrar(self, funcion) -> None:
+        
+        """
+        Método que registra una función que se llamará al cerrar cada barra.
+        
+        Parámetros:
+        -----------
+        funcion : callable
+            Función con la firma `funcion(agregador, resolucion, barra)`, donde `barra` es un diccionario con las claves
+            Date (pd.Timestamp en hora local), Open, High, Low, Close, Volume y Ticks.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.funciones.append(funcion)
+        
+        
+    def agregar_tick(self, tiempo: int, precio: float, tamano: float = 0.0) -> None:
+        
+        """
+        Método que agrega un tick a todas las resoluciones.
+        
+        Parámetros:
+        -----------
+        tiempo : int
+            Tiempo del tick en segundos desde 1970 (como lo envía IB).
+            
+        precio : float
+            Precio del tick.
+            
+        tamano : float, opcional
+            Tamaño del tick (0 para MidPoint y BidAsk). Por defecto, es 0.0.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.agregar(tiempo * 1_000_000_000, precio, precio, precio, precio, tamano, 1)
+        
+        
+    def agregar_barra(self, tiempo: int, apertura: float, maximo: float, minimo: float, cierre: float, volumen: float,
+                      wap: float = None) -> None:
+                      
+        """
+        Método que agrega una barra de 5 segundos de `reqRealTimeBars` a todas las resoluciones (en las barras de ticks,
+        cada barra de 5 segundos cuenta como un tick; en las de dólares se utiliza su precio promedio ponderado).
+        
+        Parámetros:
+        -----------
+        tiempo : int
+            Inicio de la barra en segundos desde 1970.
+            
+        apertura, maximo, minimo, cierre : float
+            Precios de la barra.
+            
+        volumen : float
+            Volumen de la barra.
+            
+        wap : float, opcional
+            Precio promedio ponderado por volumen. Por defecto, es el precio de cierre.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.agregar(tiempo * 1_000_000_000, apertura, maximo, minimo, cierre, volumen, 1, cierre if wap is None else wap)
+        
+        
+    def agregar(self, tiempo: int, apertura: float, maximo: float, minimo: float, cierre: float, volumen: float,
+                ticks: int, precio_medio: float = None) -> None:
+                
+        """
+        Método que actualiza la barra abierta de cada resolución (y cierra las que se completan).
+        """
+        
+        cerradas = []
+        precio_medio = cierre if precio_medio is None else precio_medio
+        with self.candado:
+            for resolucion in self.resoluciones:
+                tipo, umbral = self.tipos[resolucion]
+                barra = self.abiertas[resolucion]
+                # Barras de Tiempo: cerrar si el tick pertenece a un periodo posterior
+                if tipo == "tiempo":
+                    inicio = tiempo - tiempo % umbral
+                    if barra is not None and inicio > barra[0]:
+                        cerradas.append(self.cerrar(resolucion))
+                        barra = None
+                else:
+                    inicio = tiempo
+                # Abrir o Actualizar Barra
+                if barra is None:
+                    barra = [inicio, apertura, maximo, minimo, cierre, 0.0, 0, 0.0]
+                    self.abiertas[resolucion] = barra
+                else:
+                    if maximo > barra[2]:
+                        barra[2] = maximo
+                    if minimo < barra[3]:
+                        barra[3] = minimo
+                    barra[4] = cierre
+                barra[5] += volumen
+                barra[6] += ticks
+                # Barras por Actividad: cerrar al alcanzar el umbral
+                if tipo == "ticks":
+                    barra[7] += ticks
+                elif tipo == "volumen":
+                    barra[7] += volumen
+                elif tipo == "dolares":
+                    barra[7] += volumen * precio_medio
+                if tipo != "tiempo" and barra[7] >= umbral:
+                    cerradas.append(self.cerrar(resolucion))
+        # Notificar fuera del candado
+        self.notificar(cerradas)
+        
+        
+    def cerrar(self, resolucion: str) -> tuple:
+        
+        """
+        Método que cierra la barra abierta de una resolución y la guarda en su anillo. Debe llamarse con el candado
+        adquirido.
+        """
+        
+        inicio, apertura, maximo, minimo, cierre, volumen, ticks, _ = self.abiertas[resolucion]
+        self.anillos[resolucion].agregar(inicio, apertura, maximo, minimo, cierre, volumen, ticks)
+        self.abiertas[resolucion] = None
+        
+        return resolucion, inicio, apertura, maximo, minimo, cierre, volumen, ticks
+        
+        
+    def cerrar_vencidas(self, ahora: int, espera: float = 0.5) -> None:
+        
+        """
+        Método que cierra las barras de tiempo cuyo periodo ya terminó aunque no haya llegado un tick del periodo
+        siguiente.
+        
+        Parámetros:
+        -----------
+        ahora : int
+            Tiempo actual en nanosegundos desde 1970.
+            
+        espera : float, opcional
+            Segundos de tolerancia después del fin del periodo (para ticks que llegan con retraso). Por defecto, es 0.5.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        cerradas = []
+        with self.candado:
+            for resolucion in self.resoluciones:
+                tipo, umbral = self.tipos[resolucion]
+                barra = self.abiertas[resolucion]
+                if tipo == "tiempo" and barra is not None and ahora >= barra[0] + umbral + int(espera * 1_000_000_000):
+                    cerradas.append(self.cerrar(resolucion))
+        self.notificar(cerradas)
+        
+        
+    def notificar(self, cerradas: list) -> None:
+        
+        """
+        Método que llama a las funciones registradas con cada barra cerrada.
+        """
+        
+        if len(cerradas) == 0 or len(self.funciones) == 0:
+            return
+        zona_local = datetime.now().astimezone().tzinfo
+        for resolucion, inicio, apertura, maximo, minimo, cierre, volumen, ticks in cerradas:
+            barra = {"Date": pd.Timestamp(inicio, unit="ns", tz="UTC").tz_convert(zona_local).tz_localize(None),
+                     "Open": apertura, "High": maximo, "Low": minimo, "Close": cierre, "Volume": volumen, "Ticks": ticks}
+            for funcion in self.funciones:
+                funcion(self, resolucion, barra)
+                
+                
+    def cargar_historico(self, resolucion: str, df: pd.DataFrame) -> None:
+        
+        """
+        Método que carga barras históricas (por ejemplo, de `reqHistoricalData`) en el anillo de una resolución, para
+        que los indicadores tengan historia desde el inicio de la transmisión.
+        
+        Parámetros:
+        -----------
+        resolucion : str
+            Resolución del anillo.
+            
+        df : pd.DataFrame
+            Barras con índice de fechas en hora local y columnas Open, High, Low, Close, Volume.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        indice = pd.DatetimeIndex(df.index)
+        if indice.tz is None:
+            indice = indice.tz_localize(datetime.now().astimezone().tzinfo)
+        fechas = indice.tz_convert("UTC").tz_localize(None).values.astype("datetime64[ns]").astype("int64")
+        anillo = self.anillos[resolucion]
+        with self.candado:
+            for fecha, apertura, maximo, minimo, cierre, volumen in zip(fechas, df["Open"], df["High"], df["Low"],
+                                                                        df["Close"], df["Volume"]):
+                anillo.agregar(fecha, apertura, maximo, minimo, cierre, volumen, 0)
+                
+                
+    def barras(self, resolucion: str) -> pd.DataFrame:
+        
+        """
+        Método que devuelve las barras cerradas de una resolución.
+        
+        Parámetros:
+        -----------
+        resolucion : str
+            Resolución de las barras.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con el formato de `reqHistoricalData` (más la columna Ticks).
+        """
+        
+        with self.candado:
+            return self.anillos[resolucion].a_dataframe()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from ibapi.contract import Contract
+import copy
+import threading
+import numpy as np
+import pandas as pd
+
+# Clase que mantiene las griegas agregadas de las posiciones de la cuenta
+class AgregadorGriegas:
+    
+    """
+    Clase que combina las posiciones de la cuenta (`position`) con las griegas que calcula IB para cada opción
+    (`tickOptionComputation`) y mantiene los totales de delta, gamma, vega y theta por subyacente, por cuenta y de todo el
+    portafolio.
+    
+    Cada posición ("pata") guarda su aportación actual (cantidad x multiplicador x griegas por unidad). Cuando llega un
+    tick o cambia una posición sólo se calcula la diferencia con la aportación anterior y se suma a los totales, por lo que
+    cada actualización y cada consulta de exposición es O(1), sin importar el número de patas.
+    
+    Las acciones y los futuros aportan delta = cantidad x multiplicador. Las opciones se suscriben a datos de mercado a
+    través de `IB_Trading.suscripciones` (componente "griegas") y utilizan las griegas del modelo de IB (ticks 13 y 83):
+    delta en acciones equivalentes, gamma por unidad del subyacente, vega en dinero por 1% de volatilidad y theta en
+    dinero por día.
+    """
+    
+    # Griegas agregadas
+    GRIEGAS = ["delta", "gamma", "vega", "theta"]
+    # Tipos de tick con las griegas del modelo de IB (tiempo real y retrasado)
+    TICKS_MODELO = (13, 83)
+    # Tipos de activo con griegas (el resto aporta sólo delta)
+    TIPOS_OPCION = ("OPT", "FOP")
+    
+    def __init__(self, app) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        app : IB_Trading
+            Instancia de `IB_Trading` a la que pertenece el agregador.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.app = app
+        self.activo = False
+        # Patas ((cuenta, conId) -> información) y patas de cada suscripción (reqId -> claves)
+        self.patas = {}
+        self.patas_reqId = {}
+        # Totales (clave -> arreglo [delta, gamma, vega, theta])
+        self.por_subyacente = {}
+        self.por_cuenta = {}
+        self.total = np.zeros(len(self.GRIEGAS))
+        self.candado = threading.Lock()
+        
+        
+    def sumar(self, pata: dict, diferencia: np.ndarray) -> None:
+        
+        """
+        Método que suma la diferencia de aportación de una pata a los totales de su subyacente, su cuenta y del portafolio.
+        """
+        
+        for totales, clave in ((self.por_subyacente, pata["subyacente"]), (self.por_cuenta, pata["cuenta"])):
+            if clave not in totales:
+                totales[clave] = np.zeros(len(self.GRIEGAS))
+            totales[clave] += diferencia
+        self.total += diferencia
+        
+        
+    def actualizar_posicion(self, account: str, contract: Contract, position: float) -> None:
+        
+        """
+        Método que agrega, actualiza o elimina una pata al recibir una posición de la cuenta.
+        
+        Parámetros:
+        -----------
+        account : str
+            Cuenta de la posición.
+            
+        contract : Contract
+            Contrato de la posición.
+            
+        position : float
+            Cantidad de la posición (0 elimina la pata).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        clave = (account, contract.conId)
+        opcion = contract.secType in self.TIPOS_OPCION
+        suscribir = cancelar = None
+        with self.candado:
+            pata = self.patas.get(clave)
+            # Nueva Pata
+            if pata is None:
+                if position == 0:
+                    return
+                multiplicador = float(contract.multiplier) if contract.multiplier else (100.0 if opcion else 1.0)
+                pata = {"cuenta": account, "subyacente": contract.symbol, "contrato": contract, "secType": contract.secType,
+                        "cantidad": 0.0, "multiplicador": multiplicador, "reqId": None,
+                        "griegas": np.zeros(len(self.GRIEGAS)) if opcion else np.array([1.0, 0.0, 0.0, 0.0]),
+                        "aportacion": np.zeros(len(self.GRIEGAS))}
+                self.patas[clave] = pata
+                suscribir = opcion
+            # Actualizar Aportación
+            pata["cantidad"] = float(position)
+            aportacion = pata["cantidad"] * pata["multiplicador"] * pata["griegas"]
+            self.sumar(pata, aportacion - pata["aportacion"])
+            pata["aportacion"] = aportacion
+            # Eliminar Pata Cerrada
+            if position == 0:
+                del self.patas[clave]
+                cancelar = pata["reqId"]
+                if cancelar is not None:
+                    self.patas_reqId[cancelar].discard(clave)
+                    if len(self.patas_reqId[cancelar]) == 0:
+                        del self.patas_reqId[cancelar]
+        # Suscribir / Cancelar Datos de Mercado (fuera del candado)
+        if suscribir:
+            contrato = copy.copy(contract)
+            contrato.exchange = contrato.exchange or "SMART"
+            reqId = self.app.suscripciones.suscribir(contrato, componente="griegas")
+            with self.candado:
+                if self.patas.get(clave) is pata:
+                    pata["reqId"] = reqId
+                    self.patas_reqId.setdefault(reqId, set()).add(clave)
+                    return
+            self.app.suscripciones.cancelar(reqId, componente="griegas")
+        if cancelar is not None:
+            self.app.suscripciones.cancelar(cancelar, componente="griegas")
+            
+            
+    def actualizar_griegas(self, reqId: int, tickType: int, delta: float, gamma: float, vega: float, theta: float) -> None:
+        
+        """
+        Método que actualiza las griegas por unidad de las patas de una suscripción y suma la diferencia a los totales.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick. Sólo se utilizan las griegas del modelo (13 y 83).
+            
+        delta, gamma, vega, theta : float
+            Griegas por unidad de la opción. Los valores no disponibles (`None` o el máximo de IB) conservan el valor
+            anterior.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        if tickType not in self.TICKS_MODELO:
+            return
+        with self.candado:
+            claves = self.patas_reqId.get(reqId)
+            if not claves:
+                return
+            for clave in claves:
+                pata = self.patas[clave]
+                griegas = pata["griegas"]
+                for i, valor in enumerate((delta, gamma, vega, theta)):
+                    if valor is not None and abs(valor) < 1e100:
+                        griegas[i] = valor
+                aportacion = pata["cantidad"] * pata["multiplicador"] * griegas
+                self.sumar(pata, aportacion - pata["aportacion"])
+                pata["aportacion"] = aportacion
+                
+                
+    def exposicion(self, subyacente: str = None, cuenta: str = None) -> dict:
+        
+        """
+        Método que devuelve la exposición actual (O(1)) de un subyacente, de una cuenta o de todo el portafolio.
+        
+        Parámetros:
+        -----------
+        subyacente : str, opcional
+            Símbolo del subyacente. Por defecto, es `None`.
+            
+        cuenta : str, opcional
+            Cuenta. Se utiliza si no se indica el subyacente. Por defecto, es `None` (todo el portafolio).
+            
+        Salida:
+        -------
+        return: dict : Diccionario {delta, gamma, vega, theta}. Ceros si no hay posiciones.
+        """
+        
+        with self.candado:
+            if subyacente is not None:
+                totales = self.por_subyacente.get(subyacente)
+            elif cuenta is not None:
+                totales = self.por_cuenta.get(cuenta)
+            else:
+                totales = self.total
+            valores = totales.tolist() if totales is not None else [0.0] * len(self.GRIEGAS)
+            
+        return dict(zip(self.GRIEGAS, valores))
+        
+        
+    def resumen(self) -> pd.DataFrame:
+        
+        """
+        Método que genera una tabla con las patas y su aportación actual a las griegas del portafolio.
+        
+        Salida:
+        -------
+        return: pd.DataFrame : Una fila por pata (cuenta, subyacente, contrato, cantidad, multiplicador, reqId y las
+                               aportaciones de delta, gamma, vega y theta).
+        """
+        
+        with self.candado:
+            filas = [[pata["cuenta"], pata["subyacente"], pata["contrato"].localSymbol or pata["subyacente"], pata["secType"],
+                      pata["cantidad"], pata["multiplicador"], pata["reqId"], *pata["aportacion"].tolist()]
+                     for pata in self.patas.values()]
+                     
+        return pd.DataFrame(filas, columns=["Cuenta", "Subyacente", "Contrato", "Tipo Activo", "Cantidad", "Multiplicador",
+                                            "reqId"] + [griega.capitalize() for griega in self.GRIEGAS])
+                                            
+                                            
+    def detener(self) -> None:
+        
+        """
+        Método que cancela las suscripciones de las patas y reinicia los totales.
+        """
+        
+        with self.candado:
+            reqIds = list(self.patas_reqId)
+            self.patas.clear()
+            self.patas_reqId.clear()
+            self.por_subyacente.clear()
+            self.por_cuenta.clear()
+            self.total = np.zeros(len(self.GRIEGAS))
+            self.activo = False
+        for reqId in reqIds:
+            self.app.suscripciones.cancelar(reqId, componente="griegas")
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import os
+import pandas as pd
+# Librerías Opcionales (pip install pyarrow)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Clase que almacena barras históricas en archivos columnares (Parquet)
+class AlmacenParquet:
+    
+    """
+    Clase que almacena barras históricas en archivos Parquet particionados por símbolo, tamaño de barra y año:
+        
+        raiz/symbol=AAPL/barSize=1day/year=2024/part-0.parquet
+        
+    A diferencia de las tablas SQLite (orientadas a filas), el formato columnar permite leer sólo las columnas y los años
+    necesarios: los filtros por fecha se aplican sobre las particiones y las estadísticas de cada archivo (predicate
+    pushdown) y los archivos se leen con memory-map. Requiere la librería `pyarrow`.
+    """
+    
+    COLUMNAS = ["Open", "High", "Low", "Close", "Volume"]
+    
+    def __init__(self, raiz: str) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        raiz : str
+            Carpeta raíz del almacén. Si no existe, se creará automáticamente.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Verificar Dependencia
+        if pa is None:
+            raise ImportError("AlmacenParquet requiere la librería 'pyarrow' (pip install pyarrow).")
+        # Atributos
+        self.raiz = raiz
+        os.makedirs(self.raiz, exist_ok=True)
+        
+        
+    def ruta_serie(self, symbol: str, barSize: str) -> str:
+        
+        """
+        Método que devuelve la carpeta de una serie (símbolo y tamaño de barra).
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo.
+            
+        barSize : str
+            Tamaño de la barra en el formato de IB (por ejemplo, "1 day").
+            
+        Salida:
+        -------
+        return: str : Ruta de la carpeta.
+        """
+        
+        return os.path.join(self.raiz, f"symbol={symbol}", f"barSize={barSize.replace(' ', '')}")
+        
+        
+    def guardar_barras(self, df: pd.DataFrame, symbol: str, barSize: str = "1 day") -> None:
+        
+        """
+        Método que guarda (o reemplaza) barras de una serie. Sólo se reescriben los años que contienen barras nuevas; las
+        fechas repetidas conservan el valor más reciente.
+        
+        Parámetros:
+        -----------
+        df : pd.DataFrame
+            Barras con el formato de `reqHistoricalData` (índice de fechas y columnas Open, High, Low, Close, Volume).
+            
+        symbol : str
+            Símbolo del activo.
+            
+        barSize : str, opcional
+            Tamaño de la barra. Por defecto, es "1 day".
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Normalizar Datos
+        nuevos = df[self.COLUMNAS].astype("float64")
+        nuevos.index = pd.DatetimeIndex(nuevos.index).tz_localize(None) if nuevos.index.tz is not None \
+            else pd.DatetimeIndex(nuevos.index)
+        nuevos.index.name = "Date"
+        ruta = self.ruta_serie(symbol, barSize)
+        # Reescribir cada Año Afectado
+        for year, datos_year in nuevos.groupby(nuevos.index.year):
+            carpeta = os.path.join(ruta, f"year={year}")
+            archivo = os.path.join(carpeta, "part-0.parquet")
+            if os.path.exists(archivo):
+                existentes = self.a_dataframe(pq.read_table(archivo, memory_map=True))
+                datos_year = pd.concat([existentes, datos_year])
+                datos_year = datos_year[~datos_year.index.duplicated(keep="last")]
+            datos_year = datos_year.sort_index()
+            os.makedirs(carpeta, exist_ok=True)
+            # Escritura Atómica (archivo temporal y reemplazo)
+            tabla = pa.Table.from_pandas(datos_year.reset_index(), preserve_index=False)
+            pq.write_table(tabla, archivo + ".tmp", compression="zstd")
+            os.replace(archivo + ".tmp", archivo)
+            
+            
+    @classmethod
+    def a_dataframe(cls, tabla) -> pd.DataFrame:
+        
+        """
+        Método que convierte una tabla de Arrow en el formato de `reqHistoricalData`.
+        
+        Parámetros:
+        -----------
+        tabla : pa.Table
+            Tabla con las columnas Date, Open, High, Low, Close y Volume.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con índice de fechas.
+        """
+        
+        datos = tabla.select(["Date"] + cls.COLUMNAS).to_pandas()
+        datos["Date"] = datos["Date"].astype("datetime64[ns]")
+        datos.set_index(["Date"], inplace=True)
+        
+        return datos
+        
+        
+    def leer_barras(self, symbol: str, barSize: str = "1 day", inicio=None, fin=None) -> pd.DataFrame:
+        
+        """
+        Método que lee las barras de una serie, opcionalmente dentro de un intervalo de fechas. Sólo se abren los años del
+        intervalo y, dentro de cada archivo, los grupos de filas que pueden contener fechas del intervalo.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo.
+            
+        barSize : str, opcional
+            Tamaño de la barra. Por defecto, es "1 day".
+            
+        inicio : datetime, opcional
+            Fecha mínima de las barras. Si es `None`, no se aplica límite.
+            
+        fin : datetime, opcional
+            Fecha máxima de las barras. Si es `None`, no se aplica límite.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con el mismo formato que devuelve `reqHistoricalData` (vacío si no hay datos).
+        """
+        
+        ruta = self.ruta_serie(symbol, barSize)
+        if not os.path.isdir(ruta):
+            return pd.DataFrame(columns=self.COLUMNAS, index=pd.DatetimeIndex([], name="Date"))
+        # Filtros (particiones por año y estadísticas de fechas)
+        filtros = []
+        if inicio is not None:
+            inicio = pd.Timestamp(inicio)
+            filtros += [("year", ">=", inicio.year), ("Date", ">=", inicio)]
+        if fin is not None:
+            fin = pd.Timestamp(fin)
+            filtros += [("year", "<=", fin.year), ("Date", "<=", fin)]
+        tabla = pq.read_table(ruta, filters=filtros or None, memory_map=True, partitioning="hive")
+        
+        return self.a_dataframe(tabla).sort_index()
+        
+        
+    def leer_varios(self, symbols: list, barSize: str = "1 day", inicio=None, fin=None) -> dict:
+        
+        """
+        Método que lee las barras de varios símbolos.
+        
+        Parámetros:
+        -----------
+        symbols : list
+            Lista de símbolos.
+            
+        barSize, inicio, fin :
+            Los mismos parámetros que `leer_barras`.
+            
+        Salida:
+        -------
+        return: dict : Diccionario {símbolo: pd.DataFrame}.
+        """
+        
+        return {symbol: self.leer_barras(symbol, barSize, inicio, fin) for symbol in symbols}
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import sqlite3
+import threading
+import os
+import pandas as pd
+
+# Clase que administra conexiones persistentes a una base de datos SQLite
+class AlmacenSQLite:
+    
+    """
+    Clase que administra el acceso a una base de datos SQLite para almacenar barras históricas.
+    
+    Cada hilo mantiene su propia conexión persistente a la base de datos (se abre una vez y se reutiliza), la base de datos
+    trabaja en modo WAL con `synchronous=NORMAL` (los lectores no se bloquean mientras un escritor inserta datos) y las
+    escrituras se realizan en bloque, en transacciones por lotes, con `INSERT OR REPLACE`. Las fechas se guardan como
+    enteros (segundos desde 1970), lo que genera índices más compactos que el texto.
+    
+    Utilice `AlmacenSQLite.abrir(db_path)` para obtener la instancia compartida de cada archivo.
+    """
+    
+    # Instancias compartidas por ruta
+    instancias = {}
+    candado_instancias = threading.Lock()
+    
+    def __init__(self, db_path: str, tamano_lote: int = 50000) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        db_path : str
+            Ruta del archivo de la base de datos SQLite. Si el archivo no existe, se creará automáticamente.
+            
+        tamano_lote : int, opcional
+            Número de registros que se insertan por transacción. Por defecto, es 50000.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.db_path = db_path
+        self.tamano_lote = tamano_lote
+        # Conexiones por hilo y candado de escritura (SQLite admite un único escritor a la vez)
+        self.locales = threading.local()
+        self.candado_escritura = threading.Lock()
+        self.conexiones = []
+        self.candado_conexiones = threading.Lock()
+        # Tablas ya verificadas
+        self.tablas = set()
+        
+        
+    @classmethod
+    def abrir(cls, db_path: str) -> "AlmacenSQLite":
+        
+        """
+        Método que devuelve la instancia compartida para una base de datos (la crea la primera vez).
+        
+        Parámetros:
+        -----------
+        db_path : str
+            Ruta del archivo de la base de datos SQLite.
+            
+        Salida:
+        -------
+        return: AlmacenSQLite : Instancia asociada a la ruta.
+        """
+        
+        ruta = os.path.abspath(db_path)
+        with cls.candado_instancias:
+            if ruta not in cls.instancias:
+                cls.instancias[ruta] = cls(ruta)
+                
+        return cls.instancias[ruta]
+        
+        
+    def conexion(self) -> sqlite3.Connection:
+        
+        """
+        Método que devuelve la conexión persistente del hilo actual (la abre y configura la primera vez).
+        
+        Salida:
+        -------
+        return: sqlite3.Connection : Conexión a la base de datos.
+        """
+        
+        conn = getattr(self.locales, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+            # Configurar Modo WAL (lectores concurrentes) y Escritura Rápida
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self.locales.conn = conn
+            with self.candado_conexiones:
+                self.conexiones.append(conn)
+                
+        return conn
+        
+        
+    def ejecutar(self, sql: str, parametros: tuple = ()) -> list:
+        
+        """
+        Método que ejecuta una sentencia individual (consulta o escritura) y confirma la transacción.
+        
+        Parámetros:
+        -----------
+        sql : str
+            Sentencia SQL.
+            
+        parametros : tuple, opcional
+            Parámetros de la sentencia. Por defecto, es una tupla vacía.
+            
+        Salida:
+        -------
+        return: list : Filas devueltas por la sentencia.
+        """
+        
+        conn = self.conexion()
+        if sql.lstrip().upper().startswith(("SELECT", "PRAGMA")):
+            return conn.execute(sql, parametros).fetchall()
+        with self.candado_escritura:
+            with conn:
+                return conn.execute(sql, parametros).fetchall()
+                
+                
+    def escribir(self, sql: str, registros: list) -> None:
+        
+        """
+        Método que inserta una lista de registros en transacciones por lotes.
+        
+        Parámetros:
+        -----------
+        sql : str
+            Sentencia de inserción con parámetros (?).
+            
+        registros : list
+            Lista de tuplas con los valores de cada registro.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        conn = self.conexion()
+        with self.candado_escritura:
+            for i in range(0, len(registros), self.tamano_lote):
+                with conn:
+                    conn.executemany(sql, registros[i:i + self.tamano_lote])
+                    
+                    
+    def columnas(self, table_name: str) -> dict:
+        
+        """
+        Método que devuelve las columnas de una tabla y su tipo declarado.
+        
+        Parámetros:
+        -----------
+        table_name : str
+            Nombre de la tabla.
+            
+        Salida:
+        -------
+        return: dict : Diccionario {columna: tipo}. Vacío si la tabla no existe.
+        """
+        
+        return {fila[1]: fila[2].upper() for fila in self.ejecutar(f"PRAGMA table_info({table_name})")}
+        
+        
+    def preparar_tabla(self, table_name: str) -> None:
+        
+        """
+        Método que crea la tabla de barras si no existe. Si la tabla fue creada por una versión anterior (fechas como
+        texto), se convierte a fechas enteras conservando los datos.
+        
+        Parámetros:
+        -----------
+        table_name : str
+            Nombre de la tabla.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        if table_name in self.tablas:
+            return
+        estructura = """
+            CREATE TABLE IF NOT EXISTS {} (
+                date INTEGER PRIMARY KEY,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume INTEGER
+                )
+        """
+        columnas = self.columnas(table_name)
+        if len(columnas) == 0:
+            self.ejecutar(estructura.format(table_name))
+        elif columnas.get("date") != "INTEGER":
+            # Migrar Tabla Anterior (fechas en texto)
+            conn = self.conexion()
+            with self.candado_escritura:
+                with conn:
+                    conn.execute(estructura.format(f"{table_name}_migracion"))
+                    conn.execute(f"INSERT OR REPLACE INTO {table_name}_migracion SELECT CAST(strftime('%s', date) AS INTEGER), "
+                                 f"open, high, low, close, volume FROM {table_name}")
+                    conn.execute(f"DROP TABLE {table_name}")
+                    conn.execute(f"ALTER TABLE {table_name}_migracion RENAME TO {table_name}")
+        self.tablas.add(table_name)
+        
+        
+    @staticmethod
+    def a_epoch(fechas: pd.Index) -> list:
+        
+        """
+        Método que convierte un índice de fechas en segundos desde 1970 (se conserva la hora local si tiene zona horaria).
+        
+        Parámetros:
+        -----------
+        fechas : pd.Index
+            Índice de fechas.
+            
+        Salida:
+        -------
+        return: list : Lista de enteros.
+        """
+        
+        fechas = pd.DatetimeIndex(fechas)
+        if fechas.tz is not None:
+            fechas = fechas.tz_localize(None)
+            
+        return fechas.values.astype("datetime64[s]").astype("int64").tolist()
+        
+        
+    def guardar_barras(self, df: pd.DataFrame, table_name: str) -> None:
+        
+        """
+        Método que guarda (o reemplaza) barras en una tabla.
+        
+        Parámetros:
+        -----------
+        df : pd.DataFrame
+            Barras con el formato de `reqHistoricalData` (índice de fechas y columnas Open, High, Low, Close, Volume).
+            
+        table_name : str
+            Nombre de la tabla.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.preparar_tabla(table_name)
+        # Preparar Registros (sin copiar el DataFrame)
+        columnas = [df[columna].astype(float).tolist() for columna in ["Open", "High", "Low", "Close", "Volume"]]
+        registros = list(zip(self.a_epoch(df.index), *columnas))
+        self.escribir(f"INSERT OR REPLACE INTO {table_name} (date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?)",
+                      registros)
+                      
+                      
+    def leer_barras(self, table_name: str, inicio=None, fin=None) -> pd.DataFrame:
+        
+        """
+        Método que lee las barras de una tabla.
+        
+        Parámetros:
+        -----------
+        table_name : str
+            Nombre de la tabla.
+            
+        inicio : datetime, opcional
+            Fecha mínima de las barras. Si es `None`, no se aplica límite.
+            
+        fin : datetime, opcional
+            Fecha máxima de las barras. Si es `None`, no se aplica límite.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con el mismo formato que devuelve `reqHistoricalData`.
+        """
+        
+        self.preparar_tabla(table_name)
+        inicio = -2**62 if inicio is None else self.a_epoch([inicio])[0]
+        fin = 2**62 if fin is None else self.a_epoch([fin])[0]
+        datos = pd.read_sql(f"SELECT date, open, high, low, close, volume FROM {table_name} WHERE date BETWEEN ? AND ? "
+                            "ORDER BY date", con=self.conexion(), params=(inicio, fin))
+        datos.columns = ["Date", "Open", "High", "Low", "Close", "Volume"]
+        datos["Date"] = pd.to_datetime(datos["Date"], unit="s")
+        datos.set_index(["Date"], inplace=True)
+        
+        return datos
+        
+        
+    def cerrar(self) -> None:
+        
+        """
+        Método que cierra todas las conexiones abiertas.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.candado_conexiones:
+            for conn in self.conexiones:
+                conn.close()
+            self.conexiones.clear()
+        self.locales = threading.local()
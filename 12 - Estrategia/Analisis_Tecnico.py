@@ -56,6 +56,248 @@ def Cruce_MA(df: pd.DataFrame, tendencia_rapida: int, tendencia_lenta: int, tend
     return df_final
 
 
+# Clase que calcula el cruce de medias móviles de forma incremental
+class Cruce_MA_Incremental:
+    
+    """
+    Clase que calcula el cruce de medias móviles barra por barra, con el mismo resultado que `Cruce_MA` (columnas 
+    MA_Rapida, MA_Lenta, Cruces y Tendencia) pero con un costo O(1) por barra nueva: los cierres se guardan en un buffer
+    circular del tamaño de la ventana lenta y cada media se actualiza con una suma acumulada (se suma el cierre nuevo y
+    se resta el que sale de la ventana).
+    
+    Puede calentarse con un DataFrame histórico (`calentar`) y después recibir cada barra nueva con `actualizar` o 
+    directamente desde un `AgregadorBarras` (`al_cerrar_barra`).
+    """
+    
+    # Cada cuántas barras se recalculan las sumas desde el buffer (evita acumular error de redondeo)
+    RECALCULAR_CADA = 10000
+    
+    def __init__(self, tendencia_rapida: int, tendencia_lenta: int) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        tendencia_rapida : int
+            Número de periodos para la media móvil rápida.
+            
+        tendencia_lenta : int
+            Número de periodos para la media móvil lenta.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Parámetros
+        self.tendencia_rapida = tendencia_rapida
+        self.tendencia_lenta = tendencia_lenta
+        # Buffer circular de cierres (del tamaño de la ventana más grande)
+        self.ventana = max(tendencia_rapida, tendencia_lenta)
+        self.cierres = [0.0] * self.ventana
+        self.n = 0
+        # Sumas de cada ventana y estado anterior
+        self.suma_rapida = 0.0
+        self.suma_lenta = 0.0
+        self.ma_rapida = np.nan
+        self.ma_lenta = np.nan
+        self.cruce = np.nan
+        self.tendencia = np.nan
+        
+        
+    def actualizar(self, cierre: float) -> dict:
+        
+        """
+        Método que agrega el cierre de una barra nueva y devuelve los valores de esa barra.
+        
+        Parámetros:
+        -----------
+        cierre : float
+            Precio de cierre de la barra.
+            
+        Salida:
+        -------
+        return: dict : MA_Rapida, MA_Lenta, Cruces (1, -1 o NaN) y Tendencia (último cruce) de la barra.
+        """
+        
+        # Actualizar Sumas (sumar el cierre nuevo y restar los que salen de cada ventana)
+        i = self.n % self.ventana
+        if self.n >= self.tendencia_rapida:
+            self.suma_rapida -= self.cierres[(self.n - self.tendencia_rapida) % self.ventana]
+        if self.n >= self.tendencia_lenta:
+            self.suma_lenta -= self.cierres[(self.n - self.tendencia_lenta) % self.ventana]
+        self.cierres[i] = cierre
+        self.suma_rapida += cierre
+        self.suma_lenta += cierre
+        self.n += 1
+        if self.n % self.RECALCULAR_CADA == 0:
+            self.recalcular_sumas()
+        # Medias Móviles (NaN hasta completar la ventana)
+        ma_rapida_anterior, ma_lenta_anterior = self.ma_rapida, self.ma_lenta
+        self.ma_rapida = self.suma_rapida / self.tendencia_rapida if self.n >= self.tendencia_rapida else np.nan
+        self.ma_lenta = self.suma_lenta / self.tendencia_lenta if self.n >= self.tendencia_lenta else np.nan
+        # Detectar Cruces (mismas condiciones que Cruce_MA)
+        if self.ma_rapida > self.ma_lenta and ma_rapida_anterior < ma_lenta_anterior:
+            self.cruce = self.tendencia = 1.0
+        elif self.ma_lenta > self.ma_rapida and ma_lenta_anterior < ma_rapida_anterior:
+            self.cruce = self.tendencia = -1.0
+        else:
+            self.cruce = np.nan
+            
+        return self.ultimo
+    
+    
+    def recalcular_sumas(self) -> None:
+        
+        """
+        Método que recalcula las sumas de ambas ventanas a partir del buffer de cierres.
+        """
+        
+        recientes = [self.cierres[(self.n - k) % self.ventana] for k in range(1, min(self.n, self.ventana) + 1)]
+        self.suma_rapida = float(np.sum(recientes[:self.tendencia_rapida]))
+        self.suma_lenta = float(np.sum(recientes[:self.tendencia_lenta]))
+        
+        
+    @property
+    def ultimo(self) -> dict:
+        
+        """
+        Valores de la última barra procesada.
+        """
+        
+        return {"MA_Rapida": self.ma_rapida, "MA_Lenta": self.ma_lenta, "Cruces": self.cruce, "Tendencia": self.tendencia}
+    
+    
+    def calentar(self, df: pd.DataFrame) -> pd.DataFrame:
+        
+        """
+        Método que inicializa el estado con un DataFrame histórico (de forma vectorizada, con `Cruce_MA`). Las barras
+        posteriores deben agregarse con `actualizar`.
+        
+        Parámetros:
+        -----------
+        df : pd.DataFrame
+            DataFrame con la columna 'Close'.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Resultado de `Cruce_MA` para el DataFrame histórico.
+        """
+        
+        resultado = Cruce_MA(df=df, tendencia_rapida=self.tendencia_rapida, tendencia_lenta=self.tendencia_lenta, 
+                             tendencia_continua=True)
+        # Cargar los últimos cierres en el buffer y recalcular las sumas
+        cierres = df["Close"].to_numpy(dtype="float64")
+        self.n = len(cierres)
+        for k, cierre in enumerate(cierres[-self.ventana:]):
+            self.cierres[(self.n - min(self.n, self.ventana) + k) % self.ventana] = float(cierre)
+        self.recalcular_sumas()
+        # Estado de la última barra
+        if len(resultado) > 0:
+            ultimo = resultado.iloc[-1]
+            self.ma_rapida, self.ma_lenta = ultimo["MA_Rapida"], ultimo["MA_Lenta"]
+            self.cruce, self.tendencia = ultimo["Cruces"], ultimo["Tendencia"]
+            
+        return resultado
+    
+    
+    def al_cerrar_barra(self, agregador, resolucion: str, barra: dict) -> None:
+        
+        """
+        Método para registrar con `AgregadorBarras.al_cerrar` (o `on_bar` de `IB_Trading.reqStreamingBars`): agrega el 
+        cierre de cada barra cerrada.
+        """
+        
+        self.actualizar(barra["Close"])
+        
+        
+# Clase que mantiene un cruce de medias móviles incremental por activo
+class Monitor_Cruces_MA:
+    
+    """
+    Clase que mantiene una instancia de `Cruce_MA_Incremental` por activo (y resolución), para evaluar las señales de
+    cientos de activos con una actualización O(1) por barra.
+    """
+    
+    def __init__(self, tendencia_rapida: int, tendencia_lenta: int) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        tendencia_rapida : int
+            Número de periodos para la media móvil rápida.
+            
+        tendencia_lenta : int
+            Número de periodos para la media móvil lenta.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.tendencia_rapida = tendencia_rapida
+        self.tendencia_lenta = tendencia_lenta
+        self.cruces = {}
+        
+        
+    def obtener(self, clave) -> Cruce_MA_Incremental:
+        
+        """
+        Método que devuelve el cruce incremental de un activo (lo crea la primera vez).
+        """
+        
+        cruce = self.cruces.get(clave)
+        if cruce is None:
+            cruce = Cruce_MA_Incremental(self.tendencia_rapida, self.tendencia_lenta)
+            self.cruces[clave] = cruce
+            
+        return cruce
+    
+    
+    def calentar(self, clave, df: pd.DataFrame) -> pd.DataFrame:
+        
+        """
+        Método que inicializa el cruce de un activo con un DataFrame histórico (ver `Cruce_MA_Incremental.calentar`).
+        """
+        
+        return self.obtener(clave).calentar(df)
+    
+    
+    def actualizar(self, clave, cierre: float) -> dict:
+        
+        """
+        Método que agrega el cierre de una barra nueva de un activo (ver `Cruce_MA_Incremental.actualizar`).
+        """
+        
+        return self.obtener(clave).actualizar(cierre)
+    
+    
+    def al_cerrar_barra(self, agregador, resolucion: str, barra: dict) -> None:
+        
+        """
+        Método para registrar con `AgregadorBarras.al_cerrar`: la clave de cada activo es (agregador.nombre, resolucion).
+        """
+        
+        self.obtener((agregador.nombre, resolucion)).actualizar(barra["Close"])
+        
+        
+    def senales(self) -> pd.DataFrame:
+        
+        """
+        Método que devuelve el estado actual de todos los activos.
+        
+        Salida:
+        -------
+        return: pd.DataFrame : Una fila por activo con MA_Rapida, MA_Lenta, Cruces y Tendencia de su última barra.
+        """
+        
+        return pd.DataFrame([cruce.ultimo for cruce in self.cruces.values()], index=list(self.cruces.keys()),
+                            columns=["MA_Rapida", "MA_Lenta", "Cruces", "Tendencia"])
+    
+    
 # Recordatorio:
 if __name__ == "__main__":
     # Importar librerías adicionales
@@ -72,7 +314,7 @@ if __name__ == "__main__":
     contrato.exchange = "SMART"
     contrato.currency = "USD"
     # Descargar Datos
-    df = IB_datos.reqHistoricalData(reqId=0, contract=contrato, durationStr="2 Y")
+    df = IB_datos.reqHistoricalData(contract=contrato, durationStr="2 Y")
     print(df)
     calculo_ma = Cruce_MA(df=df, tendencia_rapida=9, tendencia_lenta=21, tendencia_continua=True)    
     print(calculo_ma)
@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import os
+import sys
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from Almacen_SQLite import AlmacenSQLite
+from Almacen_Parquet import AlmacenParquet
+from Cache_Historico import CacheBarras
+from Agregador_Barras import interpretar_resolucion
+from Indicadores import detectar_cruces, propagar
+
+# Reglas de pandas para las resoluciones de calendario (inicio de semana / de mes)
+REGLAS_CALENDARIO = {"week": "W", "weeks": "W", "month": "MS", "months": "MS"}
+# Columnas del resultado del barrido
+COLUMNAS_RESULTADO = ["barSize", "Activo", "Rapida", "Lenta", "PnL", "Sharpe", "Drawdown", "Operaciones", "Exposicion"]
+
+# Función que lee las barras de varios activos desde un almacén local
+def cargar_barras(fuente, symbols, barSize: str = "1 day", inicio=None, fin=None, tabla: str = "{symbol}",
+                  whatToShow: str = "ADJUSTED_LAST", useRTH: int = 1) -> dict:
+                  
+    """
+    Función que lee las barras históricas de varios activos desde el almacenamiento local del proyecto.
+    
+    Parámetros:
+    -----------
+    fuente : str | AlmacenSQLite | AlmacenParquet | CacheBarras | dict
+        Origen de los datos:
+            - AlmacenSQLite (o ruta a un archivo .db/.sqlite): una tabla por activo (ver `tabla`).
+            - AlmacenParquet (o ruta a una carpeta): `leer_varios` con el `barSize` indicado.
+            - CacheBarras: `symbols` debe ser un diccionario {activo: conId}.
+            - dict: diccionario {activo: pd.DataFrame} ya cargado (se devuelve sin cambios).
+            
+    symbols : list | dict
+        Activos a leer (diccionario {activo: conId} para CacheBarras).
+        
+    barSize : str, opcional
+        Tamaño de las barras almacenadas. Por defecto, es "1 day".
+        
+    inicio, fin : datetime, opcional
+        Intervalo de fechas. Si es `None`, no se aplica límite.
+        
+    tabla : str, opcional
+        Plantilla del nombre de la tabla en SQLite. Admite {symbol} y {barSize} (con "_" en lugar de espacios). Por
+        defecto, es "{symbol}".
+        
+    whatToShow, useRTH : opcional
+        Resto de la clave de las series de CacheBarras. Por defecto, son "ADJUSTED_LAST" y 1.
+        
+    Salida:
+    -------
+    return: dict : Diccionario {activo: pd.DataFrame} con el formato de `reqHistoricalData`.
+    """
+    
+    if isinstance(fuente, dict):
+        return fuente
+    if isinstance(fuente, str):
+        fuente = AlmacenSQLite.abrir(fuente) if os.path.splitext(fuente)[1] in (".db", ".sqlite") else AlmacenParquet(fuente)
+    if isinstance(fuente, AlmacenParquet):
+        return fuente.leer_varios(list(symbols), barSize=barSize, inicio=inicio, fin=fin)
+    if isinstance(fuente, CacheBarras):
+        return {symbol: fuente.cargar((conId, barSize, whatToShow, useRTH), inicio, fin) for symbol, conId in symbols.items()}
+    if isinstance(fuente, AlmacenSQLite):
+        return {symbol: fuente.leer_barras(tabla.format(symbol=symbol, barSize=barSize.replace(" ", "_")), inicio, fin)
+                for symbol in symbols}
+                
+    raise TypeError(f"Fuente de datos no válida: {type(fuente).__name__}")
+
+
+# Función que agrupa barras en una resolución mayor
+def remuestrear(df: pd.DataFrame, barSize: str) -> pd.DataFrame:
+    
+    """
+    Función que agrupa barras OHLCV en barras de tiempo de mayor duración (las barras sin operaciones se descartan).
+    
+    Parámetros:
+    -----------
+    df : pd.DataFrame
+        Barras con el formato de `reqHistoricalData`.
+        
+    barSize : str
+        Resolución de destino en el formato de IB ("1 hour", "4 hours", "1 day", "1 week", "1 month").
+        
+    Salida:
+    -------
+    return: pd.DataFrame : Barras agrupadas (la fecha de cada barra es su inicio).
+    """
+    
+    cantidad, unidad = barSize.split()
+    if unidad in REGLAS_CALENDARIO:
+        regla = f"{int(cantidad)}{REGLAS_CALENDARIO[unidad]}"
+    else:
+        tipo, umbral = interpretar_resolucion(barSize)
+        if tipo != "tiempo":
+            raise ValueError(f"Sólo se admiten barras de tiempo: '{barSize}'")
+        regla = pd.Timedelta(umbral, unit="ns")
+    agrupado = df.resample(regla, label="left", closed="left").agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+        
+    return agrupado.dropna(subset=["Close"])
+
+
+# -------------------------------------------------- Procesos del barrido --------------------------------------------------
+
+# Paneles de cada proceso: {barSize: (sumas acumuladas, conteo de cierres válidos, rendimientos, periodos por año)}
+PANELES = {}
+# Parámetros de la simulación en cada proceso
+PARAMETROS = {}
+
+# Función que inicializa un proceso del barrido
+def iniciar_proceso(paneles: dict, comision: float, solo_largos: bool) -> None:
+    
+    """
+    Función que prepara un proceso del barrido: guarda los precios de cierre y calcula, una sola vez por barSize, las
+    sumas acumuladas de las que se obtienen todas las medias móviles y los rendimientos de cada barra.
+    """
+    
+    PANELES.clear()
+    for barSize, (cierres, periodos_anio) in paneles.items():
+        validos = ~np.isnan(cierres)
+        acumulada = np.zeros((cierres.shape[0] + 1, cierres.shape[1]))
+        np.cumsum(np.where(validos, cierres, 0.0), axis=0, out=acumulada[1:])
+        conteo = np.zeros((cierres.shape[0] + 1, cierres.shape[1]), dtype="int64")
+        np.cumsum(validos, axis=0, out=conteo[1:])
+        # Rendimiento de cada barra sobre el último cierre válido (0 si no hay precio)
+        precios = propagar(cierres)
+        rendimientos = np.zeros(cierres.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rendimientos[1:] = np.nan_to_num(precios[1:] / precios[:-1] - 1, nan=0.0, posinf=0.0, neginf=0.0)
+        PANELES[barSize] = (acumulada, conteo, rendimientos, periodos_anio)
+    PARAMETROS.update(comision=comision, solo_largos=solo_largos)
+
+
+# Función que obtiene una media móvil a partir de las sumas acumuladas
+def media_movil(barSize: str, ventana: int) -> np.ndarray:
+    
+    """
+    Función que obtiene la media móvil simple de todos los activos a partir de las sumas acumuladas del proceso (O(T)
+    por ventana, sin importar su tamaño).
+    """
+    
+    acumulada, conteo, _, _ = PANELES[barSize]
+    media = np.full((acumulada.shape[0] - 1, acumulada.shape[1]), np.nan)
+    if ventana < acumulada.shape[0]:
+        media[ventana - 1:] = (acumulada[ventana:] - acumulada[:-ventana]) / ventana
+        media[ventana - 1:][(conteo[ventana:] - conteo[:-ventana]) < ventana] = np.nan
+        
+    return media
+
+
+# Función que simula una estrategia de cruce de medias móviles
+def simular(barSize: str, media_rapida: np.ndarray, media_lenta: np.ndarray) -> tuple:
+    
+    """
+    Función que simula el cruce de dos medias móviles en todos los activos de un barSize. La posición es la tendencia
+    de `Cruce_MA` (1 comprado, -1 vendido, 0 antes del primer cruce) y se mantiene desde el cierre de la barra de la
+    señal hasta el cierre de la barra siguiente. Cada cambio de posición paga la comisión (proporcional al valor
+    operado).
+    
+    Salida:
+    -------
+    return: tuple : (rendimientos de la estrategia por barra, posiciones), arreglos (tiempo x activo).
+    """
+    
+    _, _, rendimientos, _ = PANELES[barSize]
+    posiciones = np.nan_to_num(propagar(detectar_cruces(media_rapida, media_lenta)))
+    if PARAMETROS["solo_largos"]:
+        posiciones = np.clip(posiciones, 0.0, None)
+    cambios = np.abs(np.diff(posiciones, axis=0, prepend=0.0))
+    resultado = np.zeros(posiciones.shape)
+    resultado[1:] = posiciones[:-1] * rendimientos[1:]
+    resultado -= PARAMETROS["comision"] * cambios
+    
+    return resultado, posiciones
+
+
+# Función que evalúa un grupo de combinaciones del barrido
+def evaluar_grupo(barSize: str, combinaciones: list) -> list:
+    
+    """
+    Función que evalúa un grupo de combinaciones (rapida, lenta) de un barSize y calcula, para cada activo, el PnL
+    (rendimiento total compuesto), el Sharpe anualizado, el drawdown máximo, el número de operaciones y la exposición.
+    
+    Salida:
+    -------
+    return: list : Lista de tuplas (rapida, lenta, pnl, sharpe, drawdown, operaciones, exposicion), con un arreglo por
+                   activo en cada métrica.
+    """
+    
+    periodos_anio = PANELES[barSize][3]
+    medias_rapidas = {}
+    metricas = []
+    for rapida, lenta in combinaciones:
+        if rapida not in medias_rapidas:
+            medias_rapidas[rapida] = media_movil(barSize, rapida)
+        resultado, posiciones = simular(barSize, medias_rapidas[rapida], media_movil(barSize, lenta))
+        # Curva de Capital
+        capital = np.cumprod(1 + resultado, axis=0)
+        pnl = capital[-1] - 1
+        drawdown = (capital / np.maximum.accumulate(capital, axis=0) - 1).min(axis=0)
+        # Sharpe Anualizado
+        desviacion = resultado.std(axis=0, ddof=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(desviacion > 0, resultado.mean(axis=0) / desviacion * np.sqrt(periodos_anio), np.nan)
+        operaciones = np.count_nonzero(np.diff(posiciones, axis=0, prepend=0.0), axis=0)
+        exposicion = np.count_nonzero(posiciones, axis=0) / posiciones.shape[0]
+        metricas.append((rapida, lenta, pnl, sharpe, drawdown, operaciones, exposicion))
+        
+    return metricas
+
+
+# Clase que evalúa estrategias de cruce de medias móviles sobre datos históricos
+class BacktestCruceMA:
+    
+    """
+    Clase que evalúa de forma vectorizada la estrategia de cruce de medias móviles (`Cruce_MA`) sobre una malla de
+    parámetros (rapida, lenta, barSize) y varios activos.
+    
+    Los precios de cierre de todos los activos se alinean en un panel (tiempo x activo) por barSize, cada proceso
+    calcula una sola vez sus sumas acumuladas (de las que sale cualquier media móvil en O(T)) y las combinaciones se
+    reparten entre procesos agrupadas por media rápida. El resultado es un DataFrame ordenado con una fila por
+    (barSize, activo, rapida, lenta).
+    """
+    
+    def __init__(self, datos: dict, barSize: str = "1 day", comision: float = 0.0, solo_largos: bool = False) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        datos : dict
+            Diccionario {activo: pd.DataFrame} con las barras de cada activo (formato de `reqHistoricalData`). Los
+            valores `None` o vacíos se omiten.
+            
+        barSize : str, opcional
+            Tamaño de las barras de `datos`. Las resoluciones mayores del barrido se obtienen agrupando estas barras.
+            Por defecto, es "1 day".
+            
+        comision : float, opcional
+            Costo de cada cambio de posición como proporción del valor operado (0.0005 = 5 puntos base). Por defecto,
+            es 0.0.
+            
+        solo_largos : bool, opcional
+            Si es True, las señales de venta cierran la posición en lugar de abrir una posición corta. Por defecto, es
+            False.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.datos = {activo: df for activo, df in datos.items() if df is not None and len(df) > 0}
+        self.barSize = barSize
+        self.comision = comision
+        self.solo_largos = solo_largos
+        # Paneles de cierres por barSize
+        self.paneles = {}
+        
+        
+    @classmethod
+    def desde_almacen(cls, fuente, symbols, barSize: str = "1 day", inicio=None, fin=None, tabla: str = "{symbol}",
+                      **kwargs) -> "BacktestCruceMA":
+                      
+        """
+        Método que crea el backtest con las barras de un almacén local (ver `cargar_barras`).
+        
+        Parámetros:
+        -----------
+        fuente, symbols, barSize, inicio, fin, tabla :
+            Los mismos parámetros que `cargar_barras`.
+            
+        **kwargs :
+            Parámetros adicionales del constructor (comision, solo_largos).
+            
+        Salida:
+        -------
+        return: BacktestCruceMA : Instancia con los datos cargados.
+        """
+        
+        return cls(cargar_barras(fuente, symbols, barSize, inicio, fin, tabla), barSize=barSize, **kwargs)
+        
+        
+    def panel(self, barSize: str = None) -> pd.DataFrame:
+        
+        """
+        Método que devuelve el panel de precios de cierre (tiempo x activo) de un barSize.
+        
+        Parámetros:
+        -----------
+        barSize : str, opcional
+            Tamaño de las barras. Si es `None`, se utiliza el de los datos.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Cierres con una columna por activo (NaN donde un activo no tiene barra).
+        """
+        
+        barSize = barSize or self.barSize
+        if barSize not in self.paneles:
+            if barSize == self.barSize:
+                cierres = {activo: df["Close"] for activo, df in self.datos.items()}
+            else:
+                cierres = {activo: remuestrear(df, barSize)["Close"] for activo, df in self.datos.items()}
+            self.paneles[barSize] = pd.DataFrame(cierres).sort_index().astype("float64")
+            
+        return self.paneles[barSize]
+        
+        
+    @staticmethod
+    def periodos_anio(panel: pd.DataFrame) -> float:
+        
+        """
+        Método que estima el número de barras por año de un panel (para anualizar el Sharpe).
+        """
+        
+        if len(panel) < 2:
+            return 252.0
+        anios = (panel.index[-1] - panel.index[0]) / pd.Timedelta(days=365.25)
+        
+        return len(panel) / anios if anios > 0 else 252.0
+        
+        
+    def barrer(self, rapidas, lentas, barSizes: list = None, procesos: int = None) -> pd.DataFrame:
+        
+        """
+        Método que evalúa todas las combinaciones (rapida, lenta, barSize) con rapida < lenta en todos los activos.
+        
+        Parámetros:
+        -----------
+        rapidas : iterable
+            Ventanas de la media móvil rápida.
+            
+        lentas : iterable
+            Ventanas de la media móvil lenta.
+            
+        barSizes : list, opcional
+            Tamaños de barra a evaluar. Si es `None`, sólo se evalúa el de los datos.
+            
+        procesos : int, opcional
+            Número de procesos. Si es `None`, se utiliza el número de CPUs; con 1, todo se evalúa en el proceso actual.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Una fila por (barSize, activo, rapida, lenta) con las columnas PnL (rendimiento total),
+                               Sharpe (anualizado), Drawdown (máximo, negativo), Operaciones y Exposicion (fracción de
+                               barras con posición), ordenado de mayor a menor Sharpe.
+        """
+        
+        barSizes = barSizes or [self.barSize]
+        paneles = {barSize: self.panel(barSize) for barSize in barSizes}
+        activos = list(paneles[barSizes[0]].columns)
+        # Agrupar combinaciones por barSize y media rápida (cada grupo reutiliza la misma media rápida)
+        lentas = sorted(set(lentas))
+        grupos = []
+        for barSize, rapida in itertools.product(barSizes, sorted(set(rapidas))):
+            combinaciones = [(rapida, lenta) for lenta in lentas if rapida < lenta]
+            if len(combinaciones) > 0:
+                grupos.append((barSize, combinaciones))
+        if len(grupos) == 0:
+            return pd.DataFrame(columns=COLUMNAS_RESULTADO)
+        # Evaluar Grupos
+        argumentos = ({barSize: (panel.to_numpy(), self.periodos_anio(panel)) for barSize, panel in paneles.items()},
+                      self.comision, self.solo_largos)
+        procesos = procesos or os.cpu_count() or 1
+        if procesos == 1 or len(grupos) == 1:
+            iniciar_proceso(*argumentos)
+            resultados = [evaluar_grupo(*grupo) for grupo in grupos]
+        else:
+            with ProcessPoolExecutor(max_workers=min(procesos, len(grupos)), initializer=iniciar_proceso,
+                                     initargs=argumentos) as ejecutor:
+                resultados = list(ejecutor.map(evaluar_grupo, *zip(*grupos)))
+        # Construir DataFrame
+        filas = []
+        for (barSize, _), metricas in zip(grupos, resultados):
+            for rapida, lenta, pnl, sharpe, drawdown, operaciones, exposicion in metricas:
+                for i, activo in enumerate(activos):
+                    filas.append((barSize, activo, rapida, lenta, pnl[i], sharpe[i], drawdown[i], operaciones[i],
+                                  exposicion[i]))
+        resultado = pd.DataFrame(filas, columns=COLUMNAS_RESULTADO)
+        
+        return resultado.sort_values("Sharpe", ascending=False, ignore_index=True)
+        
+        
+    def evaluar(self, rapida: int, lenta: int, barSize: str = None) -> pd.DataFrame:
+        
+        """
+        Método que simula una sola combinación y devuelve la curva de capital de cada activo (para revisar en detalle
+        una combinación del barrido).
+        
+        Parámetros:
+        -----------
+        rapida : int
+            Ventana de la media móvil rápida.
+            
+        lenta : int
+            Ventana de la media móvil lenta.
+            
+        barSize : str, opcional
+            Tamaño de las barras. Si es `None`, se utiliza el de los datos.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Capital acumulado (inicia en 1) con una columna por activo.
+        """
+        
+        barSize = barSize or self.barSize
+        panel = self.panel(barSize)
+        iniciar_proceso({barSize: (panel.to_numpy(), self.periodos_anio(panel))}, self.comision, self.solo_largos)
+        resultado, _ = simular(barSize, media_movil(barSize, rapida), media_movil(barSize, lenta))
+        
+        return pd.DataFrame(np.cumprod(1 + resultado, axis=0), index=panel.index, columns=panel.columns)
+
+
+if __name__ == "__main__":
+    
+    # Barrido de los activos de Sistema_Alternativo con barras diarias almacenadas en Parquet
+    tickers = ["AMZN", "AAPL", "TSLA", "MSFT", "GOOG", "META", "NVDA"]
+    backtest = BacktestCruceMA.desde_almacen(sys.argv[1] if len(sys.argv) > 1 else "../datos/parquet", tickers,
+                                             barSize="1 day", comision=0.0005)
+    resultados = backtest.barrer(rapidas=range(3, 51), lentas=range(10, 201, 2))
+    print(resultados.head(20).to_string())
+    # Mejor combinación promedio entre activos
+    print(resultados.groupby(["Rapida", "Lenta"])["Sharpe"].mean().sort_values(ascending=False).head(10))
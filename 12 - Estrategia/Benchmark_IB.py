@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+# Importar librerías de IB
+from ibapi.contract import Contract
+from ibapi.scanner import ScannerSubscription
+from ibapi.message import IN
+# Importar librerías del Proyecto
+from IB_Trading import IB_Trading
+from Servidor_Simulado import ServidorSimulado
+# Importar librerías Ordinarias
+import os
+import sys
+import json
+import platform
+import subprocess
+import threading
+import time
+import ibapi
+import numpy as np
+from datetime import datetime
+
+# Archivo de historial de resultados (junto a este módulo)
+HISTORIAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_historial.json")
+
+# Clase que mide el rendimiento de IB_Trading contra el servidor simulado
+class BenchmarkIB:
+    
+    """
+    Clase que mide el rendimiento de `IB_Trading` (del mensaje en el socket hasta el DataFrame) contra un
+    `ServidorSimulado` local. Cada prueba reporta el rendimiento (unidades por segundo) y los percentiles de latencia:
+        
+        - historico: barras/seg recibidas por `historicalData` y devueltas por `reqHistoricalData`.
+        - contratos: contratos/seg recibidos por `contractDetails` para cadenas de opciones grandes.
+        - ticks: ticks/seg procesados por `tickPrice`, `tickSize`, `tickGeneric` y `tickByTick*`. Los mensajes se
+          reproducen directamente en la cola del cliente (sin socket) para que el límite sea el propio cliente.
+        - escaner: filas/seg de `reqScannerSubscription`.
+        - ordenes: latencia de `reqIds` -> `placeOrder` -> primer `orderStatus`.
+        
+    Los resultados se agregan a un historial JSON y se comparan con la ejecución anterior para detectar regresiones.
+    """
+    
+    def __init__(self, repeticiones: int = 5, latencia: float = 0.0, historial: str = HISTORIAL) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        repeticiones : int, opcional
+            Número de repeticiones de cada petición. Por defecto, es 5.
+            
+        latencia : float, opcional
+            Latencia (en segundos) del servidor simulado. Por defecto, es 0.0.
+            
+        historial : str, opcional
+            Ruta del archivo JSON de historial. Por defecto, es 'benchmark_historial.json' junto a este módulo.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.repeticiones = repeticiones
+        self.latencia = latencia
+        self.historial = historial
+        self.resultados = {}
+        self.servidor = None
+        self.app = None
+        
+        
+    # -------------------------------------------------- Utilidades --------------------------------------------------
+    
+    @staticmethod
+    def resumen(latencias: list, unidades: int) -> dict:
+        
+        """
+        Método que resume las latencias de una prueba.
+        
+        Parámetros:
+        -----------
+        latencias : list
+            Duración (en segundos) de cada repetición u operación.
+            
+        unidades : int
+            Número total de unidades procesadas (barras, contratos, ticks, ...).
+            
+        Salida:
+        -------
+        return: dict : Rendimiento (unidades por segundo) y percentiles de latencia en milisegundos.
+        """
+        
+        latencias = np.asarray(latencias, dtype="float64")
+        p50, p90, p99 = (np.percentile(latencias, [50, 90, 99]) * 1000).tolist()
+        
+        return {"por_segundo": round(unidades / latencias.sum(), 1), "unidades": int(unidades), "n": len(latencias),
+                "p50_ms": round(p50, 3), "p90_ms": round(p90, 3), "p99_ms": round(p99, 3),
+                "max_ms": round(float(latencias.max()) * 1000, 3)}
+                
+                
+    @staticmethod
+    def contrato(symbol: str, secType: str = "STK") -> Contract:
+        
+        """
+        Método que crea un contrato de prueba.
+        """
+        
+        contrato = Contract()
+        contrato.symbol = symbol
+        contrato.secType = secType
+        contrato.exchange = "SMART"
+        contrato.currency = "USD"
+        
+        return contrato
+        
+        
+    def conectar(self, **kwargs) -> None:
+        
+        """
+        Método que inicia un servidor simulado (con los parámetros indicados) y conecta una instancia de `IB_Trading`.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.servidor = ServidorSimulado(port=0, latencia=self.latencia, **kwargs)
+        puerto = self.servidor.iniciar()
+        self.app = IB_Trading(log_file=os.devnull)
+        self.app.connect(port=puerto)
+        
+        
+    def desconectar(self) -> None:
+        
+        """
+        Método que desconecta el cliente y detiene el servidor simulado.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.app.disconnect()
+        self.servidor.detener()
+        
+        
+    # -------------------------------------------------- Pruebas --------------------------------------------------
+    
+    def historico(self, durationStr: str = "20 D", barSizeSetting: str = "1 min") -> dict:
+        
+        """
+        Método que mide la descarga de barras históricas (`historicalData` -> `reqHistoricalData`).
+        
+        Parámetros:
+        -----------
+        durationStr : str, opcional
+            Duración de cada petición. Por defecto, es "20 D".
+            
+        barSizeSetting : str, opcional
+            Tamaño de las barras. Por defecto, es "1 min".
+            
+        Salida:
+        -------
+        return: dict : Resumen de la prueba.
+        """
+        
+        latencias, barras = [], 0
+        for i in range(self.repeticiones):
+            inicio = time.perf_counter()
+            datos = self.app.reqHistoricalData(contract=self.contrato(f"BH{i}"), durationStr=durationStr,
+                                               barSizeSetting=barSizeSetting, use_cache=False, timeout=120)
+            latencias.append(time.perf_counter() - inicio)
+            barras += len(datos)
+            
+        return self.resumen(latencias, barras)
+        
+        
+    def contratos(self) -> dict:
+        
+        """
+        Método que mide la recepción de cadenas de opciones completas con `reqContractDetails`.
+        
+        Salida:
+        -------
+        return: dict : Resumen de la prueba.
+        """
+        
+        latencias, contratos = [], 0
+        for i in range(self.repeticiones):
+            inicio = time.perf_counter()
+            detalles = self.app.reqContractDetails(contract=self.contrato(f"OC{i}", "OPT"), timeout=120)
+            latencias.append(time.perf_counter() - inicio)
+            contratos += len(detalles)
+            
+        return self.resumen(latencias, contratos)
+        
+        
+    def ticks(self, n_ticks: int = 200000, suscripciones: int = 50) -> dict:
+        
+        """
+        Método que mide el procesamiento de ticks. Los mensajes (tickPrice, tickSize, tickGeneric y tickByTick) se
+        codifican previamente y se reproducen en la cola de mensajes del cliente, de modo que se mide la decodificación
+        y los callbacks de `IB_Trading` sin el costo del servidor.
+        
+        Parámetros:
+        -----------
+        n_ticks : int, opcional
+            Número de mensajes reproducidos. Por defecto, es 200000.
+            
+        suscripciones : int, opcional
+            Número de reqIds distintos entre los que se reparten los mensajes. Por defecto, es 50.
+            
+        Salida:
+        -------
+        return: dict : Resumen de la prueba (latencias = duración de cada callback).
+        """
+        
+        # Codificar Mensajes
+        generador = np.random.default_rng(0)
+        precios = np.round(100 + np.cumsum(generador.normal(0, 0.01, n_ticks)), 2)
+        ahora = int(time.time())
+        plantillas = [
+            lambda reqId, precio: (IN.TICK_PRICE, 6, reqId, 1, precio, 100, 0),
+            lambda reqId, precio: (IN.TICK_PRICE, 6, reqId, 2, precio + 0.01, 200, 0),
+            lambda reqId, precio: (IN.TICK_SIZE, 6, reqId, 8, 150000),
+            lambda reqId, precio: (IN.TICK_GENERIC, 6, reqId, 24, 0.25),
+            lambda reqId, precio: (IN.TICK_BY_TICK, reqId, 2, ahora, precio, 100, 0, "NASDAQ", ""),
+            lambda reqId, precio: (IN.TICK_BY_TICK, reqId, 3, ahora, precio, precio + 0.01, 100, 200, 0),
+            lambda reqId, precio: (IN.TICK_BY_TICK, reqId, 4, ahora, precio + 0.005),
+            ]
+        mensajes = ["\0".join(str(campo) for campo in plantillas[i % len(plantillas)](i % suscripciones, precios[i])).encode()
+                    + b"\0" for i in range(n_ticks)]
+        # Instrumentar Callbacks (duración de cada llamada)
+        duraciones = []
+        for nombre in ["tickPrice", "tickSize", "tickGeneric", "tickByTickAllLast", "tickByTickBidAsk", "tickByTickMidPoint"]:
+            setattr(self.app, nombre, self.cronometrar(getattr(self.app, nombre), duraciones))
+        terminado = threading.Event()
+        self.app.currentTime = lambda tiempo: terminado.set()
+        for reqId in range(suscripciones):
+            self.app.cotizaciones.registrar(reqId)
+        # Reproducir Mensajes (con un mensaje final de currentTime como marcador)
+        inicio = time.perf_counter()
+        for mensaje in mensajes:
+            self.app.msg_queue.put(mensaje)
+        self.app.msg_queue.put(f"{IN.CURRENT_TIME}\0" "1\0" "0\0".encode())
+        terminado.wait(timeout=300)
+        total = time.perf_counter() - inicio
+        # Restaurar Callbacks
+        for nombre in ["tickPrice", "tickSize", "tickGeneric", "tickByTickAllLast", "tickByTickBidAsk", "tickByTickMidPoint",
+                       "currentTime"]:
+            delattr(self.app, nombre)
+        for reqId in range(suscripciones):
+            self.app.cotizaciones.eliminar(reqId)
+        resultado = self.resumen(duraciones, len(duraciones))
+        resultado["por_segundo"] = round(n_ticks / total, 1)
+        resultado["callbacks"] = len(duraciones)
+        
+        return resultado
+        
+        
+    @staticmethod
+    def cronometrar(funcion, duraciones: list):
+        
+        """
+        Método que envuelve un callback para registrar la duración de cada llamada.
+        """
+        
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            funcion(*args, **kwargs)
+            duraciones.append(time.perf_counter() - inicio)
+            
+        return envoltura
+        
+        
+    def escaner(self, filas: int = 50) -> dict:
+        
+        """
+        Método que mide la recepción de resultados del escáner con `reqScannerSubscription`.
+        
+        Parámetros:
+        -----------
+        filas : int, opcional
+            Número de filas solicitadas por petición. Por defecto, es 50.
+            
+        Salida:
+        -------
+        return: dict : Resumen de la prueba.
+        """
+        
+        latencias, total_filas = [], 0
+        for i in range(self.repeticiones):
+            suscripcion = ScannerSubscription()
+            suscripcion.instrument = "STK"
+            suscripcion.locationCode = "STK.US.MAJOR"
+            suscripcion.scanCode = f"TOP_PERC_GAIN_{i}"
+            suscripcion.numberOfRows = filas
+            inicio = time.perf_counter()
+            resultados = self.app.reqScannerSubscription(subscription=suscripcion)
+            latencias.append(time.perf_counter() - inicio)
+            total_filas += len(resultados)
+            
+        return self.resumen(latencias, total_filas)
+        
+        
+    def ordenes(self, n_ordenes: int = 200) -> dict:
+        
+        """
+        Método que mide la latencia de extremo a extremo de una orden: `reqIds` -> `placeOrder` -> primer `orderStatus`.
+        
+        Parámetros:
+        -----------
+        n_ordenes : int, opcional
+            Número de órdenes enviadas. Por defecto, es 200.
+            
+        Salida:
+        -------
+        return: dict : Resumen de la prueba.
+        """
+        
+        # Instrumentar orderStatus (evento por orden)
+        eventos = {}
+        original = self.app.orderStatus
+        
+        def orderStatus(orderId, *args):
+            original(orderId, *args)
+            if orderId in eventos:
+                eventos[orderId].set()
+                
+        self.app.orderStatus = orderStatus
+        contrato = self.contrato("AAPL")
+        latencias = []
+        for i in range(n_ordenes):
+            inicio = time.perf_counter()
+            orderId = self.app.reqIds()
+            eventos[orderId] = threading.Event()
+            self.app.placeOrder(orderId, contrato, self.app.market_order("BUY" if i % 2 == 0 else "SELL", 1))
+            eventos[orderId].wait(timeout=10)
+            latencias.append(time.perf_counter() - inicio)
+        del self.app.orderStatus
+        
+        return self.resumen(latencias, n_ordenes)
+        
+        
+    # -------------------------------------------------- Ejecución --------------------------------------------------
+    
+    def ejecutar(self) -> dict:
+        
+        """
+        Método que ejecuta todas las pruebas.
+        
+        Salida:
+        -------
+        return: dict : Resultados de cada prueba.
+        """
+        
+        self.conectar(vencimientos_cadena=12, strikes_cadena=101, ticks_por_segundo=1.0)
+        try:
+            self.resultados["historico_barras"] = self.historico()
+            self.resultados["contratos_cadena"] = self.contratos()
+            self.resultados["ticks"] = self.ticks()
+            self.resultados["escaner_filas"] = self.escaner()
+            self.resultados["ordenes_latencia"] = self.ordenes()
+        finally:
+            self.desconectar()
+            
+        return self.resultados
+        
+        
+    @staticmethod
+    def version() -> str:
+        
+        """
+        Método que devuelve la versión del código (commit de git, si está disponible).
+        """
+        
+        try:
+            return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except OSError:
+            return ""
+            
+            
+    def guardar(self, umbral: float = 0.10) -> list:
+        
+        """
+        Método que agrega los resultados al historial JSON y los compara con la ejecución anterior.
+        
+        Parámetros:
+        -----------
+        umbral : float, opcional
+            Caída relativa del rendimiento a partir de la cual se reporta una regresión. Por defecto, es 0.10 (10%).
+            
+        Salida:
+        -------
+        return: list : Descripción de las regresiones encontradas.
+        """
+        
+        historial = []
+        if os.path.exists(self.historial):
+            with open(self.historial, "r", encoding="utf-8") as archivo:
+                historial = json.load(archivo)
+        # Comparar con la Ejecución Anterior
+        regresiones = []
+        if len(historial) > 0:
+            anterior = historial[-1]["resultados"]
+            for prueba, resultado in self.resultados.items():
+                if prueba in anterior and anterior[prueba]["por_segundo"] > 0:
+                    cambio = resultado["por_segundo"] / anterior[prueba]["por_segundo"] - 1
+                    if cambio < -umbral:
+                        regresiones.append(f"{prueba}: {anterior[prueba]['por_segundo']} -> {resultado['por_segundo']} "
+                                           f"({cambio:+.1%})")
+        # Agregar Ejecución
+        historial.append({"fecha": datetime.now().isoformat(timespec="seconds"), "version": self.version(),
+                          "python": platform.python_version(), "ibapi": ibapi.get_version_string(),
+                          "resultados": self.resultados})
+        with open(self.historial, "w", encoding="utf-8") as archivo:
+            json.dump(historial, archivo, indent=2)
+            
+        return regresiones
+
+
+if __name__ == "__main__":
+    
+    # Ejecutar Pruebas
+    benchmark = BenchmarkIB(repeticiones=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    resultados = benchmark.ejecutar()
+    for prueba, resultado in resultados.items():
+        print(f"{prueba:<18} {resultado['por_segundo']:>12,.1f}/s   p50={resultado['p50_ms']:.3f} ms   "
+              f"p99={resultado['p99_ms']:.3f} ms")
+    # Guardar Historial y Reportar Regresiones
+    regresiones = benchmark.guardar()
+    for regresion in regresiones:
+        print("Regresión:", regresion)
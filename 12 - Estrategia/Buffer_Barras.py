@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# Clase que acumula barras históricas en arreglos de NumPy
+class BufferBarras:
+    
+    """
+    Clase que acumula las barras de una petición histórica en arreglos de NumPy preasignados (que crecen al doble cuando
+    se llenan), en lugar de crear una lista de Python por barra:
+        
+        - fechas: int64 (nanosegundos desde 1970)
+        - precios: float64 con columnas Open, High, Low, Close
+        - volumen: float64 (IB envía volúmenes fraccionarios, p. ej. en criptomonedas o divisas)
+        
+    Las fechas se interpretan al recibir cada barra con un analizador de formato fijo (sin `pd.to_datetime` sobre texto)
+    y se expresan en hora local sin zona horaria (igual que `AgregadorBarras`), sin importar el formatDate de la
+    petición. El DataFrame final se construye sobre los mismos arreglos, sin copiarlos.
+    """
+    
+    # Días ya interpretados ('YYYYMMDD' -> nanosegundos), compartidos entre buffers
+    cache_dias = {}
+    
+    def __init__(self, capacidad: int = 1024) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        capacidad : int, opcional
+            Número de barras reservadas inicialmente. Por defecto, es 1024.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Arreglos preasignados
+        self.fechas = np.empty(capacidad, dtype="int64")
+        self.precios = np.empty((capacidad, 4), dtype="float64")
+        self.volumen = np.empty(capacidad, dtype="float64")
+        self.n = 0
+        
+        
+    def __len__(self) -> int:
+        
+        """
+        Método que devuelve el número de barras acumuladas.
+        """
+        
+        return self.n
+        
+        
+    def __repr__(self) -> str:
+        
+        """
+        Método que devuelve una representación resumida del buffer.
+        """
+        
+        return f"BufferBarras(barras={self.n}, capacidad={len(self.fechas)})"
+        
+        
+    @classmethod
+    def fecha_a_ns(cls, texto: str) -> int:
+        
+        """
+        Método que convierte la fecha de una barra de IB en nanosegundos desde 1970, en hora local sin zona horaria.
+        Admite los formatos:
+            
+            - 'YYYYMMDD' (barras diarias o mayores)
+            - 'YYYYMMDD  HH:mm:ss' o 'YYYYMMDD-HH:mm:ss' (formatDate=1; ya en hora local)
+            - 'YYYYMMDD HH:mm:ss Zona' (formatDate=1; se convierte de la zona indicada a hora local)
+            - Segundos desde 1970 (formatDate=2; se convierten de UTC a hora local)
+            
+        Parámetros:
+        -----------
+        texto : str
+            Fecha de la barra.
+            
+        Salida:
+        -------
+        return: int : Nanosegundos desde 1970.
+        """
+        
+        # Timestamp UNIX (formatDate=2)
+        if len(texto) != 8 and texto.isdigit():
+            return cls.utc_a_local(int(texto))
+        # Día (se interpreta una sola vez)
+        dia = texto[:8]
+        ns_dia = cls.cache_dias.get(dia)
+        if ns_dia is None:
+            ns_dia = int(np.datetime64(f"{dia[:4]}-{dia[4:6]}-{dia[6:8]}", "ns").astype("int64"))
+            cls.cache_dias[dia] = ns_dia
+        if len(texto) == 8:
+            return ns_dia
+        # Hora del Día
+        partes = texto[9:].split()
+        horas, minutos, segundos = partes[0].split(":")
+        # Convertir de la Zona Horaria indicada a Hora Local
+        if len(partes) > 1:
+            try:
+                zona = ZoneInfo(partes[1])
+            except (ValueError, KeyError):
+                zona = None
+            if zona is not None:
+                fecha = datetime(int(dia[:4]), int(dia[4:6]), int(dia[6:8]), int(horas), int(minutos), int(segundos),
+                                 tzinfo=zona)
+                return cls.utc_a_local(int(fecha.timestamp()))
+                
+        return ns_dia + ((int(horas) * 60 + int(minutos)) * 60 + int(segundos)) * 1_000_000_000
+        
+        
+    @staticmethod
+    def utc_a_local(segundos: int) -> int:
+        
+        """
+        Método que convierte segundos desde 1970 (UTC) en nanosegundos desde 1970 en hora local sin zona horaria.
+        
+        Parámetros:
+        -----------
+        segundos : int
+            Segundos desde 1970 (UTC).
+            
+        Salida:
+        -------
+        return: int : Nanosegundos desde 1970 (hora local).
+        """
+        
+        return (segundos + time.localtime(segundos).tm_gmtoff) * 1_000_000_000
+        
+        
+    def agregar(self, bar) -> None:
+        
+        """
+        Método que agrega una barra al buffer.
+        
+        Parámetros:
+        -----------
+        bar : ibapi.common.BarData
+            Barra recibida en `historicalData`.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Crecer al doble si está lleno
+        if self.n == len(self.fechas):
+            capacidad = max(1024, 2 * len(self.fechas))
+            self.fechas = np.resize(self.fechas, capacidad)
+            self.precios = np.resize(self.precios, (capacidad, 4))
+            self.volumen = np.resize(self.volumen, capacidad)
+        # Almacenar Valores
+        i = self.n
+        self.fechas[i] = self.fecha_a_ns(bar.date)
+        self.precios[i] = (bar.open, bar.high, bar.low, bar.close)
+        self.volumen[i] = float(bar.volume)
+        self.n += 1
+        
+        
+    def a_dataframe(self) -> pd.DataFrame:
+        
+        """
+        Método que construye el DataFrame de las barras acumuladas, con el formato de `reqHistoricalData`. El DataFrame
+        utiliza los arreglos del buffer directamente (sin copia).
+        
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con índice de fechas y columnas Open, High, Low, Close y Volume.
+        """
+        
+        n = self.n
+        indice = pd.DatetimeIndex(self.fechas[:n].view("datetime64[ns]"), name="Date")
+        datos = pd.DataFrame(self.precios[:n], index=indice, columns=["Open", "High", "Low", "Close"], copy=False)
+        datos["Volume"] = self.volumen[:n]
+        
+        return datos
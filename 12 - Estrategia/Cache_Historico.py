@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import math
+import pandas as pd
+from datetime import datetime, timedelta
+from Almacen_SQLite import AlmacenSQLite
+
+# Función que convierte la duración de IB en un intervalo de tiempo
+def duracion_a_intervalo(durationStr: str, fin: datetime) -> datetime:
+    
+    """
+    Función que calcula la fecha de inicio de una petición a partir de su duración en el formato de IB.
+    
+    Parámetros:
+    -----------
+    durationStr : str
+        Duración en el formato de IB (por ejemplo, "3600 S", "15 D", "3 W", "6 M", "2 Y").
+        
+    fin : datetime
+        Fecha final de la petición.
+        
+    Salida:
+    -------
+    return: datetime : Fecha de inicio de la petición.
+    """
+    
+    cantidad, unidad = durationStr.split()
+    cantidad = int(cantidad)
+    if unidad == "S":
+        return fin - timedelta(seconds=cantidad)
+    elif unidad == "D":
+        return fin - timedelta(days=cantidad)
+    elif unidad == "W":
+        return fin - timedelta(weeks=cantidad)
+    elif unidad == "M":
+        return (pd.Timestamp(fin) - pd.DateOffset(months=cantidad)).to_pydatetime()
+    elif unidad == "Y":
+        return (pd.Timestamp(fin) - pd.DateOffset(years=cantidad)).to_pydatetime()
+        
+    raise ValueError(f"Duración no reconocida: {durationStr}")
+
+
+# Función que convierte un intervalo de tiempo en una duración de IB
+def intervalo_a_duracion(inicio: datetime, fin: datetime, barSizeSetting: str) -> str:
+    
+    """
+    Función que genera la duración mínima (en el formato de IB) que cubre un intervalo de tiempo.
+    
+    Parámetros:
+    -----------
+    inicio : datetime
+        Fecha de inicio del intervalo.
+        
+    fin : datetime
+        Fecha final del intervalo.
+        
+    barSizeSetting : str
+        Tamaño de la barra solicitada. Para barras diarias o mayores siempre se utilizan días o años.
+        
+    Salida:
+    -------
+    return: str : Duración en el formato de IB.
+    """
+    
+    segundos = max(1, math.ceil((fin - inicio).total_seconds()))
+    barra_intradia = barSizeSetting.split()[1].startswith(("sec", "min", "hour"))
+    if barra_intradia and segundos < 86400:
+        return f"{segundos} S"
+    # Redondear hacia arriba (con un día extra para incluir la última barra completa)
+    dias = math.ceil(segundos / 86400) + 1
+    if dias <= 365:
+        return f"{dias} D"
+        
+    return f"{math.ceil(dias / 365)} Y"
+
+
+# Función que convierte una fecha de IB en datetime
+def texto_a_fecha(endDateTime: str) -> datetime:
+    
+    """
+    Función que interpreta la fecha final de una petición histórica de IB.
+    
+    Parámetros:
+    -----------
+    endDateTime : str
+        Fecha en el formato 'YYYYMMDD HH:mm:ss' (con o sin zona horaria) o 'YYYYMMDD-HH:mm:ss'. Si está vacía, se
+        utiliza el momento actual.
+        
+    Salida:
+    -------
+    return: datetime : Fecha interpretada (sin zona horaria).
+    """
+    
+    if endDateTime == "":
+        return datetime.now().replace(microsecond=0)
+        
+    return datetime.strptime(endDateTime[:17].replace("-", " "), "%Y%m%d %H:%M:%S")
+
+
+# Clase que almacena localmente las barras históricas descargadas
+class CacheBarras:
+    
+    """
+    Clase que mantiene una caché local (SQLite, a través de `AlmacenSQLite`) de barras históricas.
+    
+    Cada serie se identifica por la clave (conId, barSize, whatToShow, useRTH). Además de las barras, la caché registra el
+    intervalo de tiempo que ya tiene descargado para cada serie, de forma que una nueva petición sólo necesita solicitar
+    al servidor los huecos del inicio y del final que faltan.
+    """
+    
+    def __init__(self, db_path: str) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        db_path : str
+            Ruta del archivo de la base de datos SQLite. Si el archivo no existe, se creará automáticamente.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.db_path = db_path
+        self.almacen = AlmacenSQLite.abrir(db_path)
+        # Definir estructura
+        self.almacen.ejecutar("""
+                CREATE TABLE IF NOT EXISTS barras_cache (
+                    conId INTEGER,
+                    barSize TEXT,
+                    whatToShow TEXT,
+                    useRTH INTEGER,
+                    date INTEGER,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    PRIMARY KEY (conId, barSize, whatToShow, useRTH, date)
+                    ) WITHOUT ROWID
+        """)
+        self.almacen.ejecutar("""
+                CREATE TABLE IF NOT EXISTS cobertura_cache (
+                    conId INTEGER,
+                    barSize TEXT,
+                    whatToShow TEXT,
+                    useRTH INTEGER,
+                    inicio INTEGER,
+                    fin INTEGER,
+                    PRIMARY KEY (conId, barSize, whatToShow, useRTH)
+                    )
+        """)
+        
+        
+    @staticmethod
+    def a_epoch(fecha) -> int:
+        
+        """
+        Método que convierte una fecha (sin zona horaria) en segundos desde 1970.
+        
+        Parámetros:
+        -----------
+        fecha : datetime | pd.Timestamp
+            Fecha a convertir.
+            
+        Salida:
+        -------
+        return: int : Segundos desde 1970-01-01.
+        """
+        
+        return int(pd.Timestamp(fecha).value // 10**9)
+        
+        
+    def cobertura(self, clave: tuple) -> tuple:
+        
+        """
+        Método que devuelve el intervalo de tiempo almacenado para una serie.
+        
+        Parámetros:
+        -----------
+        clave : tuple
+            Clave de la serie: (conId, barSize, whatToShow, useRTH).
+            
+        Salida:
+        -------
+        return: tuple : (inicio, fin) como `pd.Timestamp`, o `None` si la serie no está en la caché.
+        """
+        
+        filas = self.almacen.ejecutar("SELECT inicio, fin FROM cobertura_cache WHERE conId = ? AND barSize = ? AND "
+                                      "whatToShow = ? AND useRTH = ?", clave)
+        if len(filas) == 0:
+            return None
+        fila = filas[0]
+        
+        return pd.Timestamp(fila[0], unit="s"), pd.Timestamp(fila[1], unit="s")
+        
+        
+    def huecos(self, clave: tuple, inicio: datetime, fin: datetime) -> list:
+        
+        """
+        Método que calcula los intervalos que faltan en la caché para cubrir [inicio, fin].
+        
+        Parámetros:
+        -----------
+        clave : tuple
+            Clave de la serie: (conId, barSize, whatToShow, useRTH).
+            
+        inicio : datetime
+            Fecha de inicio solicitada.
+            
+        fin : datetime
+            Fecha final solicitada.
+            
+        Salida:
+        -------
+        return: list : Lista de tuplas (inicio, fin) con los huecos del inicio y/o del final. Si la serie no está en la
+                       caché, contiene el intervalo completo.
+        """
+        
+        cobertura = self.cobertura(clave)
+        if cobertura is None:
+            return [(pd.Timestamp(inicio), pd.Timestamp(fin))]
+        huecos = []
+        # Hueco al Inicio
+        if pd.Timestamp(inicio) < cobertura[0]:
+            huecos.append((pd.Timestamp(inicio), cobertura[0]))
+        # Hueco al Final
+        if pd.Timestamp(fin) > cobertura[1]:
+            huecos.append((cobertura[1], pd.Timestamp(fin)))
+            
+        return huecos
+        
+        
+    def guardar(self, clave: tuple, df: pd.DataFrame, inicio: datetime, fin: datetime) -> None:
+        
+        """
+        Método que inserta o actualiza barras en la caché y amplía el intervalo cubierto de la serie.
+        
+        Parámetros:
+        -----------
+        clave : tuple
+            Clave de la serie: (conId, barSize, whatToShow, useRTH).
+            
+        df : pd.DataFrame
+            Barras descargadas, con el formato de `reqHistoricalData`.
+            
+        inicio : datetime
+            Fecha de inicio del intervalo descargado.
+            
+        fin : datetime
+            Fecha final del intervalo descargado. El intervalo debe ser contiguo al que ya se tenía almacenado.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Preparar Registros
+        fechas = df.index.values.astype("datetime64[s]").astype("int64").tolist()
+        columnas = [df[columna].astype(float).tolist() for columna in ["Open", "High", "Low", "Close", "Volume"]]
+        registros = [clave + fila for fila in zip(fechas, *columnas)]
+        inicio, fin = self.a_epoch(inicio), self.a_epoch(fin)
+        # Almacenar (Insertar o Reemplazar). La cobertura se amplía después de guardar las barras.
+        self.almacen.escribir("INSERT OR REPLACE INTO barras_cache (conId, barSize, whatToShow, useRTH, date, open, high, low, "
+                              "close, volume) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", registros)
+        self.almacen.ejecutar("""
+            INSERT INTO cobertura_cache (conId, barSize, whatToShow, useRTH, inicio, fin) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (conId, barSize, whatToShow, useRTH) DO UPDATE SET
+                inicio = MIN(inicio, excluded.inicio),
+                fin = MAX(fin, excluded.fin)
+        """, clave + (inicio, fin))
+        
+        
+    def cargar(self, clave: tuple, inicio: datetime = None, fin: datetime = None) -> pd.DataFrame:
+        
+        """
+        Método que lee las barras almacenadas de una serie.
+        
+        Parámetros:
+        -----------
+        clave : tuple
+            Clave de la serie: (conId, barSize, whatToShow, useRTH).
+            
+        inicio : datetime, opcional
+            Fecha mínima de las barras. Si es `None`, no se aplica límite.
+            
+        fin : datetime, opcional
+            Fecha máxima de las barras. Si es `None`, no se aplica límite.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con el mismo formato que devuelve `reqHistoricalData`.
+        """
+        
+        inicio = -2**62 if inicio is None else self.a_epoch(inicio)
+        fin = 2**62 if fin is None else self.a_epoch(fin)
+        datos = pd.read_sql("SELECT date, open, high, low, close, volume FROM barras_cache WHERE conId = ? AND barSize = ? "
+                            "AND whatToShow = ? AND useRTH = ? AND date BETWEEN ? AND ? ORDER BY date",
+                            con=self.almacen.conexion(), params=clave + (inicio, fin))
+        datos.columns = ["Date", "Open", "High", "Low", "Close", "Volume"]
+        datos["Date"] = pd.to_datetime(datos["Date"], unit="s")
+        datos.set_index(["Date"], inplace=True)
+        
+        return datos
+        
+        
+    def eliminar(self, clave: tuple) -> None:
+        
+        """
+        Método que elimina una serie de la caché (barras e intervalo cubierto).
+        
+        Parámetros:
+        -----------
+        clave : tuple
+            Clave de la serie: (conId, barSize, whatToShow, useRTH).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        condicion = "WHERE conId = ? AND barSize = ? AND whatToShow = ? AND useRTH = ?"
+        self.almacen.ejecutar(f"DELETE FROM cobertura_cache {condicion}", clave)
+        self.almacen.ejecutar(f"DELETE FROM barras_cache {condicion}", clave)
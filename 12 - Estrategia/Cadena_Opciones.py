@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from ibapi.contract import Contract
+from Almacen_SQLite import AlmacenSQLite
+from Control_Peticiones import clave_contrato
+from concurrent.futures import wait as futures_wait
+from datetime import datetime
+import numpy as np
+
+# Clase que mantiene las cadenas de opciones de varios activos
+class CadenaOpciones:
+    
+    """
+    Clase que descarga una vez al día las cadenas de opciones (vencimientos y strikes) de los activos y las guarda en
+    memoria y, opcionalmente, en una base de datos SQLite (a través de `AlmacenSQLite`).
+    
+    La cadena de cada activo se obtiene con una sola petición `reqSecDefOptParams`, que devuelve todos los vencimientos y
+    la unión de los strikes de todos ellos. Como no todos los strikes existen en todos los vencimientos, los vencimientos
+    que se van a negociar pueden "detallarse" con `reqContractDetails` para conocer los strikes exactos de cada tipo de
+    opción. Las peticiones de varios activos se envían a la vez.
+    
+    Los strikes se guardan como arreglos de NumPy ordenados por (activo, vencimiento, tipo), por lo que la selección de un
+    strike (ATM, N strikes por encima o por debajo del precio) es una búsqueda binaria.
+    """
+    
+    def __init__(self, trading_app, db_path: str = None, exchange: str = "SMART", currency: str = "USD") -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        trading_app : IB_Trading
+            Instancia conectada de `IB_Trading` que se utilizará para las peticiones.
+            
+        db_path : str, opcional
+            Ruta de la base de datos SQLite en la que se guardan las cadenas. Si es `None` (por defecto), las cadenas sólo
+            se guardan en memoria.
+            
+        exchange : str, opcional
+            Mercado de las opciones. Por defecto, es "SMART".
+            
+        currency : str, opcional
+            Divisa de las opciones. Por defecto, es "USD".
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.trading_app = trading_app
+        self.exchange = exchange
+        self.currency = currency
+        # Cadenas en memoria (symbol -> información y strikes por (vencimiento, tipo))
+        self.cadenas = {}
+        # Almacenamiento Local (Opcional)
+        self.almacen = AlmacenSQLite.abrir(db_path) if db_path else None
+        if self.almacen is not None:
+            self.almacen.ejecutar("""
+                    CREATE TABLE IF NOT EXISTS cadenas_info (
+                        symbol TEXT PRIMARY KEY,
+                        fecha TEXT,
+                        tradingClass TEXT,
+                        multiplier TEXT,
+                        underlyingConId INTEGER,
+                        vencimientos TEXT
+                        )
+            """)
+            self.almacen.ejecutar("""
+                    CREATE TABLE IF NOT EXISTS cadenas_strikes (
+                        symbol TEXT,
+                        vencimiento TEXT,
+                        tipo TEXT,
+                        strike REAL,
+                        PRIMARY KEY (symbol, vencimiento, tipo, strike)
+                        ) WITHOUT ROWID
+            """)
+            
+            
+    @staticmethod
+    def hoy() -> str:
+        
+        """
+        Método que devuelve la fecha actual (AAAAMMDD), que identifica la descarga diaria de las cadenas.
+        
+        Salida:
+        -------
+        return: str : Fecha actual en el formato AAAAMMDD.
+        """
+        
+        return datetime.now().strftime("%Y%m%d")
+        
+        
+    def cargar(self, simbolos: list, forzar: bool = False, timeout: float = 10.0) -> None:
+        
+        """
+        Método que se asegura de tener la cadena del día de cada activo. Las cadenas que no están en memoria ni en la base
+        de datos se solicitan al servidor, todas a la vez.
+        
+        Parámetros:
+        -----------
+        simbolos : list
+            Símbolos de los activos subyacentes.
+            
+        forzar : bool, opcional
+            Si es `True`, las cadenas se vuelven a descargar aunque ya se tengan. Por defecto, es `False`.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) de espera de las peticiones. Por defecto, es de 10 segundos.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Cadenas Disponibles (Memoria o Base de Datos)
+        faltantes = []
+        for symbol in dict.fromkeys(simbolos):
+            if not forzar and (self.vigente(symbol) or self.leer(symbol)):
+                continue
+            faltantes.append(symbol)
+        if len(faltantes) == 0:
+            return
+        # Resolver conId de los Subyacentes (Todos a la vez)
+        subyacentes = {symbol: self.subyacente(symbol) for symbol in faltantes}
+        futuros = {symbol: self.trading_app.reqContractDetailsAsync(contract=contrato) for symbol, contrato in subyacentes.items()
+                   if clave_contrato(contrato) not in self.trading_app.conIds}
+        futures_wait(futuros.values(), timeout=timeout)
+        for symbol, futuro in futuros.items():
+            detalles = self.trading_app.wait_request(futuro.clave, futuro, timeout=0)
+            if detalles:
+                self.trading_app.conIds[clave_contrato(subyacentes[symbol])] = detalles[0].contract.conId
+        # Solicitar Parámetros de las Cadenas (Todas a la vez)
+        futuros = {symbol: self.trading_app.reqSecDefOptParamsAsync(underlyingSymbol=symbol, underlyingSecType="STK",
+                                                                    underlyingConId=self.trading_app.conIds[clave_contrato(contrato)])
+                   for symbol, contrato in subyacentes.items() if clave_contrato(contrato) in self.trading_app.conIds}
+        futures_wait(futuros.values(), timeout=timeout)
+        for symbol, futuro in futuros.items():
+            parametros = self.trading_app.wait_request(futuro.clave, futuro, timeout=0)
+            if parametros:
+                self.guardar(symbol, parametros)
+                
+                
+    def detallar(self, pares: list, forzar: bool = False, timeout: float = 10.0) -> None:
+        
+        """
+        Método que obtiene los strikes exactos de cada tipo de opción ('C' y 'P') para varios pares (activo, vencimiento),
+        con una petición `reqContractDetails` por par, todas a la vez.
+        
+        Parámetros:
+        -----------
+        pares : list
+            Lista de tuplas (symbol, vencimiento).
+            
+        forzar : bool, opcional
+            Si es `True`, los pares se vuelven a detallar aunque ya se tengan. Por defecto, es `False`.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) de espera de las peticiones. Por defecto, es de 10 segundos.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Asegurar las Cadenas
+        self.cargar([symbol for symbol, _ in pares], timeout=timeout)
+        # Solicitar Contratos (Todos a la vez)
+        futuros = {}
+        for symbol, vencimiento in dict.fromkeys(pares):
+            cadena = self.cadenas.get(symbol)
+            if cadena is None or (not forzar and (vencimiento, "C") in cadena["strikes"]):
+                continue
+            futuros[(symbol, vencimiento)] = self.trading_app.reqContractDetailsAsync(contract=self.contrato(symbol, vencimiento))
+        futures_wait(futuros.values(), timeout=timeout)
+        # Guardar Strikes por Tipo
+        registros = []
+        for (symbol, vencimiento), futuro in futuros.items():
+            detalles = self.trading_app.wait_request(futuro.clave, futuro, timeout=0)
+            if not detalles:
+                continue
+            for tipo in ("C", "P"):
+                strikes = np.unique([d.contract.strike for d in detalles if d.contract.right == tipo])
+                self.cadenas[symbol]["strikes"][(vencimiento, tipo)] = strikes
+                registros += [(symbol, vencimiento, tipo, strike) for strike in strikes.tolist()]
+        if self.almacen is not None and len(registros) > 0:
+            self.almacen.escribir("INSERT OR REPLACE INTO cadenas_strikes (symbol, vencimiento, tipo, strike) VALUES (?, ?, ?, ?)",
+                                  registros)
+                                  
+                                  
+    def vigente(self, symbol: str) -> bool:
+        
+        """
+        Método que indica si la cadena de un activo está en memoria y es del día.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        Salida:
+        -------
+        return: bool : `True` si la cadena en memoria corresponde al día actual.
+        """
+        
+        cadena = self.cadenas.get(symbol)
+        
+        return cadena is not None and cadena["fecha"] == self.hoy()
+        
+        
+    def leer(self, symbol: str) -> bool:
+        
+        """
+        Método que carga en memoria la cadena del día de un activo desde la base de datos.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        Salida:
+        -------
+        return: bool : `True` si la base de datos tenía la cadena del día.
+        """
+        
+        if self.almacen is None:
+            return False
+        filas = self.almacen.ejecutar("SELECT tradingClass, multiplier, underlyingConId, vencimientos FROM cadenas_info "
+                                      "WHERE symbol = ? AND fecha = ?", (symbol, self.hoy()))
+        if len(filas) == 0:
+            return False
+        tradingClass, multiplier, underlyingConId, vencimientos = filas[0]
+        # Strikes por (Vencimiento, Tipo). Ordenados por la llave primaria.
+        strikes = {}
+        for vencimiento, tipo, strike in self.almacen.ejecutar("SELECT vencimiento, tipo, strike FROM cadenas_strikes WHERE "
+                                                               "symbol = ? ORDER BY vencimiento, tipo, strike", (symbol,)):
+            strikes.setdefault((vencimiento, tipo), []).append(strike)
+        self.cadenas[symbol] = {"fecha": self.hoy(), "tradingClass": tradingClass, "multiplier": multiplier,
+                                "underlyingConId": underlyingConId,
+                                "vencimientos": np.array(vencimientos.split(",") if vencimientos else [], dtype=str),
+                                "strikes": {clave: np.array(valores) for clave, valores in strikes.items()}}
+                                
+        return True
+        
+        
+    def guardar(self, symbol: str, parametros: list) -> None:
+        
+        """
+        Método que guarda la cadena de un activo a partir de la respuesta de `reqSecDefOptParams`.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        parametros : list
+            Lista de diccionarios devuelta por `reqSecDefOptParams` (uno por mercado).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Elegir el Mercado (y la clase de negociación del propio activo, si existe)
+        candidatos = [p for p in parametros if p["exchange"] == self.exchange] or parametros
+        parametro = next((p for p in candidatos if p["tradingClass"] == symbol), candidatos[0])
+        vencimientos = np.array(sorted(parametro["expirations"]), dtype=str)
+        strikes = np.unique(np.asarray(parametro["strikes"], dtype=float))
+        # Guardar en Memoria. La llave ("", "") contiene los strikes de todos los vencimientos.
+        self.cadenas[symbol] = {"fecha": self.hoy(), "tradingClass": parametro["tradingClass"],
+                                "multiplier": parametro["multiplier"], "underlyingConId": parametro["underlyingConId"],
+                                "vencimientos": vencimientos, "strikes": {("", ""): strikes}}
+        # Guardar en la Base de Datos (Reemplazar la cadena anterior)
+        if self.almacen is not None:
+            self.almacen.ejecutar("DELETE FROM cadenas_strikes WHERE symbol = ?", (symbol,))
+            self.almacen.ejecutar("INSERT OR REPLACE INTO cadenas_info (symbol, fecha, tradingClass, multiplier, underlyingConId, "
+                                  "vencimientos) VALUES (?, ?, ?, ?, ?, ?)",
+                                  (symbol, self.hoy(), parametro["tradingClass"], parametro["multiplier"],
+                                   parametro["underlyingConId"], ",".join(vencimientos.tolist())))
+            self.almacen.escribir("INSERT OR REPLACE INTO cadenas_strikes (symbol, vencimiento, tipo, strike) VALUES (?, ?, ?, ?)",
+                                  [(symbol, "", "", strike) for strike in strikes.tolist()])
+                                  
+                                  
+    def subyacente(self, symbol: str) -> Contract:
+        
+        """
+        Método que crea el contrato del activo subyacente (acción).
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        Salida:
+        -------
+        return: Contract : Contrato de la acción en SMART con la divisa de la clase.
+        """
+        
+        contrato = Contract()
+        contrato.symbol = symbol
+        contrato.secType = "STK"
+        contrato.exchange = "SMART"
+        contrato.currency = self.currency
+        
+        return contrato
+        
+        
+    def vencimientos(self, symbol: str) -> np.ndarray:
+        
+        """
+        Método que devuelve los vencimientos ordenados de un activo. Descarga la cadena si no se tiene.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        Salida:
+        -------
+        return: np.ndarray : Vencimientos (AAAAMMDD), vacío si no se pudo obtener la cadena.
+        """
+        
+        self.cargar([symbol])
+        cadena = self.cadenas.get(symbol)
+        
+        return cadena["vencimientos"] if cadena is not None else np.array([], dtype=str)
+        
+        
+    def vencimiento_mes(self, symbol: str, mes: str) -> str:
+        
+        """
+        Método que elige el vencimiento de un mes. Se prefiere el vencimiento mensual estándar (tercer viernes); si no
+        existe, se utiliza el primer vencimiento del mes.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        mes : str
+            Mes del vencimiento (AAAAMM).
+            
+        Salida:
+        -------
+        return: str : Vencimiento (AAAAMMDD), o `None` si el activo no tiene vencimientos en el mes.
+        """
+        
+        vencimientos = self.vencimientos(symbol)
+        # Vencimientos del Mes (Búsqueda Binaria sobre el arreglo ordenado)
+        inicio, fin = np.searchsorted(vencimientos, [mes, mes + "99"])
+        del_mes = vencimientos[inicio:fin].tolist()
+        if len(del_mes) == 0:
+            return None
+        for vencimiento in del_mes:
+            fecha = datetime.strptime(vencimiento[:8], "%Y%m%d")
+            if fecha.weekday() == 4 and 15 <= fecha.day <= 21:
+                return vencimiento
+                
+        return del_mes[0]
+        
+        
+    def strikes(self, symbol: str, vencimiento: str, right: str, exacto: bool = True) -> np.ndarray:
+        
+        """
+        Método que devuelve los strikes ordenados de un activo, vencimiento y tipo de opción.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        vencimiento : str
+            Vencimiento (AAAAMMDD).
+            
+        right : str
+            Tipo de opción ('C' o 'P').
+            
+        exacto : bool, opcional
+            Si es `True` (por defecto), se detalla el vencimiento (una sola vez al día) para devolver sólo los strikes que
+            existen. Si es `False`, se devuelven los strikes de todos los vencimientos de la cadena.
+            
+        Salida:
+        -------
+        return: np.ndarray : Strikes ordenados de menor a mayor (vacío si no se tiene la cadena).
+        """
+        
+        if exacto:
+            self.detallar([(symbol, vencimiento)])
+        else:
+            self.cargar([symbol])
+        cadena = self.cadenas.get(symbol)
+        if cadena is None:
+            return np.array([])
+            
+        return cadena["strikes"].get((vencimiento, right), cadena["strikes"][("", "")])
+        
+        
+    def strike_atm(self, symbol: str, vencimiento: str, right: str, precio: float, exacto: bool = True) -> float:
+        
+        """
+        Método que devuelve el strike más cercano al precio del activo (ATM).
+        
+        Parámetros:
+        -----------
+        symbol, vencimiento, right, exacto :
+            Los mismos parámetros que `strikes`.
+            
+        precio : float
+            Precio del activo subyacente.
+            
+        Salida:
+        -------
+        return: float : Strike ATM, o `None` si no hay strikes.
+        """
+        
+        strikes = self.strikes(symbol, vencimiento, right, exacto=exacto)
+        if len(strikes) == 0:
+            return None
+        i = np.searchsorted(strikes, precio)
+        if i == len(strikes) or (i > 0 and precio - strikes[i - 1] <= strikes[i] - precio):
+            i -= 1
+            
+        return float(strikes[i])
+        
+        
+    def strike_desplazado(self, symbol: str, vencimiento: str, right: str, precio: float, n: int, exacto: bool = True) -> float:
+        
+        """
+        Método que devuelve el n-ésimo strike por encima (n > 0) o por debajo (n < 0) del precio del activo. Si no hay
+        tantos strikes, se devuelve el más lejano disponible de ese lado.
+        
+        Parámetros:
+        -----------
+        symbol, vencimiento, right, exacto :
+            Los mismos parámetros que `strikes`.
+            
+        precio : float
+            Precio del activo subyacente.
+            
+        n : int
+            Número de strikes de desplazamiento respecto al precio (distinto de 0).
+            
+        Salida:
+        -------
+        return: float : Strike seleccionado, o `None` si no hay strikes de ese lado del precio.
+        """
+        
+        strikes = self.strikes(symbol, vencimiento, right, exacto=exacto)
+        if n > 0:
+            i = np.searchsorted(strikes, precio, side="right")
+            if i == len(strikes):
+                return None
+            return float(strikes[min(i + n - 1, len(strikes) - 1)])
+        i = np.searchsorted(strikes, precio, side="left")
+        if i == 0:
+            return None
+            
+        return float(strikes[max(i + n, 0)])
+        
+        
+    def strike_otm(self, symbol: str, vencimiento: str, right: str, precio: float, n: int = 1, exacto: bool = True) -> float:
+        
+        """
+        Método que devuelve el n-ésimo strike fuera del dinero (OTM): por encima del precio para las 'Call' y por debajo
+        para las 'Put'.
+        
+        Parámetros:
+        -----------
+        symbol, vencimiento, right, exacto :
+            Los mismos parámetros que `strikes`.
+            
+        precio : float
+            Precio del activo subyacente.
+            
+        n : int, opcional
+            Número de strikes fuera del dinero (1 es el más cercano al precio). Por defecto, es 1.
+            
+        Salida:
+        -------
+        return: float : Strike seleccionado, o `None` si no hay strikes de ese lado del precio (ver `strike_desplazado`).
+        """
+        
+        return self.strike_desplazado(symbol, vencimiento, right, precio, n if right == "C" else -n, exacto=exacto)
+        
+        
+    def contrato(self, symbol: str, vencimiento: str, right: str = "", strike: float = 0.0) -> Contract:
+        
+        """
+        Método que crea el contrato de una opción de la cadena.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo subyacente.
+            
+        vencimiento : str
+            Vencimiento (AAAAMMDD).
+            
+        right : str, opcional
+            Tipo de opción ('C' o 'P'). Si está vacío (por defecto), el contrato describe todas las opciones del vencimiento.
+            
+        strike : float, opcional
+            Precio de ejercicio. Si es 0.0 (por defecto), el contrato describe todos los strikes.
+            
+        Salida:
+        -------
+        return: Contract : Contrato de la opción.
+        """
+        
+        cadena = self.cadenas.get(symbol, {})
+        contrato = Contract()
+        contrato.symbol = symbol
+        contrato.secType = "OPT"
+        contrato.exchange = self.exchange
+        contrato.currency = self.currency
+        contrato.multiplier = cadena.get("multiplier") or "100"
+        contrato.tradingClass = cadena.get("tradingClass", "")
+        contrato.lastTradeDateOrContractMonth = vencimiento
+        contrato.right = right
+        contrato.strike = strike
+        
+        return contrato
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import threading
+import bisect
+import time
+from collections import deque
+
+# Función que genera una clave única para un contrato
+def clave_contrato(contract) -> tuple:
+    
+    """
+    Función que genera una clave que identifica a un contrato, útil para agrupar peticiones del mismo instrumento.
+    
+    Parámetros:
+    -----------
+    contract : Contract
+        Objeto que define el contrato financiero.
+        
+    Salida:
+    -------
+    return: tuple : Clave del contrato. Si se conoce el `conId`, se utiliza junto con el exchange.
+    """
+    
+    # Usar el conId si ya fue resuelto por el servidor
+    if getattr(contract, "conId", 0):
+        return (contract.conId, contract.exchange)
+        
+    return (contract.symbol, contract.secType, contract.exchange, contract.currency,
+            contract.lastTradeDateOrContractMonth, contract.strike, contract.right)
+
+
+# Clase que controla el ritmo de las peticiones de datos históricos
+class ControlRitmoHistorico:
+    
+    """
+    Clase que aplica las reglas de ritmo (pacing) de IB para las peticiones de datos históricos:
+        
+        1. No realizar peticiones idénticas en un lapso de 15 segundos.
+        2. No realizar 6 o más peticiones del mismo contrato, exchange y tipo de dato en 2 segundos.
+        3. No realizar más de 60 peticiones en cualquier ventana de 10 minutos.
+        
+    En lugar de esperar a recibir un error de "pacing violation", cada petición reserva un turno y se retrasa el tiempo
+    necesario para respetar las tres reglas. La clase es segura para usarse desde varios hilos.
+    """
+    
+    def __init__(self, espera_identicas: float = 15.0, max_por_contrato: int = 5, ventana_contrato: float = 2.0,
+                 max_peticiones: int = 60, ventana_global: float = 600.0, solo_barras_pequenas: bool = True) -> None:
+                 
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        espera_identicas : float, opcional
+            Segundos mínimos entre dos peticiones idénticas. Por defecto, es 15.0.
+            
+        max_por_contrato : int, opcional
+            Número máximo de peticiones del mismo contrato dentro de `ventana_contrato`. Por defecto, es 5, ya que IB
+            considera violación a partir de la sexta.
+            
+        ventana_contrato : float, opcional
+            Duración (en segundos) de la ventana por contrato. Por defecto, es 2.0.
+            
+        max_peticiones : int, opcional
+            Número máximo de peticiones dentro de `ventana_global`. Por defecto, es 60.
+            
+        ventana_global : float, opcional
+            Duración (en segundos) de la ventana global. Por defecto, es 600.0 (10 minutos).
+            
+        solo_barras_pequenas : bool, opcional
+            Si es True (por defecto), el límite global de 60 peticiones sólo se aplica a barras de 30 segundos o menos,
+            que son las que IB restringe de forma estricta. Si es False, se aplica a todas las peticiones.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Parámetros de las reglas
+        self.espera_identicas = espera_identicas
+        self.max_por_contrato = max_por_contrato
+        self.ventana_contrato = ventana_contrato
+        self.max_peticiones = max_peticiones
+        self.ventana_global = ventana_global
+        self.solo_barras_pequenas = solo_barras_pequenas
+        # Historial de turnos reservados (instantes en time.monotonic)
+        self.candado = threading.Lock()
+        self.turnos_globales = []
+        self.turnos_contratos = {}
+        self.turnos_identicos = {}
+        
+        
+    @staticmethod
+    def barra_pequena(barSizeSetting: str) -> bool:
+        
+        """
+        Método que indica si un tamaño de barra es de 30 segundos o menos.
+        
+        Parámetros:
+        -----------
+        barSizeSetting : str
+            Tamaño de la barra en el formato de IB (por ejemplo, "5 secs", "1 min").
+            
+        Salida:
+        -------
+        return: bool : True si la barra es de 30 segundos o menos.
+        """
+        
+        cantidad, unidad = barSizeSetting.split()
+        
+        return unidad.startswith("sec") and int(cantidad) <= 30
+        
+        
+    @staticmethod
+    def siguiente_hueco(turnos: list, instante: float, limite: int, ventana: float) -> float:
+        
+        """
+        Método que calcula el primer instante, a partir de `instante`, en el que una nueva petición no excede el `limite`
+        de turnos dentro de la `ventana`.
+        
+        Parámetros:
+        -----------
+        turnos : list
+            Lista ordenada de instantes reservados.
+            
+        instante : float
+            Instante deseado para la nueva petición.
+            
+        limite : int
+            Número máximo de turnos permitidos en la ventana.
+            
+        ventana : float
+            Duración de la ventana en segundos.
+            
+        Salida:
+        -------
+        return: float : Instante permitido para la petición.
+        """
+        
+        # Turnos que caen dentro de la ventana del instante deseado (incluye turnos reservados a futuro)
+        recientes = turnos[bisect.bisect_right(turnos, instante - ventana):]
+        if len(recientes) < limite:
+            return instante
+            
+        return max(instante, recientes[len(recientes) - limite] + ventana)
+        
+        
+    def reservar(self, clave_contrato: tuple, clave_peticion: tuple, barSizeSetting: str = "1 day", peso: int = 1) -> float:
+        
+        """
+        Método que reserva un turno para una petición y devuelve el instante en el que puede enviarse.
+        
+        Parámetros:
+        -----------
+        clave_contrato : tuple
+            Clave del contrato, exchange y tipo de dato (`whatToShow`) de la petición.
+            
+        clave_peticion : tuple
+            Clave completa de la petición, utilizada para detectar peticiones idénticas.
+            
+        barSizeSetting : str, opcional
+            Tamaño de la barra solicitada. Por defecto, es "1 day".
+            
+        peso : int, opcional
+            Número de peticiones que IB contabiliza para esta solicitud (las peticiones "BID_ASK" cuentan doble).
+            Por defecto, es 1.
+            
+        Salida:
+        -------
+        return: float : Instante (en la escala de `time.monotonic`) en el que se puede enviar la petición.
+        """
+        
+        with self.candado:
+            ahora = time.monotonic()
+            self.purgar(ahora)
+            aplicar_global = (not self.solo_barras_pequenas) or self.barra_pequena(barSizeSetting)
+            turnos_contrato = self.turnos_contratos.setdefault(clave_contrato, [])
+            # Regla 1: Peticiones Idénticas
+            instante = ahora
+            ultima = self.turnos_identicos.get(clave_peticion)
+            if ultima is not None:
+                instante = max(instante, ultima + self.espera_identicas)
+            # Reglas 2 y 3: Repetir hasta que ambas se cumplan a la vez
+            while True:
+                nuevo_instante = self.siguiente_hueco(turnos_contrato, instante, self.max_por_contrato - peso + 1,
+                                                      self.ventana_contrato)
+                if aplicar_global:
+                    nuevo_instante = self.siguiente_hueco(self.turnos_globales, nuevo_instante, self.max_peticiones - peso + 1,
+                                                          self.ventana_global)
+                if nuevo_instante == instante:
+                    break
+                instante = nuevo_instante
+            # Registrar Turno
+            for _ in range(peso):
+                bisect.insort(turnos_contrato, instante)
+                if aplicar_global:
+                    bisect.insort(self.turnos_globales, instante)
+            self.turnos_identicos[clave_peticion] = instante
+            
+        return instante
+        
+        
+    def esperar_turno(self, clave_contrato: tuple, clave_peticion: tuple, barSizeSetting: str = "1 day", peso: int = 1) -> float:
+        
+        """
+        Método que reserva un turno y bloquea el hilo actual hasta que la petición pueda enviarse.
+        
+        Parámetros:
+        -----------
+        Los mismos que el método `reservar`.
+        
+        Salida:
+        -------
+        return: float : Segundos de espera aplicados.
+        """
+        
+        # Reservar y Esperar
+        espera = max(0.0, self.reservar(clave_contrato, clave_peticion, barSizeSetting, peso) - time.monotonic())
+        if espera > 0:
+            time.sleep(espera)
+            
+        return espera
+        
+        
+    def purgar(self, ahora: float) -> None:
+        
+        """
+        Método que elimina del historial los turnos que ya no afectan a ninguna regla.
+        
+        Parámetros:
+        -----------
+        ahora : float
+            Instante actual (en la escala de `time.monotonic`).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Ventana Global
+        del self.turnos_globales[:bisect.bisect_right(self.turnos_globales, ahora - self.ventana_global)]
+        # Ventanas por Contrato
+        for clave in list(self.turnos_contratos):
+            turnos = self.turnos_contratos[clave]
+            del turnos[:bisect.bisect_right(turnos, ahora - self.ventana_contrato)]
+            if len(turnos) == 0:
+                del self.turnos_contratos[clave]
+        # Peticiones Idénticas
+        for clave in [clave for clave, instante in self.turnos_identicos.items() if instante < ahora - self.espera_identicas]:
+            del self.turnos_identicos[clave]
+
+
+# Clase que asigna identificadores de petición
+class AsignadorIds:
+    
+    """
+    Clase que asigna identificadores (reqId) únicos a las peticiones de forma segura entre hilos.
+    
+    Los identificadores se generan de forma creciente a partir de `inicio`. Los que se liberan se reutilizan, pero sólo
+    después de un tiempo de reposo, para que una respuesta tardía de una petición anterior no se mezcle con la nueva.
+    """
+    
+    def __init__(self, inicio: int = 10000, reposo: float = 30.0) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        inicio : int, opcional
+            Primer identificador que se asignará. Por defecto, es 10000 (para no coincidir con Ids asignados manualmente).
+            
+        reposo : float, opcional
+            Segundos que deben pasar desde que se libera un identificador hasta que puede volver a asignarse.
+            Por defecto, es 30.0.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.siguiente = inicio
+        self.reposo = reposo
+        self.candado = threading.Lock()
+        self.en_uso = set()
+        self.liberados = deque()
+        
+        
+    def obtener(self) -> int:
+        
+        """
+        Método que asigna un identificador libre.
+        
+        Salida:
+        -------
+        return: int : Identificador asignado.
+        """
+        
+        with self.candado:
+            # Reutilizar el identificador liberado más antiguo si ya cumplió su reposo
+            if len(self.liberados) > 0 and self.liberados[0][0] + self.reposo <= time.monotonic():
+                reqId = self.liberados.popleft()[1]
+            else:
+                reqId = self.siguiente
+                self.siguiente += 1
+            self.en_uso.add(reqId)
+            
+        return reqId
+        
+        
+    def liberar(self, reqId: int) -> None:
+        
+        """
+        Método que devuelve un identificador para que pueda reutilizarse.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador a liberar. Los identificadores que no fueron asignados por la clase se ignoran.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.candado:
+            if reqId in self.en_uso:
+                self.en_uso.remove(reqId)
+                self.liberados.append((time.monotonic(), reqId))
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import threading
+import pandas as pd
+
+# Clase que mantiene abierta una suscripción del escáner y compara cada actualización con la anterior
+class EscanerContinuo:
+    
+    """
+    Clase que recibe las actualizaciones de una suscripción del escáner que permanece abierta (IB vuelve a enviar el
+    resultado completo periódicamente, terminado en `scannerDataEnd`) y compara cada resultado con el anterior:
+        
+        - "entrada": el contrato aparece en el resultado.
+        - "salida": el contrato deja de aparecer.
+        - "cambio": el contrato cambia de posición (rank).
+        
+    Los eventos de cada actualización se notifican juntos a las funciones registradas con `al_cambiar`. Los detalles de
+    cada contrato se guardan por conId en un diccionario compartido, de modo que las filas repetidas reutilizan el mismo
+    objeto `ContractDetails` en lugar de acumular uno nuevo por actualización.
+    """
+    
+    # Columnas del resultado (el mismo formato que `IB_Trading.reqScannerSubscription`)
+    COLUMNAS = ["reqId", "rank", "Instrumento", "Tipo Activo", "Divisa", "Exchange", "contrato Detalles"]
+    
+    def __init__(self, reqId: int, subscription, detalles: dict = None, opciones: list = [], filtros: list = []) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción del escáner.
+            
+        subscription : ScannerSubscription
+            Suscripción del escáner.
+            
+        detalles : dict, opcional
+            Diccionario {conId: ContractDetails} compartido entre escáneres. Por defecto, es `None` (uno propio).
+            
+        opciones, filtros : list, opcional
+            `scannerSubscriptionOptions` y `scannerSubscriptionFilterOptions` de la suscripción (para volver a enviarla
+            al reconectar). Por defecto, son listas vacías.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.reqId = reqId
+        self.subscription = subscription
+        self.opciones = opciones
+        self.filtros = filtros
+        self.detalles = {} if detalles is None else detalles
+        # Resultado actual (conId -> rank) y lote en recepción
+        self.ranking = {}
+        self.lote = []
+        self.actualizaciones = 0
+        self.funciones = []
+        self.recibido = threading.Event()
+        self.candado = threading.Lock()
+        # Mensaje de error si IB canceló la suscripción
+        self.fallido = None
+        
+        
+    def al_cambiar(self, funcion) -> None:
+        
+        """
+        Método que registra una función `funcion(escaner, eventos)` que se llama después de cada actualización con cambios.
+        `eventos` es una lista de tuplas (tipo, conId, rank anterior, rank nuevo), con tipo "entrada", "salida" o "cambio".
+        La función se ejecuta en el hilo de lectura de la API.
+        """
+        
+        self.funciones.append(funcion)
+        
+        
+    def recibir(self, rank: int, contractDetails) -> None:
+        
+        """
+        Método que agrega una fila a la actualización en curso (llamado desde `scannerData`).
+        
+        Parámetros:
+        -----------
+        rank : int
+            Posición del contrato en el escáner.
+            
+        contractDetails : ContractDetails
+            Detalles del contrato. Si el conId ya se conocía, se conserva el objeto existente.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        conId = contractDetails.contract.conId
+        if conId not in self.detalles:
+            self.detalles[conId] = contractDetails
+        self.lote.append((conId, rank))
+        
+        
+    def fin_lote(self) -> list:
+        
+        """
+        Método que cierra la actualización en curso (llamado desde `scannerDataEnd`), la compara con la anterior y notifica
+        los cambios.
+        
+        Salida:
+        -------
+        return: list : Eventos de la actualización.
+        """
+        
+        nuevo = dict(self.lote)
+        self.lote = []
+        with self.candado:
+            anterior = self.ranking
+            self.ranking = nuevo
+            self.actualizaciones += 1
+        # Comparar con el Resultado Anterior
+        eventos = [("salida", conId, rank, None) for conId, rank in anterior.items() if conId not in nuevo]
+        for conId, rank in nuevo.items():
+            rank_anterior = anterior.get(conId)
+            if rank_anterior is None:
+                eventos.append(("entrada", conId, None, rank))
+            elif rank_anterior != rank:
+                eventos.append(("cambio", conId, rank_anterior, rank))
+        self.recibido.set()
+        # Notificar
+        if len(eventos) > 0:
+            for funcion in self.funciones:
+                funcion(self, eventos)
+                
+        return eventos
+        
+        
+    def reiniciar_lote(self) -> None:
+        
+        """
+        Método que descarta la actualización en curso (al volver a enviar la suscripción después de una reconexión). El
+        resultado anterior se conserva para compararlo con la primera actualización nueva.
+        """
+        
+        self.lote = []
+        
+        
+    def fallar(self, mensaje: str) -> None:
+        
+        """
+        Método que marca el escáner como fallido (llamado desde `error`) y libera a quien espera su primera actualización.
+        """
+        
+        self.fallido = mensaje
+        self.lote = []
+        self.recibido.set()
+        
+        
+    def esperar(self, timeout: float = 15.0) -> bool:
+        
+        """
+        Método que espera la primera actualización del escáner.
+        
+        Parámetros:
+        -----------
+        timeout : float, opcional
+            Tiempo máximo (en segundos) de espera. Por defecto, es de 15 segundos.
+            
+        Salida:
+        -------
+        return: bool : `True` si ya se recibió al menos una actualización (`False` si se agotó el tiempo o el escáner
+                       falló).
+        """
+        
+        return self.recibido.wait(timeout=timeout) and self.fallido is None
+        
+        
+    def resultados(self) -> pd.DataFrame:
+        
+        """
+        Método que devuelve el resultado actual del escáner ordenado por rank, con el mismo formato que
+        `IB_Trading.reqScannerSubscription`.
+        """
+        
+        with self.candado:
+            ranking = sorted(self.ranking.items(), key=lambda x: x[1])
+        filas = []
+        for conId, rank in ranking:
+            detalles = self.detalles[conId]
+            contrato = detalles.contract
+            filas.append([self.reqId, rank, contrato.symbol, contrato.secType, contrato.currency, contrato.exchange, detalles])
+            
+        return pd.DataFrame(filas, columns=self.COLUMNAS)
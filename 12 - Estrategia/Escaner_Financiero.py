@@ -1,11 +1,79 @@
 # -*- coding: utf-8 -*-
 # Importar librerías
 from IB_Trading import IB_Trading, ScannerSubscription
+from Control_Peticiones import clave_contrato
 import pandas as pd
-import numpy as np
+
+# Columnas de los Spreads
+COLUMNAS_SPREAD = ["Precio Mercado", "Precio Ask", "Precio Bid", "Spread Comprar Porcentaje", "Spread Vender Porcentaje",
+                   "Spread Porcentaje"]
+
+# Definir Función de los Spreads
+def Spreads_Activos(trading_app: IB_Trading, contratos: list, timeout: float = 11.0) -> pd.DataFrame:
+    
+    """
+    Función que obtiene el precio de mercado, el ask y el bid de varios activos a la vez y calcula sus spreads porcentuales.
+    
+    Los precios se obtienen de snapshots de datos de mercado solicitados de forma concurrente (`IB_Trading.reqMktDataBatch`).
+    Sólo los activos sin bid o ask en el snapshot se consultan con datos históricos BID_ASK del día (también de forma
+    concurrente), cuyo Open es el bid promedio y cuyo Close es el ask promedio. El precio de mercado es el último precio
+    negociado o, si no lo hay, el cierre anterior o el precio medio.
+    
+    Parámetros:
+    -----------
+    trading_app : IB_Trading
+        Instancia del objeto `IB_Trading` utilizado para realizar las peticiones.
+        
+    contratos : list
+        Lista de objetos `Contract` de los activos.
+        
+    timeout : float, opcional
+        Tiempo máximo (en segundos) de espera de cada snapshot. Por defecto, es de 11 segundos.
+        
+    Salida:
+    -------
+    return: pd.DataFrame : Una fila por contrato (en el mismo orden) con las columnas de `COLUMNAS_SPREAD`. NaN si no se
+                           obtuvieron los precios.
+    """
+    
+    # Contratos Únicos (un activo puede aparecer en varios escáneres)
+    unicos, posiciones, claves = {}, [], {}
+    for contrato in contratos:
+        clave = clave_contrato(contrato)
+        if clave not in claves:
+            claves[clave] = len(unicos)
+            unicos[claves[clave]] = contrato
+        posiciones.append(claves[clave])
+    
+    # Snapshots de todos los Activos
+    cotizaciones = trading_app.reqMktDataBatch(contracts=unicos, timeout=timeout)
+    precios = pd.DataFrame([cotizaciones[i] or {} for i in unicos], columns=["bid", "ask", "last", "close"], dtype=float)
+    # Un bid o ask de 0 en acciones indica que no hay cotización (p. ej. activo suspendido): se consulta el histórico
+    precios = precios.where(precios > 0)
+    
+    # Consultar Datos Históricos sólo de los Activos sin Bid o Ask
+    faltantes = precios.index[precios["bid"].isna() | precios["ask"].isna()]
+    if len(faltantes) > 0:
+        historicos = trading_app.reqHistoricalDataBatch(contracts={i: unicos[i] for i in faltantes}, durationStr="1 D",
+                                                        barSizeSetting="1 day", whatToShow="BID_ASK")
+        for i, datos in historicos.items():
+            if datos is not None and len(datos) > 0:
+                precios.loc[i, ["bid", "ask"]] = [datos["Open"].iloc[-1], datos["Close"].iloc[-1]]
+    precios = precios.iloc[posiciones].reset_index(drop=True)
+                
+    # Calcular los Spreads (todas las filas a la vez)
+    mercado = precios["last"].fillna(precios["close"]).fillna((precios["bid"] + precios["ask"]) / 2)
+    spreads = pd.DataFrame({"Precio Mercado": mercado, "Precio Ask": precios["ask"], "Precio Bid": precios["bid"]})
+    spreads["Spread Comprar Porcentaje"] = (precios["ask"] - mercado) / mercado
+    spreads["Spread Vender Porcentaje"] = (mercado - precios["bid"]) / mercado
+    spreads["Spread Porcentaje"] = (precios["ask"] - precios["bid"]) / mercado
+    
+    return spreads[COLUMNAS_SPREAD]
+    
 
 # Definir Función del Escáner
-def Open_Gap_Assets(trading_app: IB_Trading, suscripciones: list = [], menor_spread_porcentaje: bool = False) -> dict:
+def Open_Gap_Assets(trading_app: IB_Trading, suscripciones: list = [], menor_spread_porcentaje: bool = False, 
+                    continuo: bool = False) -> dict:
     
     """
     Función que identifica activos con mayor ganancia o pérdida basándose en un escáner y, opcionalmente, calcula el spread porcentual.
@@ -21,8 +89,12 @@ def Open_Gap_Assets(trading_app: IB_Trading, suscripciones: list = [], menor_spr
         Por defecto, es False.
         
     menor_spread_porcentaje : bool, opcional
-        Si es True, se calculará el spread porcentual para los activos seleccionados y se incluirá en el resultado.
-        Por defecto, es False.
+        Si es True, se calculará el spread porcentual para los activos seleccionados (ver `Spreads_Activos`) y se incluirá
+        en el resultado. Por defecto, es False.
+        
+    continuo : bool, opcional
+        Si es True, los escáneres se mantienen abiertos (`IB_Trading.reqScannerStream`) y las siguientes llamadas leen su
+        resultado actual, que IB actualiza continuamente, sin volver a suscribirse. Por defecto, es False.
         
     Salida:
     -------
@@ -60,85 +132,39 @@ def Open_Gap_Assets(trading_app: IB_Trading, suscripciones: list = [], menor_spr
         suscripcion_top_lose = suscripciones[1]
         
         
-    # Obtener Índices Actuales (Para no eliminar información)
-    ids_peticiones = sorted(list(trading_app.escaner_resultados.keys()))
-    if len(ids_peticiones) == 0:
-        # No hay información actualmente almacenada
-        id_peticion1 = 0
-        id_peticion2 = 1
+    # Realizar Peticiones (Los Ids se asignan automáticamente)
+    if continuo:
+        # Abrir (o reutilizar) ambos Escáneres a la vez y esperar su primer resultado
+        escaner_gain = trading_app.reqScannerStream(subscription=suscripcion_top_gain, timeout=0)
+        escaner_lose = trading_app.reqScannerStream(subscription=suscripcion_top_lose, timeout=0)
+        listo_gain = escaner_gain.esperar(timeout=15.0)
+        listo_lose = escaner_lose.esperar(timeout=15.0)
+        # Si IB canceló algún Escáner o no envió resultados a tiempo, realizar la petición única (si falló, el siguiente
+        # llamado abre un escáner nuevo)
+        if listo_gain:
+            peticion_gain = escaner_gain.resultados()
+        else:
+            peticion_gain = trading_app.reqScannerSubscription(subscription=suscripcion_top_gain,
+                                                               scannerSubscriptionOptions=[], scannerSubscriptionFilterOptions=[])
+        if listo_lose:
+            peticion_lose = escaner_lose.resultados()
+        else:
+            peticion_lose = trading_app.reqScannerSubscription(subscription=suscripcion_top_lose, 
+                                                               scannerSubscriptionOptions=[], scannerSubscriptionFilterOptions=[])
     else:
-        # Usar IDs no utilizados anteriormente
-        ultimo_id = ids_peticiones[-1]
-        id_peticion1 = int(ultimo_id + 1)
-        id_peticion2 = int(ultimo_id + 2)
-        
-    # Realizar Peticiones
-    peticion_gain = trading_app.reqScannerSubscription(reqId=id_peticion1, subscription=suscripcion_top_gain,
-                                                       scannerSubscriptionOptions=[], scannerSubscriptionFilterOptions=[])
-    peticion_lose = trading_app.reqScannerSubscription(reqId=id_peticion2, subscription=suscripcion_top_lose, 
-                                                       scannerSubscriptionOptions=[], scannerSubscriptionFilterOptions=[])
+        peticion_gain = trading_app.reqScannerSubscription(subscription=suscripcion_top_gain,
+                                                           scannerSubscriptionOptions=[], scannerSubscriptionFilterOptions=[])
+        peticion_lose = trading_app.reqScannerSubscription(subscription=suscripcion_top_lose, 
+                                                           scannerSubscriptionOptions=[], scannerSubscriptionFilterOptions=[])
     
-    # Spreads
+    # Spreads (todos los activos a la vez)
     if menor_spread_porcentaje:
-        # Iterar en cada activo (Gain)
-        spreads_gain = []
-        for indice, registro_gain in peticion_gain.iterrows():
-            # Extraer Contrato
-            contrato = registro_gain["contrato Detalles"].contract
-            # Realizar Petición Datos Ask
-            precios_ask = trading_app.reqHistoricalData(reqId=0, contract=contrato, durationStr="1 D", barSizeSetting="1 day",
-                                                        whatToShow="ASK", keep_stored=False)
-            # Obtener Precio de Mercado
-            precios_mercado = trading_app.reqHistoricalData(reqId=0, contract=contrato, durationStr="1 D", barSizeSetting="1 day",
-                                                        whatToShow="ADJUSTED_LAST", keep_stored=False)
-            # Consultar Precios Bid
-            precios_bid = trading_app.reqHistoricalData(reqId=0, contract=contrato, durationStr="1 D", barSizeSetting="1 day",
-                                                        whatToShow="BID", keep_stored=False)
-            # Validando que si se obtuvieron los datos
-            if (precios_ask is not None) and (precios_mercado is not None) and (precios_bid is not None):
-                # Calcular el Spread en Términos de Porcentaje
-                spread_porcentaje_ask = (precios_ask["Close"] - precios_mercado["Close"]) / precios_mercado["Close"]
-                spread_porcentaje_bid = (precios_mercado["Close"] - precios_bid["Close"]) / precios_mercado["Close"]
-                spread = (precios_ask["Close"] - precios_bid["Close"])
-                porcentaje_spread = spread / precios_mercado["Close"]
-                # Almacenar
-                spreads_gain.append([precios_mercado["Close"].iloc[0], precios_ask["Close"].iloc[0], precios_bid["Close"].iloc[0],
-                                     spread_porcentaje_ask.iloc[0], spread_porcentaje_bid.iloc[0], porcentaje_spread.iloc[0]])
-            else:
-                # Rellenar Información con NaNs
-                spreads_gain.append([np.nan] * 6)
-        # Iterar en cada activo (Lose)
-        spreads_lose = []
-        for indice, registro_lose in peticion_lose.iterrows():
-            # Extraer Contrato
-            contrato = registro_lose["contrato Detalles"].contract
-            # Realizar Petición Datos Ask
-            precios_ask = trading_app.reqHistoricalData(reqId=0, contract=contrato, durationStr="1 D", barSizeSetting="1 day",
-                                                        whatToShow="ASK", keep_stored=False)
-            # Obtener Precio de Mercado
-            precios_mercado = trading_app.reqHistoricalData(reqId=0, contract=contrato, durationStr="1 D", barSizeSetting="1 day",
-                                                        whatToShow="ADJUSTED_LAST", keep_stored=False)
-            # Consultar Precios Bid
-            precios_bid = trading_app.reqHistoricalData(reqId=0, contract=contrato, durationStr="1 D", barSizeSetting="1 day",
-                                                        whatToShow="BID", keep_stored=False)
-            # Validando que si se obtuvieron los datos
-            if (precios_ask is not None) and (precios_mercado is not None) and (precios_bid is not None):
-                # Calcular el Spread en Términos de Porcentaje
-                spread_porcentaje_ask = (precios_ask["Close"] - precios_mercado["Close"]) / precios_mercado["Close"]
-                spread_porcentaje_bid = (precios_mercado["Close"] - precios_bid["Close"]) / precios_mercado["Close"]
-                spread = (precios_ask["Close"] - precios_bid["Close"])
-                porcentaje_spread = spread / precios_mercado["Close"]
-                # Almacenar
-                spreads_lose.append([precios_mercado["Close"].iloc[0], precios_ask["Close"].iloc[0], precios_bid["Close"].iloc[0],
-                                     spread_porcentaje_ask.iloc[0], spread_porcentaje_bid.iloc[0], porcentaje_spread.iloc[0]])
-            else:
-                # Rellenar Información con NaNs
-                spreads_lose.append([np.nan] * 6)
+        contratos = [detalles.contract for detalles in peticion_gain["contrato Detalles"]] + \
+                    [detalles.contract for detalles in peticion_lose["contrato Detalles"]]
+        spreads = Spreads_Activos(trading_app=trading_app, contratos=contratos)
         # Agregar a DataFrame
-        peticion_gain[["Precio Mercado", "Precio Ask", "Precio Bid", "Spread Comprar Porcentaje",
-                       "Spread Vender Porcentaje", "Spread Porcentaje"]] = spreads_gain
-        peticion_lose[["Precio Mercado", "Precio Ask", "Precio Bid", "Spread Comprar Porcentaje",
-                       "Spread Vender Porcentaje", "Spread Porcentaje"]] = spreads_lose
+        peticion_gain[COLUMNAS_SPREAD] = spreads.iloc[:len(peticion_gain)].values
+        peticion_lose[COLUMNAS_SPREAD] = spreads.iloc[len(peticion_gain):].values
         
     return {"Ganancia": peticion_gain, "Perdida": peticion_lose}
         
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from Futuros_Continuos import FuturoContinuo
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import math
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Clase que monitorea la estructura temporal de varios futuros en tiempo real
+class EstructuraTemporal:
+    
+    """
+    Clase que se suscribe a los primeros `n_vencimientos` contratos de varios futuros (raíces) a través del gestor de
+    suscripciones de `IB_Trading` y mantiene su estructura temporal en arreglos de NumPy (una fila por raíz y una columna
+    por vencimiento):
+        
+        - `medios`: precio medio (bid + ask) / 2 de cada contrato.
+        - `spreads`: diferencia entre cada vencimiento y el anterior (spread de calendario).
+        - `bases`: base anualizada entre vencimientos consecutivos, ln(F2 / F1) / (T2 - T1), con T en años.
+        - `rendimiento_roll`: rendimiento anualizado del roll del primer al segundo vencimiento, (F1 - F2) / F2 / (T2 - T1).
+          Positivo en backwardation.
+          
+    Cada tick de bid o ask (recibido a través de `QuoteBook.escuchar`) actualiza en el lugar sólo el precio medio de su
+    contrato y los spreads y bases vecinos, por lo que el costo por tick no depende del número de raíces. Las alertas
+    (`alerta`) se disparan cuando un spread cruza su umbral.
+    """
+    
+    def __init__(self, trading_app, raices: dict, n_vencimientos: int = 6, currency: str = "USD",
+                 db_path: str = "futuros.db") -> None:
+                 
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        trading_app : IB_Trading
+            Instancia conectada de `IB_Trading` que se utilizará para las suscripciones.
+            
+        raices : dict
+            Diccionario {símbolo: mercado} de los futuros a monitorear (por ejemplo, {"ES": "CME", "CL": "NYMEX"}).
+            
+        n_vencimientos : int, opcional
+            Número de vencimientos (desde el más cercano) de cada raíz. Por defecto, es 6.
+            
+        currency : str, opcional
+            Divisa de los futuros. Por defecto, es "USD".
+            
+        db_path : str, opcional
+            Base de datos en la que `FuturoContinuo` guarda la escalera de vencimientos. Por defecto, es "futuros.db".
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.trading_app = trading_app
+        self.raices = list(raices)
+        self.n_vencimientos = n_vencimientos
+        self.futuros = {symbol: FuturoContinuo(trading_app, symbol, exchange, currency=currency, db_path=db_path)
+                        for symbol, exchange in raices.items()}
+        # Estructura Temporal (raíz x vencimiento)
+        forma = (len(self.raices), n_vencimientos)
+        self.medios = np.full(forma, np.nan)
+        self.anios = np.full(forma, np.nan)
+        self.vencimientos = np.full(forma, np.nan)
+        self.spreads = np.full((forma[0], forma[1] - 1), np.nan)
+        self.bases = np.full((forma[0], forma[1] - 1), np.nan)
+        self.rendimiento_roll = np.full(forma[0], np.nan)
+        self.contratos = [[None] * n_vencimientos for _ in self.raices]
+        # Suscripciones (reqId -> (raíz, vencimiento))
+        self.posiciones = {}
+        # Alertas ((raíz, vencimiento) -> lista de [umbral, función, lado actual])
+        self.alertas = {}
+        self.candado = threading.Lock()
+        
+        
+    def iniciar(self) -> None:
+        
+        """
+        Método que obtiene los vencimientos vigentes de cada raíz (todas a la vez) y se suscribe a sus datos de mercado.
+        """
+        
+        hoy = datetime.now().strftime("%Y%m%d")
+        # Escaleras de Vencimientos (una petición por raíz, todas a la vez; se guardan una vez al día)
+        with ThreadPoolExecutor(max_workers=max(1, len(self.raices))) as ejecutor:
+            escaleras = dict(zip(self.raices, ejecutor.map(lambda symbol: self.futuros[symbol].escalera(), self.raices)))
+        # Suscribirse a los Primeros Vencimientos
+        for r, symbol in enumerate(self.raices):
+            escalera = escaleras[symbol]
+            if escalera is None:
+                continue
+            vigentes = escalera[escalera["vencimiento"] >= hoy].iloc[:self.n_vencimientos]
+            for j, fila in enumerate(vigentes.itertuples(index=False)):
+                contrato = self.futuros[symbol].contrato(fila)
+                contrato.includeExpired = False
+                self.contratos[r][j] = contrato
+                self.vencimientos[r, j] = datetime.strptime(fila.vencimiento, "%Y%m%d").timestamp()
+                self.anios[r, j] = self.anios_al_vencimiento(r, j)
+                reqId = self.trading_app.suscripciones.suscribir(contrato, componente="estructura_temporal")
+                self.posiciones[reqId] = (r, j)
+                self.trading_app.cotizaciones.escuchar(reqId, self.actualizar)
+                # Tomar los precios que llegaron antes de registrar el oyente
+                self.actualizar(reqId, "bid", np.nan)
+                
+                
+    def detener(self) -> None:
+        
+        """
+        Método que cancela las suscripciones de la estructura temporal.
+        """
+        
+        for reqId in list(self.posiciones):
+            self.trading_app.cotizaciones.dejar_de_escuchar(reqId, self.actualizar)
+            self.trading_app.suscripciones.cancelar(reqId, componente="estructura_temporal")
+        self.posiciones.clear()
+        
+        
+    def actualizar(self, reqId: int, campo: str, precio: float) -> None:
+        
+        """
+        Método que recibe cada precio de una suscripción (ver `QuoteBook.escuchar`) y actualiza el precio medio del contrato
+        y los spreads, bases y rendimiento del roll que dependen de él.
+        """
+        
+        if campo not in ("bid", "ask"):
+            return
+        posicion = self.posiciones.get(reqId)
+        if posicion is None:
+            return
+        r, j = posicion
+        medio = self.trading_app.cotizaciones.medio(reqId)
+        disparar = []
+        with self.candado:
+            if medio == self.medios[r, j] or (math.isnan(medio) and math.isnan(self.medios[r, j])):
+                return
+            self.medios[r, j] = medio
+            # Pares (vencimiento, siguiente) que dependen del contrato
+            for k in (j - 1, j):
+                if 0 <= k < self.n_vencimientos - 1:
+                    disparar += self.calcular_par(r, k)
+        # Notificar Alertas (fuera del candado)
+        for funcion, argumentos in disparar:
+            funcion(*argumentos)
+            
+            
+    def anios_al_vencimiento(self, r: int, j: int) -> float:
+        
+        """
+        Método que devuelve el tiempo (en años) que falta para el vencimiento j de una raíz.
+        """
+        
+        return (self.vencimientos[r, j] - time.time()) / (365 * 86400)
+        
+        
+    def calcular_par(self, r: int, k: int) -> list:
+        
+        """
+        Método que recalcula el spread y la base entre los vencimientos k y k + 1 de una raíz (y el rendimiento del roll si
+        k = 0). Debe llamarse con el candado adquirido. Devuelve las alertas que cruzaron su umbral.
+        """
+        
+        cercano, lejano = self.medios[r, k], self.medios[r, k + 1]
+        spread = float(lejano - cercano)
+        # Años al vencimiento actuales (avanzan con el tiempo)
+        self.anios[r, k] = self.anios_al_vencimiento(r, k)
+        self.anios[r, k + 1] = self.anios_al_vencimiento(r, k + 1)
+        plazo = self.anios[r, k + 1] - self.anios[r, k]
+        self.spreads[r, k] = spread
+        self.bases[r, k] = math.log(lejano / cercano) / plazo if cercano > 0 and lejano > 0 and plazo > 0 else np.nan
+        if k == 0:
+            self.rendimiento_roll[r] = (cercano - lejano) / lejano / plazo if lejano > 0 and plazo > 0 else np.nan
+        # Revisar Alertas
+        disparar = []
+        if math.isnan(spread):
+            return disparar
+        for alerta in self.alertas.get((r, k), []):
+            lado = spread > alerta[0]
+            if alerta[2] is not None and lado != alerta[2]:
+                disparar.append((alerta[1], (self.raices[r], k, spread, alerta[0])))
+            alerta[2] = lado
+            
+        return disparar
+        
+        
+    def alerta(self, symbol: str, vencimiento: int, umbral: float, funcion) -> None:
+        
+        """
+        Método que registra una función que se llama cuando el spread entre los vencimientos `vencimiento` y
+        `vencimiento + 1` de una raíz cruza un umbral (en cualquier dirección).
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Raíz del futuro.
+            
+        vencimiento : int
+            Posición del primer vencimiento del spread (0 = el más cercano).
+            
+        umbral : float
+            Valor del spread que dispara la alerta.
+            
+        funcion : callable
+            Función `funcion(symbol, vencimiento, spread, umbral)`. Se ejecuta en el hilo de lectura de la API.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        r = self.raices.index(symbol)
+        with self.candado:
+            spread = self.spreads[r, vencimiento]
+            self.alertas.setdefault((r, vencimiento), []).append([umbral, funcion, None if math.isnan(spread) else spread > umbral])
+            
+            
+    def tabla(self) -> pd.DataFrame:
+        
+        """
+        Método que genera una tabla con la estructura temporal actual.
+        
+        Salida:
+        -------
+        return: pd.DataFrame : Una fila por raíz y vencimiento con el contrato, los años al vencimiento, el precio medio y
+                               el spread y la base respecto al siguiente vencimiento.
+        """
+        
+        with self.candado:
+            medios, spreads, bases = self.medios.copy(), self.spreads.copy(), self.bases.copy()
+        filas = []
+        for r, symbol in enumerate(self.raices):
+            for j in range(self.n_vencimientos):
+                contrato = self.contratos[r][j]
+                if contrato is None:
+                    continue
+                siguiente = j < self.n_vencimientos - 1
+                filas.append([symbol, j, contrato.localSymbol, contrato.lastTradeDateOrContractMonth, self.anios[r, j], medios[r, j],
+                              spreads[r, j] if siguiente else np.nan, bases[r, j] if siguiente else np.nan])
+                              
+        return pd.DataFrame(filas, columns=["Raiz", "Posicion", "Contrato", "Vencimiento", "Anios", "Medio", "Spread", "Base"])
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from ibapi.contract import Contract
+from Cache_Historico import CacheBarras
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# Clase que construye series continuas de un futuro
+class FuturoContinuo:
+    
+    """
+    Clase que construye la serie continua de un futuro a partir de todos sus contratos.
+        
+        - Escalera de vencimientos: todos los contratos (incluidos los vencidos que IB aún conserva) se obtienen con una
+          sola petición `reqContractDetails` y se guardan una vez al día en la base de datos.
+        - Historia de cada contrato: se descarga de forma concurrente a través de `CacheBarras`, por lo que sólo se
+          solicitan los huecos que faltan. Un contrato vencido, una vez descargado, no se vuelve a pedir.
+        - Serie continua: el cambio de contrato (roll) se hace por fecha (`dias_roll` días antes del vencimiento) o por
+          volumen (en cuanto el siguiente contrato negocia más, con ese mismo límite). Los precios anteriores a cada roll
+          se ajustan hacia atrás por razón (`ratio`) o por diferencia (`diferencia`) para eliminar el salto entre
+          contratos.
+    """
+    
+    def __init__(self, trading_app, symbol: str, exchange: str, currency: str = "USD", db_path: str = "futuros.db",
+                 tradingClass: str = None) -> None:
+                 
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        trading_app : IB_Trading
+            Instancia conectada de `IB_Trading` que se utilizará para las peticiones.
+            
+        symbol : str
+            Símbolo del futuro (por ejemplo, "CL" o "ES").
+            
+        exchange : str
+            Mercado del futuro (por ejemplo, "NYMEX" o "CME").
+            
+        currency : str, opcional
+            Divisa del futuro. Por defecto, es "USD".
+            
+        db_path : str, opcional
+            Ruta de la base de datos SQLite en la que se guardan la escalera, las barras de cada contrato y las series
+            continuas. Por defecto, es "futuros.db".
+            
+        tradingClass : str, opcional
+            Clase de negociación de los contratos. Si es `None` (por defecto), se utilizan los contratos cuya clase
+            coincide con el símbolo (si existen).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.trading_app = trading_app
+        self.symbol = symbol
+        self.exchange = exchange
+        self.currency = currency
+        self.tradingClass = tradingClass
+        # Almacenamiento (barras por contrato y escalera de vencimientos)
+        self.cache = CacheBarras(db_path)
+        self.almacen = self.cache.almacen
+        self.almacen.ejecutar("""
+                CREATE TABLE IF NOT EXISTS futuros_escalera (
+                    symbol TEXT,
+                    exchange TEXT,
+                    fecha TEXT,
+                    conId INTEGER,
+                    localSymbol TEXT,
+                    vencimiento TEXT,
+                    mes TEXT,
+                    multiplier TEXT,
+                    tradingClass TEXT,
+                    PRIMARY KEY (symbol, exchange, conId)
+                    )
+        """)
+        self.contratos = None
+        
+        
+    def escalera(self, forzar: bool = False, timeout: float = 20.0) -> pd.DataFrame:
+        
+        """
+        Método que devuelve la escalera de vencimientos del futuro (se descarga como máximo una vez al día).
+        
+        Parámetros:
+        -----------
+        forzar : bool, opcional
+            Si es `True`, la escalera se vuelve a descargar aunque ya se tenga la del día. Por defecto, es `False`.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) de espera de la petición. Por defecto, es de 20 segundos.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Contratos ordenados por vencimiento (columnas conId, localSymbol, vencimiento, mes,
+                               multiplier y tradingClass), o `None` si no se pudo obtener.
+        """
+        
+        hoy = datetime.now().strftime("%Y%m%d")
+        columnas = ["conId", "localSymbol", "vencimiento", "mes", "multiplier", "tradingClass"]
+        # Escalera del Día (Memoria o Base de Datos)
+        if not forzar:
+            if self.contratos is not None and self.contratos.attrs.get("fecha") == hoy:
+                return self.contratos
+            filas = self.almacen.ejecutar(f"SELECT {', '.join(columnas)} FROM futuros_escalera WHERE symbol = ? AND "
+                                          "exchange = ? AND fecha = ? ORDER BY vencimiento", (self.symbol, self.exchange, hoy))
+            if len(filas) > 0:
+                self.contratos = pd.DataFrame(filas, columns=columnas)
+                self.contratos.attrs["fecha"] = hoy
+                return self.contratos
+        # Solicitar Contratos (incluidos los vencidos)
+        contrato = Contract()
+        contrato.symbol = self.symbol
+        contrato.secType = "FUT"
+        contrato.exchange = self.exchange
+        contrato.currency = self.currency
+        contrato.includeExpired = True
+        detalles = self.trading_app.reqContractDetails(contract=contrato, timeout=timeout)
+        if not detalles:
+            return self.contratos
+        filas = [[d.contract.conId, d.contract.localSymbol, d.contract.lastTradeDateOrContractMonth[:8], d.contractMonth,
+                  d.contract.multiplier, d.contract.tradingClass] for d in detalles]
+        contratos = pd.DataFrame(filas, columns=columnas).drop_duplicates("conId")
+        # Filtrar Clase de Negociación
+        clase = self.tradingClass or self.symbol
+        if (contratos["tradingClass"] == clase).any():
+            contratos = contratos[contratos["tradingClass"] == clase]
+        contratos = contratos.sort_values("vencimiento", ignore_index=True)
+        contratos.attrs["fecha"] = hoy
+        # Guardar (Reemplazar la escalera anterior)
+        self.almacen.ejecutar("DELETE FROM futuros_escalera WHERE symbol = ? AND exchange = ?", (self.symbol, self.exchange))
+        self.almacen.escribir("INSERT OR REPLACE INTO futuros_escalera (symbol, exchange, fecha, conId, localSymbol, vencimiento, "
+                              "mes, multiplier, tradingClass) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              [(self.symbol, self.exchange, hoy, *fila) for fila in contratos.itertuples(index=False)])
+        self.contratos = contratos
+        
+        return self.contratos
+        
+        
+    def contrato(self, fila) -> Contract:
+        
+        """
+        Método que crea el contrato de una fila de la escalera (se incluye `includeExpired` para los contratos vencidos).
+        """
+        
+        contrato = Contract()
+        contrato.conId = int(fila.conId)
+        contrato.symbol = self.symbol
+        contrato.secType = "FUT"
+        contrato.exchange = self.exchange
+        contrato.currency = self.currency
+        contrato.localSymbol = fila.localSymbol
+        contrato.lastTradeDateOrContractMonth = fila.vencimiento
+        contrato.multiplier = fila.multiplier
+        contrato.tradingClass = fila.tradingClass
+        contrato.includeExpired = True
+        
+        return contrato
+        
+        
+    def contrato_frontal(self, fecha: datetime = None, dias_roll: int = 0) -> Contract:
+        
+        """
+        Método que devuelve el contrato frontal (el primero que vence después de `fecha` + `dias_roll` días).
+        
+        Parámetros:
+        -----------
+        fecha : datetime, opcional
+            Fecha de referencia. Si es `None` (por defecto), se utiliza el momento actual.
+            
+        dias_roll : int, opcional
+            Días antes del vencimiento en los que se cambia al siguiente contrato. Por defecto, es 0.
+            
+        Salida:
+        -------
+        return: Contract : Contrato frontal, o `None` si no hay contratos vigentes.
+        """
+        
+        contratos = self.escalera()
+        if contratos is None:
+            return None
+        limite = ((fecha or datetime.now()) + timedelta(days=dias_roll)).strftime("%Y%m%d")
+        i = np.searchsorted(contratos["vencimiento"].to_numpy(dtype=str), limite, side="right")
+        if i == len(contratos):
+            return None
+            
+        return self.contrato(contratos.iloc[i])
+        
+        
+    def descargar(self, barSize: str = "1 day", inicio: datetime = None, useRTH: int = 1, max_en_curso: int = 6,
+                  timeout: float = 60.0) -> dict:
+                  
+        """
+        Método que descarga (o completa) la historia de cada contrato de la escalera de forma concurrente. Cada contrato
+        se descarga desde el vencimiento de dos contratos antes (cuando pasa a ser el segundo contrato, lo que permite
+        comparar volúmenes para el roll) hasta su propio vencimiento.
+        
+        Parámetros:
+        -----------
+        barSize : str, opcional
+            Tamaño de las barras. Por defecto, es "1 day".
+            
+        inicio : datetime, opcional
+            Fecha mínima de los datos. Si es `None` (por defecto), se descargan todos los contratos de la escalera.
+            
+        useRTH : int, opcional
+            1 para utilizar sólo el horario regular de negociación, 0 para todo el horario. Por defecto, es 1.
+            
+        max_en_curso : int, opcional
+            Número máximo de contratos que se descargan al mismo tiempo. Por defecto, es 6.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) de espera de cada petición. Por defecto, es de 60 segundos.
+            
+        Salida:
+        -------
+        return: dict : Diccionario {conId: pd.DataFrame} con las barras de cada contrato (`None` si falló la descarga).
+        """
+        
+        contratos = self.escalera()
+        if contratos is None:
+            return {}
+        ahora = datetime.now().replace(microsecond=0)
+        vencimientos = pd.to_datetime(contratos["vencimiento"], format="%Y%m%d")
+        # Intervalo de cada Contrato
+        tareas = []
+        for i, fila in enumerate(contratos.itertuples(index=False)):
+            fin = min(vencimientos[i] + timedelta(days=1), ahora)
+            desde = vencimientos[i - 2] if i >= 2 else vencimientos[i] - timedelta(days=365)
+            if inicio is not None:
+                desde = max(desde, pd.Timestamp(inicio))
+            if desde >= fin:
+                continue
+            tareas.append((fila, desde.to_pydatetime(), pd.Timestamp(fin).to_pydatetime()))
+            
+        # Descargar un Contrato (sólo los huecos que faltan en la caché)
+        def descargar_contrato(fila, desde, fin) -> pd.DataFrame:
+            return self.trading_app.reqHistoricalDataCache(contract=self.contrato(fila), inicio=desde, fin=fin,
+                                                           endDateTime="" if fin >= ahora else fin.strftime("%Y%m%d %H:%M:%S"),
+                                                           barSizeSetting=barSize, whatToShow="TRADES", useRTH=useRTH,
+                                                           timeout=timeout, cache=self.cache)
+                                                           
+        with ThreadPoolExecutor(max_workers=max_en_curso) as ejecutor:
+            futuros = {fila.conId: ejecutor.submit(descargar_contrato, fila, desde, fin) for fila, desde, fin in tareas}
+            
+        return {conId: futuro.result() for conId, futuro in futuros.items()}
+        
+        
+    def continua(self, barSize: str = "1 day", roll: str = "volumen", ajuste: str = "ratio", dias_roll: int = 5,
+                 inicio: datetime = None, useRTH: int = 1, tabla: str = None) -> pd.DataFrame:
+                 
+        """
+        Método que construye la serie continua del futuro.
+        
+        Parámetros:
+        -----------
+        barSize : str, opcional
+            Tamaño de las barras. Por defecto, es "1 day".
+            
+        roll : str, opcional
+            Regla de cambio de contrato:
+                - "fecha": `dias_roll` días antes del vencimiento del contrato activo.
+                - "volumen" (por defecto): a partir de la barra siguiente a la primera en que el siguiente contrato
+                  negocia más volumen que el activo, y como máximo `dias_roll` días antes del vencimiento.
+                  
+        ajuste : str, opcional
+            Ajuste hacia atrás de los precios anteriores a cada roll: "ratio" (por defecto), "diferencia" o `None` (sin
+            ajuste). El ajuste se calcula con los cierres de ambos contratos en la última barra antes del roll.
+            
+        dias_roll : int, opcional
+            Días antes del vencimiento en los que se cambia de contrato (como máximo). Por defecto, es 5.
+            
+        inicio : datetime, opcional
+            Fecha mínima de la serie. Por defecto, es `None` (todos los contratos de la escalera).
+            
+        useRTH : int, opcional
+            1 para utilizar sólo el horario regular de negociación, 0 para todo el horario. Por defecto, es 1.
+            
+        tabla : str, opcional
+            Si se indica, la serie continua se guarda (reemplazando la anterior) en esa tabla de la base de datos, con el
+            formato de `AlmacenSQLite.guardar_barras`. Por defecto, es `None`.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras Open, High, Low, Close (ajustados), Volume y el contrato activo (Contrato).
+        """
+        
+        if roll not in ("fecha", "volumen"):
+            raise ValueError(f"Regla de roll no reconocida: {roll}")
+        if ajuste not in ("ratio", "diferencia", None):
+            raise ValueError(f"Ajuste no reconocido: {ajuste}")
+        # Historia de los Contratos (en orden de vencimiento, sólo los que tienen datos)
+        datos = self.descargar(barSize=barSize, inicio=inicio, useRTH=useRTH)
+        if self.contratos is None:
+            return None
+        contratos = self.contratos[[datos.get(conId) is not None and len(datos[conId]) > 0 for conId in self.contratos["conId"]]]
+        if len(contratos) == 0:
+            return None
+        paneles = {columna: pd.concat({conId: datos[conId][columna] for conId in contratos["conId"]}, axis=1)
+                   for columna in ["Open", "High", "Low", "Close", "Volume"]}
+        fechas = paneles["Close"].index
+        volumen = paneles["Volume"].to_numpy()
+        # Límite de cada contrato (debe haberse cambiado al siguiente a partir de esta fecha)
+        limites = pd.to_datetime(contratos["vencimiento"], format="%Y%m%d") - timedelta(days=dias_roll)
+        # Barras en que empieza cada contrato (a partir del segundo)
+        cambios = np.zeros(len(contratos) - 1, dtype=np.int64)
+        desde = 0
+        for i in range(len(contratos) - 1):
+            hasta = max(int(np.searchsorted(fechas, limites.iloc[i], side="left")), desde)
+            if roll == "volumen":
+                cruces = np.flatnonzero(volumen[desde:hasta, i + 1] > volumen[desde:hasta, i])
+                if len(cruces) > 0:
+                    hasta = desde + cruces[0] + 1
+            cambios[i] = desde = hasta
+        activo = np.searchsorted(cambios, np.arange(len(fechas)), side="right")
+        # Ajuste hacia atrás (con los cierres de la última barra antes de cada roll)
+        cierres = paneles["Close"].ffill().to_numpy()
+        anterior = np.clip(cambios - 1, 0, None)
+        viejo, nuevo = cierres[anterior, np.arange(len(cambios))], cierres[anterior, np.arange(1, len(cambios) + 1)]
+        validos = (cambios > 0) & (cambios < len(fechas)) & (viejo > 0) & (nuevo > 0)
+        if ajuste == "ratio":
+            saltos = np.where(validos, nuevo / np.where(validos, viejo, 1.0), 1.0)
+            factores = np.append(np.cumprod(saltos[::-1])[::-1], 1.0)
+        elif ajuste == "diferencia":
+            saltos = np.where(validos, nuevo - viejo, 0.0)
+            factores = np.append(np.cumsum(saltos[::-1])[::-1], 0.0)
+        # Serie Continua (barras del contrato activo)
+        filas = np.arange(len(fechas))
+        continua = pd.DataFrame({columna: panel.to_numpy()[filas, activo] for columna, panel in paneles.items()}, index=fechas)
+        if ajuste == "ratio":
+            continua[["Open", "High", "Low", "Close"]] *= factores[activo][:, None]
+        elif ajuste == "diferencia":
+            continua[["Open", "High", "Low", "Close"]] += factores[activo][:, None]
+        continua["Contrato"] = contratos["localSymbol"].to_numpy()[activo]
+        continua = continua[continua["Close"].notna()]
+        # Guardar (la serie ajustada cambia en cada roll, por lo que se reemplaza completa)
+        if tabla is not None:
+            self.almacen.preparar_tabla(tabla)
+            self.almacen.ejecutar(f"DELETE FROM {tabla}")
+            self.almacen.guardar_barras(continua, tabla)
+            
+        return continua
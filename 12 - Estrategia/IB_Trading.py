@@ -5,11 +5,22 @@ from ibapi.wrapper import EWrapper
 from ibapi.contract import Contract
 from ibapi.order import Order
 from ibapi.scanner import ScannerSubscription
+# Importar librerías del Proyecto
+from Control_Peticiones import ControlRitmoHistorico, AsignadorIds, clave_contrato
+from Cache_Historico import CacheBarras, duracion_a_intervalo, intervalo_a_duracion, texto_a_fecha
+from Almacen_SQLite import AlmacenSQLite
+from Almacen_Parquet import AlmacenParquet
+from Buffer_Barras import BufferBarras
+from Libro_Cotizaciones import QuoteBook
+from Suscripciones_Mercado import GestorSuscripciones
+from Agregador_Griegas import AgregadorGriegas
+from Escaner_Continuo import EscanerContinuo
+from Agregador_Barras import AgregadorBarras, interpretar_resolucion
 # Importar librerías Ordinarias
 import threading
 import logging
-import sqlite3
 import pandas as pd
+from concurrent.futures import Future, CancelledError, TimeoutError as FuturesTimeoutError, wait as futures_wait
 from datetime import datetime, timedelta
 import time
 
@@ -24,6 +35,9 @@ class IB_Trading(EWrapper, EClient):
         cotizaciones, analizar datos históricos, y más.
     """
     
+    # Códigos de error del servidor que invalidan una petición pendiente (la respuesta de "Fin" nunca llegará)
+    CODIGOS_ERROR_PETICION = {162, 200, 203, 321, 322, 354, 366, 420, 10089, 10168, 10197}
+    
     def __init__(self, log_file: str = "ibapi_errors.log", mode: str = "w", **kwargs) -> None:
         
         """
@@ -45,6 +59,13 @@ class IB_Trading(EWrapper, EClient):
                                          registrarse en el archivo. Por defecto, es `False`.
                 - verbose (bool): Indica si se debe habilitar un nivel más detallado de mensajes en la consola,
                                   no necesariamente relacionado con errores. Por defecto, es `False`.
+                - first_request_id (int): Primer identificador que se asignará automáticamente a las peticiones.
+                                          Por defecto, es 10000 (para no coincidir con Ids asignados manualmente).
+                - cache_db (str): Ruta de una base de datos SQLite que se utilizará como caché de datos históricos.
+                                  Si se indica, `reqHistoricalData` y `reqMaxData` sólo descargan los huecos que faltan.
+                                  Por defecto, es `None` (sin caché).
+                - market_data_lines (int): Número de líneas de datos de mercado de la cuenta que puede utilizar el
+                                           gestor de suscripciones (`self.suscripciones`). Por defecto, es 100.
                                   
         Salida:
         -------
@@ -58,20 +79,45 @@ class IB_Trading(EWrapper, EClient):
         self.mode = mode
         self.errors_verbose = kwargs.get("errors_verbose", False)
         self.verbose = kwargs.get("verbose", False)
-        self.evento_uso_comun = threading.Event()
+        # Registro de peticiones pendientes (reqId o clave de la petición -> Future)
+        self.peticiones = {}
+        self.candado_peticiones = threading.Lock()
+        self.ids_peticiones = AsignadorIds(inicio=kwargs.get("first_request_id", 10000))
+        # Control de ritmo (pacing) de las peticiones de datos históricos
+        self.control_ritmo = ControlRitmoHistorico()
+        # Caché de datos históricos (Opcional)
+        self.cache_barras = CacheBarras(kwargs["cache_db"]) if kwargs.get("cache_db") else None
+        self.conIds = {}
         # Crear logger
         self.logger = self.create_logger()
         # Atributos para almacenar información de las peticiones
         self.order_id = None
         self.contador_desconexion = 0
         self.contratos = {}
+        self.parametros_opciones = {}
         self.datos_precios = {}
         self.ordenes_abiertas = []
         self.ordenes_completadas = []
         self.account_summary = []
         self.posiciones = []
+        # Indica si `reqPositions` está recibiendo las posiciones (las actualizaciones posteriores no se almacenan)
+        self.recibiendo_posiciones = False
         self.pnl_account = []
         self.escaner_resultados = {}
+        # Escáneres continuos (reqId -> EscanerContinuo) y detalles de sus contratos (conId -> ContractDetails)
+        self.escaneres = {}
+        self.detalles_escaner = {}
+        # Libro de cotizaciones en tiempo real (última cotización por reqId de reqMktData)
+        self.cotizaciones = QuoteBook()
+        # Gestor de suscripciones de datos de mercado (deduplicación, límite de líneas y rotación de snapshots)
+        self.suscripciones = GestorSuscripciones(self, max_lineas=kwargs.get("market_data_lines", 100))
+        # Snapshots en curso de `reqMktDataBatch` (reqIds)
+        self.snapshots_lote = set()
+        # Griegas agregadas del portafolio (posiciones x griegas de IB, actualizadas en cada tick)
+        self.griegas = AgregadorGriegas(self)
+        # Agregadores de barras en tiempo real (reqId -> AgregadorBarras)
+        self.agregadores = {}
+        self.reloj_barras = None
         
         
     def create_logger(self) -> logging.Logger:
@@ -112,6 +158,170 @@ class IB_Trading(EWrapper, EClient):
         open(self.log_file, "w").close()
         
         
+    def register_request(self, clave, procesar=None) -> Future:
+        
+        """
+        Método que registra una petición pendiente y devuelve el `Future` que se resolverá cuando llegue su respuesta.
+        
+        Cada petición se identifica por su propia clave (normalmente el reqId), por lo que varias peticiones pueden estar
+        en curso al mismo tiempo sobre la misma conexión sin despertar a una espera equivocada.
+        
+        Parámetros:
+        -----------
+        clave : int | str
+            Identificador de la petición. Se usa el reqId cuando la petición lo tiene, o un nombre fijo (por ejemplo,
+            "positions") para las peticiones de la API que no lo incluyen.
+            
+        procesar : callable, opcional
+            Función sin argumentos que construye el resultado final de la petición una vez recibida la señal de "Fin".
+            Si es `None` (por defecto), el resultado será el valor que se pase a `resolve_request`.
+            
+        Salida:
+        -------
+        return: concurrent.futures.Future : Future asociado a la petición.
+        """
+        
+        # Crear Future
+        futuro = Future()
+        futuro.clave = clave
+        with self.candado_peticiones:
+            # Cancelar una petición previa con la misma clave que haya quedado pendiente
+            anterior = self.peticiones.get(clave)
+            if anterior is not None:
+                anterior["futuro"].cancel()
+            self.peticiones[clave] = {"futuro": futuro, "procesar": procesar}
+            
+        return futuro
+        
+        
+    def resolve_request(self, clave, resultado=None) -> None:
+        
+        """
+        Método que resuelve el `Future` de una petición pendiente. Se llama desde los métodos de "Fin" (`*End`).
+        
+        Parámetros:
+        -----------
+        clave : int | str
+            Identificador de la petición.
+            
+        resultado : object, opcional
+            Resultado de la petición. Se ignora si la petición se registró con una función `procesar`.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Extraer Petición
+        with self.candado_peticiones:
+            peticion = self.peticiones.pop(clave, None)
+        if peticion is None or peticion["futuro"].done():
+            return
+        # Construir Resultado
+        try:
+            if peticion["procesar"] is not None:
+                resultado = peticion["procesar"]()
+            peticion["futuro"].set_result(resultado)
+        except Exception as error:
+            peticion["futuro"].set_exception(error)
+            
+            
+    def fail_request(self, clave, excepcion: Exception) -> None:
+        
+        """
+        Método que marca como fallida una petición pendiente para que su espera termine de inmediato.
+        
+        Parámetros:
+        -----------
+        clave : int | str
+            Identificador de la petición.
+            
+        excepcion : Exception
+            Excepción que se asignará al `Future` de la petición.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Extraer Petición
+        with self.candado_peticiones:
+            peticion = self.peticiones.pop(clave, None)
+        if peticion is not None and not peticion["futuro"].done():
+            peticion["futuro"].set_exception(excepcion)
+            
+            
+    def wait_request(self, clave, futuro: Future, timeout: float = None):
+        
+        """
+        Método que espera el resultado de una petición registrada.
+        
+        Parámetros:
+        -----------
+        clave : int | str
+            Identificador de la petición.
+            
+        futuro : concurrent.futures.Future
+            Future devuelto por `register_request`.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) de espera. Si es `None`, se espera indefinidamente.
+            
+        Salida:
+        -------
+        return: object : Resultado de la petición, o `None` si se agotó el tiempo o la petición falló.
+        """
+        
+        try:
+            return futuro.result(timeout=timeout)
+        except FuturesTimeoutError:
+            # Retirar la petición para que una respuesta tardía no se confunda con una posterior
+            with self.candado_peticiones:
+                peticion = self.peticiones.get(clave)
+                if peticion is not None and peticion["futuro"] is futuro:
+                    del self.peticiones[clave]
+            futuro.cancel()
+            self.logger.warning(f"Tiempo de espera agotado en la Solicitud: {clave}")
+        except CancelledError:
+            self.logger.warning(f"Solicitud cancelada: {clave}")
+        except Exception as error:
+            self.logger.warning(f"Solicitud fallida: {clave} - {error}")
+            
+        return None
+        
+        
+    def next_request_id(self) -> int:
+        
+        """
+        Método que asigna un identificador de petición que no está en uso. Los métodos `req*` lo utilizan cuando no
+        se les indica un `reqId`.
+        
+        Salida:
+        -------
+        return: int : Identificador de petición.
+        """
+        
+        return self.ids_peticiones.obtener()
+        
+        
+    def release_request_id(self, reqId: int) -> None:
+        
+        """
+        Método que libera un identificador asignado por `next_request_id` para que pueda reutilizarse.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.ids_peticiones.liberar(reqId)
+        
+        
     def error(self, reqId: int, errorCode: int, errorString: str) -> None:
         
         """
@@ -145,7 +355,21 @@ class IB_Trading(EWrapper, EClient):
         # Mostrar por consola (Opcional)
         if self.errors_verbose:
             print(error_mensaje)
-            
+        # Finalizar la espera de la petición afectada
+        if errorCode in self.CODIGOS_ERROR_PETICION:
+            self.fail_request(reqId, RuntimeError(error_mensaje))
+            # Retirar el escáner continuo cancelado por IB
+            escaner = self.escaneres.pop(reqId, None)
+            if escaner is not None:
+                escaner.fallar(error_mensaje)
+                self.release_request_id(reqId)
+                self.retirar_detalles_escaner(escaner)
+        # Conexión recuperada con pérdida de datos: volver a enviar los escáneres continuos
+        if errorCode == 1101:
+            self.reenviar_escaneres()
+        # Notificar al gestor de suscripciones de datos de mercado
+        self.suscripciones.error(reqId, errorCode)
+        
             
     def nextValidId(self, orderId: int) -> None:
         
@@ -169,8 +393,8 @@ class IB_Trading(EWrapper, EClient):
         # Imprimir en consola
         if self.verbose:
             print("Siguiente Id válido:", orderId)
-        # Establecer Evento
-        self.evento_uso_comun.set()
+        # Resolver Petición
+        self.resolve_request("nextValidId", orderId)
         
         
     def reqIds(self, numIds: int = -1, timeout: float = 3.0) -> int:
@@ -193,13 +417,12 @@ class IB_Trading(EWrapper, EClient):
         return: int : Próximo identificador de orden
         """
         
-        # Reiniciar Bandera del Evento
-        self.evento_uso_comun.clear()
+        # Registrar Petición
+        futuro = self.register_request("nextValidId")
         # Llamar al método de las Clases Padres
         super().reqIds(numIds=numIds)
         # Esperar a que termine la petición
-        self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
+        self.wait_request("nextValidId", futuro, timeout=timeout)
         
         return self.order_id
     
@@ -232,6 +455,8 @@ class IB_Trading(EWrapper, EClient):
         # Agregar logs
         self.logger.info("-" * 40 + "\n")
         self.logger.info("Estableciendo Conexión")
+        # Registrar la petición del primer Id válido (confirma la conexión)
+        futuro = self.register_request("nextValidId")
         # Mandar a llamar el método de las clases Padres
         super().connect(host=host, port=port, clientId=clientId)
         if self.isConnected():
@@ -240,11 +465,15 @@ class IB_Trading(EWrapper, EClient):
         self.api_thread = threading.Thread(target=self.run)
         self.api_thread.start()
         # Esperar conexión
-        respuesta_conexion = self.evento_uso_comun.wait(timeout=timeout)
+        respuesta_conexion = self.wait_request("nextValidId", futuro, timeout=timeout)
         # Revisar Respuesta
-        if not respuesta_conexion:
+        if respuesta_conexion is None:
             self.logger.warning(msg="Error en la Conexión")
-        self.evento_uso_comun.clear()
+        else:
+            # Reconexión: volver a solicitar las suscripciones de datos de mercado y los escáneres continuos
+            if len(self.suscripciones.suscripciones) > 0:
+                self.suscripciones.resuscribir()
+            self.reenviar_escaneres()
         
         
     def disconnect(self, clear_logger: bool = False) -> None:
@@ -323,11 +552,67 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Establecer Bandera
-        self.evento_uso_comun.set()
+        # Resolver Petición
+        self.resolve_request(reqId)
+        
+        
+    def reqContractDetailsAsync(self, reqId: int = None, contract: Contract = None, keep_stored: bool = False) -> Future:
+        
+        """
+        Método que envía la solicitud de detalles de un contrato sin bloquear, de modo que se puedan tener varias
+        solicitudes en curso al mismo tiempo.
+        
+        Parámetros:
+        -----------
+        reqId : int, opcional
+            Identificador único para la solicitud de detalles de contrato. Si es `None` (por defecto), se asigna automáticamente.
+            
+        contract : Contract
+            Objeto de tipo `Contract` que describe el contrato o activo cuyos detalles se solicitan.
+            
+        keep_stored : bool, opcional
+            Si es `True`, los detalles del contrato permanecerán almacenados en el atributo de  `self.contratos` (requiere
+            indicar el `reqId`). Si es `False` (por defecto), los detalles se eliman del almacenamiento después de ser procesados.
+            
+        Salida:
+        -------
+        return: concurrent.futures.Future : Future que se resuelve con la lista de detalles de los contratos.
+        """
+        
+        # Procesar respuesta al recibir la señal de Fin
+        def procesar() -> list:
+            contratos = self.contratos.get(contract.secType, {}).get(reqId, [])
+            # Eliminar Datos (Opcional)
+            if not keep_stored and reqId in self.contratos.get(contract.secType, {}):
+                del self.contratos[contract.secType][reqId]
+                if len(self.contratos[contract.secType]) == 0:
+                    del self.contratos[contract.secType]
+                    
+            return contratos
+        
+        # Validar Contrato
+        if contract is None:
+            raise ValueError("Se debe proporcionar el contrato de la solicitud")
+        # Los datos almacenados se consultan por su reqId, por lo que debe indicarlo quien los solicita
+        if reqId is None and keep_stored:
+            raise ValueError("Para mantener almacenados los datos (keep_stored=True) se debe proporcionar el reqId")
+        # Asignar Id automáticamente (Opcional)
+        id_automatico = reqId is None
+        if id_automatico:
+            reqId = self.next_request_id()
+        # Descartar resultados previos con el mismo Id
+        self.contratos.get(contract.secType, {}).pop(reqId, None)
+        # Registrar Petición
+        futuro = self.register_request(reqId, procesar)
+        if id_automatico:
+            futuro.add_done_callback(lambda f: self.release_request_id(reqId))
+        # Llamar a método de las Clases Padres
+        super().reqContractDetails(reqId=reqId, contract=contract)
+        
+        return futuro
         
         
-    def reqContractDetails(self, reqId: int, contract: Contract, keep_stored: bool = False, timeout: float = 10.0) -> list:
+    def reqContractDetails(self, reqId: int = None, contract: Contract = None, keep_stored: bool = False, timeout: float = 10.0) -> list:
         
         """
         Método para obtener los detalles de un contrato o activo solicitado.
@@ -337,15 +622,15 @@ class IB_Trading(EWrapper, EClient):
         
         Parámetros:
         -----------
-        reqId : int
-            Identificador único para la solicitud de detalles de contrato.
+        reqId : int, opcional
+            Identificador único para la solicitud de detalles de contrato. Si es `None` (por defecto), se asigna automáticamente.
             
         contract : Contract
             Objeto de tipo `Contract` que describe el contrato o activo cuyos detalles se solicitan.
             
         keep_stored : bool, opcional
-            Si es `True`, los detalles del contrato permanecerán almacenados en el atributo de  `self.contratos`.
-            Si es `False` (por defecto), los detalles se eliman del almacenamiento después de ser retornados.
+            Si es `True`, los detalles del contrato permanecerán almacenados en el atributo de  `self.contratos` (requiere
+            indicar el `reqId`). Si es `False` (por defecto), los detalles se eliman del almacenamiento después de ser retornados.
             
         timeout : float, opcional
             Tiempo en segundos que el método esperará una respuesta antes de continuar. Por defecto, es de 10 segundos.
@@ -355,22 +640,150 @@ class IB_Trading(EWrapper, EClient):
         return: list : Lista con los detalles de los contratos solicitados.
         """
         
-        # Limpiar Evento
-        self.evento_uso_comun.clear()
-        # Llamar a método de las Clases Padres
-        super().reqContractDetails(reqId=reqId, contract=contract)
+        # Enviar Petición
+        futuro = self.reqContractDetailsAsync(reqId=reqId, contract=contract, keep_stored=keep_stored)
         # Esperar respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        # Revisar respuesta
-        if respuesta:
-            contratos = self.contratos[contract.secType][reqId]
-            # Eliminar Datos (Opcional)
-            if not keep_stored:
-                del self.contratos[contract.secType][reqId]
-                if len(self.contratos[contract.secType]) == 0:
-                    del self.contratos[contract.secType]
+        return self.wait_request(futuro.clave, futuro, timeout=timeout)
+        
+        
+    def securityDefinitionOptionParameter(self, reqId: int, exchange: str, underlyingConId: int, tradingClass: str,
+                                          multiplier: str, expirations: set, strikes: set) -> None:
+        
+        """
+        Método que recibe los parámetros de la cadena de opciones (vencimientos y strikes) de un activo en un mercado.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador único de la solicitud realizada al servidor.
             
-            return contratos
+        exchange : str
+            Mercado en el que se negocian las opciones.
+            
+        underlyingConId : int
+            conId del activo subyacente.
+            
+        tradingClass : str
+            Clase de negociación de las opciones.
+            
+        multiplier : str
+            Multiplicador de las opciones.
+            
+        expirations : set
+            Conjunto de vencimientos (AAAAMMDD).
+            
+        strikes : set
+            Conjunto de precios de ejercicio (de todos los vencimientos).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Almacenar Parámetros
+        if reqId not in self.parametros_opciones:
+            self.parametros_opciones[reqId] = []
+        self.parametros_opciones[reqId].append({"exchange": exchange, "underlyingConId": underlyingConId,
+                                                "tradingClass": tradingClass, "multiplier": multiplier,
+                                                "expirations": sorted(expirations), "strikes": sorted(strikes)})
+        
+        
+    def securityDefinitionOptionParameterEnd(self, reqId: int) -> None:
+        
+        """
+        Método que se llama una vez que se han recibido todos los parámetros de la cadena de opciones.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador único de la solicitud realizada al servidor.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Resolver Petición
+        self.resolve_request(reqId)
+        
+        
+    def reqSecDefOptParamsAsync(self, reqId: int = None, underlyingSymbol: str = "", futFopExchange: str = "",
+                                underlyingSecType: str = "STK", underlyingConId: int = 0) -> Future:
+        
+        """
+        Método que envía la solicitud de los parámetros de la cadena de opciones de un activo sin bloquear, de modo que
+        se puedan tener varias solicitudes en curso al mismo tiempo.
+        
+        Parámetros:
+        -----------
+        reqId : int, opcional
+            Identificador único para la solicitud. Si es `None` (por defecto), se asigna automáticamente.
+            
+        underlyingSymbol : str
+            Símbolo del activo subyacente.
+            
+        futFopExchange : str, opcional
+            Mercado de los futuros (sólo para opciones sobre futuros). Por defecto, es "" (opciones sobre acciones).
+            
+        underlyingSecType : str, opcional
+            Tipo de activo del subyacente. Por defecto, es "STK".
+            
+        underlyingConId : int, opcional
+            conId del activo subyacente. Por defecto, es 0.
+            
+        Salida:
+        -------
+        return: concurrent.futures.Future : Future que se resuelve con una lista de diccionarios (uno por mercado) con
+                                            las llaves exchange, underlyingConId, tradingClass, multiplier, expirations
+                                            y strikes (ordenados).
+        """
+        
+        # Procesar respuesta al recibir la señal de Fin
+        def procesar() -> list:
+            return self.parametros_opciones.pop(reqId, [])
+        
+        # Asignar Id automáticamente (Opcional)
+        id_automatico = reqId is None
+        if id_automatico:
+            reqId = self.next_request_id()
+        # Descartar resultados previos con el mismo Id
+        self.parametros_opciones.pop(reqId, None)
+        # Registrar Petición
+        futuro = self.register_request(reqId, procesar)
+        if id_automatico:
+            futuro.add_done_callback(lambda f: self.release_request_id(reqId))
+        # Llamar a método de las Clases Padres
+        super().reqSecDefOptParams(reqId=reqId, underlyingSymbol=underlyingSymbol, futFopExchange=futFopExchange,
+                                   underlyingSecType=underlyingSecType, underlyingConId=underlyingConId)
+        
+        return futuro
+    
+    
+    def reqSecDefOptParams(self, reqId: int = None, underlyingSymbol: str = "", futFopExchange: str = "",
+                           underlyingSecType: str = "STK", underlyingConId: int = 0, timeout: float = 10.0) -> list:
+        
+        """
+        Método para obtener los parámetros de la cadena de opciones (vencimientos y strikes) de un activo con una sola
+        petición, en lugar de solicitar los detalles de cada contrato de opción.
+        
+        Parámetros:
+        -----------
+        reqId, underlyingSymbol, futFopExchange, underlyingSecType, underlyingConId :
+            Los mismos parámetros que `reqSecDefOptParamsAsync`.
+            
+        timeout : float, opcional
+            Tiempo en segundos que el método esperará una respuesta antes de continuar. Por defecto, es de 10 segundos.
+            
+        Salida:
+        -------
+        return: list : Lista de diccionarios (uno por mercado) con los parámetros de la cadena de opciones.
+        """
+        
+        # Enviar Petición
+        futuro = self.reqSecDefOptParamsAsync(reqId=reqId, underlyingSymbol=underlyingSymbol, futFopExchange=futFopExchange,
+                                              underlyingSecType=underlyingSecType, underlyingConId=underlyingConId)
+        # Esperar respuesta
+        return self.wait_request(futuro.clave, futuro, timeout=timeout)
         
         
     def historicalData(self, reqId: int, bar) -> None:
@@ -393,10 +806,9 @@ class IB_Trading(EWrapper, EClient):
         """
         
         # Extraer y almacenar los valores
-        datos = [bar.date, bar.open, bar.high, bar.low, bar.close, bar.volume]
         if reqId not in self.datos_precios:
-            self.datos_precios[reqId] = []
-        self.datos_precios[reqId].append(datos)
+            self.datos_precios[reqId] = BufferBarras()
+        self.datos_precios[reqId].agregar(bar)
         
         
     def historicalDataEnd(self, reqId: int, start: str, end: str) -> None:
@@ -420,22 +832,86 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Establecer Evento
-        self.evento_uso_comun.set()
+        # Resolver Petición
+        self.resolve_request(reqId)
+        
+        
+    def reqHistoricalDataAsync(self, reqId: int = None, contract: Contract = None, endDateTime: str = "", durationStr: str = "1 Y",
+                               barSizeSetting: str = "1 day", whatToShow: str = "ADJUSTED_LAST", useRTH: int = 1, 
+                               formatDate: int = 1, keepUpToDate: bool = False, chartOptions: list = [], 
+                               keep_stored: bool = False, delayed_data: bool = False) -> Future:
+        
+        """
+        Método que envía una solicitud de datos históricos sin bloquear. Permite mantener varias solicitudes en curso sobre
+        la misma conexión; cada una se resuelve únicamente con su propio `historicalDataEnd`.
+        
+        Antes de enviarse, la solicitud espera (si es necesario) su turno en `self.control_ritmo` para no provocar
+        violaciones de ritmo (pacing) del servidor.
+        
+        Parámetros:
+        -----------
+        Los mismos que `reqHistoricalData`, a excepción de `timeout`.
+            
+        Salida:
+        -------
+        return: concurrent.futures.Future : Future que se resuelve con un DataFrame de los datos históricos.
+        """
+        
+        # Procesar respuesta al recibir la señal de Fin
+        def procesar() -> pd.DataFrame:
+            datos = self.datos_precios.get(reqId, BufferBarras(capacidad=0)).a_dataframe()
+            # Revisar si eliminar datos procesados
+            if not keep_stored:
+                self.datos_precios.pop(reqId, None)
+                
+            return datos
+        
+        # Validar Contrato
+        if contract is None:
+            raise ValueError("Se debe proporcionar el contrato de la solicitud")
+        # Los datos almacenados se consultan por su reqId, por lo que debe indicarlo quien los solicita
+        if reqId is None and keep_stored:
+            raise ValueError("Para mantener almacenados los datos (keep_stored=True) se debe proporcionar el reqId")
+        # Asignar Id automáticamente (Opcional)
+        id_automatico = reqId is None
+        if id_automatico:
+            reqId = self.next_request_id()
+        # Respetar las reglas de ritmo de IB
+        clave = clave_contrato(contract) + (whatToShow,)
+        self.control_ritmo.esperar_turno(clave_contrato=clave, 
+                                         clave_peticion=clave + (endDateTime, durationStr, barSizeSetting, useRTH),
+                                         barSizeSetting=barSizeSetting, peso=2 if whatToShow == "BID_ASK" else 1)
+        # Descartar resultados previos con el mismo Id
+        self.datos_precios.pop(reqId, None)
+        # Registrar Petición
+        futuro = self.register_request(reqId, procesar)
+        if id_automatico:
+            futuro.add_done_callback(lambda f: self.release_request_id(reqId))
+        # Ajustar Data
+        if not delayed_data:
+            self.reqMarketDataType(marketDataType=1)
+        else:
+            self.reqMarketDataType(marketDataType=3)
+        # Llamar al método de las clases Padres
+        super().reqHistoricalData(reqId=reqId, contract=contract, endDateTime=endDateTime, durationStr=durationStr,
+                                  barSizeSetting=barSizeSetting, whatToShow=whatToShow, useRTH=useRTH,
+                                  formatDate=formatDate, keepUpToDate=keepUpToDate, chartOptions=chartOptions)
+        
+        return futuro
         
         
-    def reqHistoricalData(self, reqId: int, contract: Contract, endDateTime: str = "", durationStr: str = "1 Y",
+    def reqHistoricalData(self, reqId: int = None, contract: Contract = None, endDateTime: str = "", durationStr: str = "1 Y",
                           barSizeSetting: str = "1 day", whatToShow: str = "ADJUSTED_LAST", useRTH: int = 1, 
                           formatDate: int = 1, keepUpToDate: bool = False, chartOptions: list = [], keep_stored: bool = False,
-                          timeout: float = 10.0, delayed_data: bool = False) -> pd.DataFrame:
+                          timeout: float = 10.0, delayed_data: bool = False, use_cache: bool = True) -> pd.DataFrame:
         
         """
         Método para solicitar datos históricos de un activo financiero en un intervalo de tiempo especificado.
         
         Parámetros:
         -----------
-        reqId : int
-            Identificador único de la solicitud.
+        reqId : int, opcional
+            Identificador único de la solicitud. Si es `None` (por defecto), se asigna automáticamente.
             
         contract : Contract
             Objeto que define el contrato financiero (activo) del cual se solicitan los datos históricos.
@@ -467,8 +943,8 @@ class IB_Trading(EWrapper, EClient):
             Lista de pares clave-valor para configuraciones adicionales del gráfico. Parámetro de uso interno.
             
         keep_stored : bool, opcional
-            Si es `True`, los detalles de los datos permanecerán almacenados en el atributo de  `self.datos_precios`.
-            Si es `False` (por defecto), los datos se eliman del almacenamiento después de ser retornados.
+            Si es `True`, los detalles de los datos permanecerán almacenados en el atributo de  `self.datos_precios`
+            (requiere indicar el `reqId`). Si es `False` (por defecto), los datos se eliman del almacenamiento después de ser retornados.
             
         timeout : float, opcional
             Tiempo en segundos que el método esperará una respuesta antes de continuar. Por defecto, es de 10 segundos.
@@ -476,71 +952,258 @@ class IB_Trading(EWrapper, EClient):
         delayed_data : bool, opcional
             Si es True, solicita datos retrasados en lugar de datos en tiempo real. Por defecto, es False.
             
+        use_cache : bool, opcional
+            Si es True (por defecto) y la instancia tiene una caché configurada (`cache_db`), los datos se leen de la caché
+            y sólo se solicitan al servidor los huecos que faltan. No aplica a las peticiones con `keepUpToDate`.
+            
         Salida:
         -------
         return: pd.DataFrame : Datos históricos del activo solicitado.
         """
         
-        # Limpiar Estado del Evento
-        self.evento_uso_comun.clear()
-        # Ajustar Data
-        if not delayed_data:
-            self.reqMarketDataType(marketDataType=1)
-        else:
-            self.reqMarketDataType(marketDataType=3)
-        # Llamar al método de las clases Padres
-        super().reqHistoricalData(reqId=reqId, contract=contract, endDateTime=endDateTime, durationStr=durationStr,
-                                  barSizeSetting=barSizeSetting, whatToShow=whatToShow, useRTH=useRTH,
-                                  formatDate=formatDate, keepUpToDate=keepUpToDate, chartOptions=chartOptions)
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
-        if respuesta:
-            # Extraer Valores
-            datos = pd.DataFrame(self.datos_precios[reqId], columns=["Date", "Open", "High", "Low", "Close", "Volume"])
-            datos["Date"] = pd.to_datetime(datos["Date"])
-            datos.set_index(["Date"], inplace=True)
-            # Revisar si eliminar datos procesados
-            if not keep_stored:
-                del self.datos_precios[reqId]
-                
-            return datos
+        # Utilizar la Caché (Opcional)
+        if use_cache and (self.cache_barras is not None) and (not keepUpToDate):
+            fin = texto_a_fecha(endDateTime)
+            inicio = duracion_a_intervalo(durationStr, fin)
+            if not barSizeSetting.split()[1].startswith(("sec", "min", "hour")):
+                inicio = inicio.replace(hour=0, minute=0, second=0)
+            return self.reqHistoricalDataCache(contract=contract, inicio=inicio, fin=fin, endDateTime=endDateTime,
+                                               barSizeSetting=barSizeSetting, whatToShow=whatToShow, useRTH=useRTH,
+                                               timeout=timeout, delayed_data=delayed_data)
+        # Enviar Petición
+        futuro = self.reqHistoricalDataAsync(reqId=reqId, contract=contract, endDateTime=endDateTime, durationStr=durationStr,
+                                             barSizeSetting=barSizeSetting, whatToShow=whatToShow, useRTH=useRTH,
+                                             formatDate=formatDate, keepUpToDate=keepUpToDate, chartOptions=chartOptions,
+                                             keep_stored=keep_stored, delayed_data=delayed_data)
+        # Esperar respuesta
+        return self.wait_request(futuro.clave, futuro, timeout=timeout)
         
     
-    def headTimestamp(self, reqId: int, headTimestamp: str) -> None:
+    def resolve_conId(self, contract: Contract, timeout: float = 10.0) -> int:
         
         """
-        Método que procesa y almacena la fecha más antigua disponible para un activo financiero proporcionada por IB.
+        Método que obtiene el identificador único (conId) de un contrato. Si el contrato no lo incluye, se solicita una vez
+        al servidor y se guarda para las siguientes consultas.
         
         Parámetros:
         -----------
-        reqId : int
-            Identificador único de la solicitud.
+        contract : Contract
+            Objeto que define el contrato financiero.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) para esperar los detalles del contrato. Por defecto, es de 10 segundos.
             
-        headTimestamp : str
-            Fecha más antigua disponible en formato 'YYYYMMDD HH:mm:ss'. Esta fecha representa el inicio de los datos históricos
-            disponibles para el activo solicitado.
-        
         Salida:
         -------
-        return: NoneType : None.
+        return: int : conId del contrato, o `None` si no se pudo obtener.
         """
         
-        # Almacenar
-        self.headTimestamp_value = headTimestamp
-        self.evento_uso_comun.set()
-        
-        
-    def reqHeadTimeStamp(self, reqId: int, contract: Contract, whatToShow: str = "ADJUSTED_LAST", useRTH: int = 1,
-                         formatDate: int = 1, timeout: float = 3.0) -> str:
+        # Revisar si ya se conoce
+        if contract.conId:
+            return contract.conId
+        clave = clave_contrato(contract)
+        if clave not in self.conIds:
+            detalles = self.reqContractDetails(contract=contract, timeout=timeout)
+            if not detalles:
+                return None
+            self.conIds[clave] = detalles[0].contract.conId
+            
+        return self.conIds[clave]
+    
+    
+    def reqHistoricalDataCache(self, contract: Contract, inicio: datetime, fin: datetime, endDateTime: str = "",
+                               barSizeSetting: str = "1 day", whatToShow: str = "ADJUSTED_LAST", useRTH: int = 1,
+                               timeout: float = 10.0, delayed_data: bool = False, cache: CacheBarras = None) -> pd.DataFrame:
         
         """
-        Método que nos permite conocer la fecha más antigua de datos para un instrumento financiero.
+        Método que obtiene datos históricos a través de la caché local (`self.cache_barras`), solicitando al servidor
+        únicamente los huecos del inicio y del final que aún no están almacenados.
+        
+        Parámetros:
+        -----------
+        contract : Contract
+            Objeto que define el contrato financiero (activo).
+            
+        inicio : datetime
+            Fecha de inicio de los datos solicitados.
+            
+        fin : datetime
+            Fecha final de los datos solicitados.
+            
+        endDateTime : str, opcional
+            Fecha final en el formato de IB correspondiente a `fin`. Vacía (por defecto) si `fin` es el momento actual.
+            
+        barSizeSetting, whatToShow, useRTH, timeout, delayed_data :
+            Los mismos parámetros que `reqHistoricalData`.
+            
+        cache : CacheBarras, opcional
+            Caché que se utilizará. Si es `None` (por defecto), se utiliza `self.cache_barras`.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Datos históricos del activo en el intervalo [inicio, fin], o `None` si falló la descarga
+                               de algún hueco.
+                               
+        Nota: con "ADJUSTED_LAST", un dividendo o split modifica los precios ya almacenados. En ese caso, elimine la serie
+        de la caché (`self.cache_barras.eliminar`) para volver a descargarla completa.
+        """
+        
+        # Caché a utilizar
+        cache = self.cache_barras if cache is None else cache
+        # Obtener clave de la serie
+        conId = self.resolve_conId(contract)
+        if conId is None:
+            return None
+        clave = (conId, barSizeSetting, whatToShow, useRTH)
+        # Descargar Huecos
+        for inicio_hueco, fin_hueco in cache.huecos(clave, inicio, fin):
+            # "ADJUSTED_LAST" sólo admite peticiones que terminan en el momento actual
+            if (fin_hueco >= fin) or (whatToShow == "ADJUSTED_LAST"):
+                texto_fin, referencia_fin = endDateTime, fin
+            else:
+                texto_fin, referencia_fin = fin_hueco.strftime("%Y%m%d %H:%M:%S"), fin_hueco
+            df = self.reqHistoricalData(contract=contract, endDateTime=texto_fin,
+                                        durationStr=intervalo_a_duracion(inicio_hueco, referencia_fin, barSizeSetting),
+                                        barSizeSetting=barSizeSetting, whatToShow=whatToShow, useRTH=useRTH, timeout=timeout,
+                                        delayed_data=delayed_data, use_cache=False)
+            if df is None:
+                return None
+            # Actualizar Caché
+            cache.guardar(clave, df, inicio_hueco, fin_hueco)
+            
+        return cache.cargar(clave, inicio, fin)
+    
+    
+    def reqHistoricalDataBatch(self, contracts, endDateTime: str = "", durationStr: str = "1 Y", barSizeSetting: str = "1 day",
+                               whatToShow: str = "ADJUSTED_LAST", useRTH: int = 1, formatDate: int = 1, max_in_flight: int = 10,
+                               timeout: float = 60.0, delayed_data: bool = False, callback=None) -> dict:
+        
+        """
+        Método para descargar datos históricos de múltiples activos de forma concurrente.
+        
+        Las solicitudes se envían sin esperar la respuesta de las anteriores, manteniendo como máximo `max_in_flight`
+        solicitudes en curso y respetando las reglas de ritmo (pacing) de IB. Cada solicitud utiliza su propio reqId.
+        
+        Parámetros:
+        -----------
+        contracts : list | dict
+            Contratos a descargar. Si es una lista, los resultados se indexan por la posición de cada contrato (dos contratos
+            pueden tener el mismo símbolo); si es un diccionario, se utilizan sus claves.
+            
+        endDateTime, durationStr, barSizeSetting, whatToShow, useRTH, formatDate, delayed_data :
+            Los mismos parámetros que `reqHistoricalData`, aplicados a todos los contratos.
+            
+        max_in_flight : int, opcional
+            Número máximo de solicitudes en curso al mismo tiempo. Por defecto, es 10.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) que se esperará la respuesta de cada solicitud. Por defecto, es de 60 segundos.
+            
+        callback : callable, opcional
+            Función `callback(clave, df)` que se ejecuta en cuanto se completa cada solicitud.
+            
+        Salida:
+        -------
+        return: dict : Diccionario {clave: pd.DataFrame}. Las solicitudes fallidas o sin respuesta tienen el valor `None`.
+        """
+        
+        # Normalizar Contratos
+        if isinstance(contracts, dict):
+            pares = list(contracts.items())
+        else:
+            pares = list(enumerate(contracts))
+        resultados = {}
+        en_curso = {}
+        candado = threading.Lock()
+        semaforo = threading.Semaphore(max_in_flight)
+        
+        # Almacenar cada resultado en cuanto llega
+        def completar(clave, reqId, futuro) -> None:
+            try:
+                datos = futuro.result()
+            except Exception as error:
+                self.logger.warning(f"Solicitud fallida: {reqId} ({clave}) - {error}")
+                datos = None
+            with candado:
+                resultados[clave] = datos
+                en_curso.pop(reqId, None)
+            self.release_request_id(reqId)
+            semaforo.release()
+            if callback is not None:
+                callback(clave, datos)
+                
+        # Liberar las solicitudes que excedieron su tiempo de espera
+        def expirar() -> None:
+            ahora = time.monotonic()
+            with candado:
+                vencidas = [reqId for reqId, limite in en_curso.items() if limite is not None and limite <= ahora]
+            for reqId in vencidas:
+                self.cancelHistoricalData(reqId=reqId)
+                self.fail_request(reqId, FuturesTimeoutError(f"Tiempo de espera agotado en la Solicitud: {reqId}"))
+                
+        # Enviar Solicitudes
+        futuros = []
+        for clave, contrato in pares:
+            while not semaforo.acquire(timeout=0.5):
+                expirar()
+            reqId = self.next_request_id()
+            # Registrar antes de enviar (la respuesta puede llegar antes de que termine `reqHistoricalDataAsync`); el tiempo
+            # de espera cuenta desde el envío, después del turno de ritmo
+            with candado:
+                en_curso[reqId] = None
+            futuro = self.reqHistoricalDataAsync(reqId=reqId, contract=contrato, endDateTime=endDateTime, durationStr=durationStr,
+                                                 barSizeSetting=barSizeSetting, whatToShow=whatToShow, useRTH=useRTH,
+                                                 formatDate=formatDate, delayed_data=delayed_data)
+            with candado:
+                if reqId in en_curso and timeout is not None:
+                    en_curso[reqId] = time.monotonic() + timeout
+            futuro.add_done_callback(lambda f, clave=clave, reqId=reqId: completar(clave, reqId, f))
+            futuros.append(futuro)
+            
+        # Esperar a las solicitudes restantes
+        while True:
+            pendientes = futures_wait(futuros, timeout=0.5).not_done
+            if len(pendientes) == 0:
+                break
+            expirar()
+            
+        return {clave: resultados.get(clave) for clave, _ in pares}
+    
+    
+    def headTimestamp(self, reqId: int, headTimestamp: str) -> None:
+        
+        """
+        Método que procesa y almacena la fecha más antigua disponible para un activo financiero proporcionada por IB.
         
         Parámetros:
         -----------
         reqId : int
             Identificador único de la solicitud.
             
+        headTimestamp : str
+            Fecha más antigua disponible en formato 'YYYYMMDD HH:mm:ss'. Esta fecha representa el inicio de los datos históricos
+            disponibles para el activo solicitado.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Resolver Petición con la fecha recibida
+        self.resolve_request(reqId, headTimestamp)
+        
+        
+    def reqHeadTimeStamp(self, reqId: int = None, contract: Contract = None, whatToShow: str = "ADJUSTED_LAST", useRTH: int = 1,
+                         formatDate: int = 1, timeout: float = 3.0) -> str:
+        
+        """
+        Método que nos permite conocer la fecha más antigua de datos para un instrumento financiero.
+        
+        Parámetros:
+        -----------
+        reqId : int, opcional
+            Identificador único de la solicitud. Si es `None` (por defecto), se asigna automáticamente.
+            
         contract : Contract
             Objeto que define el contrato financiero (activo).
             
@@ -562,27 +1225,34 @@ class IB_Trading(EWrapper, EClient):
         return: str : Fecha más antigua disponible para el activo solicitado.
         """
         
-        # Limpiar Estado Interno del Evento
-        self.evento_uso_comun.clear()
+        # Validar Contrato
+        if contract is None:
+            raise ValueError("Se debe proporcionar el contrato de la solicitud")
+        # Asignar Id automáticamente (Opcional)
+        id_automatico = reqId is None
+        if id_automatico:
+            reqId = self.next_request_id()
+        # Registrar Petición
+        futuro = self.register_request(reqId)
         # Llamar al método de la clase de los Padres
         super().reqHeadTimeStamp(reqId=reqId, contract=contract, whatToShow=whatToShow, useRTH=useRTH, formatDate=formatDate)
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        if respuesta:
-            fecha_disponibilidad_inicial = self.headTimestamp_value
-            del self.headTimestamp_value
-            
-            return fecha_disponibilidad_inicial
+        fecha_disponibilidad_inicial = self.wait_request(reqId, futuro, timeout=timeout)
+        # Liberar Id
+        if id_automatico:
+            self.release_request_id(reqId)
+        
+        return fecha_disponibilidad_inicial
         
         
-    def reqMaxData(self, reqId: int, contract: Contract, **kwargs) -> pd.DataFrame:
+    def reqMaxData(self, reqId: int = None, contract: Contract = None, **kwargs) -> pd.DataFrame:
         
         """
         Método para obtener todos los datos históricos disponibles para un activo financiero.
         
         Parámetros:
         -----------
-        reqId : int
-            Identificador único de la solicitud.
+        reqId : int, opcional
+            Identificador único de la solicitud. Si es `None` (por defecto), se asigna automáticamente.
             
         contract : Contract
             Objeto que define el contrato financiero (activo).
@@ -595,11 +1265,26 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : Registro máximo de datos históricos para el activo solicitado.
         """
             
+        # Con caché: partir del inicio ya almacenado (sólo se descargará el hueco final)
+        whatToShow = kwargs.get("whatToShow", "ADJUSTED_LAST")
+        if self.cache_barras is not None:
+            conId = self.resolve_conId(contract)
+            if conId is not None:
+                cobertura = self.cache_barras.cobertura((conId, "1 day", whatToShow, 1))
+                if cobertura is not None:
+                    return self.reqHistoricalDataCache(contract=contract, inicio=cobertura[0], fin=texto_a_fecha(""),
+                                                       barSizeSetting="1 day", whatToShow=whatToShow, timeout=None,
+                                                       delayed_data=True)
         # Obtener fecha más antigua de datos
         fecha_mas_antigua = self.reqHeadTimeStamp(reqId=reqId, contract=contract, **kwargs)
         if isinstance(fecha_mas_antigua, str):
             fecha_mas_antigua = datetime.strptime(fecha_mas_antigua, "%Y%m%d %H:%M:%S")
             fecha_hoy = datetime.now()
+            # Con caché: descargar todo el historial una única vez
+            if self.cache_barras is not None:
+                return self.reqHistoricalDataCache(contract=contract, inicio=fecha_mas_antigua, fin=texto_a_fecha(""),
+                                                   barSizeSetting="1 day", whatToShow=whatToShow, timeout=None,
+                                                   delayed_data=True)
             diferencia = int(fecha_hoy.year - fecha_mas_antigua.year + 1)
             # Obtener Datos
             df = self.reqHistoricalData(reqId=reqId, contract=contract, durationStr=f"{diferencia} Y", barSizeSetting="1 day",
@@ -614,7 +1299,10 @@ class IB_Trading(EWrapper, EClient):
         Método para guardar un DataFrame en una base de datos SQLite.
         
         Este método permite almacenar los datos contenidos en un DataFrame en una tabla específica dentro de una base de datos.
-        Si la tabla no existe, se crea automáticamente con la estructura predeterminada.
+        Si la tabla no existe, se crea automáticamente con la estructura predeterminada. Las fechas que ya existen en la
+        tabla se reemplazan con los nuevos valores, por lo que el método puede ejecutarse varias veces sobre los mismos datos.
+        Las fechas se guardan como enteros (segundos desde 1970); las tablas creadas por versiones anteriores (fechas como
+        texto) se convierten automáticamente.
         
         Parámetros:
         -----------
@@ -633,30 +1321,95 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Conectar a la Base de Datos
-        conn = sqlite3.connect(db_path)
-        # Generar Cursor
-        cursor = conn.cursor()
-        # Definir estructura
-        sql = f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                date DATETIME PRIMARY KEY,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume INTEGER
-                )
-        """
-        # Ejecutar comando
-        cursor.execute(sql)
-        # Almacenar
-        data = df.copy()
-        data.index = data.index.strftime("%Y-%m-%d %H:%M:%S")
-        lista_datos = data.reset_index().values.tolist()
-        cursor.executemany(f"INSERT INTO {table_name} (date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?)", lista_datos)
-        # Confirmar comando
-        conn.commit()
+        # Guardar en Bloque (conexión persistente, modo WAL y transacciones por lotes)
+        AlmacenSQLite.abrir(db_path).guardar_barras(df=df, table_name=table_name)
+        
+        
+    def Read_from_DB(self, db_path: str, table_name: str, start: datetime = None, end: datetime = None) -> pd.DataFrame:
+        
+        """
+        Método para leer los datos guardados con `Save_to_DB`.
+        
+        Parámetros:
+        -----------
+        db_path : str
+            Ruta del archivo de la base de datos SQLite.
+            
+        table_name : str
+            El nombre de la tabla que contiene los datos.
+            
+        start : datetime, opcional
+            Fecha mínima de los datos. Por defecto, es None (sin límite).
+            
+        end : datetime, opcional
+            Fecha máxima de los datos. Por defecto, es None (sin límite).
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Datos almacenados, con el mismo formato que devuelve `reqHistoricalData`.
+        """
+        
+        return AlmacenSQLite.abrir(db_path).leer_barras(table_name=table_name, inicio=start, fin=end)
+    
+    
+    def Save_to_Parquet(self, df: pd.DataFrame, root_path: str, symbol: str, barSize: str = "1 day") -> None:
+        
+        """
+        Método para guardar un DataFrame en un almacén columnar (archivos Parquet particionados por símbolo, tamaño de barra
+        y año). Es una alternativa a `Save_to_DB` para análisis que recorren muchos símbolos. Requiere `pyarrow`.
+        
+        Parámetros:
+        -----------
+        df : pd.DataFrame
+            El DataFrame con los datos a almacenar (formato de `reqHistoricalData`).
+            
+        root_path : str
+            Carpeta raíz del almacén. Si no existe, se creará automáticamente.
+            
+        symbol : str
+            Símbolo del activo.
+            
+        barSize : str, opcional
+            Tamaño de la barra de los datos. Por defecto, es "1 day".
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        AlmacenParquet(root_path).guardar_barras(df=df, symbol=symbol, barSize=barSize)
+        
+        
+    def Read_from_Parquet(self, root_path: str, symbol: str, barSize: str = "1 day", start: datetime = None,
+                          end: datetime = None) -> pd.DataFrame:
+        
+        """
+        Método para leer los datos guardados con `Save_to_Parquet`. Sólo se leen los años y grupos de filas que contienen
+        fechas del intervalo solicitado.
+        
+        Parámetros:
+        -----------
+        root_path : str
+            Carpeta raíz del almacén.
+            
+        symbol : str
+            Símbolo del activo.
+            
+        barSize : str, opcional
+            Tamaño de la barra de los datos. Por defecto, es "1 day".
+            
+        start : datetime, opcional
+            Fecha mínima de los datos. Por defecto, es None (sin límite).
+            
+        end : datetime, opcional
+            Fecha máxima de los datos. Por defecto, es None (sin límite).
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Datos almacenados, con el mismo formato que devuelve `reqHistoricalData`.
+        """
+        
+        return AlmacenParquet(root_path).leer_barras(symbol=symbol, barSize=barSize, inicio=start, fin=end)
     
     
     def orderStatus(self, orderId: int, status: str, filled: float, remaining: float, avgFillPrice: float, permId: int, parentId: int, 
@@ -822,8 +1575,8 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Establecer bandera interna del Evento
-        self.evento_uso_comun.set()
+        # Resolver Petición
+        self.resolve_request("openOrders", True)
         
         
     def reqOpenOrders(self, keep_stored: bool = False, timeout: float = 3.0) -> pd.DataFrame:
@@ -846,15 +1599,14 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : DataFrame con las órdenes abiertas existentes asociadas con el cliente actual.
         """
         
-        # Limpiar Estado del Evento
-        self.evento_uso_comun.clear()
+        # Registrar Petición
+        futuro = self.register_request("openOrders")
         # Limpiar lista de órdenes
         self.ordenes_abiertas.clear()
         # Llamar al método de las super clases
         super().reqOpenOrders()
         # Esperar Respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
+        respuesta = self.wait_request("openOrders", futuro, timeout=timeout)
         # Estructura Órdenes
         if respuesta:
             # Obtener Órdenes
@@ -889,15 +1641,14 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : DataFrame con las órdenes abiertas existentes asociadas con la cuenta.
         """
         
-        # Limpiar Estado del Evento
-        self.evento_uso_comun.clear()
+        # Registrar Petición
+        futuro = self.register_request("openOrders")
         # Limpiar lista de órdenes
         self.ordenes_abiertas.clear()
         # Llamar al método de las super clases
         super().reqAllOpenOrders()
         # Esperar Respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
+        respuesta = self.wait_request("openOrders", futuro, timeout=timeout)
         # Estructura Órdenes
         if respuesta:
             # Obtener Órdenes
@@ -961,8 +1712,8 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Establecer Evento
-        self.evento_uso_comun.set()
+        # Resolver Petición
+        self.resolve_request("completedOrders", True)
         
         
     def reqCompletedOrders(self, apiOnly: bool = False, keep_stored: bool = False, timeout: float = 3.0) -> pd.DataFrame:
@@ -989,14 +1740,14 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : Órdenes completadas en un formato de DataFrame.
         """
         
-        # Limpiar Evento y la lista de Órdenes Completadas
-        self.evento_uso_comun.clear()
+        # Registrar Petición
+        futuro = self.register_request("completedOrders")
+        # Limpiar lista
         self.ordenes_completadas.clear()
         # Llamar al método de la clase Padre
         super().reqCompletedOrders(apiOnly=apiOnly)
         # Esperar respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
+        respuesta = self.wait_request("completedOrders", futuro, timeout=timeout)
         # Estructura Órdenes Completadas
         if respuesta:
             # Obtener Valores
@@ -1229,11 +1980,11 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Establecer Evento
-        self.evento_uso_comun.set()
+        # Resolver Petición
+        self.resolve_request(reqId, True)
         
     
-    def reqAccountSummary(self, reqId: int, groupName: str = "All", tags: str = "$LEDGER:USD", keep_stored: bool = False, 
+    def reqAccountSummary(self, reqId: int = None, groupName: str = "All", tags: str = "$LEDGER:USD", keep_stored: bool = False, 
                           timeout: float = 4.0) -> pd.DataFrame:
         
         """
@@ -1244,8 +1995,8 @@ class IB_Trading(EWrapper, EClient):
         
         Parámetros:
         -----------
-        reqId : int
-            Identificador único para la solicitud del resumen de la cuenta.
+        reqId : int, opcional
+            Identificador único para la solicitud del resumen de la cuenta. Si es `None` (por defecto), se asigna automáticamente.
             
         groupName : str, opcional
             Nombre del grupo de cuentas que se desean consultar. Por defecto, se consulta 'All' (todas las cuentas disponibles).
@@ -1255,8 +2006,8 @@ class IB_Trading(EWrapper, EClient):
             de los libros contables en USD ('$LEDGER:USD').
             
         keep_stored : bool, opcional
-            Indica si se debe mantener almacenado el resumen de la cuenta en el atributo `self.account_summary`.
-            Por defecto es `False`.
+            Indica si se debe mantener almacenado el resumen de la cuenta en el atributo `self.account_summary` (requiere
+            indicar el `reqId`). Por defecto es `False`.
             
         timeout : float, opcional
             Tiempo máximo (en segundos) para esperar la respuesta del servidor. El valor predeterminado es de 4.0 segundos.
@@ -1266,20 +2017,29 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : Resumen de la cuenta solicitada.
         """
         
-        # Limpiar Evento y lista
-        self.evento_uso_comun.clear()
-        self.account_summary.clear()
+        # Los datos almacenados se consultan por su reqId, por lo que debe indicarlo quien los solicita
+        if reqId is None and keep_stored:
+            raise ValueError("Para mantener almacenados los datos (keep_stored=True) se debe proporcionar el reqId")
+        # Asignar Id automáticamente (Opcional)
+        id_automatico = reqId is None
+        if id_automatico:
+            reqId = self.next_request_id()
+        # Registrar Petición
+        futuro = self.register_request(reqId)
+        # Limpiar registros previos de la misma solicitud
+        self.account_summary[:] = [registro for registro in self.account_summary if registro["reqId"] != reqId]
         # Llamar al método de la clase Padre
         super().reqAccountSummary(reqId=reqId, groupName=groupName, tags=tags)
         # Esperar respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
+        respuesta = self.wait_request(reqId, futuro, timeout=timeout)
         # Cancelar Suscripción
         self.cancelAccountSummary(reqId=reqId)
+        if id_automatico:
+            self.release_request_id(reqId)
         if respuesta:
-            account_summary = pd.DataFrame(self.account_summary)
+            account_summary = pd.DataFrame([registro for registro in self.account_summary if registro["reqId"] == reqId])
             if not keep_stored:
-                self.account_summary.clear()
+                self.account_summary[:] = [registro for registro in self.account_summary if registro["reqId"] != reqId]
                 
             return account_summary
         
@@ -1309,14 +2069,18 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Almacenar
-        diccionario = {"Cuenta": account, "Símbolo": contract.symbol, "Tipo Activo": contract.secType,
-                       "exchange": contract.exchange, "Cantidad": position, "Costo Promedio": avgCost,
-                       "Valor Total Posición": position * avgCost, "contrato": contract}
-        self.posiciones.append(diccionario)
-        # Mostrar Consola
-        if self.verbose:
-            print(diccionario)
+        # Actualizar Griegas del Portafolio
+        if self.griegas.activo:
+            self.griegas.actualizar_posicion(account, contract, position)
+        # Almacenar (sólo durante una petición de `reqPositions`)
+        if self.recibiendo_posiciones:
+            diccionario = {"Cuenta": account, "Símbolo": contract.symbol, "Tipo Activo": contract.secType,
+                           "exchange": contract.exchange, "Cantidad": position, "Costo Promedio": avgCost,
+                           "Valor Total Posición": position * avgCost, "contrato": contract}
+            self.posiciones.append(diccionario)
+            # Mostrar Consola
+            if self.verbose:
+                print(diccionario)
         
         
     def positionEnd(self) -> None:
@@ -1329,8 +2093,10 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Establecer Evento
-        self.evento_uso_comun.set()
+        # Dejar de almacenar las actualizaciones posteriores
+        self.recibiendo_posiciones = False
+        # Resolver Petición
+        self.resolve_request("positions", True)
         
         
     def reqPositions(self, keep_stored: bool = False, timeout: float = 5.0) -> pd.DataFrame:
@@ -1352,16 +2118,19 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : Un DataFrame con las posiciones abiertas en la cuenta.
         """
         
-        # Limpiar Evento y lista de posiciones
-        self.evento_uso_comun.clear()
+        # Registrar Petición
+        futuro = self.register_request("positions")
+        # Limpiar lista
         self.posiciones.clear()
+        self.recibiendo_posiciones = True
         # Llamar al método de SuperClase
         super().reqPositions()
         # Esperar Respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
-        # Cancelar Suscripción a las posiciones
-        self.cancelPositions()
+        respuesta = self.wait_request("positions", futuro, timeout=timeout)
+        self.recibiendo_posiciones = False
+        # Cancelar Suscripción a las posiciones (se mantiene si la utiliza el agregador de griegas)
+        if not self.griegas.activo:
+            self.cancelPositions()
         # Comprobar Respuesta
         if respuesta:
             if len(self.posiciones) == 0:
@@ -1373,6 +2142,79 @@ class IB_Trading(EWrapper, EClient):
             return posiciones
         
         
+    def reqPortfolioGreeks(self, timeout: float = 5.0) -> AgregadorGriegas:
+        
+        """
+        Método que inicia el seguimiento de las griegas del portafolio: se suscribe a las posiciones de la cuenta (sin
+        cancelarlas, para recibir cada cambio, que sólo se envía al agregador) y a los datos de mercado de cada opción. Los totales se actualizan en cada
+        tick y se consultan con `self.griegas.exposicion(subyacente=..., cuenta=...)`.
+        
+        Parámetros:
+        -----------
+        timeout : float, opcional
+            Tiempo máximo (en segundos) para esperar las posiciones iniciales. Por defecto, es de 5.0 segundos.
+            
+        Salida:
+        -------
+        return: AgregadorGriegas : Agregador de griegas (`self.griegas`).
+        """
+        
+        # Activar Agregador
+        self.griegas.activo = True
+        # Registrar Petición
+        futuro = self.register_request("positions")
+        # Suscribirse a las Posiciones
+        super().reqPositions()
+        # Esperar las Posiciones Iniciales
+        self.wait_request("positions", futuro, timeout=timeout)
+        
+        return self.griegas
+    
+    
+    def cancelPortfolioGreeks(self) -> None:
+        
+        """
+        Método que detiene el seguimiento de las griegas del portafolio (posiciones y datos de mercado de las opciones).
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.cancelPositions()
+        self.griegas.detener()
+        
+        
+    def tickOptionComputation(self, reqId: int, tickType: int, tickAttrib: int, impliedVol: float, delta: float, optPrice: float,
+                              pvDividend: float, gamma: float, vega: float, theta: float, undPrice: float) -> None:
+        
+        """
+        Método que recibe los cálculos de IB (volatilidad implícita y griegas) de una suscripción de opciones y actualiza
+        las griegas del portafolio.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick (10: Bid, 11: Ask, 12: Last, 13: Modelo y sus equivalentes retrasados 80-83).
+            
+        tickAttrib : int
+            Indica si el cálculo se basa en el precio (0) o en la volatilidad implícita (1).
+            
+        impliedVol, delta, optPrice, pvDividend, gamma, vega, theta, undPrice : float
+            Volatilidad implícita, griegas, precio de la opción, valor presente de los dividendos y precio del subyacente.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Actualizar Griegas del Portafolio
+        self.griegas.actualizar_griegas(reqId, tickType, delta, gamma, vega, theta)
+        
+        
     def pnl(self, reqId: int, dailyPnL: float, unrealizedPnL: float, realizedPnL: float) -> None:
         
         """
@@ -1405,19 +2247,19 @@ class IB_Trading(EWrapper, EClient):
         # Desplegar en Consola
         if self.verbose:
             print(info)
-        # Establecer Evento
-        self.evento_uso_comun.set()
+        # Resolver Petición (Primera actualización recibida)
+        self.resolve_request(reqId, True)
         
         
-    def reqPnL(self, reqId: int, account: str, modelCode: str = "", keep_stored: bool = False, timeout: float = 2.0) -> pd.DataFrame:
+    def reqPnL(self, reqId: int = None, account: str = None, modelCode: str = "", keep_stored: bool = False, timeout: float = 2.0) -> pd.DataFrame:
         
         """
         Método que solicita información sobre las Ganancias y Pérdidas de la cuenta.
         
         Parámetros:
         -----------
-        reqId : int
-            Identificador único de la solicitud asociada al cálculo del PnL.
+        reqId : int, opcional
+            Identificador único de la solicitud asociada al cálculo del PnL. Si es `None` (por defecto), se asigna automáticamente.
             
         account : str
             El Identificador de la cuenta para la cual se desea obtener la información del PnL.
@@ -1426,8 +2268,8 @@ class IB_Trading(EWrapper, EClient):
             Código del modelo para obtener los PnL asociados a un modelo específico. Si no se proporciona, se utiliza una cade de texto vacía.
             
         keep_stored : bool, opcional
-            Indica si se debe mantener almacenado el resumen de las ganancias y pérdidas de la cuenta en  `self.pnl_account`.
-            Por defecto es `False`.
+            Indica si se debe mantener almacenado el resumen de las ganancias y pérdidas de la cuenta en  `self.pnl_account`
+            (requiere indicar el `reqId`). Por defecto es `False`.
             
         timeout : float, opcional
             Tiempo máximo (en segundos) para esperar la respuesta del servidor. El valor predeterminado es de 2.0 segundos.
@@ -1437,21 +2279,33 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : Un DataFrame con la información de las ganancias y pérdidas de la cuenta.
         """
         
-        # Limpiar Evento y lista de PnL
-        self.evento_uso_comun.clear()
-        self.pnl_account.clear()
+        # Validar Cuenta
+        if account is None:
+            raise ValueError("Se debe proporcionar la cuenta de la solicitud")
+        # Los datos almacenados se consultan por su reqId, por lo que debe indicarlo quien los solicita
+        if reqId is None and keep_stored:
+            raise ValueError("Para mantener almacenados los datos (keep_stored=True) se debe proporcionar el reqId")
+        # Asignar Id automáticamente (Opcional)
+        id_automatico = reqId is None
+        if id_automatico:
+            reqId = self.next_request_id()
+        # Registrar Petición
+        futuro = self.register_request(reqId)
+        # Limpiar registros previos de la misma solicitud
+        self.pnl_account[:] = [registro for registro in self.pnl_account if registro["reqId"] != reqId]
         # Llamar al método de SuperClase
         super().reqPnL(reqId=reqId, account=account, modelCode=modelCode)
         # Esperar Respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
+        respuesta = self.wait_request(reqId, futuro, timeout=timeout)
         # Cancelar Suscripción
         self.cancelPnL(reqId=reqId)
+        if id_automatico:
+            self.release_request_id(reqId)
         # Comprobar Respuesta
         if respuesta:
-            pnl = pd.DataFrame(self.pnl_account)
+            pnl = pd.DataFrame([registro for registro in self.pnl_account if registro["reqId"] == reqId])
             if not keep_stored:
-                self.pnl_account.clear()
+                self.pnl_account[:] = [registro for registro in self.pnl_account if registro["reqId"] != reqId]
                 
             return pnl
         
@@ -1519,7 +2373,7 @@ class IB_Trading(EWrapper, EClient):
         if posiciones is not False:
             salida["posiciones"] = posiciones
         # Solicitar PnL
-        pnl = self.reqPnL(reqId=1, account=account)
+        pnl = self.reqPnL(account=account)
         salida["pnl"] = pnl
         # Órdenes Abiertas
         ordenes = self.reqAllOpenOrders(keep_stored=False, timeout=3.0)
@@ -1527,7 +2381,7 @@ class IB_Trading(EWrapper, EClient):
             salida["ordenes"] = ordenes
         # Información de la Cuenta
         etiquetas = "AccountType,NetLiquidation,TotalCashValue,AvailableFunds"
-        resumen_cuenta = self.reqAccountSummary(reqId=1, groupName="All", tags=etiquetas)
+        resumen_cuenta = self.reqAccountSummary(groupName="All", tags=etiquetas)
         salida["resumen_cuenta"] = resumen_cuenta
         # Órdenes Completadas
         ordenes_completadas = self.reqCompletedOrders(apiOnly=False, keep_stored=False, timeout=3.0)
@@ -1639,6 +2493,527 @@ class IB_Trading(EWrapper, EClient):
                                          f"Cantidad: {posicion_individual['Cantidad']}")
             
     
+    def reqMktData(self, reqId: int, contract: Contract, genericTickList: str = "", snapshot: bool = False, 
+                   regulatorySnapshot: bool = False, mktDataOptions: list = []) -> None:
+        
+        """
+        Método que solicita datos de mercado en tiempo real para un contrato. Los ticks recibidos se guardan en el libro
+        de cotizaciones (`self.cotizaciones`).
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        contract : Contract
+            Objeto que especifica los detalles del contrato financiero.
+            
+        genericTickList : str, opcional
+            Lista de ticks genéricos separados por comas (por ejemplo, "104,106"). Por defecto, es "".
+            
+        snapshot : bool, opcional
+            Si es True, se recibe una sola cotización en lugar de una suscripción. Por defecto, es False.
+            
+        regulatorySnapshot : bool, opcional
+            Si es True, se solicita un snapshot regulatorio (con costo). Por defecto, es False.
+            
+        mktDataOptions : list, opcional
+            Opciones adicionales (uso interno de IB). Por defecto, es una lista vacía.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Registrar en el Libro de Cotizaciones
+        self.cotizaciones.registrar(reqId, contract)
+        # Mandar a llamar al método de las clases Padres
+        super().reqMktData(reqId, contract, genericTickList, snapshot, regulatorySnapshot, mktDataOptions)
+        
+        
+    def cancelMktData(self, reqId: int) -> None:
+        
+        """
+        Método que cancela una suscripción de datos de mercado y la retira del libro de cotizaciones.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Mandar a llamar al método de las clases Padres
+        super().cancelMktData(reqId)
+        # Retirar del Libro de Cotizaciones
+        self.cotizaciones.eliminar(reqId)
+        
+        
+    def reqMktDataBatch(self, contracts, max_in_flight: int = None, timeout: float = 11.0) -> dict:
+        
+        """
+        Método para obtener snapshots de datos de mercado (`reqMktData` con snapshot=True) de múltiples activos de forma
+        concurrente.
+        
+        Las peticiones se envían sin esperar la respuesta de las anteriores, manteniendo como máximo `max_in_flight`
+        snapshots en curso. Cada snapshot termina con `tickSnapshotEnd` (IB responde en un máximo de 11 segundos) y su
+        cotización se lee del libro (`self.cotizaciones`) antes de retirarla. Los snapshots utilizan el tipo de datos de
+        mercado vigente de la sesión (`reqMarketDataType`), que no se modifica para no afectar a las suscripciones abiertas.
+        
+        Parámetros:
+        -----------
+        contracts : list | dict
+            Contratos a consultar. Si es una lista, los resultados se indexan por la posición de cada contrato (dos contratos
+            pueden tener el mismo símbolo); si es un diccionario, se utilizan sus claves.
+            
+        max_in_flight : int, opcional
+            Número máximo de snapshots en curso al mismo tiempo. Por defecto, es `None` (las líneas de datos de mercado
+            que no utiliza el gestor de suscripciones).
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) de espera de cada snapshot. Por defecto, es de 11 segundos.
+            
+        Salida:
+        -------
+        return: dict : Diccionario {clave: dict} con la cotización de cada contrato (ver `QuoteBook.cotizacion`). Las
+                       peticiones fallidas tienen el valor `None`; las que agotaron su tiempo conservan los precios que
+                       alcanzaron a llegar.
+        """
+        
+        # Normalizar Contratos
+        if isinstance(contracts, dict):
+            pares = list(contracts.items())
+        else:
+            pares = list(enumerate(contracts))
+        if max_in_flight is None:
+            max_in_flight = max(1, self.suscripciones.max_lineas - self.suscripciones.lineas_en_uso() 
+                                - len(self.suscripciones.pendientes))
+        resultados = {}
+        en_curso = {}
+        candado = threading.Lock()
+        semaforo = threading.Semaphore(max_in_flight)
+        
+        # Leer la cotización de cada snapshot en cuanto termina
+        def completar(clave, reqId, futuro) -> None:
+            try:
+                futuro.result()
+                cotizacion = self.cotizaciones.cotizacion(reqId)
+            except FuturesTimeoutError:
+                cotizacion = self.cotizaciones.cotizacion(reqId)
+            except Exception as error:
+                self.logger.warning(f"Snapshot fallido: {reqId} ({clave}) - {error}")
+                cotizacion = None
+            with candado:
+                resultados[clave] = cotizacion
+                en_curso.pop(reqId, None)
+            self.snapshots_lote.discard(reqId)
+            self.cotizaciones.eliminar(reqId)
+            self.release_request_id(reqId)
+            semaforo.release()
+            
+        # Liberar los snapshots que excedieron su tiempo de espera
+        def expirar() -> None:
+            ahora = time.monotonic()
+            with candado:
+                vencidas = [reqId for reqId, limite in en_curso.items() if limite is not None and limite <= ahora]
+            for reqId in vencidas:
+                self.fail_request(reqId, FuturesTimeoutError(f"Tiempo de espera agotado en el Snapshot: {reqId}"))
+                
+        # Enviar Peticiones
+        futuros = []
+        for clave, contrato in pares:
+            while not semaforo.acquire(timeout=0.5):
+                expirar()
+            reqId = self.next_request_id()
+            futuro = self.register_request(reqId)
+            self.snapshots_lote.add(reqId)
+            with candado:
+                en_curso[reqId] = None if timeout is None else time.monotonic() + timeout
+            futuro.add_done_callback(lambda f, clave=clave, reqId=reqId: completar(clave, reqId, f))
+            futuros.append(futuro)
+            self.reqMktData(reqId, contrato, "", True, False, [])
+            
+        # Esperar a los snapshots restantes
+        while True:
+            pendientes = futures_wait(futuros, timeout=0.5).not_done
+            if len(pendientes) == 0:
+                break
+            expirar()
+            
+        return {clave: resultados.get(clave) for clave, _ in pares}
+        
+        
+    def tickPrice(self, reqId: int, tickType: int, price: float, attrib) -> None:
+        
+        """
+        Método que recibe los precios de una suscripción de datos de mercado y actualiza el libro de cotizaciones.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick (1: Bid, 2: Ask, 4: Last, 6: High, 7: Low, 9: Close, 14: Open y sus equivalentes retrasados).
+            
+        price : float
+            Precio recibido.
+            
+        attrib : TickAttrib
+            Atributos del tick.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Actualizar Libro
+        self.cotizaciones.actualizar_precio(reqId, tickType, price)
+        
+        
+    def tickSize(self, reqId: int, tickType: int, size: int) -> None:
+        
+        """
+        Método que recibe los tamaños (y el volumen) de una suscripción de datos de mercado y actualiza el libro de 
+        cotizaciones.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick (0: Bid Size, 3: Ask Size, 5: Last Size, 8: Volume y sus equivalentes retrasados).
+            
+        size : int
+            Tamaño recibido.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Actualizar Libro
+        self.cotizaciones.actualizar_tamano(reqId, tickType, size)
+        
+        
+    def tickGeneric(self, reqId: int, tickType: int, value: float) -> None:
+        
+        """
+        Método que recibe los valores genéricos de una suscripción de datos de mercado (volatilidad histórica e implícita,
+        número de operaciones) y actualiza el libro de cotizaciones.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick (23: Volatilidad Histórica, 24: Volatilidad Implícita, 54: Número de Operaciones).
+            
+        value : float
+            Valor recibido.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Actualizar Libro
+        self.cotizaciones.actualizar_generico(reqId, tickType, value)
+        
+        
+    def tickSnapshotEnd(self, reqId: int) -> None:
+        
+        """
+        Método que indica que se recibió la cotización completa de una petición de snapshot.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Liberar el lugar del snapshot en la rotación de suscripciones
+        self.suscripciones.fin_snapshot(reqId)
+        # Resolver Petición (sólo los snapshots de `reqMktDataBatch`)
+        if reqId in self.snapshots_lote:
+            self.resolve_request(reqId)
+        
+        
+    def reqStreamingBars(self, contract: Contract, resolutions: list = ["1 min"], source: str = "AllLast", on_bar=None, 
+                         capacity: int = 1000, seed_duration: str = None, reqId: int = None, whatToShow: str = None,
+                         useRTH: int = 0) -> AgregadorBarras:
+        
+        """
+        Método que construye barras OHLCV en tiempo real para un contrato, en varias resoluciones a la vez, a partir de 
+        datos tick-by-tick o de las barras de 5 segundos de `reqRealTimeBars`. Evita volver a descargar datos históricos 
+        para conocer la última vela: cada barra cerrada se notifica en cuanto se completa.
+        
+        Parámetros:
+        -----------
+        contract : Contract
+            Objeto que especifica los detalles del contrato financiero.
+            
+        resolutions : list, opcional
+            Resoluciones de las barras: de tiempo ("30 secs", "1 min", "30 mins", "1 hour") o por actividad ("500 ticks",
+            "10000 volume", "1000000 dollars"). Por defecto, es ["1 min"].
+            
+        source : str, opcional
+            Fuente de los datos: "AllLast", "Last", "MidPoint", "BidAsk" (tick-by-tick) o "RealTimeBars" (barras de 5 
+            segundos de operaciones). Por defecto, es "AllLast".
+            
+        on_bar : callable, opcional
+            Función `on_bar(agregador, resolucion, barra)` que se llama al cerrar cada barra. Por defecto, es `None`.
+            
+        capacity : int, opcional
+            Número de barras cerradas que se conservan por resolución. Por defecto, es 1000.
+            
+        seed_duration : str, opcional
+            Si se indica (por ejemplo, "15 D"), se descargan barras históricas de esa duración para cada resolución de 
+            tiempo y se cargan en el agregador antes de empezar. Por defecto, es `None`.
+            
+        reqId : int, opcional
+            Identificador de la petición. Si es `None`, se asigna automáticamente.
+            
+        whatToShow : str, opcional
+            Tipo de datos de la historia y de las barras de 5 segundos ("TRADES", "MIDPOINT", "ADJUSTED_LAST", etc.). Las
+            barras en tiempo real no admiten "ADJUSTED_LAST", por lo que en ese caso utilizan "TRADES". Si es `None` (por
+            defecto), es "MIDPOINT" para las fuentes "MidPoint" y "BidAsk" y "TRADES" para las demás.
+            
+        useRTH : int, opcional
+            1 para utilizar sólo el horario regular de negociación (en la historia y en las barras de 5 segundos), 0 para
+            todo el horario. Debe coincidir con el de los datos históricos con los que se compare la estrategia. Por
+            defecto, es 0.
+            
+        Salida:
+        -------
+        return: AgregadorBarras : Agregador con las barras de cada resolución (`agregador.barras(resolucion)`).
+        """
+        
+        # Crear Agregador
+        agregador = AgregadorBarras(resoluciones=resolutions, capacidad=capacity, nombre=contract.symbol)
+        if on_bar is not None:
+            agregador.al_cerrar(on_bar)
+        if whatToShow is None:
+            whatToShow = "MIDPOINT" if source in ("MidPoint", "BidAsk") else "TRADES"
+        # Cargar Historia (sólo barras de tiempo completas)
+        if seed_duration is not None:
+            for resolucion in resolutions:
+                tipo, periodo = interpretar_resolucion(resolucion)
+                if tipo != "tiempo":
+                    continue
+                datos = self.reqHistoricalData(contract=contract, durationStr=seed_duration, barSizeSetting=resolucion, 
+                                               whatToShow=whatToShow, useRTH=useRTH)
+                if datos is not None and len(datos) > 0:
+                    completas = datos.index + pd.Timedelta(periodo, unit="ns") <= datetime.now()
+                    agregador.cargar_historico(resolucion, datos[completas])
+        # Asignar Id y Registrar Agregador
+        if reqId is None:
+            reqId = self.next_request_id()
+        agregador.reqId, agregador.fuente = reqId, source
+        self.agregadores[reqId] = agregador
+        # Solicitar Datos
+        if source == "RealTimeBars":
+            super().reqRealTimeBars(reqId, contract, 5, "TRADES" if whatToShow == "ADJUSTED_LAST" else whatToShow, 
+                                    bool(useRTH), [])
+        else:
+            super().reqTickByTickData(reqId, contract, source, 0, False)
+        # Iniciar Reloj (cierra las barras de tiempo sin actividad)
+        if self.reloj_barras is None or not self.reloj_barras.is_alive():
+            self.reloj_barras = threading.Thread(target=self.cerrar_barras_vencidas, daemon=True)
+            self.reloj_barras.start()
+            
+        return agregador
+    
+    
+    def cancelStreamingBars(self, reqId: int) -> None:
+        
+        """
+        Método que cancela la transmisión de barras en tiempo real de un agregador.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición (`agregador.reqId`).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        agregador = self.agregadores.pop(reqId, None)
+        if agregador is None:
+            return
+        if agregador.fuente == "RealTimeBars":
+            super().cancelRealTimeBars(reqId)
+        else:
+            super().cancelTickByTickData(reqId)
+        self.release_request_id(reqId)
+        
+        
+    def cerrar_barras_vencidas(self, intervalo: float = 0.25) -> None:
+        
+        """
+        Método que ejecuta el reloj de los agregadores: cierra periódicamente las barras de tiempo cuyo periodo terminó. 
+        Termina cuando no quedan agregadores.
+        
+        Parámetros:
+        -----------
+        intervalo : float, opcional
+            Segundos entre revisiones. Por defecto, es 0.25.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        while len(self.agregadores) > 0:
+            ahora = time.time_ns()
+            for agregador in list(self.agregadores.values()):
+                # Las barras de 5 segundos llegan al terminar su periodo: dar margen de una barra
+                agregador.cerrar_vencidas(ahora, espera=5.5 if agregador.fuente == "RealTimeBars" else 0.5)
+            time.sleep(intervalo)
+            
+            
+    def tickByTickAllLast(self, reqId: int, tickType: int, time: int, price: float, size: int, tickAttribLast, 
+                          exchange: str, specialConditions: str) -> None:
+        
+        """
+        Método que recibe las operaciones tick-by-tick ("Last" y "AllLast") y las envía al agregador de barras.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición.
+            
+        tickType : int
+            1: "Last", 2: "AllLast".
+            
+        time : int
+            Tiempo de la operación (segundos desde 1970).
+            
+        price : float
+            Precio de la operación.
+            
+        size : int
+            Tamaño de la operación.
+            
+        tickAttribLast, exchange, specialConditions :
+            Atributos de la operación.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        agregador = self.agregadores.get(reqId)
+        if agregador is not None:
+            agregador.agregar_tick(time, price, size)
+            
+            
+    def tickByTickBidAsk(self, reqId: int, time: int, bidPrice: float, askPrice: float, bidSize: int, askSize: int, 
+                         tickAttribBidAsk) -> None:
+        
+        """
+        Método que recibe las cotizaciones tick-by-tick ("BidAsk") y envía su precio medio al agregador de barras.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición.
+            
+        time : int
+            Tiempo de la cotización (segundos desde 1970).
+            
+        bidPrice, askPrice : float
+            Precios de compra y venta.
+            
+        bidSize, askSize : int
+            Tamaños de compra y venta.
+            
+        tickAttribBidAsk :
+            Atributos de la cotización.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        agregador = self.agregadores.get(reqId)
+        if agregador is not None:
+            agregador.agregar_tick(time, (bidPrice + askPrice) / 2)
+            
+            
+    def tickByTickMidPoint(self, reqId: int, time: int, midPoint: float) -> None:
+        
+        """
+        Método que recibe el precio medio tick-by-tick ("MidPoint") y lo envía al agregador de barras.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición.
+            
+        time : int
+            Tiempo del tick (segundos desde 1970).
+            
+        midPoint : float
+            Precio medio.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        agregador = self.agregadores.get(reqId)
+        if agregador is not None:
+            agregador.agregar_tick(time, midPoint)
+            
+            
+    def realtimeBar(self, reqId: int, time: int, open_: float, high: float, low: float, close: float, volume: int, 
+                    wap: float, count: int) -> None:
+        
+        """
+        Método que recibe las barras de 5 segundos de `reqRealTimeBars` y las envía al agregador de barras.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición.
+            
+        time : int
+            Inicio de la barra (segundos desde 1970).
+            
+        open_, high, low, close : float
+            Precios de la barra.
+            
+        volume : int
+            Volumen de la barra.
+            
+        wap : float
+            Precio promedio ponderado por volumen.
+            
+        count : int
+            Número de operaciones de la barra.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        agregador = self.agregadores.get(reqId)
+        if agregador is not None:
+            agregador.agregar_barra(time, open_, high, low, close, volume, wap)
+            
+            
     def scannerData(self, reqId: int, rank: int, contractDetails, distance: str, benchmark: str, projection: str, legsStr: str) -> None:
         
         """
@@ -1672,6 +3047,11 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
 
+        # Escáner Continuo
+        escaner = self.escaneres.get(reqId)
+        if escaner is not None:
+            escaner.recibir(rank, contractDetails)
+            return
         # Almacenar registros
         registro = {
             
@@ -1708,12 +3088,21 @@ class IB_Trading(EWrapper, EClient):
         return: NoneType : None.
         """
         
-        # Establecer Evento
-        self.evento_uso_comun.set()
+        # Escáner Continuo (comparar con la actualización anterior)
+        escaner = self.escaneres.get(reqId)
+        if escaner is not None:
+            eventos = escaner.fin_lote()
+            # Liberar los detalles de los contratos que salieron
+            salidas = [conId for tipo, conId, _, _ in eventos if tipo == "salida"]
+            if len(salidas) > 0:
+                self.depurar_detalles_escaner(salidas)
+            return
+        # Resolver Petición
+        self.resolve_request(reqId, True)
         
         
-    def reqScannerSubscription(self, reqId: int, subscription: ScannerSubscription, scannerSubscriptionOptions: list, 
-                               scannerSubscriptionFilterOptions: list, keep_stored: bool = False, timeout: float = 15.0) -> pd.DataFrame:
+    def reqScannerSubscription(self, reqId: int = None, subscription: ScannerSubscription = None, scannerSubscriptionOptions: list = [], 
+                               scannerSubscriptionFilterOptions: list = [], keep_stored: bool = False, timeout: float = 15.0) -> pd.DataFrame:
         
         """
         Método para suscribirse a un escáner de mercado en tiempo real. Este escáner permite recibir información sobre instrumentos
@@ -1721,21 +3110,21 @@ class IB_Trading(EWrapper, EClient):
         
         Parámetros:
         -----------
-        reqId : int
-            Identificador único de la solicitud del escáner.
+        reqId : int, opcional
+            Identificador único de la solicitud del escáner. Si es `None` (por defecto), se asigna automáticamente.
 
         subscription : ScannerSubscription
             Objeto que define los criterios de búsqueda del escáner, como tipos de activos, exchanges y filtros.
 
-        scannerSubscriptionOptions : list
-            Opciones adicionales para la suscripción al scáner.
+        scannerSubscriptionOptions : list, opcional
+            Opciones adicionales para la suscripción al scáner. Por defecto, es una lista vacía.
 
-        scannerSubscriptionFilterOptions : list
-            Opciones específicas para aplicar filtros adicionales en la búsqueda.
+        scannerSubscriptionFilterOptions : list, opcional
+            Opciones específicas para aplicar filtros adicionales en la búsqueda. Por defecto, es una lista vacía.
             
         keep_stored : bool, opcional
-            Indica si se debe mantener almacenado el resultado del escáner en `self.escaner_resultados`.
-            Por defecto es `False`.
+            Indica si se debe mantener almacenado el resultado del escáner en `self.escaner_resultados` (requiere indicar
+            el `reqId`). Por defecto es `False`.
             
         timeout : float, opcional
             Tiempo máximo (en segundos) para esperar la respuesta del servidor. El valor predeterminado es de 15.0 segundos.
@@ -1745,8 +3134,18 @@ class IB_Trading(EWrapper, EClient):
         return: pd.DataFrame : Un DataFrame con el resultado del Escáner.
         """
         
-        # Limpiar Evento
-        self.evento_uso_comun.clear()
+        # Validar Suscripción
+        if subscription is None:
+            raise ValueError("Se debe proporcionar la suscripción del escáner")
+        # Los datos almacenados se consultan por su reqId, por lo que debe indicarlo quien los solicita
+        if reqId is None and keep_stored:
+            raise ValueError("Para mantener almacenados los datos (keep_stored=True) se debe proporcionar el reqId")
+        # Asignar Id automáticamente (Opcional)
+        id_automatico = reqId is None
+        if id_automatico:
+            reqId = self.next_request_id()
+        # Registrar Petición
+        futuro = self.register_request(reqId)
         # Hacer un reset de la clave si ya existe
         if reqId in self.escaner_resultados:
             self.escaner_resultados[reqId].clear()
@@ -1754,10 +3153,11 @@ class IB_Trading(EWrapper, EClient):
         super().reqScannerSubscription(reqId=reqId, subscription=subscription, scannerSubscriptionOptions=scannerSubscriptionOptions, 
                                        scannerSubscriptionFilterOptions=scannerSubscriptionFilterOptions)
         # Esperar respuesta
-        respuesta = self.evento_uso_comun.wait(timeout=timeout)
-        self.evento_uso_comun.clear()
+        respuesta = self.wait_request(reqId, futuro, timeout=timeout)
         # Cancelar Suscripción
         self.cancelScannerSubscription(reqId=reqId)
+        if id_automatico:
+            self.release_request_id(reqId)
         # Validar Petición
         if respuesta:
             # Convertir a DataFrame
@@ -1767,6 +3167,145 @@ class IB_Trading(EWrapper, EClient):
                 
             return escaner_resultados
         
+        
+    def reqScannerStream(self, subscription: ScannerSubscription = None, scannerSubscriptionOptions: list = [],
+                         scannerSubscriptionFilterOptions: list = [], on_change=None, timeout: float = 15.0) -> EscanerContinuo:
+        
+        """
+        Método que abre (o reutiliza) una suscripción del escáner que permanece abierta. Cada actualización que envía IB se
+        compara con la anterior y genera eventos de entrada, salida y cambio de posición, sin volver a suscribirse.
+        
+        Parámetros:
+        -----------
+        subscription : ScannerSubscription
+            Objeto que define los criterios de búsqueda del escáner. Si ya hay un escáner continuo abierto con los mismos
+            criterios, se reutiliza.
+            
+        scannerSubscriptionOptions, scannerSubscriptionFilterOptions : list, opcional
+            Los mismos parámetros que `reqScannerSubscription`.
+            
+        on_change : callable, opcional
+            Función `on_change(escaner, eventos)` que se llama en cada actualización con cambios. Por defecto, es `None`.
+            
+        timeout : float, opcional
+            Tiempo máximo (en segundos) para esperar la primera actualización. Con 0 no se espera. Por defecto, es de
+            15.0 segundos.
+            
+        Salida:
+        -------
+        return: EscanerContinuo : Escáner continuo (`escaner.resultados()` devuelve el resultado actual).
+        """
+        
+        # Validar Suscripción
+        if subscription is None:
+            raise ValueError("Se debe proporcionar la suscripción del escáner")
+        # Reutilizar un Escáner con los mismos criterios
+        clave = (tuple(sorted(vars(subscription).items())), str(scannerSubscriptionOptions), str(scannerSubscriptionFilterOptions))
+        escaner = next((escaner for escaner in self.escaneres.values() if escaner.clave == clave), None)
+        if escaner is None:
+            reqId = self.next_request_id()
+            escaner = EscanerContinuo(reqId=reqId, subscription=subscription, detalles=self.detalles_escaner,
+                                      opciones=scannerSubscriptionOptions, filtros=scannerSubscriptionFilterOptions)
+            escaner.clave = clave
+            self.escaneres[reqId] = escaner
+            super().reqScannerSubscription(reqId=reqId, subscription=subscription, 
+                                           scannerSubscriptionOptions=scannerSubscriptionOptions, 
+                                           scannerSubscriptionFilterOptions=scannerSubscriptionFilterOptions)
+        if on_change is not None:
+            escaner.al_cambiar(on_change)
+        # Esperar la primera actualización
+        if timeout and not escaner.esperar(timeout=timeout):
+            self.logger.warning(f"Tiempo de espera agotado en el Escáner: {escaner.reqId}")
+            
+        return escaner
+    
+    
+    def reenviar_escaneres(self) -> None:
+        
+        """
+        Método que vuelve a enviar las suscripciones de los escáneres continuos (después de una reconexión o de recuperar
+        la conexión con pérdida de datos). Cada escáner conserva su reqId y su último resultado.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        for reqId, escaner in list(self.escaneres.items()):
+            escaner.reiniciar_lote()
+            super().reqScannerSubscription(reqId=reqId, subscription=escaner.subscription, 
+                                           scannerSubscriptionOptions=escaner.opciones, 
+                                           scannerSubscriptionFilterOptions=escaner.filtros)
+            
+            
+    def cancelScannerStream(self, reqId: int) -> None:
+        
+        """
+        Método que cancela un escáner continuo.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador del escáner (`escaner.reqId`).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        escaner = self.escaneres.pop(reqId, None)
+        if escaner is None:
+            return
+        self.cancelScannerSubscription(reqId=reqId)
+        self.release_request_id(reqId)
+        self.retirar_detalles_escaner(escaner)
+        
+        
+    def depurar_detalles_escaner(self, conIds) -> None:
+        
+        """
+        Método que elimina de `detalles_escaner` los contratos que ya no aparecen en ningún escáner continuo activo, para
+        que el diccionario compartido no crezca sin límite durante la sesión.
+        
+        Parámetros:
+        -----------
+        conIds : iterable
+            conIds candidatos a eliminarse (los que salieron de un escáner o los de un escáner retirado).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Contratos en uso (resultado actual y actualización en recepción de cada escáner)
+        en_uso = set()
+        for escaner in list(self.escaneres.values()):
+            en_uso.update(escaner.ranking)
+            en_uso.update(conId for conId, _ in escaner.lote)
+        for conId in set(conIds) - en_uso:
+            self.detalles_escaner.pop(conId, None)
+            
+            
+    def retirar_detalles_escaner(self, escaner: EscanerContinuo) -> None:
+        
+        """
+        Método que separa un escáner cancelado o fallido del diccionario compartido de detalles: el escáner conserva una
+        copia propia de los detalles de su último resultado (para `resultados`) y el resto se depura.
+        
+        Parámetros:
+        -----------
+        escaner : EscanerContinuo
+            Escáner retirado de `self.escaneres`.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        compartidos = escaner.detalles
+        escaner.detalles = {conId: compartidos[conId] for conId in escaner.ranking if conId in compartidos}
+        self.depurar_detalles_escaner(list(escaner.detalles) + [conId for conId, _ in escaner.lote])
+        
 
 # Recordatorio:
 if __name__ == "__main__":
@@ -1866,13 +3405,12 @@ if __name__ == "__main__":
     IB_Instancia.Save_to_DB(df=df_casi_max, db_path=db_path, table_name=table_name)        
         
     # Leer Datos Parciales
-    conn = sqlite3.connect(db_path)
-    datos_db = pd.read_sql(sql=f"SELECT * FROM {table_name}", con=conn)
+    datos_db = IB_Instancia.Read_from_DB(db_path=db_path, table_name=table_name)
     print(datos_db)        
     # Agregar Más Datos a Base de Datos Existente
     IB_Instancia.Save_to_DB(df=df_restantes_max, db_path=db_path, table_name=table_name)
     # Leer Datos Completados
-    datos_db = pd.read_sql(sql=f"SELECT * FROM {table_name}", con=conn)    
+    datos_db = IB_Instancia.Read_from_DB(db_path=db_path, table_name=table_name)
     print(datos_db)            
     if len(datos_db) == len(df_max):
         print("!Datos guardados exitosamente!")
@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+
+# Los indicadores de este módulo reciben paneles (tiempo x activo): un DataFrame con una columna por activo, o un arreglo
+# de NumPy de dos dimensiones. Todos los activos se calculan en una sola pasada vectorizada y el resultado conserva el
+# índice y las columnas del panel de entrada.
+
+# Función que construye un panel a partir de los DataFrames de varios activos
+def panel_desde(datos: dict, columna: str = "Close") -> pd.DataFrame:
+    
+    """
+    Función que construye un panel (tiempo x activo) con una columna de los DataFrames de varios activos, alineando sus
+    fechas (las fechas que faltan en un activo quedan como NaN).
+    
+    Parámetros:
+    -----------
+    datos : dict
+        Diccionario {activo: pd.DataFrame}, por ejemplo el resultado de `IB_Trading.reqHistoricalDataBatch`. Los
+        valores `None` se omiten.
+        
+    columna : str, opcional
+        Columna a extraer. Por defecto, es "Close".
+        
+    Salida:
+    -------
+    return: pd.DataFrame : Panel con una columna por activo.
+    """
+    
+    return pd.DataFrame({activo: df[columna] for activo, df in datos.items() if df is not None}).sort_index()
+
+
+# Función que convierte un panel en un arreglo de NumPy
+def a_arreglo(panel) -> tuple:
+    
+    """
+    Función que convierte un panel en un arreglo float64 de dos dimensiones y devuelve una función que reconstruye el
+    formato de entrada (DataFrame con el mismo índice y columnas, o arreglo).
+    """
+    
+    if isinstance(panel, pd.Series):
+        panel = panel.to_frame()
+    if isinstance(panel, pd.DataFrame):
+        index, columns = panel.index, panel.columns
+        return panel.to_numpy(dtype="float64"), lambda valores: pd.DataFrame(valores, index=index, columns=columns)
+    arreglo = np.asarray(panel, dtype="float64")
+    if arreglo.ndim == 1:
+        arreglo = arreglo[:, None]
+        
+    return arreglo, lambda valores: valores
+
+
+# Función que calcula sumas móviles con sumas acumuladas
+def suma_movil(x: np.ndarray, ventana: int) -> tuple:
+    
+    """
+    Función que calcula la suma móvil de cada columna con sumas acumuladas (O(T) sin importar la ventana).
+    
+    Parámetros:
+    -----------
+    x : np.ndarray
+        Arreglo (tiempo x activo). Los NaN no se suman.
+        
+    ventana : int
+        Número de periodos de la ventana.
+        
+    Salida:
+    -------
+    return: tuple : (suma, conteo) de valores válidos de cada ventana (NaN/0 en las primeras `ventana - 1` filas).
+    """
+    
+    acumulada = np.zeros((x.shape[0] + 1, x.shape[1]))
+    suma = np.full(x.shape, np.nan)
+    conteo = np.zeros(x.shape, dtype="int64")
+    validos = ~np.isnan(x)
+    # Sin NaN, todas las ventanas completas tienen `ventana` valores
+    if validos.all():
+        np.cumsum(x, axis=0, out=acumulada[1:])
+        np.subtract(acumulada[ventana:], acumulada[:-ventana], out=suma[ventana - 1:])
+        conteo[ventana - 1:] = ventana
+        return suma, conteo
+    np.cumsum(np.where(validos, x, 0.0), axis=0, out=acumulada[1:])
+    conteo_acumulado = np.zeros((x.shape[0] + 1, x.shape[1]), dtype="int64")
+    np.cumsum(validos, axis=0, out=conteo_acumulado[1:])
+    np.subtract(acumulada[ventana:], acumulada[:-ventana], out=suma[ventana - 1:])
+    np.subtract(conteo_acumulado[ventana:], conteo_acumulado[:-ventana], out=conteo[ventana - 1:])
+    
+    return suma, conteo
+
+
+# Función que calcula la media y la desviación estándar móviles
+def media_desviacion_movil(x: np.ndarray, ventana: int) -> tuple:
+    
+    """
+    Función que calcula la media y la desviación estándar (ddof=1) móviles de cada columna, con sumas acumuladas de x y
+    x². Los datos se centran por columna antes de acumular para reducir el error de redondeo. Una ventana con algún NaN
+    produce NaN (como `rolling(ventana)` de pandas).
+    """
+    
+    centro = np.nanmean(x, axis=0) if np.isfinite(x).any() else np.zeros(x.shape[1])
+    centrado = x - np.nan_to_num(centro)
+    suma, conteo = suma_movil(centrado, ventana)
+    suma_cuadrados, _ = suma_movil(centrado ** 2, ventana)
+    completa = conteo == ventana
+    media = np.where(completa, suma / ventana, np.nan)
+    varianza = np.where(completa, (suma_cuadrados - ventana * media ** 2) / (ventana - 1), np.nan) if ventana > 1 else \
+        np.full(x.shape, np.nan)
+    desviacion = np.sqrt(np.clip(varianza, 0.0, None))
+    
+    return media + np.nan_to_num(centro), desviacion
+
+
+# Función que aplica un suavizado exponencial por columnas
+def suavizado_exponencial(x: np.ndarray, alpha: float) -> np.ndarray:
+    
+    """
+    Función que aplica un suavizado exponencial y_t = alpha * x_t + (1 - alpha) * y_{t-1} a todas las columnas a la vez
+    (un recorrido en el tiempo, vectorizado entre activos). Empieza en el primer valor válido de cada columna y los NaN
+    conservan el valor anterior (equivale a `ewm(alpha=alpha, adjust=False, ignore_na=True).mean()`).
+    """
+    
+    resultado = np.full(x.shape, np.nan)
+    anterior = np.full(x.shape[1], np.nan)
+    for t in range(x.shape[0]):
+        fila = x[t]
+        anterior = np.where(np.isnan(anterior), fila, np.where(np.isnan(fila), anterior, alpha * fila + (1 - alpha) * anterior))
+        resultado[t] = anterior
+        
+    return resultado
+
+
+# Función que detecta los cruces entre dos medias móviles
+def detectar_cruces(rapida: np.ndarray, lenta: np.ndarray) -> np.ndarray:
+    
+    """
+    Función que detecta los cruces entre dos medias móviles con las mismas reglas que `Cruce_MA`: 1 cuando la media
+    rápida pasa a estar por encima de la lenta, -1 cuando pasa a estar por debajo y NaN en el resto de las filas.
+    """
+    
+    diferencia = rapida - lenta
+    cruces = np.full(diferencia.shape, np.nan)
+    with np.errstate(invalid="ignore"):
+        cruces[1:][(diferencia[1:] > 0) & (diferencia[:-1] < 0)] = 1.0
+        cruces[1:][(diferencia[1:] < 0) & (diferencia[:-1] > 0)] = -1.0
+        
+    return cruces
+
+
+# Función que propaga el último valor válido de cada columna
+def propagar(x: np.ndarray) -> np.ndarray:
+    
+    """
+    Función que propaga hacia adelante el último valor válido de cada columna (equivale a `ffill()` de pandas).
+    """
+    
+    filas = np.where(np.isnan(x), 0, np.arange(x.shape[0])[:, None])
+    np.maximum.accumulate(filas, axis=0, out=filas)
+    
+    return x[filas, np.arange(x.shape[1])]
+
+
+# -------------------------------------------------- Indicadores --------------------------------------------------
+
+# Función que calcula la media móvil simple
+def sma(panel, ventana: int):
+    
+    """
+    Función que calcula la media móvil simple de todos los activos (igual a `rolling(ventana).mean()`).
+    
+    Parámetros:
+    -----------
+    panel : pd.DataFrame | np.ndarray
+        Panel de precios (tiempo x activo).
+        
+    ventana : int
+        Número de periodos.
+        
+    Salida:
+    -------
+    return: pd.DataFrame | np.ndarray : Media móvil con la forma del panel.
+    """
+    
+    x, formato = a_arreglo(panel)
+    suma, conteo = suma_movil(x, ventana)
+    suma /= ventana
+    suma[conteo < ventana] = np.nan
+    
+    return formato(suma)
+
+
+# Función que calcula la media móvil exponencial
+def ema(panel, ventana: int):
+    
+    """
+    Función que calcula la media móvil exponencial de todos los activos (igual a `ewm(span=ventana, adjust=False)`).
+    
+    Parámetros:
+    -----------
+    panel : pd.DataFrame | np.ndarray
+        Panel de precios (tiempo x activo).
+        
+    ventana : int
+        Número de periodos (span).
+        
+    Salida:
+    -------
+    return: pd.DataFrame | np.ndarray : Media móvil exponencial con la forma del panel.
+    """
+    
+    x, formato = a_arreglo(panel)
+    
+    return formato(suavizado_exponencial(x, 2 / (ventana + 1)))
+
+
+# Función que calcula el cruce de medias móviles de todos los activos
+def cruce_ma(panel, tendencia_rapida: int, tendencia_lenta: int, tipo: str = "sma", tendencia_continua: bool = True) -> dict:
+    
+    """
+    Función que calcula el cruce de medias móviles de todos los activos, con las mismas reglas que
+    `Analisis_Tecnico.Cruce_MA`.
+    
+    Parámetros:
+    -----------
+    panel : pd.DataFrame | np.ndarray
+        Panel de precios de cierre (tiempo x activo).
+        
+    tendencia_rapida : int
+        Número de periodos para la media móvil rápida.
+        
+    tendencia_lenta : int
+        Número de periodos para la media móvil lenta.
+        
+    tipo : str, opcional
+        "sma" (media simple, como `Cruce_MA`) o "ema" (media exponencial). Por defecto, es "sma".
+        
+    tendencia_continua : bool, opcional
+        Si es True, se agrega el panel "Tendencia" (último cruce de cada activo). Por defecto, es True.
+        
+    Salida:
+    -------
+    return: dict : Paneles "MA_Rapida", "MA_Lenta", "Cruces" (1, -1 o NaN) y "Tendencia". Utilice `cruce_ma_activo`
+                   para obtener el formato de `Cruce_MA` de un activo.
+    """
+    
+    x, formato = a_arreglo(panel)
+    media = sma if tipo == "sma" else ema
+    rapida = media(x, tendencia_rapida)
+    lenta = media(x, tendencia_lenta)
+    cruces = detectar_cruces(rapida, lenta)
+    resultado = {"MA_Rapida": formato(rapida), "MA_Lenta": formato(lenta), "Cruces": formato(cruces)}
+    # Tendencia Continua (último cruce de cada columna)
+    if tendencia_continua:
+        resultado["Tendencia"] = formato(propagar(cruces))
+        
+    return resultado
+
+
+# Función que extrae el cruce de medias móviles de un activo
+def cruce_ma_activo(resultado: dict, activo) -> pd.DataFrame:
+    
+    """
+    Función que extrae de `cruce_ma` un activo con el formato de `Analisis_Tecnico.Cruce_MA`.
+    
+    Parámetros:
+    -----------
+    resultado : dict
+        Resultado de `cruce_ma` (calculado sobre un DataFrame).
+        
+    activo :
+        Columna del activo.
+        
+    Salida:
+    -------
+    return: pd.DataFrame : Columnas MA_Rapida, MA_Lenta, Cruces y (si existe) Tendencia.
+    """
+    
+    return pd.DataFrame({nombre: panel[activo] for nombre, panel in resultado.items()})
+
+
+# Función que calcula el RSI
+def rsi(panel, ventana: int = 14):
+    
+    """
+    Función que calcula el índice de fuerza relativa (RSI) de Wilder de todos los activos.
+    
+    Parámetros:
+    -----------
+    panel : pd.DataFrame | np.ndarray
+        Panel de precios de cierre (tiempo x activo).
+        
+    ventana : int, opcional
+        Número de periodos. Por defecto, es 14.
+        
+    Salida:
+    -------
+    return: pd.DataFrame | np.ndarray : RSI (0 a 100) con la forma del panel.
+    """
+    
+    x, formato = a_arreglo(panel)
+    cambios = np.vstack([np.full((1, x.shape[1]), np.nan), np.diff(x, axis=0)])
+    ganancias = suavizado_exponencial(np.where(np.isnan(cambios), np.nan, np.clip(cambios, 0.0, None)), 1 / ventana)
+    perdidas = suavizado_exponencial(np.where(np.isnan(cambios), np.nan, np.clip(-cambios, 0.0, None)), 1 / ventana)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        indice = 100 - 100 / (1 + ganancias / perdidas)
+    indice = np.where((perdidas == 0) & (ganancias > 0), 100.0, indice)
+    # Descartar los primeros periodos (el suavizado aún no tiene suficientes datos)
+    validos = np.cumsum(~np.isnan(cambios), axis=0)
+    indice[validos < ventana] = np.nan
+    
+    return formato(indice)
+
+
+# Función que calcula el ATR
+def atr(high, low, close, ventana: int = 14):
+    
+    """
+    Función que calcula el rango verdadero promedio (ATR) de Wilder de todos los activos.
+    
+    Parámetros:
+    -----------
+    high, low, close : pd.DataFrame | np.ndarray
+        Paneles de precios máximos, mínimos y de cierre (tiempo x activo).
+        
+    ventana : int, opcional
+        Número de periodos. Por defecto, es 14.
+        
+    Salida:
+    -------
+    return: pd.DataFrame | np.ndarray : ATR con la forma del panel.
+    """
+    
+    maximo, formato = a_arreglo(high)
+    minimo, _ = a_arreglo(low)
+    cierre, _ = a_arreglo(close)
+    cierre_anterior = np.vstack([np.full((1, cierre.shape[1]), np.nan), cierre[:-1]])
+    rango = np.fmax(maximo - minimo, np.fmax(np.abs(maximo - cierre_anterior), np.abs(minimo - cierre_anterior)))
+    resultado = suavizado_exponencial(rango, 1 / ventana)
+    resultado[np.cumsum(~np.isnan(rango), axis=0) < ventana] = np.nan
+    
+    return formato(resultado)
+
+
+# Función que calcula las Bandas de Bollinger
+def bollinger(panel, ventana: int = 20, desviaciones: float = 2.0) -> dict:
+    
+    """
+    Función que calcula las Bandas de Bollinger de todos los activos.
+    
+    Parámetros:
+    -----------
+    panel : pd.DataFrame | np.ndarray
+        Panel de precios de cierre (tiempo x activo).
+        
+    ventana : int, opcional
+        Número de periodos. Por defecto, es 20.
+        
+    desviaciones : float, opcional
+        Número de desviaciones estándar de las bandas. Por defecto, es 2.0.
+        
+    Salida:
+    -------
+    return: dict : Paneles "Media", "Superior", "Inferior" y "%B" (posición del precio dentro de las bandas).
+    """
+    
+    x, formato = a_arreglo(panel)
+    media, desviacion = media_desviacion_movil(x, ventana)
+    superior = media + desviaciones * desviacion
+    inferior = media - desviaciones * desviacion
+    with np.errstate(divide="ignore", invalid="ignore"):
+        porcentaje_b = (x - inferior) / (superior - inferior)
+        
+    return {"Media": formato(media), "Superior": formato(superior), "Inferior": formato(inferior),
+            "%B": formato(porcentaje_b)}
+
+
+# Función que calcula el z-score móvil
+def zscore(panel, ventana: int = 20):
+    
+    """
+    Función que calcula el z-score móvil (precio menos la media, entre la desviación estándar) de todos los activos.
+    
+    Parámetros:
+    -----------
+    panel : pd.DataFrame | np.ndarray
+        Panel de precios (tiempo x activo).
+        
+    ventana : int, opcional
+        Número de periodos. Por defecto, es 20.
+        
+    Salida:
+    -------
+    return: pd.DataFrame | np.ndarray : z-score con la forma del panel.
+    """
+    
+    x, formato = a_arreglo(panel)
+    media, desviacion = media_desviacion_movil(x, ventana)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return formato((x - media) / desviacion)
+
+
+# Función que calcula el VWAP
+def vwap(high, low, close, volume, reiniciar_diario: bool = True):
+    
+    """
+    Función que calcula el precio promedio ponderado por volumen (VWAP) acumulado de todos los activos, con el precio
+    típico (máximo + mínimo + cierre) / 3.
+    
+    Parámetros:
+    -----------
+    high, low, close, volume : pd.DataFrame | np.ndarray
+        Paneles de precios máximos, mínimos, de cierre y de volumen (tiempo x activo).
+        
+    reiniciar_diario : bool, opcional
+        Si es True, el acumulado se reinicia en cada día (requiere paneles con índice de fechas). Por defecto, es True.
+        
+    Salida:
+    -------
+    return: pd.DataFrame | np.ndarray : VWAP con la forma del panel.
+    """
+    
+    maximo, formato = a_arreglo(high)
+    minimo, _ = a_arreglo(low)
+    cierre, _ = a_arreglo(close)
+    volumen, _ = a_arreglo(volume)
+    volumen = np.nan_to_num(volumen)
+    precio_volumen = np.nan_to_num((maximo + minimo + cierre) / 3 * volumen)
+    acumulado_pv = np.cumsum(precio_volumen, axis=0)
+    acumulado_v = np.cumsum(volumen, axis=0)
+    # Reiniciar en cada día (restar el acumulado al cierre del día anterior)
+    if reiniciar_diario and isinstance(close, pd.DataFrame) and isinstance(close.index, pd.DatetimeIndex):
+        dias = close.index.normalize().to_numpy()
+        inicio_dia = np.concatenate([[True], dias[1:] != dias[:-1]])
+        posiciones = np.maximum.accumulate(np.where(inicio_dia, np.arange(len(dias)), 0))
+        base_pv = np.vstack([np.zeros((1, cierre.shape[1])), acumulado_pv[:-1]])[posiciones]
+        base_v = np.vstack([np.zeros((1, cierre.shape[1])), acumulado_v[:-1]])[posiciones]
+        acumulado_pv = acumulado_pv - base_pv
+        acumulado_v = acumulado_v - base_v
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return formato(np.where(acumulado_v > 0, acumulado_pv / acumulado_v, np.nan))
@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Clase que mantiene la última cotización de cada suscripción de datos de mercado
+class QuoteBook:
+    
+    """
+    Clase que mantiene el estado actual (top of book) de cada suscripción de `reqMktData` en un arreglo de NumPy: una fila
+    por reqId que se actualiza en el lugar con cada `tickPrice`, `tickSize` y `tickGeneric`, en lugar de acumular una
+    lista de tuplas por tick. La memoria depende sólo del número de suscripciones (no de la duración de la sesión).
+    Sólo se actualizan los reqIds registrados, por lo que los ticks tardíos de una suscripción ya eliminada se ignoran.
+        
+        - `cotizacion(reqId)` / `cotizacion_conId(conId)`: lectura O(1) de una suscripción.
+        - `snapshot()`: DataFrame con todo el libro, construido de forma vectorizada.
+        - `escuchar(reqId, funcion)`: notificación de cada precio recibido de una suscripción, para cálculos incrementales.
+        
+    Los precios y tamaños se guardan como float64 (NaN mientras no se reciban) y los tiempos de actualización como
+    nanosegundos desde 1970. Los ticks retrasados (66-76) se guardan en los mismos campos que los ticks en tiempo real.
+    """
+    
+    # Campos del libro
+    CAMPOS = ["bid", "ask", "last", "bid_size", "ask_size", "last_size", "volume", "open", "high", "low", "close",
+              "hist_vol", "implied_vol", "trade_count"]
+    TIEMPOS = ["ts_bid", "ts_ask", "ts_last", "ts"]
+    # Tipo de tick -> columna (precios, tamaños y genéricos; incluye los ticks retrasados)
+    TICKS_PRECIO = {1: 0, 2: 1, 4: 2, 14: 7, 6: 8, 7: 9, 9: 10, 66: 0, 67: 1, 68: 2, 76: 7, 72: 8, 73: 9, 75: 10}
+    TICKS_TAMANO = {0: 3, 3: 4, 5: 5, 8: 6, 69: 3, 70: 4, 71: 5, 74: 6}
+    TICKS_GENERICO = {23: 11, 24: 12, 54: 13}
+    # Columna de precio -> columna de tiempo
+    TIEMPO_PRECIO = {0: 0, 1: 1, 2: 2}
+    
+    def __init__(self, capacidad: int = 256) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        capacidad : int, opcional
+            Número de suscripciones reservadas inicialmente (el libro crece al doble si se llena). Por defecto, es 256.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Arreglos del libro
+        self.valores = np.full((capacidad, len(self.CAMPOS)), np.nan)
+        self.tiempos = np.zeros((capacidad, len(self.TIEMPOS)), dtype="int64")
+        self.conIds = np.zeros(capacidad, dtype="int64")
+        self.reqIds = np.full(capacidad, -1, dtype="int64")
+        self.symbols = [""] * capacidad
+        # Índices (reqId -> fila, conId -> fila) y filas libres para reutilizar
+        self.filas = {}
+        self.filas_conId = {}
+        self.libres = []
+        self.n = 0
+        self.candado = threading.Lock()
+        # Funciones que se notifican en cada precio (reqId -> lista de funciones)
+        self.oyentes = {}
+        
+        
+    def __len__(self) -> int:
+        
+        """
+        Método que devuelve el número de suscripciones en el libro.
+        """
+        
+        return len(self.filas)
+        
+        
+    def __contains__(self, reqId: int) -> bool:
+        
+        """
+        Método que indica si un reqId está en el libro.
+        """
+        
+        return reqId in self.filas
+        
+        
+    def registrar(self, reqId: int, contract=None) -> int:
+        
+        """
+        Método que agrega una suscripción al libro (o devuelve su fila si ya existe).
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción de `reqMktData`.
+            
+        contract : Contract, opcional
+            Contrato de la suscripción (se guardan su símbolo y conId). Por defecto, es `None`.
+            
+        Salida:
+        -------
+        return: int : Fila asignada.
+        """
+        
+        with self.candado:
+            fila = self.filas.get(reqId)
+            if fila is None:
+                fila = self.nueva_fila(reqId)
+            if contract is not None:
+                self.symbols[fila] = contract.localSymbol or contract.symbol
+                if contract.conId:
+                    self.conIds[fila] = contract.conId
+                    self.filas_conId[contract.conId] = fila
+                    
+        return fila
+        
+        
+    def nueva_fila(self, reqId: int) -> int:
+        
+        """
+        Método que asigna una fila (libre o nueva) a un reqId. Debe llamarse con el candado adquirido.
+        """
+        
+        if len(self.libres) > 0:
+            fila = self.libres.pop()
+        else:
+            # Crecer al doble si está lleno
+            if self.n == len(self.reqIds):
+                capacidad = 2 * len(self.reqIds)
+                self.valores = np.vstack([self.valores, np.full((capacidad - self.n, len(self.CAMPOS)), np.nan)])
+                self.tiempos = np.vstack([self.tiempos, np.zeros((capacidad - self.n, len(self.TIEMPOS)), dtype="int64")])
+                self.conIds = np.concatenate([self.conIds, np.zeros(capacidad - self.n, dtype="int64")])
+                self.reqIds = np.concatenate([self.reqIds, np.full(capacidad - self.n, -1, dtype="int64")])
+                self.symbols += [""] * (capacidad - self.n)
+            fila = self.n
+            self.n += 1
+        self.reqIds[fila] = reqId
+        self.filas[reqId] = fila
+        
+        return fila
+        
+        
+    def eliminar(self, reqId: int) -> None:
+        
+        """
+        Método que elimina una suscripción del libro. Su fila se reutiliza en la siguiente suscripción.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.candado:
+            fila = self.filas.pop(reqId, None)
+            if fila is None:
+                return
+            if self.filas_conId.get(self.conIds[fila]) == fila:
+                del self.filas_conId[self.conIds[fila]]
+            self.valores[fila] = np.nan
+            self.tiempos[fila] = 0
+            self.conIds[fila] = 0
+            self.reqIds[fila] = -1
+            self.symbols[fila] = ""
+            self.libres.append(fila)
+            self.oyentes.pop(reqId, None)
+            
+            
+    def escuchar(self, reqId: int, funcion) -> None:
+        
+        """
+        Método que registra una función que se llama cada vez que se actualiza un precio de una suscripción. La función
+        recibe `funcion(reqId, campo, precio)` (por ejemplo, campo = "bid"; precio NaN si IB no tiene precio) y se ejecuta en el hilo de lectura de la API,
+        después de actualizar el libro, por lo que debe ser rápida. Los oyentes se eliminan junto con la suscripción.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        funcion : callable
+            Función a notificar.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.candado:
+            self.oyentes[reqId] = self.oyentes.get(reqId, []) + [funcion]
+            
+            
+    def dejar_de_escuchar(self, reqId: int, funcion) -> None:
+        
+        """
+        Método que retira una función registrada con `escuchar`.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        funcion : callable
+            Función a retirar.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.candado:
+            oyentes = [oyente for oyente in self.oyentes.get(reqId, []) if oyente != funcion]
+            if len(oyentes) > 0:
+                self.oyentes[reqId] = oyentes
+            else:
+                self.oyentes.pop(reqId, None)
+                
+                
+    # -------------------------------------------------- Actualizaciones --------------------------------------------------
+    
+    def actualizar_precio(self, reqId: int, tickType: int, price: float) -> None:
+        
+        """
+        Método que actualiza un precio (llamado desde `tickPrice`).
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick.
+            
+        price : float
+            Precio recibido (IB envía -1 cuando no hay precio disponible; los precios cero o negativos de combos y spreads
+            son válidos).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        columna = self.TICKS_PRECIO.get(tickType)
+        if columna is None:
+            return
+        ahora = time.time_ns()
+        with self.candado:
+            fila = self.filas.get(reqId)
+            if fila is None:
+                return
+            valor = np.nan if price == -1 else price
+            self.valores[fila, columna] = valor
+            if columna in self.TIEMPO_PRECIO:
+                self.tiempos[fila, self.TIEMPO_PRECIO[columna]] = ahora
+            self.tiempos[fila, 3] = ahora
+            oyentes = self.oyentes.get(reqId)
+        # Notificar (fuera del candado, para que los oyentes puedan leer el libro)
+        if oyentes is not None:
+            for funcion in oyentes:
+                funcion(reqId, self.CAMPOS[columna], valor)
+                
+                
+    def actualizar_tamano(self, reqId: int, tickType: int, size: float) -> None:
+        
+        """
+        Método que actualiza un tamaño o el volumen (llamado desde `tickSize`).
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick.
+            
+        size : float
+            Tamaño recibido.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        columna = self.TICKS_TAMANO.get(tickType)
+        if columna is None:
+            return
+        ahora = time.time_ns()
+        with self.candado:
+            fila = self.filas.get(reqId)
+            if fila is None:
+                return
+            self.valores[fila, columna] = size
+            self.tiempos[fila, 3] = ahora
+            
+            
+    def actualizar_generico(self, reqId: int, tickType: int, value: float) -> None:
+        
+        """
+        Método que actualiza un valor genérico como la volatilidad (llamado desde `tickGeneric`).
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        tickType : int
+            Tipo de tick.
+            
+        value : float
+            Valor recibido.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        columna = self.TICKS_GENERICO.get(tickType)
+        if columna is None:
+            return
+        ahora = time.time_ns()
+        with self.candado:
+            fila = self.filas.get(reqId)
+            if fila is None:
+                return
+            self.valores[fila, columna] = value
+            self.tiempos[fila, 3] = ahora
+            
+            
+    # -------------------------------------------------- Lecturas --------------------------------------------------
+    
+    def cotizacion(self, reqId: int) -> dict:
+        
+        """
+        Método que devuelve la cotización actual de una suscripción.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        Salida:
+        -------
+        return: dict : Campos del libro (precios, tamaños y tiempos en nanosegundos), o `None` si el reqId no existe.
+        """
+        
+        with self.candado:
+            fila = self.filas.get(reqId)
+            if fila is None:
+                return None
+            cotizacion = dict(zip(self.CAMPOS, self.valores[fila].tolist()))
+            cotizacion.update(zip(self.TIEMPOS, self.tiempos[fila].tolist()))
+            cotizacion.update({"reqId": reqId, "symbol": self.symbols[fila], "conId": int(self.conIds[fila])})
+            
+        return cotizacion
+        
+        
+    def cotizacion_conId(self, conId: int) -> dict:
+        
+        """
+        Método que devuelve la cotización actual de un contrato a partir de su conId.
+        
+        Parámetros:
+        -----------
+        conId : int
+            Identificador del contrato.
+            
+        Salida:
+        -------
+        return: dict : Cotización (ver `cotizacion`), o `None` si el contrato no está en el libro.
+        """
+        
+        fila = self.filas_conId.get(conId)
+        if fila is None:
+            return None
+            
+        return self.cotizacion(int(self.reqIds[fila]))
+        
+        
+    def medio(self, reqId: int) -> float:
+        
+        """
+        Método que devuelve el precio medio (bid + ask) / 2 de una suscripción (NaN si falta alguno de los dos).
+        """
+        
+        fila = self.filas.get(reqId)
+        if fila is None:
+            return np.nan
+            
+        return (self.valores[fila, 0] + self.valores[fila, 1]) / 2
+        
+        
+    def snapshot(self) -> pd.DataFrame:
+        
+        """
+        Método que devuelve el libro completo como un DataFrame (una fila por suscripción, indexado por reqId).
+        
+        Salida:
+        -------
+        return: pd.DataFrame : Campos del libro más las columnas symbol, conId, mid, spread y los tiempos como fechas.
+        """
+        
+        with self.candado:
+            activas = np.flatnonzero(self.reqIds[:self.n] >= 0)
+            valores = self.valores[activas]
+            tiempos = self.tiempos[activas]
+            symbols = [self.symbols[fila] for fila in activas]
+            conIds = self.conIds[activas]
+            reqIds = self.reqIds[activas]
+        # Construir DataFrame
+        libro = pd.DataFrame(valores, columns=self.CAMPOS, index=pd.Index(reqIds, name="reqId"))
+        libro.insert(0, "symbol", symbols)
+        libro.insert(1, "conId", conIds)
+        libro["mid"] = (libro["bid"] + libro["ask"]) / 2
+        libro["spread"] = libro["ask"] - libro["bid"]
+        for i, columna in enumerate(self.TIEMPOS):
+            libro[columna] = pd.to_datetime(np.where(tiempos[:, i] > 0, tiempos[:, i], np.iinfo("int64").min), unit="ns")
+            
+        return libro.sort_index()
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 # Importar librerías
 from IB_Trading import IB_Trading, Contract
-import threading
+from Valuacion_Opciones import volatilidad_implicita
+from datetime import datetime
+import time
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 
 # Clase que extrae las Volatilidades Implícitas
@@ -10,21 +13,45 @@ class IV_Options(IB_Trading):
     
     """
     Clase que nos ayuda a obtener las Volatilidades Implícitas para diferentes activos.
+    
+    Todas las opciones de un vencimiento se suscriben a la vez (a través de `self.suscripciones`, que respeta el límite
+    de líneas de datos de mercado) y la volatilidad implícita de cada strike se calcula localmente, de forma vectorizada,
+    a partir de su cotización. Cada contrato tiene su propio tiempo máximo de espera, de modo que un contrato sin
+    cotización no detiene al resto.
     """
     
-    def __init__(self, ticker: str, vencimiento: str):
+    def __init__(self, ticker: str, vencimiento: str, tasa: float = 0.04, dividendo: float = 0.0, **kwargs):
         
         """
         Constructor.
+        
+        Parámetros:
+        -----------
+        ticker : str
+            Símbolo del activo subyacente.
+            
+        vencimiento : str
+            Vencimiento de las opciones (AAAAMMDD).
+            
+        tasa : float, opcional
+            Tasa libre de riesgo anual continua. Por defecto, es 0.04.
+            
+        dividendo : float, opcional
+            Tasa de dividendo anual continua. Por defecto, es 0.0.
+            
+        **kwargs :
+            Parámetros adicionales de `IB_Trading`.
         """
         
         # Inicializar a IB_Trading
-        IB_Trading.__init__(self, errors_verbose=True)
+        IB_Trading.__init__(self, errors_verbose=True, **kwargs)
         # Definir Atributos
         self.ticker = ticker
         self.vencimiento = vencimiento
-        self.volatilidad_implicita = {}
-        self.evento = threading.Event()
+        self.tasa = tasa
+        self.dividendo = dividendo
+        # Volatilidad Implícita calculada por IB (reqId -> valor)
+        self.volatilidad_ib = {}
         
     
     def tickOptionComputation(self, reqId, tickType, tickAttrib, impliedVol, delta, optPrice, 
@@ -32,109 +59,185 @@ class IV_Options(IB_Trading):
         
         """
         Este método se ejecuta cada vez que se recibe información de una opción específica, incluyendo
-        la volatilidad implícita calculada.
+        la volatilidad implícita calculada por el modelo de IB (13: tiempo real, 83: retrasado).
+        """
+        
+        # Mandar a llamar al método de las clases Padres (griegas del portafolio)
+        super().tickOptionComputation(reqId, tickType, tickAttrib, impliedVol, delta, optPrice, pvDividend, gamma, vega,
+                                      theta, undPrice)
+        # Almacenar Información Recibida (IB envía valores negativos o enormes cuando no hay cálculo)
+        if (tickType in (13, 83)) and (impliedVol is not None) and (0 < impliedVol < 100):
+            self.volatilidad_ib[reqId] = impliedVol
+            
+            
+    def cotizacion_lista(self, reqId: int) -> bool:
+        
+        """
+        Este método indica si ya se recibió una cotización utilizable (bid y ask, o el último precio) de una suscripción.
+        """
+        
+        cotizacion = self.cotizaciones.cotizacion(reqId)
+        if cotizacion is None:
+            return False
+        
+        return (cotizacion["bid"] > 0 and cotizacion["ask"] > 0) or cotizacion["last"] > 0
+    
+    
+    def esperar_cotizaciones(self, reqIds: list, timeout: float = 10.0, timeout_total: float = 60.0) -> set:
+        
         """
+        Este método espera las cotizaciones de varias suscripciones a la vez. Cada suscripción tiene `timeout` segundos
+        desde que se solicitaron sus datos (las que esperan su turno en la rotación de snapshots aún no cuentan) y la
+        espera completa termina a los `timeout_total` segundos, incluyendo a las suscripciones que siguen en la rotación.
         
-        # Agregar Petición
-        if reqId not in self.volatilidad_implicita:
-            self.volatilidad_implicita[reqId] = {"Activo": True, "Valor": ""}
-        # Almacenar Información Recibida
-        if (tickType == 83) and (self.volatilidad_implicita[reqId]["Activo"]) and (impliedVol is not None):
-            print(f"Id de Petición: {reqId}, TickType: {tickType}, Volatilidad Implícita: {impliedVol}")
-            self.volatilidad_implicita[reqId]["Valor"] = impliedVol
-            self.volatilidad_implicita[reqId]["Activo"] = False
-            # Cancelar Suscripción Activa
-            self.cancelMktData(reqId=reqId)
-            # Establecer Evento
-            self.evento.set()
+        Parámetros:
+        -----------
+        reqIds : list
+            Identificadores de las suscripciones.
+            
+        timeout : float, opcional
+            Tiempo máximo de espera (en segundos) de cada suscripción. Por defecto, es 10.0.
+            
+        timeout_total : float, opcional
+            Tiempo máximo de espera (en segundos) de todas las suscripciones. Por defecto, es 60.0.
             
+        Salida:
+        -------
+        return: set : reqIds con cotización (las que llegaron antes de agotar el tiempo).
+        """
+        
+        listos = set()
+        pendientes = set(reqIds)
+        limite = time.monotonic() + timeout_total
+        while len(pendientes) > 0:
+            ahora = time.monotonic()
+            if ahora > limite:
+                break
+            for reqId in list(pendientes):
+                if self.cotizacion_lista(reqId):
+                    listos.add(reqId)
+                    pendientes.discard(reqId)
+                else:
+                    solicitado = self.suscripciones.solicitado(reqId)
+                    if solicitado is not None and ahora - solicitado > timeout:
+                        pendientes.discard(reqId)
+            time.sleep(0.05)
             
-    def obtener_volatilidades_implicitas(self):
+        return listos
+    
+    
+    def obtener_volatilidades_implicitas(self, timeout: float = 10.0, tipo_datos: int = 3, 
+                                         timeout_total: float = 60.0) -> pd.DataFrame:
         
         """
-        Este método obtiene todos los contratos de opciones disponibles para el activo y el vencimiento especificado.
-        Realiza peticiones de volatilidades implícitas para las opciones 'Call' y 'Put' en diferentes strikes
-        y guarda los resultados en un diccionario para su posterior uso.
+        Este método obtiene todos los contratos de opciones disponibles para el activo y el vencimiento especificado,
+        solicita la cotización de todas las opciones 'Call' y 'Put' (y del subyacente) en una sola ráfaga y calcula la
+        volatilidad implícita de cada strike con el punto medio entre bid y ask (o el último precio).
+        
+        Parámetros:
+        -----------
+        timeout : float, opcional
+            Tiempo máximo de espera (en segundos) de la cotización de cada contrato. Por defecto, es 10.0.
+            
+        tipo_datos : int, opcional
+            Tipo de datos de mercado (1: tiempo real, 3: retrasados). Por defecto, es 3.
+            
+        timeout_total : float, opcional
+            Tiempo máximo de espera (en segundos) de todas las cotizaciones. Por defecto, es 60.0.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Una fila por opción con las columnas strike, right, bid, ask, precio, iv (calculada) e
+                               iv_ib (calculada por IB, si se recibió), ordenada por tipo y strike.
         """
         
         # Crear Contrato
         contrato = Contract()
         contrato.symbol = self.ticker
         contrato.secType = "OPT"
-        contrato.exchange = "BOX"
+        contrato.exchange = "SMART"
         contrato.currency = "USD"
         contrato.multiplier = "100"
         contrato.lastTradeDateOrContractMonth = self.vencimiento
-        # Obtener Contratos (Opciones Disponibles)
-        contratos_opcion = self.reqContractDetails(reqId=0, contract=contrato)
-        # Elegir 6 Contratos Random
-        indices = np.arange(len(contratos_opcion))
-        indices_random = np.random.choice(indices, size=6, replace=False).tolist()
-        indices_random = sorted(indices_random)
-        # Obtener Strikes
-        contratos_opcion = np.array(contratos_opcion)[indices_random]
-        strikes = sorted([contrato_detalles.contract.strike for contrato_detalles in contratos_opcion])
-        # Realizar Peticiones de Volatilidades Implicitas (Calls)
-        self.reqMarketDataType(marketDataType=3)
-        for n, strike in enumerate(strikes):
-            # Call
-            contrato.right = "C"
-            contrato.strike = strikes[n]
-            contrato.exchange = "SMART"
-            self.reqMktData(reqId=int(2 * n), contract=contrato, genericTickList="", 
-                            snapshot=False, regulatorySnapshot=False, mktDataOptions=[])
-            self.evento.wait()
-            self.evento.clear()
-        # Realizar Peticiones de Volatilidades Implícitas (Puts)
-        for n, strike in enumerate(strikes):
-            # Put
-            contrato.right = "P"
-            contrato.strike = strikes[n]
-            contrato.exchange = "SMART"
-            self.reqMktData(reqId=int(2 * n + 1), contract=contrato, genericTickList="", 
-                            snapshot=False, regulatorySnapshot=False, mktDataOptions=[])
-            self.evento.wait()
-            self.evento.clear()
-            
-        # Guardaar Strikes Utilizado
-        self.strikes = strikes
+        # Obtener Contratos (Todas las Opciones Disponibles)
+        contratos_opcion = [detalles.contract for detalles in self.reqContractDetails(contract=contrato)]
+        # Contrato del Subyacente
+        subyacente = Contract()
+        subyacente.symbol = self.ticker
+        subyacente.secType = "STK"
+        subyacente.exchange = "SMART"
+        subyacente.currency = "USD"
+        # Solicitar todas las cotizaciones a la vez
+        self.reqMarketDataType(marketDataType=tipo_datos)
+        reqId_subyacente = self.suscripciones.suscribir(subyacente, componente="IV_Options")
+        reqIds = [self.suscripciones.suscribir(contrato_opcion, componente="IV_Options") for contrato_opcion in contratos_opcion]
+        try:
+            listos = self.esperar_cotizaciones([reqId_subyacente] + reqIds, timeout=timeout, timeout_total=timeout_total)
+            if reqId_subyacente not in listos:
+                raise TimeoutError(f"No se recibió la cotización de {self.ticker}")
+            # Precio del Subyacente
+            S = self.cotizaciones.medio(reqId_subyacente)
+            if np.isnan(S):
+                S = self.cotizaciones.cotizacion(reqId_subyacente)["last"]
+            # Cotizaciones de las Opciones
+            cotizaciones = [self.cotizaciones.cotizacion(reqId) for reqId in reqIds]
+            opciones = pd.DataFrame({
+                "strike": [contrato_opcion.strike for contrato_opcion in contratos_opcion],
+                "right": [contrato_opcion.right for contrato_opcion in contratos_opcion],
+                "bid": [cotizacion["bid"] for cotizacion in cotizaciones],
+                "ask": [cotizacion["ask"] for cotizacion in cotizaciones],
+                "last": [cotizacion["last"] for cotizacion in cotizaciones],
+                "iv_ib": [self.volatilidad_ib.get(reqId, np.nan) for reqId in reqIds],
+                })
+        finally:
+            # Cancelar Suscripciones
+            for reqId in [reqId_subyacente] + reqIds:
+                self.suscripciones.cancelar(reqId, componente="IV_Options")
+        # Calcular Volatilidades Implícitas (vectorizado)
+        opciones["precio"] = ((opciones["bid"] + opciones["ask"]) / 2).fillna(opciones["last"])
+        vencimiento = datetime.strptime(self.vencimiento, "%Y%m%d").replace(hour=16)
+        T = max((vencimiento - datetime.now()).total_seconds(), 0) / (365 * 24 * 3600)
+        opciones["iv"] = volatilidad_implicita(opciones["precio"].to_numpy(), S, opciones["strike"].to_numpy(), T, self.tasa,
+                                               opciones["right"].to_numpy(), q=self.dividendo)
+        # Guardar Precio del Subyacente
+        self.precio_subyacente = S
         
-        return self.volatilidad_implicita
+        return opciones.sort_values(["right", "strike"], ignore_index=True)[["strike", "right", "bid", "ask", "precio", "iv", "iv_ib"]]
     
     
-# Crear Instancia y Conectarse
-IB_Vol_Impl = IV_Options(ticker="AAPL", vencimiento="20260116")
-IB_Vol_Impl.connect(host="127.0.0.1", port=7497, clientId=1)
-# Realizar Petición
-volatilidades_implicitas = IB_Vol_Impl.obtener_volatilidades_implicitas()
-
-calls_iv = [volatilidades_implicitas[0]["Valor"], volatilidades_implicitas[2]["Valor"], volatilidades_implicitas[4]["Valor"],
-            volatilidades_implicitas[6]["Valor"], volatilidades_implicitas[8]["Valor"], volatilidades_implicitas[10]["Valor"]]         
-puts_iv = [volatilidades_implicitas[1]["Valor"], volatilidades_implicitas[3]["Valor"], volatilidades_implicitas[5]["Valor"],
-           volatilidades_implicitas[7]["Valor"], volatilidades_implicitas[9]["Valor"], volatilidades_implicitas[11]["Valor"]]
-strikes = IB_Vol_Impl.strikes
-
-# Graficar
-fig, axes = plt.subplots(ncols=2, nrows=1, figsize=(22, 10))
-
-# Graficar Calls
-axes[0].plot(strikes, calls_iv, color="dodgerblue", marker="o", markersize=8, linewidth=2, label="Calls IV")
-axes[0].set_title("Volatilidad Implícita - Calls", fontsize=18, weight="bold")
-axes[0].set_xlabel("Strike", fontsize=14, weight="bold")
-axes[0].set_ylabel("Volatilidad Implícita", fontsize=14, weight="bold")
-axes[0].grid(True, linestyle="--", alpha=0.7)
-axes[0].legend()
-
-# Graficar Puts
-axes[1].plot(strikes, puts_iv, color="tomato", marker="s", markersize=8, linewidth=2, label="Puts IV")
-axes[1].set_title("Volatilidad Implícita - Puts", fontsize=18, weight="bold")
-axes[1].set_xlabel("Strike", fontsize=14, weight="bold")
-axes[1].set_ylabel("Volatilidad Implícita", fontsize=14, weight="bold")
-axes[1].grid(True, linestyle="--", alpha=0.7)
-axes[1].legend()
-
-plt.tight_layout()
-plt.show()
+if __name__ == "__main__":
+    
+    # Crear Instancia y Conectarse
+    IB_Vol_Impl = IV_Options(ticker="AAPL", vencimiento="20260116")
+    IB_Vol_Impl.connect(host="127.0.0.1", port=7497, clientId=1)
+    # Realizar Petición
+    volatilidades_implicitas = IB_Vol_Impl.obtener_volatilidades_implicitas()
+    
+    calls = volatilidades_implicitas[volatilidades_implicitas["right"] == "C"]
+    puts = volatilidades_implicitas[volatilidades_implicitas["right"] == "P"]
+    
+    # Graficar
+    fig, axes = plt.subplots(ncols=2, nrows=1, figsize=(22, 10))
+    
+    # Graficar Calls
+    axes[0].plot(calls["strike"], calls["iv"], color="dodgerblue", marker="o", markersize=8, linewidth=2, label="Calls IV")
+    axes[0].set_title("Volatilidad Implícita - Calls", fontsize=18, weight="bold")
+    axes[0].set_xlabel("Strike", fontsize=14, weight="bold")
+    axes[0].set_ylabel("Volatilidad Implícita", fontsize=14, weight="bold")
+    axes[0].grid(True, linestyle="--", alpha=0.7)
+    axes[0].legend()
+    
+    # Graficar Puts
+    axes[1].plot(puts["strike"], puts["iv"], color="tomato", marker="s", markersize=8, linewidth=2, label="Puts IV")
+    axes[1].set_title("Volatilidad Implícita - Puts", fontsize=18, weight="bold")
+    axes[1].set_xlabel("Strike", fontsize=14, weight="bold")
+    axes[1].set_ylabel("Volatilidad Implícita", fontsize=14, weight="bold")
+    axes[1].grid(True, linestyle="--", alpha=0.7)
+    axes[1].legend()
+    
+    plt.tight_layout()
+    plt.show()
+    IB_Vol_Impl.disconnect()
         
 # Recordatorio:
 #   - El Volatility Skew es una representación gráfica que muestra cómo varía la volatilidad implícita de las opciones según 
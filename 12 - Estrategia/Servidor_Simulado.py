@@ -0,0 +1,823 @@
+# -*- coding: utf-8 -*-
+# Importar librerías de IB
+from ibapi.message import IN, OUT
+# Importar librerías del Proyecto
+from Cache_Historico import duracion_a_intervalo, texto_a_fecha
+# Importar librerías Ordinarias
+import socket
+import struct
+import threading
+import heapq
+import itertools
+import zlib
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Versión del protocolo que anuncia el servidor (compatible con ibapi 9.81 y 10.x)
+SERVER_VERSION = 151
+
+# Tamaños de barra en segundos (barras intradía)
+SEGUNDOS_BARRA = {"sec": 1, "secs": 1, "min": 60, "mins": 60, "hour": 3600, "hours": 3600}
+
+# Símbolos utilizados por el escáner sintético
+SIMBOLOS_ESCANER = ["AAPL", "MSFT", "AMZN", "NVDA", "GOOGL", "META", "TSLA", "AMD", "NFLX", "INTC", "ORCL", "CRM",
+                    "ADBE", "PYPL", "UBER", "SHOP", "SQ", "PLTR", "SNOW", "COIN", "ROKU", "ZM", "DKNG", "RIVN",
+                    "LCID", "SOFI", "HOOD", "F", "GM", "BA", "DIS", "NKE", "SBUX", "KO", "PEP", "WMT", "COST",
+                    "JPM", "BAC", "C", "WFC", "GS", "MS", "XOM", "CVX", "PFE", "MRNA", "JNJ", "UNH", "LLY"]
+
+# Clase que simula un servidor de TWS / IB Gateway
+class ServidorSimulado:
+    
+    """
+    Clase que simula localmente un servidor de TWS / IB Gateway, hablando el protocolo de sockets de IB lo suficiente
+    para que `EClient.connect` (y, por lo tanto, `IB_Trading`) funcione sin conexión a IB.
+    
+    Atiende con datos sintéticos (o con los `fixtures` indicados) los flujos de:
+        
+        - nextValidId, managedAccounts y currentTime
+        - contractDetails (incluyendo cadenas de opciones) y securityDefinitionOptionParameter
+        - historicalData y headTimestamp
+        - tickPrice / tickSize / tickGeneric (reqMktData, incluyendo snapshots) y tickByTick
+        - scannerData
+        - position, pnl y accountSummary
+        - orderStatus (las órdenes se ejecutan al precio sintético), openOrderEnd y completedOrdersEnd
+        
+    No se envían mensajes `openOrder` ni `completedOrder` (su formato depende de decenas de campos de la orden), por lo
+    que `reqOpenOrders` y `reqCompletedOrders` reciben listas vacías.
+    
+    Ejemplo:
+        
+        servidor = ServidorSimulado(port=0, latencia=0.01)
+        puerto = servidor.iniciar()
+        ib = IB_Trading()
+        ib.connect(port=puerto)
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 7497, latencia: float = 0.0, ticks_por_segundo: float = 4.0,
+                 fixtures: dict = None, cuenta: str = "DU0000000", max_barras: int = 200000,
+                 vencimientos_cadena: int = 4, strikes_cadena: int = 21, max_lineas: int = None) -> None:
+                 
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        host : str, opcional
+            Dirección en la que escucha el servidor. Por defecto, es '127.0.0.1'.
+            
+        port : int, opcional
+            Puerto en el que escucha el servidor. Con 0 se elige un puerto libre. Por defecto, es 7497.
+            
+        latencia : float, opcional
+            Segundos de retraso de cada respuesta. Por defecto, es 0.0.
+            
+        ticks_por_segundo : float, opcional
+            Frecuencia de los datos en tiempo real (por suscripción). Por defecto, es 4.0.
+            
+        fixtures : dict, opcional
+            Datos fijos a servir en lugar de los sintéticos. Claves admitidas:
+                - "historico": {símbolo: pd.DataFrame con columnas Open, High, Low, Close, Volume e índice de fechas}
+                - "escaner": {scanCode: [símbolos]}
+                - "posiciones": [(símbolo, cantidad, costo promedio)]
+                - "cuenta": {etiqueta: valor}
+                - "precios": {símbolo: precio inicial}
+                
+        cuenta : str, opcional
+            Número de cuenta simulado. Por defecto, es 'DU0000000'.
+            
+        max_barras : int, opcional
+            Número máximo de barras por petición histórica. Por defecto, es 200000.
+            
+        vencimientos_cadena : int, opcional
+            Número de vencimientos semanales de las cadenas de opciones sintéticas. Por defecto, es 4.
+            
+        strikes_cadena : int, opcional
+            Número de strikes (alrededor del precio) de las cadenas de opciones sintéticas. Por defecto, es 21.
+            
+        max_lineas : int, opcional
+            Número máximo de suscripciones simultáneas de `reqMktData` por conexión (al excederlo se responde con el
+            error 101, como IB). Por defecto, es `None` (sin límite).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.host = host
+        self.port = port
+        self.latencia = latencia
+        self.ticks_por_segundo = ticks_por_segundo
+        self.fixtures = fixtures or {}
+        self.cuenta = cuenta
+        self.max_barras = max_barras
+        self.vencimientos_cadena = vencimientos_cadena
+        self.strikes_cadena = strikes_cadena
+        self.max_lineas = max_lineas
+        # Estado del Mercado Simulado
+        self.candado = threading.Lock()
+        self.precios = dict(self.fixtures.get("precios", {}))
+        self.posiciones = {simbolo: [cantidad, costo] for simbolo, cantidad, costo in self.fixtures.get("posiciones", [])}
+        self.ordenes = {}
+        # Conexiones
+        self.socket = None
+        self.conexiones = []
+        self.activo = False
+        
+        
+    def iniciar(self) -> int:
+        
+        """
+        Método que abre el socket y comienza a aceptar conexiones en un hilo de fondo.
+        
+        Salida:
+        -------
+        return: int : Puerto en el que escucha el servidor.
+        """
+        
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen()
+        self.port = self.socket.getsockname()[1]
+        self.activo = True
+        threading.Thread(target=self.aceptar, daemon=True).start()
+        
+        return self.port
+        
+        
+    def detener(self) -> None:
+        
+        """
+        Método que cierra el servidor y todas las conexiones abiertas.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.activo = False
+        if self.socket is not None:
+            self.socket.close()
+        for conexion in list(self.conexiones):
+            conexion.cerrar()
+            
+            
+    def aceptar(self) -> None:
+        
+        """
+        Método que acepta nuevas conexiones de clientes.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        while self.activo:
+            try:
+                cliente, _ = self.socket.accept()
+            except OSError:
+                break
+            cliente.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conexion = ConexionSimulada(self, cliente)
+            self.conexiones.append(conexion)
+            conexion.iniciar()
+            
+            
+    # -------------------------------------------------- Mercado Sintético --------------------------------------------------
+    
+    @staticmethod
+    def con_id(symbol: str) -> int:
+        
+        """
+        Método que genera un conId estable para un símbolo.
+        """
+        
+        return zlib.crc32(symbol.encode()) % 100_000_000 + 1
+        
+        
+    def precio(self, symbol: str, mover: bool = False) -> float:
+        
+        """
+        Método que devuelve el precio sintético actual de un símbolo (opcionalmente, lo mueve un paso aleatorio).
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo.
+            
+        mover : bool, opcional
+            Si es True, aplica un paso de la caminata aleatoria antes de devolver el precio. Por defecto, es False.
+            
+        Salida:
+        -------
+        return: float : Precio actual.
+        """
+        
+        with self.candado:
+            if symbol not in self.precios:
+                self.precios[symbol] = 20.0 + zlib.crc32(symbol.encode()) % 480
+            if mover:
+                self.precios[symbol] = round(max(0.01, self.precios[symbol] * (1 + np.random.normal(0, 0.0005))), 2)
+                
+            return self.precios[symbol]
+            
+            
+    def barras(self, symbol: str, endDateTime: str, durationStr: str, barSizeSetting: str) -> pd.DataFrame:
+        
+        """
+        Método que genera (o toma de los fixtures) las barras históricas de una petición.
+        
+        Parámetros:
+        -----------
+        symbol : str
+            Símbolo del activo.
+            
+        endDateTime, durationStr, barSizeSetting : str
+            Parámetros de la petición histórica.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras con columnas Open, High, Low, Close, Volume.
+        """
+        
+        fin = texto_a_fecha(endDateTime)
+        inicio = duracion_a_intervalo(durationStr, fin)
+        # Datos Fijos
+        historico = self.fixtures.get("historico", {})
+        if symbol in historico:
+            datos = historico[symbol]
+            return datos[(datos.index >= inicio) & (datos.index <= fin)]
+        # Fechas de las Barras
+        cantidad, unidad = barSizeSetting.split()
+        if unidad in SEGUNDOS_BARRA:
+            paso = int(cantidad) * SEGUNDOS_BARRA[unidad]
+            n = min(self.max_barras, max(1, int((fin - inicio).total_seconds() // paso)))
+            fechas = pd.date_range(end=fin.replace(second=fin.second - fin.second % min(paso, 60)), periods=n,
+                                   freq=f"{paso}s")
+        elif unidad.startswith("day"):
+            fechas = pd.bdate_range(inicio.date(), fin.date())[-self.max_barras:]
+        elif unidad.startswith("week"):
+            fechas = pd.date_range(inicio.date(), fin.date(), freq="W-MON")
+        else:
+            fechas = pd.date_range(inicio.date(), fin.date(), freq="MS")
+        # Caminata Aleatoria (reproducible por símbolo y fecha final)
+        generador = np.random.default_rng(zlib.crc32(f"{symbol}{fin.date()}".encode()))
+        n = len(fechas)
+        rendimientos = np.cumsum(generador.normal(0, 0.01, n))
+        cierre = self.precio(symbol) * np.exp(rendimientos - (rendimientos[-1] if n > 0 else 0))
+        apertura = np.concatenate([[cierre[0]], cierre[:-1]]) if n > 0 else cierre
+        rango = np.abs(generador.normal(0, 0.005, n)) * cierre
+        
+        return pd.DataFrame({"Open": apertura.round(2), "High": (np.maximum(apertura, cierre) + rango).round(2),
+                             "Low": (np.minimum(apertura, cierre) - rango).round(2), "Close": cierre.round(2),
+                             "Volume": generador.integers(1_000, 1_000_000, n)}, index=fechas)
+
+
+# Clase que atiende a un cliente conectado al servidor simulado
+class ConexionSimulada:
+    
+    """
+    Clase que atiende una conexión de un cliente: lee sus peticiones, las responde (con la latencia configurada) y genera
+    los datos en tiempo real de sus suscripciones.
+    """
+    
+    def __init__(self, servidor: ServidorSimulado, cliente: socket.socket) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        servidor : ServidorSimulado
+            Servidor al que pertenece la conexión.
+            
+        cliente : socket.socket
+            Socket del cliente.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Atributos
+        self.servidor = servidor
+        self.cliente = cliente
+        self.activa = True
+        # Mensajes pendientes de envío (instante, orden, bytes)
+        self.pendientes = []
+        self.contador = itertools.count()
+        self.condicion = threading.Condition()
+        # Suscripciones en tiempo real
+        self.candado = threading.Lock()
+        self.mkt_data = {}
+        self.tick_by_tick = {}
+        self.barras_5s = {}
+        self.ultima_barra_5s = 0
+        self.pnl = {}
+        self.order_id = 1
+        # Peticiones Atendidas
+        self.procesadores = {
+            OUT.START_API: self.start_api,
+            OUT.REQ_IDS: self.req_ids,
+            OUT.REQ_CURRENT_TIME: self.req_current_time,
+            OUT.REQ_CONTRACT_DATA: self.req_contract_data,
+            OUT.REQ_HISTORICAL_DATA: self.req_historical_data,
+            OUT.REQ_HEAD_TIMESTAMP: self.req_head_timestamp,
+            OUT.REQ_MKT_DATA: self.req_mkt_data,
+            OUT.CANCEL_MKT_DATA: self.cancelar(self.mkt_data, 2),
+            OUT.REQ_TICK_BY_TICK_DATA: self.req_tick_by_tick,
+            OUT.CANCEL_TICK_BY_TICK_DATA: self.cancelar(self.tick_by_tick, 1),
+            OUT.REQ_REAL_TIME_BARS: self.req_real_time_bars,
+            OUT.CANCEL_REAL_TIME_BARS: self.cancelar(self.barras_5s, 2),
+            OUT.REQ_SCANNER_SUBSCRIPTION: self.req_scanner,
+            OUT.REQ_POSITIONS: self.req_positions,
+            OUT.REQ_ACCOUNT_SUMMARY: self.req_account_summary,
+            OUT.REQ_PNL: self.req_pnl,
+            OUT.CANCEL_PNL: self.cancelar(self.pnl, 1),
+            OUT.PLACE_ORDER: self.place_order,
+            OUT.CANCEL_ORDER: self.cancel_order,
+            OUT.REQ_OPEN_ORDERS: self.req_open_orders,
+            OUT.REQ_ALL_OPEN_ORDERS: self.req_open_orders,
+            OUT.REQ_AUTO_OPEN_ORDERS: self.req_open_orders,
+            OUT.REQ_COMPLETED_ORDERS: self.req_completed_orders,
+            OUT.REQ_SEC_DEF_OPT_PARAMS: self.req_sec_def_opt_params,
+            }
+            
+            
+    def iniciar(self) -> None:
+        
+        """
+        Método que inicia los hilos de lectura, envío y datos en tiempo real.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        for objetivo in [self.leer, self.enviar_pendientes, self.transmitir]:
+            threading.Thread(target=objetivo, daemon=True).start()
+            
+            
+    def cerrar(self) -> None:
+        
+        """
+        Método que cierra la conexión.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.activa = False
+        with self.condicion:
+            self.condicion.notify()
+        try:
+            self.cliente.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.cliente.close()
+        if self in self.servidor.conexiones:
+            self.servidor.conexiones.remove(self)
+            
+            
+    # -------------------------------------------------- Protocolo --------------------------------------------------
+    
+    def recibir(self, n: int) -> bytes:
+        
+        """
+        Método que lee exactamente `n` bytes del socket (None si el cliente se desconecta).
+        """
+        
+        datos = b""
+        while len(datos) < n:
+            parte = self.cliente.recv(n - len(datos))
+            if not parte:
+                return None
+            datos += parte
+            
+        return datos
+        
+        
+    def recibir_mensaje(self) -> list:
+        
+        """
+        Método que lee un mensaje con prefijo de longitud y devuelve sus campos (None si el cliente se desconecta).
+        """
+        
+        cabecera = self.recibir(4)
+        if cabecera is None:
+            return None
+        cuerpo = self.recibir(struct.unpack("!I", cabecera)[0])
+        if cuerpo is None:
+            return None
+            
+        return cuerpo.decode(errors="replace").split("\0")[:-1]
+        
+        
+    def enviar(self, *campos, retraso: float = None) -> None:
+        
+        """
+        Método que programa el envío de un mensaje al cliente.
+        
+        Parámetros:
+        -----------
+        *campos :
+            Campos del mensaje (el primero es el identificador del mensaje).
+            
+        retraso : float, opcional
+            Segundos de retraso. Por defecto, es la latencia configurada en el servidor.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        texto = "".join(self.campo(valor) + "\0" for valor in campos).encode()
+        mensaje = struct.pack("!I", len(texto)) + texto
+        retraso = self.servidor.latencia if retraso is None else retraso
+        with self.condicion:
+            heapq.heappush(self.pendientes, (time.monotonic() + retraso, next(self.contador), mensaje))
+            self.condicion.notify()
+            
+            
+    @staticmethod
+    def campo(valor) -> str:
+        
+        """
+        Método que convierte un valor en un campo del protocolo.
+        """
+        
+        if isinstance(valor, bool):
+            return str(int(valor))
+        if isinstance(valor, float) and valor == int(valor) and abs(valor) < 1e15:
+            return repr(valor)
+            
+        return str(valor)
+        
+        
+    def enviar_pendientes(self) -> None:
+        
+        """
+        Método que ejecuta el hilo de envío: manda cada mensaje cuando se cumple su retraso.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        while self.activa:
+            with self.condicion:
+                while self.activa and (len(self.pendientes) == 0 or self.pendientes[0][0] > time.monotonic()):
+                    espera = None if len(self.pendientes) == 0 else self.pendientes[0][0] - time.monotonic()
+                    self.condicion.wait(espera)
+                if not self.activa:
+                    break
+                # Agrupar todos los mensajes que ya pueden enviarse
+                lote = []
+                while len(self.pendientes) > 0 and self.pendientes[0][0] <= time.monotonic():
+                    lote.append(heapq.heappop(self.pendientes)[2])
+            try:
+                self.cliente.sendall(b"".join(lote))
+            except OSError:
+                self.cerrar()
+                
+                
+    def leer(self) -> None:
+        
+        """
+        Método que ejecuta el hilo de lectura: realiza el saludo inicial y despacha cada petición del cliente.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        try:
+            # Saludo: "API\0" + versiones del cliente
+            if self.recibir(4) != b"API\0" or self.recibir_mensaje() is None:
+                self.cerrar()
+                return
+            self.enviar(SERVER_VERSION, datetime.now().strftime("%Y%m%d %H:%M:%S") + " EST", retraso=0.0)
+            while self.activa:
+                campos = self.recibir_mensaje()
+                if campos is None:
+                    break
+                procesador = self.procesadores.get(int(campos[0]))
+                if procesador is not None:
+                    procesador(campos)
+        except OSError:
+            pass
+        self.cerrar()
+        
+        
+    # -------------------------------------------------- Peticiones --------------------------------------------------
+    
+    def start_api(self, campos: list) -> None:
+        
+        self.enviar(IN.NEXT_VALID_ID, 1, self.order_id)
+        self.enviar(IN.MANAGED_ACCTS, 1, self.servidor.cuenta)
+        
+        
+    def req_ids(self, campos: list) -> None:
+        
+        self.enviar(IN.NEXT_VALID_ID, 1, self.order_id)
+        
+        
+    def req_current_time(self, campos: list) -> None:
+        
+        self.enviar(IN.CURRENT_TIME, 1, int(time.time()))
+        
+        
+    def req_contract_data(self, campos: list) -> None:
+        
+        # Campos: versión, reqId, conId, symbol, secType, vencimiento, strike, right, multiplier, exchange, ...
+        reqId, symbol, secType = campos[2], campos[4], campos[5]
+        vencimiento, strike, right, exchange, currency = campos[6], float(campos[7] or 0), campos[8], campos[10], campos[12]
+        contratos = [(symbol, secType, vencimiento, strike, right)]
+        # Cadena de Opciones (si no se especifica el contrato completo)
+        if secType in ("OPT", "FOP") and (vencimiento == "" or strike == 0 or right == ""):
+            contratos = self.cadena_opciones(symbol, secType, vencimiento, strike, right)
+        for simbolo, tipo, fecha, precio_ejercicio, derecho in contratos:
+            local = simbolo if tipo in ("STK", "CASH", "IND") else f"{simbolo} {fecha} {derecho}{precio_ejercicio:g}"
+            con_id = self.servidor.con_id(local)
+            self.enviar(IN.CONTRACT_DATA, 8, reqId, simbolo, tipo, fecha, precio_ejercicio, derecho, exchange or "SMART",
+                        currency or "USD", local, simbolo, simbolo, con_id, 0.01, 1,
+                        "100" if tipo in ("OPT", "FOP") else "", "LMT,MKT,STP", "SMART,NASDAQ,NYSE", 1,
+                        self.servidor.con_id(simbolo) if tipo in ("OPT", "FOP") else 0, f"{simbolo} Simulado", "NASDAQ",
+                        fecha[:6], "Technology", "Computers", "Computers", "US/Eastern",
+                        "20240101:0930-20240101:1600", "20240101:0930-20240101:1600", "", "", 0, 1,
+                        simbolo if tipo in ("OPT", "FOP") else "", "STK" if tipo in ("OPT", "FOP") else "", "26,26",
+                        fecha)
+        self.enviar(IN.CONTRACT_DATA_END, 1, reqId)
+        
+        
+    def cadena_opciones(self, symbol: str, secType: str, vencimiento: str, strike: float, right: str) -> list:
+        
+        """
+        Método que genera una cadena de opciones sintética (vencimientos semanales y strikes alrededor del precio).
+        """
+        
+        precio = self.servidor.precio(symbol)
+        hoy = datetime.now().date()
+        viernes = [hoy + timedelta(days=(4 - hoy.weekday()) % 7 + 7 * i) for i in range(self.servidor.vencimientos_cadena)]
+        fechas = [vencimiento] if vencimiento else [fecha.strftime("%Y%m%d") for fecha in viernes]
+        paso = 1.0 if precio < 100 else 5.0
+        strikes = [strike] if strike else [round(precio / paso) * paso + paso * k
+                                             for k in range(-(self.servidor.strikes_cadena // 2), (self.servidor.strikes_cadena + 1) // 2)]
+        derechos = [right] if right else ["C", "P"]
+        
+        return [(symbol, secType, fecha, s, d) for fecha in fechas for s in strikes for d in derechos if s > 0]
+        
+        
+    def req_sec_def_opt_params(self, campos: list) -> None:
+        
+        # Campos: reqId, underlyingSymbol, futFopExchange, underlyingSecType, underlyingConId
+        reqId, symbol = campos[1], campos[2]
+        cadena = self.cadena_opciones(symbol, "OPT", "", 0, "C")
+        fechas = sorted({fecha for _, _, fecha, _, _ in cadena})
+        strikes = sorted({strike for _, _, _, strike, _ in cadena})
+        self.enviar(IN.SECURITY_DEFINITION_OPTION_PARAMETER, reqId, "SMART", campos[5] or self.servidor.con_id(symbol),
+                    symbol, "100", len(fechas), *fechas, len(strikes), *strikes)
+        self.enviar(IN.SECURITY_DEFINITION_OPTION_PARAMETER_END, reqId)
+        
+        
+    def req_historical_data(self, campos: list) -> None:
+        
+        # Campos: reqId, conId, symbol, ..., endDateTime (15), barSize (16), duration (17), useRTH, whatToShow, formatDate
+        reqId, symbol = campos[1], campos[3]
+        endDateTime, barSizeSetting, durationStr, formatDate = campos[15], campos[16], campos[17], int(campos[20])
+        try:
+            datos = self.servidor.barras(symbol, endDateTime, durationStr, barSizeSetting)
+        except ValueError as error:
+            self.enviar(IN.ERR_MSG, 2, reqId, 321, f"Error validating request: {error}")
+            return
+        # Formato de Fechas
+        diario = barSizeSetting.split()[1] not in SEGUNDOS_BARRA
+        if diario:
+            fechas = datos.index.strftime("%Y%m%d")
+        elif formatDate == 2:
+            fechas = (datos.index.values.astype("datetime64[s]").astype("int64")).astype(str)
+        else:
+            fechas = datos.index.strftime("%Y%m%d  %H:%M:%S")
+        campos_barras = []
+        for fecha, apertura, maximo, minimo, cierre, volumen in zip(fechas, datos["Open"], datos["High"], datos["Low"],
+                                                                     datos["Close"], datos["Volume"]):
+            campos_barras += [fecha, apertura, maximo, minimo, cierre, int(volumen), round((maximo + minimo + cierre) / 3, 4), 1]
+        inicio = datos.index[0].strftime("%Y%m%d  %H:%M:%S") if len(datos) > 0 else ""
+        fin = datos.index[-1].strftime("%Y%m%d  %H:%M:%S") if len(datos) > 0 else ""
+        self.enviar(IN.HISTORICAL_DATA, reqId, inicio, fin, len(datos), *campos_barras)
+        
+        
+    def req_head_timestamp(self, campos: list) -> None:
+        
+        # Campos: reqId, conId, symbol, ...
+        historico = self.servidor.fixtures.get("historico", {})
+        inicio = historico[campos[3]].index[0] if campos[3] in historico else datetime(2000, 1, 3, 9, 30)
+        self.enviar(IN.HEAD_TIMESTAMP, campos[1], inicio.strftime("%Y%m%d %H:%M:%S"))
+        
+        
+    def req_mkt_data(self, campos: list) -> None:
+        
+        # Campos: versión, reqId, conId, symbol, secType, ..., genericTickList (16), snapshot (17)
+        reqId, symbol, snapshot = int(campos[2]), campos[4], campos[17] == "1"
+        self.enviar(IN.MARKET_DATA_TYPE, 1, reqId, 1)
+        if snapshot:
+            self.enviar_cotizacion(reqId, symbol)
+            self.enviar(IN.TICK_SNAPSHOT_END, 1, reqId)
+        else:
+            with self.candado:
+                if self.servidor.max_lineas is not None and len(self.mkt_data) >= self.servidor.max_lineas:
+                    self.enviar(IN.ERR_MSG, 2, reqId, 101, "Max number of tickers has been reached")
+                    return
+                self.mkt_data[reqId] = symbol
+                
+                
+    def req_tick_by_tick(self, campos: list) -> None:
+        
+        # Campos: reqId, conId, symbol, ..., tickType (14)
+        with self.candado:
+            self.tick_by_tick[int(campos[1])] = (campos[3], campos[14])
+            
+            
+    def req_real_time_bars(self, campos: list) -> None:
+        
+        # Campos: versión, reqId, conId, symbol, ...
+        with self.candado:
+            self.barras_5s[int(campos[2])] = campos[4]
+            
+            
+    def cancelar(self, suscripciones: dict, posicion: int):
+        
+        """
+        Método que genera el procesador de una cancelación (elimina la suscripción del reqId en `posicion`).
+        """
+        
+        def procesar(campos: list) -> None:
+            with self.candado:
+                suscripciones.pop(int(campos[posicion]), None)
+                
+        return procesar
+        
+        
+    def req_scanner(self, campos: list) -> None:
+        
+        # Campos: reqId, numberOfRows, instrument, locationCode, scanCode, ...
+        reqId, filas, scanCode = campos[1], int(campos[2] or 50), campos[5]
+        simbolos = self.servidor.fixtures.get("escaner", {}).get(scanCode)
+        if simbolos is None:
+            generador = np.random.default_rng(zlib.crc32(f"{scanCode}{datetime.now().date()}".encode()))
+            simbolos = list(generador.permutation(SIMBOLOS_ESCANER))
+        filas_escaner = []
+        for rank, simbolo in enumerate(simbolos[:filas]):
+            filas_escaner += [rank, self.servidor.con_id(simbolo), simbolo, "STK", "", 0.0, "", "SMART", "USD", simbolo,
+                              "NMS", simbolo, "", "", "", ""]
+        self.enviar(IN.SCANNER_DATA, 3, reqId, len(simbolos[:filas]), *filas_escaner)
+        
+        
+    def req_positions(self, campos: list) -> None:
+        
+        with self.servidor.candado:
+            posiciones = [(simbolo, cantidad, costo) for simbolo, (cantidad, costo) in self.servidor.posiciones.items()]
+        for simbolo, cantidad, costo in posiciones:
+            self.enviar(IN.POSITION_DATA, 3, self.servidor.cuenta, self.servidor.con_id(simbolo), simbolo, "STK", "", 0.0,
+                        "", "", "NASDAQ", "USD", simbolo, simbolo, float(cantidad), float(costo))
+        self.enviar(IN.POSITION_END, 1)
+        
+        
+    def req_account_summary(self, campos: list) -> None:
+        
+        # Campos: versión, reqId, groupName, tags
+        reqId, etiquetas = campos[2], campos[4].split(",")
+        valores = {"AccountType": "INDIVIDUAL", "NetLiquidation": "100000.00", "TotalCashValue": "100000.00",
+                   "AvailableFunds": "100000.00", "BuyingPower": "400000.00", "CashBalance": "100000.00"}
+        valores.update(self.servidor.fixtures.get("cuenta", {}))
+        for etiqueta in etiquetas:
+            if etiqueta.startswith("$LEDGER"):
+                for tag in ["CashBalance", "TotalCashBalance", "NetLiquidationByCurrency"]:
+                    self.enviar(IN.ACCOUNT_SUMMARY, 1, reqId, self.servidor.cuenta, tag, valores.get(tag, valores["CashBalance"]),
+                                "USD")
+            else:
+                self.enviar(IN.ACCOUNT_SUMMARY, 1, reqId, self.servidor.cuenta, etiqueta, valores.get(etiqueta, "0"), "USD")
+        self.enviar(IN.ACCOUNT_SUMMARY_END, 1, reqId)
+        
+        
+    def req_pnl(self, campos: list) -> None:
+        
+        with self.candado:
+            self.pnl[int(campos[1])] = campos[2]
+            
+            
+    def place_order(self, campos: list) -> None:
+        
+        # Campos: orderId, conId, symbol, ..., action (16), totalQuantity (17), orderType (18), lmtPrice (19)
+        orderId, symbol, accion = int(campos[1]), campos[3], campos[16]
+        cantidad, tipo, limite = float(campos[17]), campos[18], float(campos[19] or 0)
+        self.order_id = max(self.order_id, orderId + 1)
+        precio = self.servidor.precio(symbol)
+        self.enviar(IN.ORDER_STATUS, orderId, "Submitted", 0.0, cantidad, 0.0, orderId, 0, 0.0, 1, "", 0.0)
+        # Ejecutar (órdenes a mercado, o límites que ya cruzan el precio)
+        if tipo == "MKT" or (tipo == "LMT" and ((accion == "BUY" and limite >= precio) or (accion == "SELL" and limite <= precio))):
+            with self.servidor.candado:
+                cantidad_actual, costo = self.servidor.posiciones.get(symbol, [0.0, 0.0])
+                nueva = cantidad_actual + (cantidad if accion == "BUY" else -cantidad)
+                if nueva == 0:
+                    self.servidor.posiciones.pop(symbol, None)
+                else:
+                    self.servidor.posiciones[symbol] = [nueva, precio if cantidad_actual == 0 else costo]
+            self.enviar(IN.ORDER_STATUS, orderId, "Filled", cantidad, 0.0, precio, orderId, 0, precio, 1, "", 0.0,
+                        retraso=2 * self.servidor.latencia)
+        else:
+            self.servidor.ordenes[orderId] = campos
+            
+            
+    def cancel_order(self, campos: list) -> None:
+        
+        orderId = int(campos[2])
+        if self.servidor.ordenes.pop(orderId, None) is not None:
+            self.enviar(IN.ORDER_STATUS, orderId, "Cancelled", 0.0, 0.0, 0.0, orderId, 0, 0.0, 1, "", 0.0)
+            
+            
+    def req_open_orders(self, campos: list) -> None:
+        
+        self.enviar(IN.OPEN_ORDER_END, 1)
+        
+        
+    def req_completed_orders(self, campos: list) -> None:
+        
+        self.enviar(IN.COMPLETED_ORDERS_END)
+        
+        
+    # -------------------------------------------------- Tiempo Real --------------------------------------------------
+    
+    def enviar_cotizacion(self, reqId: int, symbol: str) -> None:
+        
+        """
+        Método que envía una cotización completa (bid, ask, last, volumen y volatilidad implícita) de un símbolo.
+        """
+        
+        precio = self.servidor.precio(symbol, mover=True)
+        tamanos = np.random.randint(1, 50, 3) * 100
+        self.enviar(IN.TICK_PRICE, 6, reqId, 1, round(precio - 0.01, 2), tamanos[0], 0, retraso=0.0)
+        self.enviar(IN.TICK_PRICE, 6, reqId, 2, round(precio + 0.01, 2), tamanos[1], 0, retraso=0.0)
+        self.enviar(IN.TICK_PRICE, 6, reqId, 4, precio, tamanos[2], 0, retraso=0.0)
+        self.enviar(IN.TICK_SIZE, 6, reqId, 8, int(np.random.randint(10_000, 1_000_000)), retraso=0.0)
+        self.enviar(IN.TICK_GENERIC, 6, reqId, 24, round(0.2 + 0.1 * np.random.random(), 4), retraso=0.0)
+        
+        
+    def transmitir(self) -> None:
+        
+        """
+        Método que ejecuta el hilo de datos en tiempo real: en cada ciclo envía un dato por suscripción activa.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        while self.activa:
+            time.sleep(1 / self.servidor.ticks_por_segundo)
+            with self.candado:
+                mkt_data = list(self.mkt_data.items())
+                tick_by_tick = list(self.tick_by_tick.items())
+                pnl = list(self.pnl)
+                barras_5s = list(self.barras_5s.items())
+            for reqId, symbol in mkt_data:
+                self.enviar_cotizacion(reqId, symbol)
+            ahora = int(time.time())
+            for reqId, (symbol, tipo) in tick_by_tick:
+                precio = self.servidor.precio(symbol, mover=True)
+                if tipo in ("Last", "AllLast"):
+                    self.enviar(IN.TICK_BY_TICK, reqId, 1 if tipo == "Last" else 2, ahora, precio, 100, 0, "NASDAQ", "",
+                                retraso=0.0)
+                elif tipo == "BidAsk":
+                    self.enviar(IN.TICK_BY_TICK, reqId, 3, ahora, round(precio - 0.01, 2), round(precio + 0.01, 2), 100,
+                                100, 0, retraso=0.0)
+                else:
+                    self.enviar(IN.TICK_BY_TICK, reqId, 4, ahora, precio, retraso=0.0)
+            # Barras de 5 segundos (al terminar cada periodo)
+            if ahora // 5 > self.ultima_barra_5s:
+                self.ultima_barra_5s = ahora // 5
+                for reqId, symbol in barras_5s:
+                    cierre = self.servidor.precio(symbol, mover=True)
+                    apertura = round(cierre * (1 + np.random.normal(0, 0.0005)), 2)
+                    self.enviar(IN.REAL_TIME_BARS, 3, reqId, ahora - ahora % 5 - 5, apertura, max(apertura, cierre) + 0.01,
+                                min(apertura, cierre) - 0.01, cierre, int(np.random.randint(100, 10_000)),
+                                round((apertura + cierre) / 2, 4), int(np.random.randint(1, 50)), retraso=0.0)
+            for reqId in pnl:
+                self.enviar(IN.PNL, reqId, round(np.random.normal(0, 100), 2), round(np.random.normal(0, 500), 2), 0.0,
+                            retraso=0.0)
+
+
+if __name__ == "__main__":
+    
+    # Iniciar Servidor en el puerto de TWS (Paper Trading)
+    servidor = ServidorSimulado(port=7497, latencia=0.005)
+    print(f"Servidor simulado escuchando en {servidor.host}:{servidor.iniciar()} (Ctrl+C para detener)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servidor.detener()
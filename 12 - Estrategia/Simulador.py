@@ -0,0 +1,771 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import heapq
+import itertools
+import sys
+from collections import defaultdict
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from IB_Trading import IB_Trading, Contract
+from Cache_Historico import duracion_a_intervalo, texto_a_fecha
+from Agregador_Barras import interpretar_resolucion
+from Backtesting import cargar_barras, remuestrear
+
+# Función que convierte una fecha en nanosegundos desde 1970
+def a_nanosegundos(fecha) -> int:
+    
+    """
+    Función que convierte una fecha (datetime, pd.Timestamp, texto o nanosegundos) en nanosegundos desde 1970.
+    """
+    
+    if isinstance(fecha, (int, np.integer)):
+        return int(fecha)
+        
+    return pd.Timestamp(fecha).value
+
+
+# Clase que implementa un reloj de simulación dirigido por eventos
+class RelojSimulado:
+    
+    """
+    Clase que implementa un reloj de simulación: el tiempo no avanza solo, sino que salta al siguiente evento
+    programado. Los eventos se guardan en un heap ordenado por (tiempo, orden de programación), de forma que una sesión
+    completa se reproduce tan rápido como lo permite el procesador.
+    """
+    
+    def __init__(self, inicio=0) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        inicio : datetime | int, opcional
+            Tiempo inicial del reloj. Por defecto, es 0 (1970).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Tiempo actual (nanosegundos desde 1970) y eventos programados
+        self.ahora = a_nanosegundos(inicio)
+        self.eventos = []
+        self.secuencia = itertools.count()
+        
+        
+    def fecha(self) -> pd.Timestamp:
+        
+        """
+        Método que devuelve el tiempo actual del reloj como fecha.
+        """
+        
+        return pd.Timestamp(self.ahora)
+        
+        
+    def time(self) -> float:
+        
+        """
+        Método que devuelve el tiempo actual en segundos desde 1970 (equivalente a `time.time()`).
+        """
+        
+        return self.ahora / 1e9
+        
+        
+    def programar(self, tiempo, funcion, *args) -> None:
+        
+        """
+        Método que programa la ejecución de una función.
+        
+        Parámetros:
+        -----------
+        tiempo : datetime | int
+            Momento de la ejecución. Si ya pasó, la función se ejecuta en el siguiente avance del reloj.
+            
+        funcion : callable
+            Función a ejecutar.
+            
+        *args :
+            Argumentos de la función.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        heapq.heappush(self.eventos, (max(a_nanosegundos(tiempo), self.ahora), next(self.secuencia), funcion, args))
+        
+        
+    def siguiente(self) -> int:
+        
+        """
+        Método que devuelve el tiempo del siguiente evento programado (`None` si no hay eventos).
+        """
+        
+        return self.eventos[0][0] if len(self.eventos) > 0 else None
+        
+        
+    def avanzar(self, tiempo, incluir: bool = True) -> None:
+        
+        """
+        Método que ejecuta en orden los eventos programados hasta un tiempo y deja el reloj en ese tiempo.
+        
+        Parámetros:
+        -----------
+        tiempo : datetime | int
+            Tiempo final.
+            
+        incluir : bool, opcional
+            Si es True, también se ejecutan los eventos programados exactamente en `tiempo`. Por defecto, es True.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        tiempo = a_nanosegundos(tiempo)
+        while len(self.eventos) > 0 and (self.eventos[0][0] < tiempo or (incluir and self.eventos[0][0] == tiempo)):
+            momento, _, funcion, args = heapq.heappop(self.eventos)
+            self.ahora = momento
+            funcion(*args)
+        self.ahora = max(self.ahora, tiempo)
+
+
+# Clase que define el deslizamiento de las órdenes simuladas
+class Deslizamiento:
+    
+    """
+    Clase que define el deslizamiento (slippage) de las órdenes simuladas: el precio de ejecución de las órdenes de
+    mercado y de paro se mueve en contra de la orden en un porcentaje (puntos base) más un número fijo de ticks. Las
+    órdenes límite se ejecutan a su precio límite o mejor, sin deslizamiento.
+    """
+    
+    def __init__(self, puntos_base: float = 0.0, ticks: int = 0, tamano_tick: float = 0.01) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        puntos_base : float, opcional
+            Deslizamiento proporcional en puntos base (1 = 0.01 %). Por defecto, es 0.0.
+            
+        ticks : int, opcional
+            Deslizamiento fijo en ticks. Por defecto, es 0.
+            
+        tamano_tick : float, opcional
+            Tamaño del tick. Por defecto, es 0.01.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        self.puntos_base = puntos_base
+        self.ticks = ticks
+        self.tamano_tick = tamano_tick
+        
+        
+    def precio(self, action: str, precio: float) -> float:
+        
+        """
+        Método que aplica el deslizamiento a un precio de referencia.
+        
+        Parámetros:
+        -----------
+        action : str
+            "BUY" o "SELL".
+            
+        precio : float
+            Precio de referencia.
+            
+        Salida:
+        -------
+        return: float : Precio de ejecución (mayor para compras y menor para ventas).
+        """
+        
+        ajuste = precio * self.puntos_base / 10000 + self.ticks * self.tamano_tick
+        
+        return precio + ajuste if action == "BUY" else precio - ajuste
+
+
+# Clase que simula el servidor de IB con datos almacenados
+class IB_Simulado:
+    
+    """
+    Clase que reproduce barras y ticks almacenados con un reloj simulado y expone el subconjunto de métodos de
+    `IB_Trading` que utilizan las estrategias (datos históricos, órdenes, posiciones y cierre de sesión), de forma que el
+    mismo código de una estrategia puede ejecutarse contra datos pasados sin conexión y sin esperas.
+    
+    Las órdenes de mercado, límite, de paro (STP) y de paro con límite (STP LMT) se ejecutan con el primer precio
+    posterior a su envío: la apertura de la siguiente barra (y su máximo o mínimo para los precios límite y de paro) o el
+    siguiente tick (ask para compras, bid para ventas).
+    """
+    
+    def __init__(self, datos: dict, barSize: str = "1 min", ticks: dict = None, deslizamiento: Deslizamiento = None,
+                 comision: float = 0.0, cuenta: str = "SIMULADA", verbose: bool = False) -> None:
+                 
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        datos : dict
+            Diccionario {activo: pd.DataFrame} con las barras almacenadas (formato de `reqHistoricalData`). Las barras
+            de mayor duración que solicite la estrategia se obtienen agrupando estas barras.
+            
+        barSize : str, opcional
+            Tamaño de las barras de `datos`. Por defecto, es "1 min".
+            
+        ticks : dict, opcional
+            Diccionario {activo: pd.DataFrame} con ticks grabados (formato de `GrabadorTicks.a_dataframe`: columna
+            "Time" y columnas "Price", "MidPoint" o "Bid"/"Ask"). Por defecto, es `None`.
+            
+        deslizamiento : Deslizamiento, opcional
+            Modelo de deslizamiento. Si es `None`, no hay deslizamiento.
+            
+        comision : float, opcional
+            Comisión por unidad operada. Por defecto, es 0.0.
+            
+        cuenta : str, opcional
+            Número de cuenta de las posiciones simuladas. Por defecto, es "SIMULADA".
+            
+        verbose : bool, opcional
+            Si es True, se muestran en consola las órdenes y ejecuciones. Por defecto, es False.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Datos
+        self.datos = {activo: df.sort_index() for activo, df in datos.items() if df is not None and len(df) > 0}
+        self.barSize = barSize
+        self.duracion = interpretar_resolucion(barSize)[1]
+        self.ticks = ticks or {}
+        self.barras_agrupadas = {}
+        # Parámetros de la simulación
+        self.reloj = RelojSimulado()
+        self.deslizamiento = deslizamiento or Deslizamiento()
+        self.comision = comision
+        self.cuenta = cuenta
+        self.verbose = verbose
+        # Órdenes, posiciones y ejecuciones
+        self.siguiente_id = 1
+        self.ordenes = {}
+        self.pendientes = defaultdict(list)
+        self.posiciones = {}
+        self.ejecuciones = []
+        self.ultimos_precios = {}
+        self.pnl_realizado = 0.0
+        self.comisiones = 0.0
+        
+        
+    # Métodos de IB_Trading que no dependen de la conexión
+    market_order = IB_Trading.market_order
+    limit_order = IB_Trading.limit_order
+    existing_order_position = IB_Trading.existing_order_position
+    
+    def connect(self, *args, **kwargs) -> None:
+        
+        """
+        Método sin efecto (la simulación no requiere conexión).
+        """
+        
+        
+    def disconnect(self, *args, **kwargs) -> None:
+        
+        """
+        Método sin efecto (la simulación no requiere conexión).
+        """
+        
+        
+    # -------------------------------------------------- Datos Históricos --------------------------------------------------
+    
+    def barras(self, activo: str, barSize: str) -> tuple:
+        
+        """
+        Método que devuelve las barras de un activo en un tamaño de barra y el cierre de cada barra en nanosegundos (las
+        barras agrupadas se calculan una sola vez).
+        """
+        
+        clave = (activo, barSize)
+        if clave not in self.barras_agrupadas:
+            df = self.datos[activo]
+            if barSize != self.barSize:
+                df = remuestrear(df, barSize)
+            fines = df.index.values.astype("datetime64[ns]").astype("int64") + interpretar_resolucion(barSize)[1]
+            self.barras_agrupadas[clave] = (df, fines)
+            
+        return self.barras_agrupadas[clave]
+        
+        
+    def reqHistoricalData(self, reqId: int = None, contract: Contract = None, endDateTime: str = "", durationStr: str = "1 Y",
+                          barSizeSetting: str = "1 day", **kwargs) -> pd.DataFrame:
+                          
+        """
+        Método que devuelve las barras de un activo que ya habían cerrado en el tiempo actual del reloj (o en
+        `endDateTime`), con el mismo formato que `IB_Trading.reqHistoricalData`.
+        
+        Parámetros:
+        -----------
+        reqId : int, opcional
+            Sin efecto (se acepta por compatibilidad).
+            
+        contract : Contract
+            Contrato del activo (se utiliza su símbolo).
+            
+        endDateTime, durationStr, barSizeSetting :
+            Los mismos parámetros que `IB_Trading.reqHistoricalData`.
+            
+        **kwargs :
+            Resto de parámetros de `IB_Trading.reqHistoricalData` (sin efecto).
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Barras del intervalo solicitado, o `None` si el activo no tiene datos.
+        """
+        
+        if contract.symbol not in self.datos:
+            return None
+        df, fines = self.barras(contract.symbol, barSizeSetting)
+        fin = texto_a_fecha(endDateTime) if endDateTime else self.reloj.fecha().to_pydatetime()
+        inicio = duracion_a_intervalo(durationStr, fin)
+        # Barras cerradas dentro del intervalo
+        ultima = np.searchsorted(fines, a_nanosegundos(fin), side="right")
+        primera = np.searchsorted(df.index.values, np.datetime64(pd.Timestamp(inicio)), side="left")
+        
+        return df.iloc[primera:ultima]
+        
+        
+    def reqHistoricalDataBatch(self, contracts, endDateTime: str = "", durationStr: str = "1 Y", barSizeSetting: str = "1 day",
+                               callback=None, **kwargs) -> dict:
+                               
+        """
+        Método que devuelve las barras de varios activos, con el mismo formato que `IB_Trading.reqHistoricalDataBatch`.
+        
+        Parámetros:
+        -----------
+        contracts : list | dict
+            Contratos a consultar. Si es una lista, los resultados se indexan por la posición de cada contrato (dos contratos
+            pueden tener el mismo símbolo); si es un diccionario, se utilizan sus claves.
+            
+        endDateTime, durationStr, barSizeSetting, callback :
+            Los mismos parámetros que `IB_Trading.reqHistoricalDataBatch`.
+            
+        Salida:
+        -------
+        return: dict : Diccionario {clave: pd.DataFrame} (`None` para los activos sin datos).
+        """
+        
+        pares = contracts.items() if isinstance(contracts, dict) else list(enumerate(contracts))
+        resultados = {}
+        for clave, contrato in pares:
+            resultados[clave] = self.reqHistoricalData(contract=contrato, endDateTime=endDateTime, durationStr=durationStr,
+                                                       barSizeSetting=barSizeSetting)
+            if callback is not None:
+                callback(clave, resultados[clave])
+                
+        return resultados
+        
+        
+    # -------------------------------------------------- Órdenes --------------------------------------------------
+    
+    def reqIds(self, numIds: int = -1, timeout: float = 3.0) -> int:
+        
+        """
+        Método que devuelve el siguiente identificador válido de órdenes.
+        """
+        
+        return self.siguiente_id
+        
+        
+    def placeOrder(self, orderId: int, contract: Contract, order) -> None:
+        
+        """
+        Método que recibe una orden. Se ejecutará con el primer precio posterior al tiempo actual del reloj.
+        
+        Parámetros:
+        -----------
+        orderId : int
+            Identificador de la orden (si ya existe, la orden se modifica).
+            
+        contract : Contract
+            Contrato de la orden.
+            
+        order : Order
+            Orden ("MKT", "LMT", "STP" o "STP LMT").
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        if orderId in self.ordenes:
+            self.pendientes[self.ordenes[orderId]["activo"]].remove(orderId)
+        self.ordenes[orderId] = {"orderId": orderId, "activo": contract.symbol, "tipo_activo": contract.secType,
+                                 "posicion": order.action, "tipo_orden": order.orderType, "estado_orden": "Submitted",
+                                 "contrato": contract, "orden": order, "tiempo": self.reloj.ahora}
+        self.pendientes[contract.symbol].append(orderId)
+        self.siguiente_id = max(self.siguiente_id, orderId + 1)
+        if self.verbose:
+            print(f"{self.reloj.fecha()} Orden {orderId}: {order.action} {order.totalQuantity} {contract.symbol} "
+                  f"({order.orderType})")
+                  
+                  
+    def cancelOrder(self, orderId: int, manualCancelOrderTime: str = "") -> None:
+        
+        """
+        Método que cancela una orden pendiente.
+        """
+        
+        orden = self.ordenes.pop(orderId, None)
+        if orden is not None:
+            self.pendientes[orden["activo"]].remove(orderId)
+            
+            
+    def reqGlobalCancel(self) -> None:
+        
+        """
+        Método que cancela todas las órdenes pendientes.
+        """
+        
+        for orderId in list(self.ordenes):
+            self.cancelOrder(orderId)
+            
+            
+    def reqAllOpenOrders(self, keep_stored: bool = False, timeout: float = 3.0) -> pd.DataFrame:
+        
+        """
+        Método que devuelve las órdenes pendientes con el formato de `IB_Trading.reqAllOpenOrders` (False si no hay).
+        """
+        
+        if len(self.ordenes) == 0:
+            return False
+        ordenes = pd.DataFrame(list(self.ordenes.values()))
+        
+        return ordenes.drop(columns=["tiempo"])
+        
+        
+    reqOpenOrders = reqAllOpenOrders
+    
+    def reqPositions(self, keep_stored: bool = False, timeout: float = 5.0) -> pd.DataFrame:
+        
+        """
+        Método que devuelve las posiciones con el formato de `IB_Trading.reqPositions` (False si no hay). Como en IB,
+        las posiciones cerradas durante la sesión se reportan con cantidad 0.
+        """
+        
+        if len(self.posiciones) == 0:
+            return False
+        filas = [{"Cuenta": self.cuenta, "Símbolo": activo, "Tipo Activo": posicion["contrato"].secType,
+                  "exchange": posicion["contrato"].exchange, "Cantidad": posicion["cantidad"],
+                  "Costo Promedio": posicion["costo"], "Valor Total Posición": posicion["cantidad"] * posicion["costo"],
+                  "contrato": posicion["contrato"]} for activo, posicion in self.posiciones.items()]
+                  
+        return pd.DataFrame(filas)
+        
+        
+    def reqCompletedOrders(self, apiOnly: bool = False, keep_stored: bool = False, timeout: float = 3.0) -> pd.DataFrame:
+        
+        """
+        Método que devuelve las ejecuciones de la simulación (False si no hay).
+        """
+        
+        if len(self.ejecuciones) == 0:
+            return False
+            
+        return pd.DataFrame(self.ejecuciones)
+        
+        
+    def end_session(self, account: str = None, close_orders: bool = False, close_positions: bool = False) -> None:
+        
+        """
+        Método que termina la sesión como `IB_Trading.end_session`: cancela las órdenes pendientes y cierra las
+        posiciones abiertas con órdenes de mercado (se ejecutan con el siguiente precio).
+        """
+        
+        if close_orders:
+            self.reqGlobalCancel()
+        if close_positions:
+            for activo, posicion in self.posiciones.items():
+                if posicion["cantidad"] != 0:
+                    direccion = "SELL" if posicion["cantidad"] > 0 else "BUY"
+                    orden = self.market_order(action=direccion, totalQuantity=abs(posicion["cantidad"]))
+                    self.placeOrder(orderId=self.reqIds(), contract=posicion["contrato"], order=orden)
+                    
+                    
+    # -------------------------------------------------- Ejecución --------------------------------------------------
+    
+    def ejecutar(self, orderId: int, precio: float, tiempo: int) -> None:
+        
+        """
+        Método que registra la ejecución completa de una orden (en `tiempo`, nanosegundos) y actualiza la posición del
+        activo.
+        """
+        
+        orden = self.ordenes.pop(orderId)
+        self.pendientes[orden["activo"]].remove(orderId)
+        cantidad = float(orden["orden"].totalQuantity) * (1 if orden["posicion"] == "BUY" else -1)
+        posicion = self.posiciones.setdefault(orden["activo"], {"cantidad": 0.0, "costo": 0.0, "contrato": orden["contrato"]})
+        # Ganancia realizada de la parte que reduce la posición
+        if posicion["cantidad"] * cantidad < 0:
+            cerrada = min(abs(cantidad), abs(posicion["cantidad"])) * np.sign(posicion["cantidad"])
+            self.pnl_realizado += float(cerrada * (precio - posicion["costo"]))
+        # Nuevo costo promedio
+        nueva = posicion["cantidad"] + cantidad
+        if nueva == 0:
+            posicion["costo"] = 0.0
+        elif posicion["cantidad"] * nueva <= 0:
+            posicion["costo"] = precio
+        elif abs(nueva) > abs(posicion["cantidad"]):
+            posicion["costo"] = (posicion["costo"] * posicion["cantidad"] + precio * cantidad) / nueva
+        posicion["cantidad"] = nueva
+        comision = abs(cantidad) * self.comision
+        self.comisiones += comision
+        self.ejecuciones.append({"Fecha": pd.Timestamp(tiempo), "orderId": orderId, "activo": orden["activo"],
+                                 "posicion": orden["posicion"], "tipo_orden": orden["tipo_orden"], "cantidad": abs(cantidad),
+                                 "precio": precio, "comision": comision})
+        if self.verbose:
+            print(f"{pd.Timestamp(tiempo)} Ejecución {orderId}: {orden['posicion']} {abs(cantidad)} {orden['activo']} @ {precio:.4f}")
+            
+            
+    def procesar_precios(self, activo: str, inicio: int, compra: tuple, venta: tuple) -> None:
+        
+        """
+        Método que revisa las órdenes pendientes de un activo contra un nuevo precio.
+        
+        Parámetros:
+        -----------
+        activo : str
+            Símbolo del activo.
+            
+        inicio : int
+            Tiempo (nanosegundos) desde el que es válido el precio: sólo se ejecutan las órdenes enviadas antes.
+            
+        compra : tuple
+            (apertura, máximo, mínimo) del precio para las órdenes de compra.
+            
+        venta : tuple
+            (apertura, máximo, mínimo) del precio para las órdenes de venta.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        for orderId in list(self.pendientes[activo]):
+            orden = self.ordenes[orderId]
+            if orden["tiempo"] > inicio:
+                continue
+            action = orden["posicion"]
+            apertura, maximo, minimo = compra if action == "BUY" else venta
+            tipo = orden["tipo_orden"]
+            # Órdenes de Paro (se activan al tocar el precio de paro)
+            if tipo in ("STP", "STP LMT"):
+                paro = orden["orden"].auxPrice
+                if (action == "BUY" and maximo < paro) or (action == "SELL" and minimo > paro):
+                    continue
+                if tipo == "STP":
+                    referencia = max(apertura, paro) if action == "BUY" else min(apertura, paro)
+                    self.ejecutar(orderId, self.deslizamiento.precio(action, referencia), inicio)
+                    continue
+                # La orden se convierte en límite
+                orden["tipo_orden"] = tipo = "LMT"
+            # Órdenes Límite
+            if tipo == "LMT":
+                limite = orden["orden"].lmtPrice
+                if action == "BUY" and minimo <= limite:
+                    self.ejecutar(orderId, min(apertura, limite), inicio)
+                elif action == "SELL" and maximo >= limite:
+                    self.ejecutar(orderId, max(apertura, limite), inicio)
+            # Órdenes de Mercado
+            else:
+                self.ejecutar(orderId, self.deslizamiento.precio(action, apertura), inicio)
+                
+                
+    # -------------------------------------------------- Reproducción --------------------------------------------------
+    
+    def al_cerrar(self, barSize: str, funcion, inicio=None, fin=None) -> None:
+        
+        """
+        Método que programa una función en el cierre de cada barra de `barSize` (en los momentos en que al menos un
+        activo cierra una barra), como lo haría una estrategia que se ejecuta en cada nueva vela.
+        
+        Parámetros:
+        -----------
+        barSize : str
+            Tamaño de las barras.
+            
+        funcion : callable
+            Función `funcion(app)` que recibe esta instancia.
+            
+        inicio, fin : datetime, opcional
+            Intervalo en el que se programan las ejecuciones. Si es `None`, no se aplica límite.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        inicio = -2**62 if inicio is None else a_nanosegundos(inicio)
+        fin = 2**62 if fin is None else a_nanosegundos(fin)
+        cierres = np.unique(np.concatenate([self.barras(activo, barSize)[1] for activo in self.datos]))
+        for cierre in cierres[(cierres >= inicio) & (cierres <= fin)].tolist():
+            self.reloj.programar(cierre, funcion, self)
+            
+            
+    def eventos(self, inicio: int, fin: int) -> list:
+        
+        """
+        Método que construye la secuencia de precios a reproducir: el cierre de cada barra almacenada y cada tick, en
+        orden cronológico.
+        
+        Salida:
+        -------
+        return: list : Lista de tuplas (tiempo, activo, inicio, compra, venta, último precio).
+        """
+        
+        tiempos, registros = [], []
+        for activo, df in self.datos.items():
+            inicios = df.index.values.astype("datetime64[ns]").astype("int64")
+            fines = inicios + self.duracion
+            seleccion = (fines > inicio) & (fines <= fin)
+            precios = df.loc[seleccion, ["Open", "High", "Low", "Close"]].to_numpy(dtype="float64").tolist()
+            for fin_barra, inicio_barra, precio in zip(fines[seleccion].tolist(), inicios[seleccion].tolist(), precios):
+                tiempos.append(fin_barra)
+                registros.append((fin_barra, activo, inicio_barra, tuple(precio[:3]), tuple(precio[:3]), precio[3]))
+        for activo, df in self.ticks.items():
+            momentos = pd.DatetimeIndex(df["Time"]).values.astype("datetime64[ns]").astype("int64")
+            if "Bid" in df.columns:
+                compras, ventas = df["Ask"].to_numpy(dtype="float64"), df["Bid"].to_numpy(dtype="float64")
+            else:
+                compras = ventas = df["Price" if "Price" in df.columns else "MidPoint"].to_numpy(dtype="float64")
+            seleccion = (momentos > inicio) & (momentos <= fin)
+            for momento, precio_compra, precio_venta in zip(momentos[seleccion].tolist(), compras[seleccion].tolist(),
+                                                            ventas[seleccion].tolist()):
+                tiempos.append(momento)
+                registros.append((momento, activo, momento, (precio_compra,) * 3, (precio_venta,) * 3,
+                                  (precio_compra + precio_venta) / 2))
+        orden = np.argsort(np.asarray(tiempos, dtype="int64"), kind="stable")
+        
+        return [registros[i] for i in orden.tolist()]
+        
+        
+    def reproducir(self, inicio, fin) -> None:
+        
+        """
+        Método que reproduce los precios almacenados entre dos fechas. Antes de cada precio se ejecutan los eventos del
+        reloj programados hasta ese momento (por ejemplo, la estrategia al cierre de cada barra), de forma que las órdenes
+        que envían se ejecutan con los precios siguientes.
+        
+        Parámetros:
+        -----------
+        inicio : datetime
+            Fecha de inicio de la reproducción.
+            
+        fin : datetime
+            Fecha final de la reproducción.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        inicio, fin = a_nanosegundos(inicio), a_nanosegundos(fin)
+        self.reloj.ahora = max(self.reloj.ahora, inicio)
+        for tiempo, activo, desde, compra, venta, ultimo in self.eventos(inicio, fin):
+            self.reloj.avanzar(tiempo, incluir=False)
+            if self.pendientes[activo]:
+                self.procesar_precios(activo, desde, compra, venta)
+            self.ultimos_precios[activo] = ultimo
+        self.reloj.avanzar(fin)
+        
+        
+    def resumen(self) -> dict:
+        
+        """
+        Método que resume el resultado de la simulación.
+        
+        Salida:
+        -------
+        return: dict : PnL realizado, no realizado (con el último precio de cada activo), comisiones, PnL neto y número
+                       de ejecuciones.
+        """
+        
+        no_realizado = 0.0
+        for activo, posicion in self.posiciones.items():
+            no_realizado += float(posicion["cantidad"] * (self.ultimos_precios.get(activo, posicion["costo"]) - posicion["costo"]))
+            
+        return {"pnl_realizado": self.pnl_realizado, "pnl_no_realizado": no_realizado, "comisiones": self.comisiones,
+                "pnl_neto": self.pnl_realizado + no_realizado - self.comisiones, "ejecuciones": len(self.ejecuciones)}
+
+
+# Función que reproduce Sistema_Alternativo con datos almacenados
+def reproducir_sistema_alternativo(datos: dict, inicio, fin, barSize: str = "1 min", hora_cierre: str = "15:59",
+                                   **kwargs) -> IB_Simulado:
+                                   
+    """
+    Función que reproduce `Sistema_Alternativo` con barras almacenadas: las señales se procesan al cierre de cada vela
+    de `marco_tiempo` (con las mismas funciones `procesar_senales`, `ejecutar_orden`, `procesar_posiciones` y
+    `procesar_ordenes` que en tiempo real) y todas las posiciones se cierran cada día a `hora_cierre`.
+    
+    Parámetros:
+    -----------
+    datos : dict
+        Diccionario {activo: pd.DataFrame} con las barras almacenadas (incluyendo los días previos a `inicio` que
+        necesita `tiempo_descargado`).
+        
+    inicio : datetime
+        Fecha de inicio de la reproducción.
+        
+    fin : datetime
+        Fecha final de la reproducción.
+        
+    barSize : str, opcional
+        Tamaño de las barras de `datos`. Por defecto, es "1 min".
+        
+    hora_cierre : str, opcional
+        Hora ("HH:MM") a la que se cierran las posiciones cada día. Por defecto, es "15:59".
+        
+    **kwargs :
+        Parámetros adicionales de `IB_Simulado` (ticks, deslizamiento, comision, verbose).
+        
+    Salida:
+    -------
+    return: IB_Simulado : Simulación terminada (ver `resumen` y `reqCompletedOrders`).
+    """
+    
+    from Sistema_Alternativo import crear_contratos, procesar_senales, marco_tiempo
+    
+    app = IB_Simulado(datos, barSize=barSize, **kwargs)
+    contratos = crear_contratos([activo for activo in datos if activo in app.datos])
+    cierre = datetime.strptime(hora_cierre, "%H:%M").time()
+    
+    # Procesar Señales al cierre de cada vela (antes del cierre de la sesión)
+    def iteracion(app: IB_Simulado) -> None:
+        if app.reloj.fecha().time() < cierre:
+            procesar_senales(IB_app=app, contratos=contratos)
+            
+    app.al_cerrar(marco_tiempo, iteracion, inicio, fin)
+    # Cerrar Posiciones cada día
+    dias = pd.DatetimeIndex(np.unique(np.concatenate([df.index.normalize().values for df in app.datos.values()])))
+    for dia in dias[(dias >= pd.Timestamp(inicio).normalize()) & (dias <= pd.Timestamp(fin))]:
+        app.reloj.programar(dia + pd.Timedelta(hours=cierre.hour, minutes=cierre.minute), app.end_session, app.cuenta,
+                            True, True)
+    app.reproducir(inicio, fin)
+    
+    return app
+
+
+if __name__ == "__main__":
+    
+    # Reproducir Sistema_Alternativo con las barras de 1 minuto almacenadas (SQLite o Parquet)
+    from Sistema_Alternativo import tickers
+    fuente = sys.argv[1] if len(sys.argv) > 1 else "../datos/parquet"
+    inicio, fin = pd.Timestamp(sys.argv[2]), pd.Timestamp(sys.argv[3]) + pd.Timedelta(days=1)
+    datos = cargar_barras(fuente, tickers, barSize="1 min", inicio=inicio - pd.Timedelta(days=30), fin=fin)
+    app = reproducir_sistema_alternativo(datos, inicio, fin, deslizamiento=Deslizamiento(puntos_base=1.0),
+                                         comision=0.005, verbose=True)
+    print(app.resumen())
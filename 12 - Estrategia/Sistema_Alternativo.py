@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 # Importar librerías
 from IB_Trading import IB_Trading, Contract
-from Analisis_Tecnico import Cruce_MA
+from Analisis_Tecnico import Cruce_MA, Monitor_Cruces_MA
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
+import queue
 import time
 
 # Seleccionar Activos a Analizar
@@ -12,10 +13,6 @@ tickers = ["AMZN", "AAPL", "TSLA", "MSFT", "GOOG", "META", "NVDA"]
 marco_tiempo = "1 hour"
 tiempo_descargado = "15 D"
 
-# Generar Instancia
-IB_app = IB_Trading(log_file="alternative_errors.txt", errors_verbose=True)
-IB_app.connect(host="127.0.0.1", port=7497, clientId=2)
-
 # Definir Función para ejecutar órdenes
 def ejecutar_orden(IB_app: IB_Trading, ticker: str, contrato: Contract, direccion: str, cantidad: int = 10) -> None:
     
@@ -75,63 +72,150 @@ def procesar_ordenes(IB_app: IB_Trading, ticker: str, direccion: str, contrato:
         if len(ordenes) == 0:
             ejecutar_orden(IB_app=IB_app, ticker=ticker, contrato=contrato, direccion=direccion)
         else:
-            posicion_actual = ordenes["posiscion"].iloc[0]
+            posicion_actual = ordenes["posicion"].iloc[0]
             if (direccion == "BUY" and posicion_actual == "SELL") or (direccion == "SELL" and posicion_actual == "BUY"):
                 IB_app.cancelOrder(orderId=ordenes["orderId"].iloc[0])
                 ejecutar_orden(IB_app=IB_app, ticker=ticker, contrato=contrato, direccion=direccion)
                 
-# Ejecutar Sistema:
+# Definir Función para crear los Contratos
+def crear_contratos(tickers: list) -> dict:
     
-# Crear Contrato
-contrato = Contract()
-contrato.secType = "STK"
-contrato.exchange = "SMART"
-contrato.currency = "USD"
-
-# Iterar hasta que cierre el mercado
-while True:
-    # Revisar si se han generado señales para cada ticker
+    """
+    Crea los contratos de acciones (SMART, USD) de cada activo.
+    """
+    
+    contratos = {}
     for ticker in tickers:
+        contrato = Contract()
         contrato.symbol = ticker
-        df = IB_app.reqHistoricalData(reqId=0, contract=contrato, durationStr=tiempo_descargado, barSizeSetting=marco_tiempo)
+        contrato.secType = "STK"
+        contrato.exchange = "SMART"
+        contrato.currency = "USD"
+        contratos[ticker] = contrato
+        
+    return contratos
+
+
+# Definir Función para ejecutar una Señal
+def ejecutar_senal(IB_app: IB_Trading, ticker: str, contrato: Contract, direccion: str) -> None:
+    
+    """
+    Envía o ajusta las órdenes de un activo con una señal: abre una posición si no hay posiciones ni órdenes del activo
+    y, en caso contrario, cierra las posiciones o cancela las órdenes en la dirección opuesta.
+    """
+    
+    # Revisar si no hay posiciones u órdenes actuales
+    existente = IB_app.existing_order_position(ticker=ticker)
+    if not existente:
+        # Generar Orden
+        ejecutar_orden(IB_app=IB_app, ticker=ticker, contrato=contrato, direccion=direccion)
+    else:
+        # Procesar Primero las Posiciones
+        procesar_posiciones(IB_app=IB_app, ticker=ticker, direccion=direccion, contrato=contrato)
+        # Procesar Órdenes Activas
+        procesar_ordenes(IB_app=IB_app, ticker=ticker, direccion=direccion, contrato=contrato)
+        
+        
+# Definir Función para procesar las Señales
+def procesar_senales(IB_app: IB_Trading, contratos: dict, tendencia_rapida: int = 9, tendencia_lenta: int = 21) -> None:
+    
+    """
+    Ejecuta una iteración del sistema con datos descargados: descarga los datos de todos los activos, detecta los cruces
+    de medias móviles de la última vela y envía o ajusta las órdenes de cada activo con señal.
+    
+    Se utiliza para reproducir el sistema con datos almacenados (`Simulador.IB_Simulado`); en tiempo real, el sistema
+    utiliza las barras en transmisión de `iniciar_barras`.
+    """
+    
+    # Descargar los datos de todos los tickers de forma concurrente
+    datos_tickers = IB_app.reqHistoricalDataBatch(contracts=contratos, durationStr=tiempo_descargado, barSizeSetting=marco_tiempo)
+    # Revisar si se han generado señales para cada ticker
+    for ticker, contrato in contratos.items():
+        df = datos_tickers[ticker]
+        if df is None or len(df) == 0:
+            continue
         # Detectar Cruces
-        cma = Cruce_MA(df=df, tendencia_rapida=9, tendencia_lenta=21)
+        cma = Cruce_MA(df=df, tendencia_rapida=tendencia_rapida, tendencia_lenta=tendencia_lenta)
         # Revisar si se generó una señal en la última vela
         if pd.notna(cma["Cruces"].iloc[-1]):
             # Obtener Dirección de la Señal Generada
             direccion = "BUY" if cma["Cruces"].iloc[-1] == 1 else "SELL"
-            # Revisar si no hay posiciones u órdenes actuales
-            existente = IB_app.existing_order_position(ticker=ticker)
-            if not existente:
-                # Generar Orden
-                ejecutar_orden(IB_app=IB_app, ticker=ticker, contrato=contrato, direccion=direccion)
-            else:
-                # Procesar Primero las Posiciones
-                procesar_posiciones(IB_app=IB_app, ticker=ticker, direccion=direccion, contrato=contrato)
-                # Procesar Órdenes Activas
-                procesar_ordenes(IB_app=IB_app, ticker=ticker, direccion=direccion, contrato=contrato)
-                
-    # Definir horario de Nueva York (Para Cesar Ejecución)
+            ejecutar_senal(IB_app=IB_app, ticker=ticker, contrato=contrato, direccion=direccion)
+            
+            
+# Definir Función para iniciar las Barras en Tiempo Real
+def iniciar_barras(IB_app: IB_Trading, contratos: dict, tendencia_rapida: int = 9, 
+                   tendencia_lenta: int = 21) -> queue.Queue:
+    
+    """
+    Suscribe cada activo a las barras de 5 segundos de IB (`reqStreamingBars`), que se agregan en velas de `marco_tiempo`
+    con `tiempo_descargado` de historia, y calcula el cruce de medias móviles de forma incremental al cierre de cada vela.
+    Las velas utilizan los mismos datos que `procesar_senales` (ADJUSTED_LAST en el horario regular de negociación).
+    
+    Las señales se colocan en una cola como tuplas (ticker, dirección): las órdenes no pueden enviarse desde el hilo de
+    la API (sus peticiones esperan respuestas de ese mismo hilo), por lo que las procesa `ejecutar_sistema`.
+    """
+    
+    monitor = Monitor_Cruces_MA(tendencia_rapida=tendencia_rapida, tendencia_lenta=tendencia_lenta)
+    senales = queue.Queue()
+    
+    # Actualizar el cruce al cerrar cada vela
+    def al_cerrar(agregador, resolucion: str, barra: dict) -> None:
+        resultado = monitor.actualizar(agregador.nombre, barra["Close"])
+        if pd.notna(resultado["Cruces"]):
+            senales.put((agregador.nombre, "BUY" if resultado["Cruces"] == 1 else "SELL"))
+            
+    for ticker, contrato in contratos.items():
+        agregador = IB_app.reqStreamingBars(contract=contrato, resolutions=[marco_tiempo], source="RealTimeBars",
+                                            seed_duration=tiempo_descargado, whatToShow="ADJUSTED_LAST", useRTH=1)
+        # Calentar con la historia y escuchar las velas nuevas
+        monitor.calentar(ticker, agregador.barras(marco_tiempo))
+        agregador.al_cerrar(al_cerrar)
+        
+    return senales
+    
+    
+# Definir Función para ejecutar el Sistema en tiempo real
+def ejecutar_sistema(IB_app: IB_Trading, contratos: dict) -> None:
+    
+    """
+    Ejecuta el sistema hasta el cierre del mercado: cada señal se procesa en cuanto cierra la vela que la genera (sin
+    volver a descargar datos históricos) y todas las posiciones se cierran 1 minuto antes del cierre.
+    """
+    
+    # Iniciar Barras en Tiempo Real
+    senales = iniciar_barras(IB_app=IB_app, contratos=contratos)
+    
+    # Definir horario de Nueva York (Para Cesar Ejecución): 1 minuto antes del cierre del mercado
     ny = pytz.timezone("America/New_York")
-    hora_ny = datetime.now(tz=ny)
-    hora_ny = hora_ny.replace(hour=15, minute=58, second=0, microsecond=0)
-    horario_cierre = hora_ny.replace(hour=16, minute=0, second=0, microsecond=0)
-    
-    # Cerrar Posiciones si ya no se puede realizar otra iteración: Las posiciones se cerrarán 1 minuto antes de que el mercado cierre.
-    if (hora_ny + timedelta(hours=1)) > horario_cierre:
-        # Pausar la ejecución del código hasta un minuto antes del cierre del mercado
-        hora_cierre_menos_un_minuto = horario_cierre - timedelta(minutes=1)
-        tiempo_dormir = (hora_cierre_menos_un_minuto - hora_ny).total_seconds()
-        time.sleep(tiempo_dormir)
-        # Cerrar Todo
-        IB_app.end_session(account="No. Cuenta", close_orders=True, close_positions=True)
-        # Terminar Bucle
-        break
-    else:
-        # Mostrar en consola
-        print("Código dormirá por 1 hora...")
-        time.sleep(60 * 60)
+    horario_cierre = datetime.now(tz=ny).replace(hour=15, minute=59, second=0, microsecond=0)
+    
+    # Procesar Señales hasta el cierre
+    while True:
+        restante = (horario_cierre - datetime.now(tz=ny)).total_seconds()
+        if restante <= 0:
+            break
+        try:
+            ticker, direccion = senales.get(timeout=min(restante, 1.0))
+        except queue.Empty:
+            continue
+        ejecutar_senal(IB_app=IB_app, ticker=ticker, contrato=contratos[ticker], direccion=direccion)
         
-# Esperar 1 minuto y desconectar al Servidor
-time.sleep(60)
-IB_app.disconnect()
+    # Cancelar Barras y Cerrar Todo
+    for reqId in list(IB_app.agregadores):
+        IB_app.cancelStreamingBars(reqId)
+    IB_app.end_session(account="No. Cuenta", close_orders=True, close_positions=True)
+            
+
+if __name__ == "__main__":
+    
+    # Generar Instancia
+    IB_app = IB_Trading(log_file="alternative_errors.txt", errors_verbose=True)
+    IB_app.connect(host="127.0.0.1", port=7497, clientId=2)
+    
+    # Ejecutar Sistema
+    ejecutar_sistema(IB_app=IB_app, contratos=crear_contratos(tickers))
+            
+    # Esperar 1 minuto y desconectar al Servidor
+    time.sleep(60)
+    IB_app.disconnect()
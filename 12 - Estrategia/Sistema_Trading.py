@@ -1,11 +1,10 @@
 # -*- coding: utf-8 -*-
 # Importar librerías
-from IB_Trading import IB_Trading, Contract
+from IB_Trading import IB_Trading
 from Analisis_Tecnico import Cruce_MA
 from Escaner_Financiero import Open_Gap_Assets
+from Cadena_Opciones import CadenaOpciones
 from datetime import datetime
-import numpy as np
-import time
 
 # Desarollar Sistema de Trading
 def Sistema_Trading() -> IB_Trading:
@@ -40,12 +39,21 @@ def Sistema_Trading() -> IB_Trading:
     
     # Sección 3: Filtrar en Base a los Promedios Móviles
     
+    # Obtener Datos de todos los candidatos en una sola ráfaga concurrente
+    contratos_candidatos = {("Ganancia", indice): instrumento["contrato Detalles"].contract 
+                            for indice, instrumento in ganancia_df.iterrows()}
+    contratos_candidatos.update({("Perdida", indice): instrumento["contrato Detalles"].contract 
+                                 for indice, instrumento in perdida_df.iterrows()})
+    datos_candidatos = IB_app.reqHistoricalDataBatch(contracts=contratos_candidatos, durationStr="3 W", barSizeSetting="30 mins")
+    
     # Filtrar: Validar Cruce de Media Móviles Calls
     cruces_gain = []
     for indice, instrumento in ganancia_df.iterrows():
         # Obtener Datos
-        df = IB_app.reqHistoricalData(reqId=0, contract=instrumento["contrato Detalles"].contract, durationStr="3 W",
-                                      barSizeSetting="30 mins")
+        df = datos_candidatos[("Ganancia", indice)]
+        if df is None:
+            cruces_gain.append(False)
+            continue
         cma = Cruce_MA(df=df, tendencia_rapida=9, tendencia_lenta=21)
         # Tendencia Alcista
         if cma["Tendencia"].iloc[-1] == 1.0:
@@ -57,8 +65,10 @@ def Sistema_Trading() -> IB_Trading:
     cruces_lose = []
     for indice, instrumento in perdida_df.iterrows():
         # Obtener Datos
-        df = IB_app.reqHistoricalData(reqId=0, contract=instrumento["contrato Detalles"].contract, durationStr="3 W",
-                                      barSizeSetting="30 mins")
+        df = datos_candidatos[("Perdida", indice)]
+        if df is None:
+            cruces_lose.append(False)
+            continue
         cma = Cruce_MA(df=df, tendencia_rapida=9, tendencia_lenta=21)
         # Tendencia Bajista
         if cma["Tendencia"].iloc[-1] == -1.0:
@@ -72,91 +82,39 @@ def Sistema_Trading() -> IB_Trading:
     
     # Sección 4: Seleccionar Opciones
     
+    # Cadenas de Opciones (se descargan una vez al día para todos los activos a la vez y se guardan localmente)
+    cadenas = CadenaOpciones(trading_app=IB_app, db_path="cadenas_opciones.db")
+    cadenas.cargar(simbolos=list(ganancia_df["Instrumento"]) + list(perdida_df["Instrumento"]))
+    # Obtener Siguiente Mes
+    fecha_hoy = datetime.now()
+    if fecha_hoy.month == 12:
+        mes_siguiente = fecha_hoy.replace(year=fecha_hoy.year + 1, month=1, day=1).strftime("%Y%m")
+    else:
+        mes_siguiente = fecha_hoy.replace(month=fecha_hoy.month + 1, day=1).strftime("%Y%m")
+    # Vencimiento del Mes Siguiente de cada Activo (Strikes exactos de todos los vencimientos a la vez)
+    vencimientos = {symbol: cadenas.vencimiento_mes(symbol, mes_siguiente) 
+                    for symbol in list(ganancia_df["Instrumento"]) + list(perdida_df["Instrumento"])}
+    cadenas.detallar(pares=[(symbol, vencimiento) for symbol, vencimiento in vencimientos.items() if vencimiento is not None])
+    
     # Seleccionar Contrato de Compra del Mes Siguiente (Calls). Seleccionar el 3 por encima del Contrato ATM
     contratos_seleccionados_gain = []
     for indice, instrumento_gain in ganancia_df.iterrows():
-        # Crear Contrato
-        contrato = Contract()
-        contrato.symbol = instrumento_gain["Instrumento"]
-        contrato.secType = "OPT"
-        contrato.exchange = instrumento_gain["Exchange"]
-        contrato.currency = instrumento_gain["Divisa"]
-        contrato.multiplier = "100"
-        # Obtener Siguiente Mes
-        fecha_hoy = datetime.now()
-        if fecha_hoy.month == 12:
-            fecha_vencimiento = fecha_hoy.replace(year=fecha_hoy.year + 1, month=1, day=1).strftime("%Y%m")
-        else:
-            fecha_vencimiento = fecha_hoy.replace(month=fecha_hoy.month + 1, day=1).strftime("%Y%m")
-        contrato.right = "C"
-        contrato.lastTradeDateOrContractMonth = fecha_vencimiento
-        # Realizar Petición de Contratos
-        contratos = IB_app.reqContractDetails(reqId=0, contract=contrato, timeout=10)
-        if contratos is not None:
-            # Extraer Precios de Ejercicio
-            contratos_strikes = sorted([[detalles_contrato.contract, detalles_contrato.contract.strike] 
-                                 for detalles_contrato in contratos], key=lambda x: x[1])
-            # Tomar el 3er Contrato por encima del Precio de Mercado
-            diversos_strikes = np.array([strike[1] for strike in contratos_strikes])
-            comparacion = diversos_strikes > instrumento_gain["Precio Mercado"]
-            contratos_strikes = (np.array(contratos_strikes)[comparacion])[:3]
-            # Validar que hay contratos
-            if len(contratos_strikes) > 0:
-                strike_seleccionado = contratos_strikes[-1][1]
-                fecha_vencimiento_especifica = contratos_strikes[-1][0].lastTradeDateOrContractMonth
-                # Especificar Strike y Vencimiento
-                contrato.strike = strike_seleccionado
-                contrato.lastTradeDateOrContractMonth = fecha_vencimiento_especifica
-            else:
-                contrato = None
-        else:
-            contrato = None
+        vencimiento = vencimientos[instrumento_gain["Instrumento"]]
+        strike = None if vencimiento is None else cadenas.strike_desplazado(instrumento_gain["Instrumento"], vencimiento, "C",
+                                                                            instrumento_gain["Precio Mercado"], n=3)
+        contrato = None if strike is None else cadenas.contrato(instrumento_gain["Instrumento"], vencimiento, "C", strike)
         # Guardar
         contratos_seleccionados_gain.append(contrato)
-        time.sleep(1)
                 
     # Seleccionar Contrato de Compra del Mes Siguiente (Puts). Seleccionar el 3 por encima del Contrato ATM
     contratos_seleccionados_lose = []
     for indice, instrumento_lose in perdida_df.iterrows():
-        # Crear Contrato
-        contrato = Contract()
-        contrato.symbol = instrumento_lose["Instrumento"]
-        contrato.secType = "OPT"
-        contrato.exchange = instrumento_lose["Exchange"]
-        contrato.currency = instrumento_lose["Divisa"]
-        contrato.multiplier = "100"
-        # Obtener Siguiente Mes
-        fecha_hoy = datetime.now()
-        if fecha_hoy.month == 12:
-            fecha_vencimiento = fecha_hoy.replace(year=fecha_hoy.year + 1, month=1, day=1).strftime("%Y%m")
-        else:
-            fecha_vencimiento = fecha_hoy.replace(month=fecha_hoy.month + 1, day=1).strftime("%Y%m")
-        contrato.right = "P"
-        contrato.lastTradeDateOrContractMonth = fecha_vencimiento
-        # Realizar Petición de Contratos
-        contratos = IB_app.reqContractDetails(reqId=0, contract=contrato, timeout=10)
-        if contratos is not None:
-            # Extraer Precios de Ejercicio
-            contratos_strikes = sorted([[detalles_contrato.contract, detalles_contrato.contract.strike] 
-                                 for detalles_contrato in contratos], key=lambda x: x[1])
-            # Tomar el 3er Contrato por encima del Precio de Mercado
-            diversos_strikes = np.array([strike[1] for strike in contratos_strikes])
-            comparacion = diversos_strikes > instrumento_lose["Precio Mercado"]
-            contratos_strikes = (np.array(contratos_strikes)[comparacion])[:3]
-            # Validar que hay contratos
-            if len(contratos_strikes) > 0:
-                strike_seleccionado = contratos_strikes[-1][1]
-                fecha_vencimiento_especifica = contratos_strikes[-1][0].lastTradeDateOrContractMonth
-                # Especificar Strike y Vencimiento
-                contrato.strike = strike_seleccionado
-                contrato.lastTradeDateOrContractMonth = fecha_vencimiento_especifica
-            else:
-                contrato = None
-        else:
-            contrato = None
+        vencimiento = vencimientos[instrumento_lose["Instrumento"]]
+        strike = None if vencimiento is None else cadenas.strike_desplazado(instrumento_lose["Instrumento"], vencimiento, "P",
+                                                                            instrumento_lose["Precio Mercado"], n=3)
+        contrato = None if strike is None else cadenas.contrato(instrumento_lose["Instrumento"], vencimiento, "P", strike)
         # Guardar
         contratos_seleccionados_lose.append(contrato)
-        time.sleep(1)
     
     # Agregar a DataFrames
     ganancia_df["Contrato Opt"] = contratos_seleccionados_gain
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+# Importar librerías del Proyecto
+from Control_Peticiones import clave_contrato
+# Importar librerías Ordinarias
+import threading
+import time
+import pandas as pd
+from collections import deque
+
+# Clase que administra las suscripciones de datos de mercado respetando el límite de líneas de la cuenta
+class GestorSuscripciones:
+    
+    """
+    Clase que administra las suscripciones de `reqMktData` de una instancia de `IB_Trading`:
+        
+        - Deduplicación: peticiones idénticas (mismo contrato y ticks genéricos) de distintos componentes comparten un
+          único reqId y una única línea; cada componente suma una referencia y la línea se cancela al liberar la última.
+        - Límite de líneas: como máximo `max_lineas - lineas_snapshot` suscripciones en tiempo real. Las suscripciones
+          que exceden el límite entran en una rotación de snapshots (`snapshot=True`) que reutiliza su reqId, por lo que
+          su cotización sigue disponible en el mismo lugar del libro (`IB_Trading.cotizaciones`).
+        - Promoción: al liberarse una línea, la primera suscripción en rotación pasa a tiempo real.
+        - Reconexión: las suscripciones en tiempo real se vuelven a solicitar al reconectar o al recuperar la conexión
+          con pérdida de datos (código 1101).
+          
+    Si IB rechaza una línea por exceder el máximo de la cuenta (código 101), la suscripción pasa a la rotación y el límite
+    se ajusta al número de líneas activas.
+    """
+    
+    def __init__(self, app, max_lineas: int = 100, lineas_snapshot: int = None, snapshots_por_segundo: float = 20.0,
+                 intervalo_minimo: float = 1.0, timeout_snapshot: float = 12.0) -> None:
+                 
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        app : IB_Trading
+            Instancia conectada (o por conectar) de `IB_Trading`.
+            
+        max_lineas : int, opcional
+            Número de líneas de datos de mercado de la cuenta. Por defecto, es 100.
+            
+        lineas_snapshot : int, opcional
+            Líneas reservadas para los snapshots simultáneos de la rotación. Debe ser menor que `max_lineas`. Por defecto,
+            es `None` (el 10% de las líneas, entre 1 y 10).
+            
+        snapshots_por_segundo : float, opcional
+            Ritmo máximo de peticiones de snapshot. Por defecto, es 20.0.
+            
+        intervalo_minimo : float, opcional
+            Segundos mínimos entre dos snapshots del mismo contrato. Por defecto, es 1.0.
+            
+        timeout_snapshot : float, opcional
+            Segundos tras los cuales un snapshot sin respuesta libera su lugar. Por defecto, es 12.0 (IB responde en
+            un máximo de 11 segundos).
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Validar Líneas
+        if lineas_snapshot is None:
+            lineas_snapshot = max(1, min(10, max_lineas // 10))
+        if lineas_snapshot >= max_lineas:
+            raise ValueError(f"Las líneas de snapshot ({lineas_snapshot}) deben ser menos que las líneas de datos de mercado "
+                             f"({max_lineas})")
+        # Atributos
+        self.app = app
+        self.max_lineas = max_lineas
+        self.lineas_snapshot = lineas_snapshot
+        self.snapshots_por_segundo = snapshots_por_segundo
+        self.intervalo_minimo = intervalo_minimo
+        self.timeout_snapshot = timeout_snapshot
+        # Suscripciones (clave -> datos) y reqId -> clave
+        self.suscripciones = {}
+        self.claves = {}
+        # Rotación de snapshots y snapshots pendientes (reqId -> instante de la petición)
+        self.rotacion = deque()
+        self.pendientes = {}
+        self.condicion = threading.Condition()
+        self.hilo = None
+        self.activo = True
+        
+        
+    @property
+    def lineas_tiempo_real(self) -> int:
+        
+        """
+        Número máximo de suscripciones en tiempo real.
+        """
+        
+        return max(0, self.max_lineas - self.lineas_snapshot)
+        
+        
+    def lineas_en_uso(self) -> int:
+        
+        """
+        Método que devuelve el número de suscripciones en tiempo real activas.
+        """
+        
+        return sum(1 for suscripcion in self.suscripciones.values() if suscripcion["modo"] == "linea")
+        
+        
+    # -------------------------------------------------- Suscripciones --------------------------------------------------
+    
+    def suscribir(self, contract, genericTickList: str = "", componente: str = "") -> int:
+        
+        """
+        Método que suscribe un contrato (o suma una referencia si ya está suscrito con los mismos ticks genéricos).
+        
+        Parámetros:
+        -----------
+        contract : Contract
+            Objeto que especifica los detalles del contrato financiero.
+            
+        genericTickList : str, opcional
+            Lista de ticks genéricos separados por comas. Por defecto, es "".
+            
+        componente : str, opcional
+            Nombre del componente que solicita la suscripción (para llevar la cuenta de referencias). Por defecto, es "".
+            
+        Salida:
+        -------
+        return: int : reqId de la suscripción (para leer su cotización en `IB_Trading.cotizaciones`).
+        """
+        
+        genericTickList = ",".join(sorted(tick.strip() for tick in genericTickList.split(",") if tick.strip()))
+        clave = (clave_contrato(contract), genericTickList)
+        with self.condicion:
+            suscripcion = self.suscripciones.get(clave)
+            if suscripcion is not None:
+                suscripcion["referencias"][componente] = suscripcion["referencias"].get(componente, 0) + 1
+                return suscripcion["reqId"]
+            # Nueva Suscripción
+            reqId = self.app.next_request_id()
+            modo = "linea" if self.lineas_en_uso() < self.lineas_tiempo_real else "rotacion"
+            suscripcion = {"reqId": reqId, "contract": contract, "genericTickList": genericTickList, "modo": modo,
+                           "referencias": {componente: 1}, "ultimo_snapshot": 0.0,
+                           "solicitado": time.monotonic() if modo == "linea" else None}
+            self.suscripciones[clave] = suscripcion
+            self.claves[reqId] = clave
+            if modo == "rotacion":
+                self.rotacion.append(clave)
+                self.iniciar_rotacion()
+                self.condicion.notify()
+        # Solicitar Datos
+        self.app.cotizaciones.registrar(reqId, contract)
+        if modo == "linea":
+            self.app.reqMktData(reqId, contract, genericTickList, False, False, [])
+            
+        return reqId
+        
+        
+    def cancelar(self, reqId: int, componente: str = "") -> None:
+        
+        """
+        Método que libera la referencia de un componente. La suscripción se cancela al liberar la última referencia.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            reqId devuelto por `suscribir`.
+            
+        componente : str, opcional
+            Nombre del componente que libera la suscripción. Por defecto, es "".
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.condicion:
+            clave = self.claves.get(reqId)
+            if clave is None:
+                return
+            suscripcion = self.suscripciones[clave]
+            referencias = suscripcion["referencias"]
+            if componente in referencias:
+                referencias[componente] -= 1
+                if referencias[componente] <= 0:
+                    del referencias[componente]
+            if len(referencias) > 0:
+                return
+            # Retirar Suscripción
+            del self.suscripciones[clave]
+            del self.claves[reqId]
+            if suscripcion["modo"] == "rotacion":
+                self.rotacion.remove(clave)
+        if suscripcion["modo"] == "linea":
+            self.app.cancelMktData(reqId)
+            self.promover()
+        else:
+            self.app.cotizaciones.eliminar(reqId)
+        self.app.release_request_id(reqId)
+        
+        
+    def promover(self) -> None:
+        
+        """
+        Método que pasa a tiempo real las primeras suscripciones en rotación mientras haya líneas disponibles (se omiten
+        las que tienen un snapshot pendiente; se promoverán al terminar).
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        promovidas = []
+        with self.condicion:
+            disponibles = self.lineas_tiempo_real - self.lineas_en_uso()
+            for clave in list(self.rotacion):
+                if disponibles <= 0:
+                    break
+                suscripcion = self.suscripciones[clave]
+                if suscripcion["reqId"] in self.pendientes:
+                    continue
+                self.rotacion.remove(clave)
+                suscripcion["modo"] = "linea"
+                if suscripcion["solicitado"] is None:
+                    suscripcion["solicitado"] = time.monotonic()
+                promovidas.append(suscripcion)
+                disponibles -= 1
+        for suscripcion in promovidas:
+            self.app.reqMktData(suscripcion["reqId"], suscripcion["contract"], suscripcion["genericTickList"], False, False, [])
+            
+            
+    def resuscribir(self) -> None:
+        
+        """
+        Método que vuelve a solicitar todas las suscripciones en tiempo real (después de una reconexión).
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.condicion:
+            self.pendientes.clear()
+            lineas = [suscripcion for suscripcion in self.suscripciones.values() if suscripcion["modo"] == "linea"]
+            self.condicion.notify()
+        for suscripcion in lineas:
+            self.app.reqMktData(suscripcion["reqId"], suscripcion["contract"], suscripcion["genericTickList"], False, False, [])
+            
+            
+    def solicitado(self, reqId: int) -> float:
+        
+        """
+        Método que devuelve el momento (`time.monotonic()`) en que se pidieron por primera vez los datos de una
+        suscripción: al suscribirse con línea en tiempo real o con su primer snapshot de la rotación.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        Salida:
+        -------
+        return: float : Momento de la primera petición, o `None` si aún espera su primer snapshot (o no existe).
+        """
+        
+        with self.condicion:
+            clave = self.claves.get(reqId)
+            return None if clave is None else self.suscripciones[clave]["solicitado"]
+            
+            
+    # -------------------------------------------------- Eventos de IB --------------------------------------------------
+    
+    def fin_snapshot(self, reqId: int) -> None:
+        
+        """
+        Método que libera el lugar de un snapshot terminado (llamado desde `tickSnapshotEnd`).
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la suscripción.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.condicion:
+            if self.pendientes.pop(reqId, None) is None:
+                return
+            self.condicion.notify()
+        if self.lineas_en_uso() < self.lineas_tiempo_real:
+            self.promover()
+            
+            
+    def error(self, reqId: int, errorCode: int) -> None:
+        
+        """
+        Método que procesa los errores de IB que afectan a las suscripciones.
+        
+        Parámetros:
+        -----------
+        reqId : int
+            Identificador de la petición.
+            
+        errorCode : int
+            Código del error.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Conexión recuperada con pérdida de datos: volver a suscribir
+        if errorCode == 1101:
+            self.resuscribir()
+            return
+        with self.condicion:
+            clave = self.claves.get(reqId)
+            if clave is None:
+                return
+            suscripcion = self.suscripciones[clave]
+            # Snapshot fallido: liberar su lugar
+            if self.pendientes.pop(reqId, None) is not None:
+                self.condicion.notify()
+            # Límite de líneas de la cuenta alcanzado: pasar a la rotación y ajustar el límite
+            elif errorCode == 101 and suscripcion["modo"] == "linea":
+                suscripcion["modo"] = "rotacion"
+                self.rotacion.appendleft(clave)
+                self.max_lineas = self.lineas_en_uso() + self.lineas_snapshot
+                if self.lineas_tiempo_real == 0:
+                    self.app.logger.warning("Sin líneas de datos de mercado en tiempo real: todas las suscripciones se "
+                                            "actualizarán con la rotación de snapshots")
+                self.iniciar_rotacion()
+                self.condicion.notify()
+                
+                
+    # -------------------------------------------------- Rotación --------------------------------------------------
+    
+    def iniciar_rotacion(self) -> None:
+        
+        """
+        Método que inicia el hilo de la rotación de snapshots (si no está en ejecución). Debe llamarse con el candado
+        adquirido.
+        """
+        
+        if self.hilo is None or not self.hilo.is_alive():
+            self.hilo = threading.Thread(target=self.rotar, daemon=True)
+            self.hilo.start()
+            
+            
+    def siguiente_snapshot(self):
+        
+        """
+        Método que elige la siguiente suscripción de la rotación a actualizar. Debe llamarse con el candado adquirido.
+        
+        Salida:
+        -------
+        return: dict : Suscripción elegida, o `None` si no hay lugar o ninguna está lista.
+        """
+        
+        ahora = time.monotonic()
+        # Liberar snapshots sin respuesta
+        for reqId, inicio in list(self.pendientes.items()):
+            if ahora - inicio > self.timeout_snapshot:
+                del self.pendientes[reqId]
+        if len(self.pendientes) >= self.lineas_snapshot:
+            return None
+        # Recorrer la rotación (round-robin)
+        for _ in range(len(self.rotacion)):
+            clave = self.rotacion[0]
+            self.rotacion.rotate(-1)
+            suscripcion = self.suscripciones[clave]
+            if suscripcion["reqId"] not in self.pendientes and ahora - suscripcion["ultimo_snapshot"] >= self.intervalo_minimo:
+                self.pendientes[suscripcion["reqId"]] = ahora
+                suscripcion["ultimo_snapshot"] = ahora
+                if suscripcion["solicitado"] is None:
+                    suscripcion["solicitado"] = ahora
+                return suscripcion
+                
+        return None
+        
+        
+    def rotar(self) -> None:
+        
+        """
+        Método que ejecuta el hilo de la rotación: solicita snapshots de las suscripciones que exceden el límite de líneas,
+        respetando los lugares reservados y el ritmo máximo. Termina cuando la rotación queda vacía.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        pausa = 1 / self.snapshots_por_segundo
+        while self.activo:
+            with self.condicion:
+                if len(self.rotacion) == 0:
+                    self.hilo = None
+                    return
+                suscripcion = self.siguiente_snapshot()
+                if suscripcion is None:
+                    self.condicion.wait(timeout=min(self.intervalo_minimo, 0.25))
+                    continue
+            # Los snapshots no admiten ticks genéricos
+            self.app.reqMktData(suscripcion["reqId"], suscripcion["contract"], "", True, False, [])
+            time.sleep(pausa)
+            
+            
+    def detener(self) -> None:
+        
+        """
+        Método que detiene la rotación de snapshots.
+        
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        with self.condicion:
+            self.activo = False
+            self.condicion.notify()
+            
+            
+    def estado(self) -> pd.DataFrame:
+        
+        """
+        Método que devuelve el estado de todas las suscripciones.
+        
+        Salida:
+        -------
+        return: pd.DataFrame : reqId, símbolo, modo ('linea' o 'rotacion'), ticks genéricos, componentes y número de
+                               referencias de cada suscripción.
+        """
+        
+        with self.condicion:
+            filas = [{"reqId": suscripcion["reqId"], "symbol": suscripcion["contract"].symbol, "modo": suscripcion["modo"],
+                      "genericTickList": suscripcion["genericTickList"],
+                      "componentes": ",".join(componente for componente in suscripcion["referencias"] if componente),
+                      "referencias": sum(suscripcion["referencias"].values())}
+                     for suscripcion in self.suscripciones.values()]
+                     
+        return pd.DataFrame(filas, columns=["reqId", "symbol", "modo", "genericTickList", "componentes", "referencias"])
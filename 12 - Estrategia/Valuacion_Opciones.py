@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import math
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+from scipy.optimize import brentq
+
+# Resultados de la valuación
+GRIEGAS = ["precio", "delta", "gamma", "vega", "theta", "rho"]
+# 1 / raíz(2 pi) para la densidad normal
+INV_RAIZ_2PI = 1 / math.sqrt(2 * math.pi)
+
+# Función que convierte el tipo de opción en un signo
+def signo_opcion(right) -> np.ndarray:
+    
+    """
+    Función que convierte el tipo de cada opción en un signo: 1 para Call y -1 para Put.
+    
+    Parámetros:
+    -----------
+    right : str | bool | array
+        "C"/"CALL"/"P"/"PUT" (en mayúsculas o minúsculas, como `Contract.right`), booleanos (True = Call) o signos
+        (1/-1). Puede ser un solo valor o un arreglo.
+        
+    Salida:
+    -------
+    return: np.ndarray : Arreglo de 1 y -1.
+    """
+    
+    right = np.asarray(right)
+    if right.dtype.kind in ("U", "S", "O"):
+        return np.where(np.char.upper(right.astype("U")).astype("U1") == "C", 1, -1).astype("int8")
+    if right.dtype.kind == "b":
+        return np.where(right, 1, -1).astype("int8")
+        
+    return np.sign(right).astype("int8")
+
+
+# Clase que valúa una cadena de opciones con el modelo de Black-Scholes
+class CadenaBlackScholes:
+    
+    """
+    Clase que valúa una cadena completa de opciones europeas con el modelo de Black-Scholes (con dividendo continuo q)
+    y calcula sus griegas en una sola pasada vectorizada.
+    
+    Los datos de cada opción que no cambian con el subyacente (strike, vencimiento, tasas, tipo) se preparan una sola vez
+    en el constructor: raíz del tiempo, factores de descuento exp(-rT) y exp(-qT), y log(K). En cada `valuar(S)` sólo se
+    recalculan d1 y d2 (reutilizados por todas las griegas), dos evaluaciones de la normal acumulada y una de la densidad.
+    Los cálculos se hacen por bloques de `tamano_bloque` opciones sobre arreglos reservados, para mantener acotada la
+    memoria temporal.
+    
+    Las griegas siguen las convenciones de IB: vega y rho por un punto porcentual (0.01) de cambio y theta por día
+    natural. Las opciones vencidas (T <= 0) o con volatilidad no positiva valen su valor intrínseco.
+    """
+    
+    def __init__(self, K, T, right, r=0.0, q=0.0, sigma=None, dtype: str = "float64", tamano_bloque: int = 65536) -> None:
+        
+        """
+        Constructor de la clase.
+        
+        Parámetros:
+        -----------
+        K : float | array
+            Precios de ejercicio.
+            
+        T : float | array
+            Tiempo al vencimiento en años.
+            
+        right : str | bool | array
+            Tipo de cada opción (ver `signo_opcion`).
+            
+        r : float | array, opcional
+            Tasa libre de riesgo anual continua. Por defecto, es 0.0.
+            
+        q : float | array, opcional
+            Tasa de dividendo anual continua. Por defecto, es 0.0.
+            
+        sigma : float | array, opcional
+            Volatilidad de cada opción. Puede indicarse (o cambiarse) en `valuar`. Por defecto, es `None`.
+            
+        dtype : str, opcional
+            Precisión de los cálculos: "float64" o "float32" (la mitad de memoria, unas 7 cifras significativas). Por
+            defecto, es "float64".
+            
+        tamano_bloque : int, opcional
+            Número de opciones que se procesan a la vez. Por defecto, es 65536.
+            
+        Salida:
+        -------
+        return: NoneType : None.
+        """
+        
+        # Ajustar todas las entradas a la misma forma
+        K, T, r, q, signo = np.broadcast_arrays(np.asarray(K, dtype=dtype), np.asarray(T, dtype=dtype),
+                                                np.asarray(r, dtype=dtype), np.asarray(q, dtype=dtype), signo_opcion(right))
+        self.dtype = np.dtype(dtype)
+        self.forma = K.shape
+        self.n = K.size
+        self.tamano_bloque = tamano_bloque
+        # Datos fijos de cada opción
+        self.K = K.ravel().copy()
+        self.T = np.maximum(T.ravel(), 0).astype(dtype)
+        self.r = r.ravel().copy()
+        self.q = q.ravel().copy()
+        self.signo = signo.ravel().astype(dtype)
+        self.raiz_T = np.sqrt(self.T)
+        self.log_K = np.log(self.K)
+        self.descuento_r = np.exp(-self.r * self.T)
+        self.descuento_q = np.exp(-self.q * self.T)
+        self.K_descontado = self.K * self.descuento_r
+        self.vencidas = self.T <= 0
+        self.sigma = None
+        if sigma is not None:
+            self.sigma = np.broadcast_to(np.asarray(sigma, dtype=dtype), self.forma).ravel().copy()
+        # Resultados (se reutilizan en cada valuación)
+        self.resultados = {griega: np.empty(self.n, dtype=dtype) for griega in GRIEGAS}
+        
+        
+    def __len__(self) -> int:
+        
+        """
+        Método que devuelve el número de opciones de la cadena.
+        """
+        
+        return self.n
+        
+        
+    def valuar(self, S, sigma=None, copiar: bool = True) -> dict:
+        
+        """
+        Método que valúa toda la cadena para un precio del subyacente.
+        
+        Parámetros:
+        -----------
+        S : float | array
+            Precio del subyacente (uno para toda la cadena o uno por opción).
+            
+        sigma : float | array, opcional
+            Volatilidad de cada opción. Si es `None`, se utiliza la del constructor (o de la última valuación).
+            
+        copiar : bool, opcional
+            Si es False, se devuelven los arreglos internos (sin copias), que se sobrescriben en la siguiente valuación.
+            Por defecto, es True.
+            
+        Salida:
+        -------
+        return: dict : Arreglos {"precio", "delta", "gamma", "vega", "theta", "rho"} con la forma de la cadena.
+        """
+        
+        if sigma is not None:
+            self.sigma = np.broadcast_to(np.asarray(sigma, dtype=self.dtype), self.forma).ravel().copy()
+        if self.sigma is None:
+            raise ValueError("Falta la volatilidad (sigma) de las opciones")
+        S = np.asarray(S, dtype=self.dtype)
+        S = np.broadcast_to(S, self.forma).ravel() if S.ndim > 0 else S
+        for inicio in range(0, self.n, self.tamano_bloque):
+            self.valuar_bloque(slice(inicio, min(inicio + self.tamano_bloque, self.n)), S)
+        # Ajustar a la forma de la cadena
+        resultados = {griega: valores.reshape(self.forma) for griega, valores in self.resultados.items()}
+        if copiar:
+            resultados = {griega: valores.copy() for griega, valores in resultados.items()}
+            
+        return resultados
+        
+        
+    def valuar_bloque(self, bloque: slice, S) -> None:
+        
+        """
+        Método que valúa un bloque de opciones y escribe el resultado en los arreglos de resultados.
+        """
+        
+        S = S[bloque] if np.ndim(S) > 0 else S
+        sigma = self.sigma[bloque]
+        raiz_T = self.raiz_T[bloque]
+        signo = self.signo[bloque]
+        descuento_q = self.descuento_q[bloque]
+        K_descontado = self.K_descontado[bloque]
+        T = self.T[bloque]
+        # d1 y d2 (una sola vez para todas las griegas)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volatilidad_T = sigma * raiz_T
+            d1 = (np.log(S) - self.log_K[bloque] + (self.r[bloque] - self.q[bloque] + 0.5 * sigma * sigma) * T) / volatilidad_T
+            d2 = d1 - volatilidad_T
+            # Normal acumulada con el signo de la opción y densidad de d1
+            N1 = ndtr(signo * d1)
+            N2 = ndtr(signo * d2)
+            densidad = np.exp(-0.5 * d1 * d1) * INV_RAIZ_2PI
+            S_descontado = S * descuento_q
+            S_densidad = S_descontado * densidad
+            # Precio y Griegas
+            self.resultados["precio"][bloque] = signo * (S_descontado * N1 - K_descontado * N2)
+            self.resultados["delta"][bloque] = signo * descuento_q * N1
+            self.resultados["gamma"][bloque] = S_densidad / (S * S * volatilidad_T)
+            self.resultados["vega"][bloque] = S_densidad * raiz_T / 100
+            self.resultados["theta"][bloque] = (-S_densidad * sigma / (2 * raiz_T) - signo * self.r[bloque] * K_descontado * N2
+                                                + signo * self.q[bloque] * S_descontado * N1) / 365
+            self.resultados["rho"][bloque] = signo * K_descontado * T * N2 / 100
+        # Opciones vencidas o sin volatilidad: valor intrínseco (del forward descontado si aún no vencen)
+        degeneradas = self.vencidas[bloque] | ~(sigma > 0)
+        if degeneradas.any():
+            S_descontado = np.broadcast_to(S_descontado, degeneradas.shape)[degeneradas]
+            signo = signo[degeneradas]
+            dentro = signo * (S_descontado - K_descontado[degeneradas]) > 0
+            for griega in GRIEGAS:
+                self.resultados[griega][bloque][degeneradas] = 0.0
+            intrinseco = signo * (S_descontado - K_descontado[degeneradas])
+            self.resultados["precio"][bloque][degeneradas] = np.where(dentro, intrinseco, 0.0)
+            self.resultados["delta"][bloque][degeneradas] = np.where(dentro, signo * descuento_q[degeneradas], 0.0)
+            
+            
+    def a_dataframe(self, resultados: dict = None, index=None) -> pd.DataFrame:
+        
+        """
+        Método que convierte una valuación en un DataFrame (una fila por opción).
+        
+        Parámetros:
+        -----------
+        resultados : dict, opcional
+            Resultado de `valuar`. Si es `None`, se utiliza la última valuación.
+            
+        index : pd.Index, opcional
+            Índice del DataFrame (por ejemplo, el conId de cada opción). Por defecto, es `None`.
+            
+        Salida:
+        -------
+        return: pd.DataFrame : Columnas strike, T, right, sigma y las griegas.
+        """
+        
+        resultados = resultados or self.resultados
+        datos = {"strike": self.K, "T": self.T, "right": np.where(self.signo > 0, "C", "P"), "sigma": self.sigma}
+        datos.update({griega: np.ravel(resultados[griega]) for griega in GRIEGAS})
+        
+        return pd.DataFrame(datos, index=index)
+
+
+# Función que valúa un conjunto de opciones con el modelo de Black-Scholes
+def black_scholes(S, K, T, r, sigma, right, q=0.0, dtype: str = "float64", tamano_bloque: int = 65536) -> dict:
+    
+    """
+    Función que valúa un conjunto de opciones europeas con el modelo de Black-Scholes y calcula sus griegas en una sola
+    pasada vectorizada (ver `CadenaBlackScholes` para valuar la misma cadena muchas veces).
+    
+    Parámetros:
+    -----------
+    S, K, T, r, sigma : float | array
+        Precio del subyacente, precio de ejercicio, tiempo al vencimiento (años), tasa libre de riesgo y volatilidad.
+        
+    right : str | bool | array
+        Tipo de cada opción (ver `signo_opcion`).
+        
+    q : float | array, opcional
+        Tasa de dividendo continua. Por defecto, es 0.0.
+        
+    dtype : str, opcional
+        "float64" o "float32". Por defecto, es "float64".
+        
+    tamano_bloque : int, opcional
+        Número de opciones que se procesan a la vez. Por defecto, es 65536.
+        
+    Salida:
+    -------
+    return: dict : Arreglos {"precio", "delta", "gamma", "vega", "theta", "rho"}.
+    """
+    
+    forma = np.broadcast_shapes(np.shape(S), np.shape(K), np.shape(T), np.shape(r), np.shape(sigma), np.shape(right),
+                                np.shape(q))
+    K, T, r, q, right = (np.broadcast_to(x, forma) for x in (K, T, r, q, np.asarray(right)))
+    cadena = CadenaBlackScholes(K, T, right, r=r, q=q, sigma=np.broadcast_to(sigma, forma), dtype=dtype,
+                                tamano_bloque=tamano_bloque)
+                                
+    return cadena.valuar(np.broadcast_to(S, forma), copiar=False)
+
+
+# Función que calcula la volatilidad implícita de un conjunto de opciones
+def volatilidad_implicita(precio, S, K, T, r, right, q=0.0, tolerancia: float = 1e-6, max_iter: int = 30,
+                          sigma_min: float = 1e-4, sigma_max: float = 5.0, prima_minima: float = 1e-6) -> np.ndarray:
+                          
+    """
+    Función que calcula la volatilidad implícita de Black-Scholes de un conjunto de opciones a la vez.
+    
+    Todas las opciones se resuelven juntas con el método de Newton (una valuación vectorizada de la cadena por
+    iteración, con la vega como derivada). Cada opción mantiene un intervalo [bajo, alto] que contiene la solución:
+    cuando el paso de Newton sale del intervalo o la vega es casi nula, se toma el punto medio (bisección). Una opción
+    converge cuando el cambio de su volatilidad es menor que `tolerancia`; las pocas que no convergen en `max_iter`
+    iteraciones se resuelven individualmente con el método de Brent.
+    
+    Las opciones con valor extrínseco o vega menores que `prima_minima` (por ejemplo, muy fuera del dinero) no
+    determinan la volatilidad, por lo que devuelven NaN.
+    
+    Parámetros:
+    -----------
+    precio : float | array
+        Prima observada de cada opción (por ejemplo, el punto medio entre bid y ask).
+        
+    S, K, T, r : float | array
+        Precio del subyacente, precio de ejercicio, tiempo al vencimiento (años) y tasa libre de riesgo.
+        
+    right : str | bool | array
+        Tipo de cada opción (ver `signo_opcion`).
+        
+    q : float | array, opcional
+        Tasa de dividendo continua. Por defecto, es 0.0.
+        
+    tolerancia : float, opcional
+        Cambio máximo de la volatilidad entre iteraciones para considerar que una opción convergió. Por defecto, es 1e-6.
+        
+    max_iter : int, opcional
+        Número máximo de iteraciones vectorizadas. Por defecto, es 30.
+        
+    sigma_min, sigma_max : float, opcional
+        Intervalo de búsqueda de la volatilidad. Por defecto, es [0.0001, 5.0].
+        
+    prima_minima : float, opcional
+        Valor extrínseco (prima menos valor intrínseco descontado) y vega (por unidad de volatilidad) mínimos para
+        calcular la volatilidad. Por defecto, es 1e-6.
+        
+    Salida:
+    -------
+    return: np.ndarray : Volatilidad implícita de cada opción (NaN si la prima está fuera de los límites de no arbitraje,
+                         su valor extrínseco o su vega son despreciables o no hay solución en el intervalo).
+    """
+    
+    forma = np.broadcast_shapes(np.shape(precio), np.shape(S), np.shape(K), np.shape(T), np.shape(r), np.shape(right),
+                                np.shape(q))
+    # Aplanar todas las entradas (la cadena de trabajo es unidimensional; el resultado recupera la forma al final)
+    precio, S = (np.broadcast_to(np.asarray(x, dtype="float64"), forma).ravel() for x in (precio, S))
+    K, T, r, q, right = (np.broadcast_to(np.asarray(x), forma).ravel() for x in (K, T, r, q, right))
+    cadena = CadenaBlackScholes(K, T, right, r=r, q=q, sigma=sigma_min)
+    # Límites de no arbitraje
+    S_descontado = S * cadena.descuento_q
+    minimo = np.maximum(cadena.signo * (S_descontado - cadena.K_descontado), 0.0)
+    maximo = np.where(cadena.signo > 0, S_descontado, cadena.K_descontado)
+    validas = (precio - minimo >= prima_minima) & (precio < maximo) & (cadena.T > 0)
+    # Valor inicial: aproximación de Brenner-Subrahmanyam y punto de inflexión de Manaster-Koehler
+    with np.errstate(divide="ignore", invalid="ignore"):
+        brenner = np.sqrt(2 * np.pi / cadena.T) * precio / S
+        inflexion = np.sqrt(2 * np.abs(np.log(S_descontado / cadena.K_descontado)) / cadena.T)
+    sigma = np.clip(np.nan_to_num(np.maximum(brenner, inflexion), nan=0.3), sigma_min, sigma_max)
+    bajo = np.full(sigma.shape, sigma_min)
+    alto = np.full(sigma.shape, sigma_max)
+    vega = np.zeros(sigma.shape)
+    pendientes = validas.copy()
+    # Newton con bisección (vectorizado)
+    for _ in range(max_iter):
+        if not pendientes.any():
+            break
+        resultado = cadena.valuar(S, sigma, copiar=False)
+        diferencia = resultado["precio"] - precio
+        vega = np.where(pendientes, resultado["vega"] * 100, vega)
+        pendientes &= diferencia != 0
+        # Actualizar intervalos
+        alto = np.where(pendientes & (diferencia > 0), sigma, alto)
+        bajo = np.where(pendientes & (diferencia < 0), sigma, bajo)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sigma - diferencia / vega
+        dentro = (newton > bajo) & (newton < alto)
+        nuevo = np.where(dentro, newton, (bajo + alto) / 2)
+        # Convergencia sobre el cambio de la volatilidad (no sobre el error en la prima)
+        paso = np.abs(nuevo - sigma)
+        sigma = np.where(pendientes, nuevo, sigma)
+        pendientes &= paso > tolerancia
+    # Método de Brent para las opciones que no convergieron
+    for i in np.flatnonzero(pendientes).tolist():
+        def error(volatilidad: float) -> float:
+            return float(black_scholes(S[i], cadena.K[i], cadena.T[i], cadena.r[i], volatilidad, cadena.signo[i],
+                                       q=cadena.q[i])["precio"]) - precio[i]
+        try:
+            sigma[i] = brentq(error, sigma_min, sigma_max, xtol=1e-10)
+        except ValueError:
+            validas[i] = False
+    # Vega despreciable: la prima no determina la volatilidad
+    validas &= vega >= prima_minima
+    
+    return np.where(validas, sigma, np.nan).reshape(forma)
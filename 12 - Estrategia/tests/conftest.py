@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import os
+import sys
+import pytest
+
+# Los módulos de la estrategia se importan directamente desde su carpeta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from IB_Trading import IB_Trading
+from Servidor_Simulado import ServidorSimulado
+
+
+@pytest.fixture
+def servidor(request):
+    
+    # Servidor simulado en un puerto libre (los parámetros se pueden indicar con `indirect=True`)
+    servidor = ServidorSimulado(port=0, **getattr(request, "param", {}))
+    servidor.iniciar()
+    yield servidor
+    servidor.detener()
+
+
+@pytest.fixture
+def app(servidor, tmp_path):
+    
+    # Instancia de IB_Trading conectada al servidor simulado
+    app = IB_Trading(log_file=str(tmp_path / "ib.log"))
+    app.connect(port=servidor.port)
+    yield app
+    app.disconnect()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from Analisis_Tecnico import Cruce_MA, Cruce_MA_Incremental, Monitor_Cruces_MA
+import numpy as np
+import pandas as pd
+
+
+def cierres(n: int = 400, semilla: int = 3) -> pd.DataFrame:
+    
+    generador = np.random.default_rng(semilla)
+    fechas = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.DataFrame({"Close": 100 + generador.standard_normal(n).cumsum()}, index=fechas)
+
+
+def test_incremental_igual_a_cruce_ma():
+    
+    df = cierres()
+    esperado = Cruce_MA(df, 9, 21)
+    cruce = Cruce_MA_Incremental(9, 21)
+    filas = [cruce.actualizar(cierre) for cierre in df["Close"]]
+    obtenido = pd.DataFrame(filas, index=df.index)[esperado.columns]
+    np.testing.assert_allclose(obtenido.to_numpy(dtype=float), esperado.to_numpy(dtype=float), atol=1e-9)
+
+
+def test_incremental_continua_despues_de_calentar():
+    
+    df = cierres()
+    esperado = Cruce_MA(df, 5, 30)
+    cruce = Cruce_MA_Incremental(5, 30)
+    cruce.calentar(df.iloc[:250])
+    filas = [cruce.actualizar(cierre) for cierre in df["Close"].iloc[250:]]
+    obtenido = pd.DataFrame(filas, index=df.index[250:])[esperado.columns]
+    np.testing.assert_allclose(obtenido.to_numpy(dtype=float), esperado.iloc[250:].to_numpy(dtype=float), atol=1e-9)
+
+
+def test_monitor_por_activo():
+    
+    monitor = Monitor_Cruces_MA(9, 21)
+    datos = {"A": cierres(semilla=1), "B": cierres(semilla=2)}
+    for clave, df in datos.items():
+        monitor.calentar(clave, df.iloc[:-50])
+        for cierre in df["Close"].iloc[-50:]:
+            ultimo = monitor.actualizar(clave, cierre)
+        esperado = Cruce_MA(df, 9, 21).iloc[-1]
+        assert np.isclose(ultimo["MA_Rapida"], esperado["MA_Rapida"])
+        assert np.isclose(ultimo["MA_Lenta"], esperado["MA_Lenta"])
+        assert ultimo["Tendencia"] == esperado["Tendencia"]
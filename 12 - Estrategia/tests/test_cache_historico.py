@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from Cache_Historico import CacheBarras
+from ibapi.contract import Contract
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+
+# Barras diarias fijas que sirve el servidor simulado
+FECHAS = pd.bdate_range("2023-01-02", "2024-12-31")
+HISTORICO = pd.DataFrame({"Open": 100.0, "High": 101.0, "Low": 99.0, "Close": 100 + np.arange(len(FECHAS)) * 0.1,
+                          "Volume": 1000.0}, index=FECHAS)
+
+
+@pytest.fixture
+def peticiones(servidor, monkeypatch):
+    
+    # Registrar (endDateTime, durationStr) de cada petición histórica que llega al servidor
+    registro = []
+    barras = servidor.barras
+    def registrar(symbol, endDateTime, durationStr, barSizeSetting):
+        registro.append((endDateTime, durationStr))
+        return barras(symbol, endDateTime, durationStr, barSizeSetting)
+    monkeypatch.setattr(servidor, "barras", registrar)
+    return registro
+
+
+def descargar(app, cache, inicio, fin):
+    
+    contrato = Contract()
+    contrato.symbol = "AAPL"
+    contrato.secType = "STK"
+    contrato.exchange = "SMART"
+    contrato.currency = "USD"
+    return app.reqHistoricalDataCache(contract=contrato, inicio=inicio, fin=fin, endDateTime=fin.strftime("%Y%m%d %H:%M:%S"),
+                                      whatToShow="TRADES", cache=cache)
+
+
+def test_huecos_del_inicio_y_del_final(tmp_path):
+    
+    cache = CacheBarras(str(tmp_path / "cache.db"))
+    clave = (1, "1 day", "TRADES", 1)
+    assert cache.huecos(clave, datetime(2024, 1, 1), datetime(2024, 6, 1)) == [(pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 6, 1))]
+    cache.guardar(clave, HISTORICO.loc["2024-03-01":"2024-04-30"], datetime(2024, 3, 1), datetime(2024, 4, 30))
+    assert cache.huecos(clave, datetime(2024, 3, 10), datetime(2024, 4, 10)) == []
+    assert cache.huecos(clave, datetime(2024, 1, 1), datetime(2024, 6, 1)) == [
+        (pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 3, 1)), (pd.Timestamp(2024, 4, 30), pd.Timestamp(2024, 6, 1))]
+    # La cobertura se amplía al guardar un hueco
+    cache.guardar(clave, HISTORICO.loc["2024-04-30":"2024-06-01"], datetime(2024, 4, 30), datetime(2024, 6, 1))
+    assert cache.cobertura(clave) == (pd.Timestamp(2024, 3, 1), pd.Timestamp(2024, 6, 1))
+
+
+@pytest.mark.parametrize("servidor", [{"fixtures": {"historico": {"AAPL": HISTORICO}}}], indirect=True)
+def test_segunda_descarga_solo_pide_el_hueco_final(app, peticiones, tmp_path):
+    
+    cache = CacheBarras(str(tmp_path / "cache.db"))
+    inicio, fin = datetime(2024, 3, 1), datetime(2024, 6, 28, 23, 59, 59)
+    primero = descargar(app, cache, inicio, fin)
+    assert len(peticiones) == 1
+    pd.testing.assert_series_equal(primero["Close"], HISTORICO.loc[inicio:fin, "Close"], check_names=False,
+                                   check_freq=False, check_index_type=False)
+    # El mismo intervalo se lee completo de la caché
+    segundo = descargar(app, cache, inicio, fin)
+    assert len(peticiones) == 1
+    pd.testing.assert_frame_equal(segundo, primero)
+    # Al extender el final, sólo se pide el hueco nuevo
+    nuevo_fin = datetime(2024, 9, 30, 23, 59, 59)
+    tercero = descargar(app, cache, inicio, nuevo_fin)
+    assert len(peticiones) == 2
+    assert peticiones[-1][0] == "20240930 23:59:59"
+    assert peticiones[-1][1] == "95 D"
+    np.testing.assert_allclose(tercero["Close"], HISTORICO.loc[inicio:nuevo_fin, "Close"])
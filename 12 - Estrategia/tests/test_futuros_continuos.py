@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from Futuros_Continuos import FuturoContinuo
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def futuro(tmp_path):
+    
+    # Tres contratos con precios constantes (100, 110 y 99) y vidas superpuestas
+    futuro = FuturoContinuo(trading_app=None, symbol="ES", exchange="CME", db_path=str(tmp_path / "futuros.db"))
+    futuro.contratos = pd.DataFrame({"conId": [1, 2, 3], "localSymbol": ["ESH4", "ESM4", "ESU4"],
+                                     "vencimiento": ["20240315", "20240615", "20240915"]})
+    vidas = {1: ("2024-01-01", "2024-03-15", 100.0), 2: ("2024-01-01", "2024-06-15", 110.0),
+             3: ("2024-03-01", "2024-09-10", 99.0)}
+    datos = {}
+    for conId, (inicio, fin, precio) in vidas.items():
+        fechas = pd.date_range(inicio, fin, freq="D", name="Date")
+        datos[conId] = pd.DataFrame({"Open": precio, "High": precio, "Low": precio, "Close": precio,
+                                     "Volume": 1000.0 * conId}, index=fechas)
+    # El segundo contrato negocia más volumen que el primero a partir del 1 de marzo
+    datos[2].loc[:"2024-02-29", "Volume"] = 500.0
+    futuro.descargar = lambda **kwargs: datos
+    return futuro
+
+
+@pytest.mark.parametrize("ajuste", ["ratio", "diferencia"])
+def test_continua_ajuste_elimina_saltos(futuro, ajuste):
+    
+    continua = futuro.continua(roll="fecha", ajuste=ajuste, dias_roll=5)
+    # Con precios constantes, la serie ajustada hacia atrás queda al nivel del último contrato
+    np.testing.assert_allclose(continua["Close"], 99.0)
+    assert continua.loc["2024-03-09", "Contrato"] == "ESH4"
+    assert continua.loc["2024-03-10", "Contrato"] == "ESM4"
+    assert continua.loc["2024-06-09", "Contrato"] == "ESM4"
+    assert continua.loc["2024-06-10", "Contrato"] == "ESU4"
+
+
+def test_continua_roll_por_volumen(futuro):
+    
+    continua = futuro.continua(roll="volumen", ajuste=None, dias_roll=5)
+    # Cambia en la barra siguiente al primer día con más volumen en el siguiente contrato
+    assert continua.loc["2024-03-01", "Contrato"] == "ESH4"
+    assert continua.loc["2024-03-02", "Contrato"] == "ESM4"
+    assert continua.loc["2024-03-02", "Close"] == 110.0
+    # El tercer contrato ya negocia más volumen que el segundo, por lo que cambia en la barra siguiente
+    assert continua.loc["2024-03-03", "Contrato"] == "ESU4"
+    assert continua["Contrato"].iloc[-1] == "ESU4"
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from Analisis_Tecnico import Cruce_MA
+from Indicadores import sma, ema, cruce_ma, cruce_ma_activo, bollinger
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def panel():
+    
+    # Caminatas aleatorias de 3 activos (uno empieza más tarde)
+    generador = np.random.default_rng(7)
+    fechas = pd.date_range("2024-01-01", periods=300, freq="D")
+    datos = pd.DataFrame(100 + generador.standard_normal((300, 3)).cumsum(axis=0), index=fechas, columns=["A", "B", "C"])
+    datos.iloc[:40, 2] = np.nan
+    return datos
+
+
+def test_sma_igual_a_rolling(panel):
+    
+    pd.testing.assert_frame_equal(sma(panel, 20), panel.rolling(20).mean(), atol=1e-9)
+
+
+def test_ema_igual_a_ewm(panel):
+    
+    esperado = panel.iloc[:, :2].ewm(span=12, adjust=False).mean()
+    pd.testing.assert_frame_equal(ema(panel.iloc[:, :2], 12), esperado, atol=1e-9)
+
+
+def test_cruce_ma_igual_a_analisis_tecnico(panel):
+    
+    resultado = cruce_ma(panel, 9, 21)
+    for activo in panel.columns:
+        esperado = Cruce_MA(panel[[activo]].rename(columns={activo: "Close"}).dropna(), 9, 21)
+        obtenido = cruce_ma_activo(resultado, activo).loc[esperado.index]
+        np.testing.assert_allclose(obtenido.to_numpy(), esperado.to_numpy(), atol=1e-9)
+
+
+def test_bollinger_bandas(panel):
+    
+    bandas = bollinger(panel, ventana=20, desviaciones=2.0)
+    media, desviacion = panel.rolling(20).mean(), panel.rolling(20).std()
+    pd.testing.assert_frame_equal(bandas["Superior"], media + 2 * desviacion, atol=1e-9)
+    pd.testing.assert_frame_equal(bandas["Inferior"], media - 2 * desviacion, atol=1e-9)
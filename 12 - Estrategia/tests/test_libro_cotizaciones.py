@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from Libro_Cotizaciones import QuoteBook
+import numpy as np
+
+
+def test_precio_sin_datos_y_precios_no_positivos():
+    
+    libro = QuoteBook(capacidad=2)
+    libro.registrar(1)
+    # IB envía -1 cuando no hay precio
+    libro.actualizar_precio(1, 1, -1.0)
+    assert np.isnan(libro.cotizacion(1)["bid"])
+    # Los combos y spreads pueden cotizar en cero o con precios negativos
+    libro.actualizar_precio(1, 1, -0.35)
+    libro.actualizar_precio(1, 2, 0.0)
+    cotizacion = libro.cotizacion(1)
+    assert cotizacion["bid"] == -0.35 and cotizacion["ask"] == 0.0
+    assert libro.medio(1) == -0.175
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from concurrent.futures import ThreadPoolExecutor
+from ibapi.contract import Contract
+import pytest
+
+
+def accion(symbol: str) -> Contract:
+    
+    contrato = Contract()
+    contrato.symbol = symbol
+    contrato.secType = "STK"
+    contrato.exchange = "SMART"
+    contrato.currency = "USD"
+    return contrato
+
+
+@pytest.mark.parametrize("servidor", [{"latencia": 0.05}], indirect=True)
+def test_peticiones_concurrentes_resuelven_su_propio_futuro(app):
+    
+    # Ambas peticiones están en curso a la vez sobre la misma conexión
+    with ThreadPoolExecutor(max_workers=2) as ejecutor:
+        historico = ejecutor.submit(app.reqHistoricalData, contract=accion("AAPL"), durationStr="5 D",
+                                    barSizeSetting="1 hour", whatToShow="TRADES")
+        detalles = ejecutor.submit(app.reqContractDetails, contract=accion("MSFT"))
+        historico, detalles = historico.result(), detalles.result()
+    assert historico is not None and len(historico) > 0
+    assert list(historico.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert len(detalles) == 1 and detalles[0].contract.symbol == "MSFT"
+    assert len(app.peticiones) == 0
+
+
+@pytest.mark.parametrize("servidor", [{"latencia": 0.05}], indirect=True)
+def test_error_falla_solo_su_peticion(app):
+    
+    # Una duración inválida produce el error 321 de IB sólo para su reqId
+    valida = app.reqHistoricalDataAsync(contract=accion("AAPL"), durationStr="5 D", barSizeSetting="1 hour",
+                                        whatToShow="TRADES")
+    invalida = app.reqHistoricalDataAsync(contract=accion("AAPL"), durationStr="5 X", barSizeSetting="1 hour",
+                                          whatToShow="TRADES")
+    detalles = app.reqContractDetailsAsync(contract=accion("MSFT"))
+    with pytest.raises(RuntimeError, match="321"):
+        invalida.result(timeout=5)
+    assert len(valida.result(timeout=5)) > 0
+    assert detalles.result(timeout=5)[0].contract.symbol == "MSFT"
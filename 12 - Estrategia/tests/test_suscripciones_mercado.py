@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from IB_Trading import IB_Trading
+from ibapi.contract import Contract
+import numpy as np
+import pytest
+import time
+
+
+def accion(symbol: str) -> Contract:
+    
+    contrato = Contract()
+    contrato.symbol = symbol
+    contrato.secType = "STK"
+    contrato.exchange = "SMART"
+    contrato.currency = "USD"
+    return contrato
+
+
+def esperar(condicion, timeout: float = 5.0) -> bool:
+    
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.02)
+    return condicion()
+
+
+def modos(app) -> dict:
+    
+    estado = app.suscripciones.estado()
+    return dict(zip(estado["reqId"], estado["modo"]))
+
+
+@pytest.fixture
+def app_lineas(servidor, tmp_path):
+    
+    # 4 líneas de la cuenta: 3 en tiempo real y 1 reservada para los snapshots de la rotación
+    app = IB_Trading(log_file=str(tmp_path / "ib.log"), market_data_lines=4)
+    app.connect(port=servidor.port)
+    yield app
+    app.suscripciones.detener()
+    app.disconnect()
+
+
+def test_deduplicacion_y_referencias(app_lineas, servidor):
+    
+    gestor = app_lineas.suscripciones
+    reqId = gestor.suscribir(accion("AAPL"), genericTickList="233,100", componente="a")
+    assert gestor.suscribir(accion("AAPL"), genericTickList="100, 233", componente="b") == reqId
+    assert gestor.lineas_en_uso() == 1
+    # La línea se mantiene mientras algún componente la use
+    gestor.cancelar(reqId, componente="a")
+    assert gestor.lineas_en_uso() == 1
+    gestor.cancelar(reqId, componente="b")
+    assert gestor.lineas_en_uso() == 0
+    assert esperar(lambda: all(len(conexion.mkt_data) == 0 for conexion in servidor.conexiones))
+
+
+def test_limite_rotacion_y_promocion(app_lineas):
+    
+    gestor = app_lineas.suscripciones
+    reqIds = [gestor.suscribir(accion(symbol), componente="t") for symbol in ["A", "B", "C", "D", "E"]]
+    assert [modos(app_lineas)[reqId] for reqId in reqIds] == ["linea"] * 3 + ["rotacion"] * 2
+    # Las suscripciones en rotación reciben cotizaciones por snapshots
+    assert esperar(lambda: all(np.isfinite(app_lineas.cotizaciones.medio(reqId)) for reqId in reqIds[3:]))
+    # Al liberar una línea, la primera en rotación pasa a tiempo real
+    gestor.cancelar(reqIds[0], componente="t")
+    assert esperar(lambda: modos(app_lineas).get(reqIds[3]) == "linea")
+    assert gestor.lineas_en_uso() == 3
+    assert modos(app_lineas)[reqIds[4]] == "rotacion"
+
+
+@pytest.mark.parametrize("servidor", [{"max_lineas": 2}], indirect=True)
+def test_error_101_pasa_a_rotacion(app_lineas):
+    
+    # La cuenta real tiene menos líneas (2) de las configuradas (3 en tiempo real)
+    gestor = app_lineas.suscripciones
+    reqIds = [gestor.suscribir(accion(symbol), componente="t") for symbol in ["A", "B", "C"]]
+    assert esperar(lambda: modos(app_lineas)[reqIds[2]] == "rotacion")
+    assert gestor.max_lineas == 3 and gestor.lineas_en_uso() == 2
+    assert esperar(lambda: np.isfinite(app_lineas.cotizaciones.medio(reqIds[2])))
+
+
+def test_resuscribir_tras_1101(app_lineas, monkeypatch):
+    
+    gestor = app_lineas.suscripciones
+    reqIds = [gestor.suscribir(accion(symbol), componente="t") for symbol in ["A", "B", "C", "D"]]
+    enviados = []
+    monkeypatch.setattr(app_lineas, "reqMktData", lambda reqId, *args: enviados.append((reqId, args[2])))
+    app_lineas.error(-1, 1101, "Connectivity between IB and TWS has been restored - data lost.")
+    # Sólo las líneas en tiempo real se vuelven a solicitar (la rotación continúa por su cuenta)
+    assert sorted(reqId for reqId, snapshot in enviados if not snapshot) == sorted(reqIds[:3])
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+from Valuacion_Opciones import black_scholes, volatilidad_implicita
+import numpy as np
+
+
+def test_volatilidad_implicita_recupera_sigma():
+    
+    # Cadena de calls y puts con distintas volatilidades
+    K = np.linspace(70, 130, 25)
+    sigma = 0.15 + 0.3 * (K / 100 - 1) ** 2
+    right = np.where(K >= 100, "C", "P")
+    precio = black_scholes(100.0, K, 0.5, 0.02, sigma, right, q=0.01)["precio"]
+    iv = volatilidad_implicita(precio, 100.0, K, 0.5, 0.02, right, q=0.01)
+    assert iv.shape == K.shape
+    np.testing.assert_allclose(iv, sigma, atol=1e-4)
+
+
+def test_volatilidad_implicita_malla_2d():
+    
+    # Malla vencimiento x strike
+    K = np.linspace(80, 120, 41)[None, :]
+    T = np.array([0.1, 0.5, 1.0])[:, None]
+    sigma = 0.2 + 0.1 * (K / 100 - 1) ** 2 + 0.05 * T
+    precio = black_scholes(100.0, K, T, 0.03, sigma, "C")["precio"]
+    iv = volatilidad_implicita(precio, 100.0, K, T, 0.03, "C")
+    assert iv.shape == (3, 41)
+    np.testing.assert_allclose(iv, sigma, atol=1e-4)
+
+
+def test_volatilidad_implicita_fuera_de_limites():
+    
+    # Primas por debajo del valor intrínseco o por encima del subyacente no tienen solución
+    iv = volatilidad_implicita([25.0, 150.0], 100.0, 75.0, 0.5, 0.0, "C")
+    assert np.isnan(iv).all()
+
+
+def test_black_scholes_valor_conocido():
+    
+    # Hull: S=100, K=100, T=1, r=5%, sigma=20%
+    resultado = black_scholes(100.0, 100.0, 1.0, 0.05, 0.2, ["C", "P"])
+    np.testing.assert_allclose(resultado["precio"], [10.4506, 5.5735], atol=1e-4)
+    np.testing.assert_allclose(resultado["delta"], [0.6368, -0.3632], atol=1e-4)
+
+
+def test_black_scholes_paridad_put_call():
+    
+    K = np.linspace(60, 140, 17)
+    S, T, r, q, sigma = 100.0, 0.75, 0.03, 0.015, 0.35
+    call = black_scholes(S, K, T, r, sigma, "C", q=q)
+    put = black_scholes(S, K, T, r, sigma, "P", q=q)
+    np.testing.assert_allclose(call["precio"] - put["precio"], S * np.exp(-q * T) - K * np.exp(-r * T), atol=1e-9)
+    np.testing.assert_allclose(call["gamma"], put["gamma"], atol=1e-12)
+    np.testing.assert_allclose(call["vega"], put["vega"], atol=1e-12)
+
+
+def test_volatilidad_implicita_muy_fuera_del_dinero():
+    
+    # Primas despreciables no determinan la volatilidad (NaN); las pequeñas pero válidas se resuelven con precisión
+    K = np.array([50.0, 60.0, 85.0, 115.0, 150.0])
+    right = np.where(K < 100, "P", "C")
+    precio = black_scholes(100.0, K, 0.05, 0.0, 0.2, right)["precio"]
+    iv = volatilidad_implicita(precio, 100.0, K, 0.05, 0.0, right)
+    assert np.isnan(iv[[0, 1, 4]]).all()
+    np.testing.assert_allclose(iv[[2, 3]], 0.2, atol=1e-8)